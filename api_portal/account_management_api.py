@@ -4,8 +4,9 @@
 #
 # -----------------------------------------------------------
 import requests
-from utils.helpers import get_response_values, url_encoded
+from utils.helpers import get_response_values
 
+from api_portal.http_transport import get_default_transport
 from api_portal.sail_portal_api import SailPortalApi
 
 
@@ -14,9 +15,10 @@ class AccountManagementApi:
     Account Management Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
     def get_user_organization_info(self, sail_portal):
         """
@@ -27,14 +29,16 @@ class AccountManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
         # Attempt to get user organization info
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/AccountManager/Organization/Information", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/AccountManager/Organization/Information",
+                json_params,
+                transport=self.transport,
             )
             # params query string
             # response = requests.get(
@@ -42,6 +46,7 @@ class AccountManagementApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -56,21 +61,23 @@ class AccountManagementApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, user_info_json, user_eosb = sail_portal.get_basic_user_info()
+        _, user_info_json, _ = sail_portal.get_basic_user_info()
         org_guid = user_info_json.get("OrganizationGuid")
-        json_params = {"Eosb": user_eosb, "OrganizationGuid": org_guid}
+        json_params = {"OrganizationGuid": org_guid}
         json_params.update(payload)
         # Attempt to update user organization info
         try:
             #  params as json
-            response = requests.put(
+            response = sail_portal.send_with_eosb(
+                "PUT",
                 f"{self.base_url}/SAIL/AccountManager/Update/Organization",
-                json=json_params,
+                json_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -83,16 +90,17 @@ class AccountManagementApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, user_info_json, user_eosb = sail_portal.get_basic_user_info()
+        _, user_info_json, _ = sail_portal.get_basic_user_info()
         user_guid = user_info_json.get("UserGuid")
-        json_params = {"Eosb": user_eosb, "UserGuid": user_guid, "AccessRights": 1}
+        json_params = {"UserGuid": user_guid, "AccessRights": 1}
         # Attempt to update user access rights
         try:
-            response = requests.put(
+            response = sail_portal.send_with_eosb(
+                "PUT",
                 f"{self.base_url}/SAIL/AccountManager/Update/AccessRight",
-                json=json_params,
+                json_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
         except requests.exceptions.HTTPError as error:
             print(f"\n{error}")
@@ -108,16 +116,17 @@ class AccountManagementApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, user_info_json, user_eosb = sail_portal.get_basic_user_info()
+        _, user_info_json, _ = sail_portal.get_basic_user_info()
         user_org_guid = user_info_json.get("OrganizationGuid")
-        json_params = {"Eosb": user_eosb, "OrganizationGuid": user_org_guid}
+        json_params = {"OrganizationGuid": user_org_guid}
         # Attempt to list_organization_users
         try:
-            response = requests.get(
+            response = sail_portal.send_with_eosb(
+                "GET",
                 f"{self.base_url}/SAIL/AccountManager/Organization/Users",
-                json=json_params,
+                json_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
         except requests.exceptions.HTTPError as error:
             print(f"\n{error}")
@@ -135,21 +144,23 @@ class AccountManagementApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, user_info_json, user_eosb = sail_portal.get_basic_user_info()
+        _, user_info_json, _ = sail_portal.get_basic_user_info()
         user_guid = user_info_json.get("UserGuid")
-        json_params = {"Eosb": user_eosb, "UserGuid": user_guid}
+        json_params = {"UserGuid": user_guid}
         json_params.update(payload)
         # Attempt to update user organization info
         try:
             #  params as json
-            response = requests.put(
+            response = sail_portal.send_with_eosb(
+                "PUT",
                 f"{self.base_url}/SAIL/AccountManager/Update/User",
-                json=json_params,
+                json_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -164,11 +175,10 @@ class AccountManagementApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, user_info_json, user_eosb = sail_portal.get_basic_user_info()
+        _, user_info_json, _ = sail_portal.get_basic_user_info()
         user_org_guid = user_info_json.get("OrganizationGuid")
-        json_params = {"Eosb": user_eosb, "OrganizationGuid": user_org_guid}
-        json_params.update(payload)
-        query_params = url_encoded(json_params)
+        query_params = {"OrganizationGuid": user_org_guid}
+        query_params.update(payload)
         try:
             #  params as json
             # response = requests.post(
@@ -177,14 +187,16 @@ class AccountManagementApi:
             #     headers=self.headers,
             #     verify=False,
             # )
-            response = requests.post(
+            response = sail_portal.send_with_eosb(
+                "POST",
                 f"{self.base_url}/SAIL/AccountManager/Admin/RegisterUser",
-                params=query_params,
+                query_params=query_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -198,21 +210,20 @@ class AccountManagementApi:
         :rtype: (string, string)
         """
         # Get user id of user to be deleted
-        sail_portal1 = SailPortalApi(base_url=get_base_url, email=Email, password=Password)
+        sail_portal1 = SailPortalApi(base_url=get_base_url, email=Email, password=Password, transport=self.transport)
         _, user_info_json, user_eosb = sail_portal1.get_basic_user_info()
         user_guid = user_info_json.get("UserGuid")
-        json_params = {"Eosb": user_eosb, "UserGuid": user_guid}
-        # Login as primary admin user
-        sail_portal.login()
+        json_params = {"UserGuid": user_guid}
         # query_params = url_encoded(json_params)
         try:
             #  params as json
             #  Delete user
-            response = requests.delete(
+            response = sail_portal1.send_with_eosb(
+                "DELETE",
                 f"{self.base_url}/SAIL/AccountManager/Remove/User",
-                json=json_params,
+                json_params,
                 headers=self.headers,
-                verify=False,
+                transport=self.transport,
             )
             # query_response = requests.delete(
             #     f"{self.base_url}/SAIL/AccountManager/Remove/User",
@@ -222,6 +233,7 @@ class AccountManagementApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, user guid and user eosb
         return (*get_response_values(response), user_guid)
 
@@ -237,13 +249,14 @@ class AccountManagementApi:
         json_params = {"Eosb": user_eosb, "UserGuid": user_guid}
         # query_params = url_encoded(json_params)
         try:
-            response = requests.put(
+            response = self.transport.request(
+                "PUT",
                 f"{self.base_url}/SAIL/AccountManager/Update/RecoverUser",
                 json=json_params,
                 headers=self.headers,
-                verify=False,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
@@ -0,0 +1,928 @@
+# -----------------------------------------------------------
+#
+# Async Api Portal Classes
+#
+# -----------------------------------------------------------
+import asyncio
+import time
+
+from config import EOSB_TTL, STREAM_MAX_FAILURES
+from utils.helpers import get_response_values, url_encoded
+from utils.stream_helpers import get_streamed_response_values
+
+from api_portal.async_http_transport import async_implicit_login, get_default_async_transport
+
+HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+
+class AsyncSailPortalApi:
+    """
+    Async Sail Portal Api Class, SailPortalApi on an AsyncHttpTransport
+
+    Every coroutine returns the same (response, response.json(), user_eosb) values as
+    SailPortalApi, the calls of one event loop share the cached eosb of the user.
+    """
+
+    def __init__(self, base_url, email, password, eosb_ttl=EOSB_TTL, transport=None):
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+        # Cached user eosb, shared by every api call made with this session
+        self.eosb_ttl = eosb_ttl
+        self._eosb = None
+        self._eosb_login_time = 0.0
+        # Created on first use, a lock made outside the event loop is bound to another loop before python 3.10
+        self._eosb_lock = None
+
+    def _lock(self):
+        if self._eosb_lock is None:
+            self._eosb_lock = asyncio.Lock()
+        return self._eosb_lock
+
+    async def login(self):
+        """
+        Login to Sail Api portal, see SailPortalApi.login
+
+        :returns: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        json_params = {"Email": self.email, "Password": self.password}
+        # Logging in again only issues another eosb, it is retried like a GET
+        response = await self.transport.request(
+            "POST", f"{self.base_url}/SAIL/AuthenticationManager/User/Login", json=json_params, idempotent=True
+        )
+        login_response, login_response_json, user_eosb = get_response_values(response)
+        # Cache the eosb of a successful login for the following api calls
+        if user_eosb:
+            self._eosb = user_eosb
+            self._eosb_login_time = time.monotonic()
+        return login_response, login_response_json, user_eosb
+
+    async def get_eosb(self):
+        """
+        Get the cached user eosb, login only when there is none or it is older than eosb_ttl
+
+        :return: user_eosb
+        :rtype: string
+        """
+        async with self._lock():
+            return await self._get_eosb()
+
+    async def _get_eosb(self):
+        if self._eosb is None or time.monotonic() - self._eosb_login_time >= self.eosb_ttl:
+            self._eosb = None
+            with async_implicit_login():
+                await self.login()
+        return self._eosb
+
+    async def refresh_eosb(self, expired_eosb):
+        """
+        Drop an eosb rejected by the portal and login again, see SailPortalApi.refresh_eosb
+
+        :param expired_eosb: eosb rejected by the portal
+        :type expired_eosb: string
+        :return: user_eosb
+        :rtype: string
+        """
+        async with self._lock():
+            if self._eosb == expired_eosb:
+                self._eosb = None
+            return await self._get_eosb()
+
+    def invalidate_eosb(self):
+        """
+        Forget the cached eosb, next api call will login again
+        """
+        self._eosb = None
+
+    async def send_with_eosb(self, method, url, json_params=None, query_params=None, transport=None, **kwargs):
+        """
+        Send a request authenticated with the cached user eosb, see SailPortalApi.send_with_eosb
+
+        :param method: http method
+        :type method: string
+        :param url: request url
+        :type url: string
+        :param json_params: params as json, defaults to None
+        :type json_params: dict, optional
+        :param query_params: params as query string, defaults to None
+        :type query_params: dict, optional
+        :param transport: AsyncHttpTransport of the api client sending the request, defaults to the one of this session
+        :type transport: class : api_portal.async_http_transport.AsyncHttpTransport, optional
+        :return: response
+        :rtype: class : api_portal.async_http_transport.AsyncResponse
+        """
+        transport = transport or self.transport
+        user_eosb = await self.get_eosb()
+        response = await self._send_eosb_request(transport, method, url, user_eosb, json_params, query_params, **kwargs)
+        if response.status_code == 401:
+            # The portal rejects an expired eosb before applying the call, resending it is safe
+            user_eosb = await self.refresh_eosb(user_eosb)
+            response = await self._send_eosb_request(
+                transport, method, url, user_eosb, json_params, query_params, **kwargs
+            )
+        return response
+
+    async def _send_eosb_request(self, transport, method, url, user_eosb, json_params, query_params, **kwargs):
+        """
+        Attach the user eosb to the request params and send the request
+        """
+        if query_params is not None:
+            query_params = dict(query_params)
+            query_params["Eosb"] = user_eosb
+            kwargs["params"] = url_encoded(query_params)
+        else:
+            json_params = dict(json_params or {})
+            json_params["Eosb"] = user_eosb
+            kwargs["json"] = json_params
+        return await transport.request(method, url, **kwargs)
+
+    async def get_basic_user_info(self):
+        """
+        Get basic user information from Sail Api portal
+
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await self.send_with_eosb(
+            "GET", f"{self.base_url}/SAIL/AuthenticationManager/GetBasicUserInformation"
+        )
+        return get_response_values(response)
+
+    async def update_password(self, current_password, new_password):
+        """
+        Update user password in Sail Api portal, see SailPortalApi.update_password
+
+        :param current_password:
+        :type current_password: string
+        :param new_password:
+        :type new_password: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        self.password = current_password
+        _, _, user_eosb = await self.login()
+        json_params = {
+            "Eosb": user_eosb,
+            "Email": self.email,
+            "CurrentPassword": current_password,
+            "NewPassword": new_password,
+        }
+        response = await self.transport.request(
+            "PATCH", f"{self.base_url}/SAIL/AuthenticationManager/User/Password", json=json_params
+        )
+        return get_response_values(response)
+
+    async def check_eosb(self, eosb):
+        """
+        Call the CheckEosb API in the Sail portal
+
+        :param eosb:
+        :type eosb: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        json_params = {"Eosb": eosb}
+        response = await self.transport.request(
+            "GET", f"{self.base_url}/SAIL/AuthenticationManager/CheckEosb", json=json_params
+        )
+        return get_response_values(response)
+
+
+class AsyncAccountManagementApi:
+    """
+    Async Account Management Api Class, AccountManagementApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def get_user_organization_info(self, sail_portal):
+        """
+        Get User Organization Info
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET", f"{self.base_url}/SAIL/AccountManager/Organization/Information", {}, transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def update_user_organization_info(self, sail_portal, payload):
+        """
+        Update User Organization Info
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: organization information
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        _, user_info_json, _ = await sail_portal.get_basic_user_info()
+        json_params = {"OrganizationGuid": user_info_json.get("OrganizationGuid")}
+        json_params.update(payload)
+        response = await sail_portal.send_with_eosb(
+            "PUT",
+            f"{self.base_url}/SAIL/AccountManager/Update/Organization",
+            json_params,
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def update_user_access_rights(self, sail_portal):
+        """
+        Update User Access rights
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        _, user_info_json, _ = await sail_portal.get_basic_user_info()
+        json_params = {"UserGuid": user_info_json.get("UserGuid"), "AccessRights": 1}
+        response = await sail_portal.send_with_eosb(
+            "PUT",
+            f"{self.base_url}/SAIL/AccountManager/Update/AccessRight",
+            json_params,
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def list_organization_users(self, sail_portal):
+        """
+        List Organization Users
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        _, user_info_json, _ = await sail_portal.get_basic_user_info()
+        json_params = {"OrganizationGuid": user_info_json.get("OrganizationGuid")}
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/AccountManager/Organization/Users",
+            json_params,
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def update_user_information(self, sail_portal, payload):
+        """
+        Update User Information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: user information
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        _, user_info_json, _ = await sail_portal.get_basic_user_info()
+        json_params = {"UserGuid": user_info_json.get("UserGuid")}
+        json_params.update(payload)
+        response = await sail_portal.send_with_eosb(
+            "PUT",
+            f"{self.base_url}/SAIL/AccountManager/Update/User",
+            json_params,
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def add_user(self, sail_portal, payload):
+        """
+        Add Register new user into database
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: user
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        _, user_info_json, _ = await sail_portal.get_basic_user_info()
+        query_params = {"OrganizationGuid": user_info_json.get("OrganizationGuid")}
+        query_params.update(payload)
+        response = await sail_portal.send_with_eosb(
+            "POST",
+            f"{self.base_url}/SAIL/AccountManager/Admin/RegisterUser",
+            query_params=query_params,
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def delete_user(self, sail_portal, get_base_url, Email, Password):
+        """
+        Delete user from database, logged in as the deleted user
+
+        :param sail_portal: unused, kept for the signature of AccountManagementApi.delete_user
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb, user_guid
+        :rtype: (AsyncResponse, dict, string, string)
+        """
+        user_portal = AsyncSailPortalApi(
+            base_url=get_base_url, email=Email, password=Password, transport=self.transport
+        )
+        _, user_info_json, _ = await user_portal.get_basic_user_info()
+        user_guid = user_info_json.get("UserGuid")
+        response = await user_portal.send_with_eosb(
+            "DELETE",
+            f"{self.base_url}/SAIL/AccountManager/Remove/User",
+            {"UserGuid": user_guid},
+            headers=self.headers,
+            transport=self.transport,
+        )
+        return (*get_response_values(response), user_guid)
+
+    async def recover_user(self, user_eosb, user_guid):
+        """
+        Recover user into database
+
+        :param user_eosb: eosb of the deleted user
+        :type user_eosb: string
+        :param user_guid: guid of the deleted user
+        :type user_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        json_params = {"Eosb": user_eosb, "UserGuid": user_guid}
+        response = await self.transport.request(
+            "PUT", f"{self.base_url}/SAIL/AccountManager/Update/RecoverUser", json=json_params, headers=self.headers
+        )
+        return get_response_values(response)
+
+
+class AsyncAzureTemplateApi:
+    """
+    Async Azure Template Api Class, AzureTemplateApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_azure_templates(self, sail_portal):
+        """
+        List Azure Template
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET", f"{self.base_url}/SAIL/AzureManager/ListTemplates", {}, transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def pull_azure_template(self, sail_portal, payload):
+        """
+        Pull Azure Template
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: template guid
+        :type payload: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/AzureManager/PullTemplate",
+            {"TemplateGuid": payload},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def register_azure_template(self, sail_portal, payload):
+        """
+        Add Register a new Azure Template
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: template payload
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "POST", f"{self.base_url}/SAIL/AzureManager/RegisterTemplate", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def update_azure_template(self, sail_portal, payload):
+        """
+        Update information in Azure Template
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: template payload
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "PUT", f"{self.base_url}/SAIL/AzureManager/UpdateTemplate", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def delete_azure_template(self, sail_portal, payload):
+        """
+        Delete information in Azure Template
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: template payload
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "DELETE", f"{self.base_url}/SAIL/AzureManager/DeleteTemplate", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+
+class AsyncDataFederationManagementApi:
+    """
+    Async Data Federation Management Api Class, DataFederationManagementApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_data_federations(self, sail_portal):
+        """
+        List Data federations
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET", f"{self.base_url}/SAIL/DataFederationManager/ListDataFederations", {}, transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def register_data_federation(self, sail_portal, payload):
+        """
+        Register Data federation
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: data federation
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "POST",
+            f"{self.base_url}/SAIL/DataFederationManager/RegisterDataFederation",
+            dict(payload),
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def delete_data_federation(self, sail_portal, data_federation_guid):
+        """
+        Delete Data federation
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param data_federation_guid: data federation guid
+        :type data_federation_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "DELETE",
+            f"{self.base_url}/SAIL/DataFederationManager/DeleteDataFederation",
+            {"DataFederationGuid": data_federation_guid},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def update_data_federation(self, sail_portal, dataset_family):
+        """
+        Update Data federation, not implemented by the portal yet, like DataFederationManagementApi
+        """
+        return ""
+
+
+class AsyncDataSetManagementApi:
+    """
+    Async DataSets Api Class, DataSetManagementApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_datasets(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
+        """
+        List Datasets
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param stream: validate the Datasets one by one instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET", f"{self.base_url}/SAIL/DatasetManager/ListDatasets", {}, stream=stream, transport=self.transport
+        )
+        if stream:
+            return get_streamed_response_values(response, "Datasets", max_failures)
+        return get_response_values(response)
+
+    async def pull_dataset(self, sail_portal, dataset_guid):
+        """
+        Pull Dataset
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param dataset_guid: dataset guid
+        :type dataset_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/DatasetManager/PullDataset",
+            {"DatasetGuid": dataset_guid},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def register_dataset(self, sail_portal, payload):
+        """
+        Add Register a new dataset
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: dataset
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "POST", f"{self.base_url}/SAIL/DatasetManager/RegisterDataset", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def delete_dataset(self, sail_portal, payload):
+        """
+        Delete registered dataset
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: dataset guid
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "DELETE", f"{self.base_url}/SAIL/DatasetManager/DeleteDataset", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+
+class AsyncDatasetFamilyManagementApi:
+    """
+    Async Dataset Family Management Api Class, DatasetFamilyManagementApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_dataset_families(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
+        """
+        List Dataset Family Information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param stream: validate the DatasetFamilies one by one instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/DatasetFamilyManager/ListDatasetFamilies",
+            {},
+            stream=stream,
+            transport=self.transport,
+        )
+        if stream:
+            return get_streamed_response_values(response, "DatasetFamilies", max_failures)
+        return get_response_values(response)
+
+    async def pull_dataset_family(self, sail_portal, dataset_family_guid):
+        """
+        Pull Dataset Family information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param dataset_family_guid: dataset family guid
+        :type dataset_family_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/DatasetFamilyManager/PullDatasetFamily",
+            {"DatasetFamilyGuid": dataset_family_guid},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def register_dataset_family(self, sail_portal, payload):
+        """
+        Register Dataset Family
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: dataset family
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "POST",
+            f"{self.base_url}/SAIL/DatasetFamilyManager/RegisterDatasetFamily",
+            dict(payload),
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def delete_dataset_family(self, sail_portal, dataset_family_guid):
+        """
+        Delete Dataset Family information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param dataset_family_guid: dataset family guid
+        :type dataset_family_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "DELETE",
+            f"{self.base_url}/SAIL/DatasetFamilyManager/DeleteDatasetFamily",
+            {"DatasetFamilyGuid": dataset_family_guid},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def update_datset_family(self, sail_portal, dataset_family):
+        """
+        Update Dataset Family information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param dataset_family: dataset family
+        :type dataset_family: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "PUT",
+            f"{self.base_url}/SAIL/DatasetFamilyManager/UpdateDatasetFamily",
+            {"DatasetFamily": dataset_family},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+
+class AsyncDigitalContractManagementApi:
+    """
+    Async Digital Contract Management Api Class, DigitalContractManagementApi on an AsyncHttpTransport
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_digital_contracts(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
+        """
+        List Digital Contract Information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param stream: validate the DigitalContracts one by one instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        await sail_portal.get_basic_user_info()
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/DigitalContractManager/DigitalContracts",
+            {},
+            stream=stream,
+            transport=self.transport,
+        )
+        if stream:
+            return get_streamed_response_values(response, "DigitalContracts", max_failures)
+        return get_response_values(response)
+
+    async def pull_digital_contract(self, sail_portal, digital_contract_guid):
+        """
+        Pull Digital Contract information
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param digital_contract_guid: digital contract guid
+        :type digital_contract_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/DigitalContractManager/PullDigitalContract",
+            {"DigitalContractGuid": digital_contract_guid},
+            transport=self.transport,
+        )
+        return get_response_values(response)
+
+    async def _send(self, sail_portal, method, path, payload):
+        response = await sail_portal.send_with_eosb(
+            method, f"{self.base_url}/SAIL/DigitalContractManager/{path}", dict(payload), transport=self.transport
+        )
+        return get_response_values(response)
+
+    async def register_digital_contract(self, sail_portal, payload):
+        """
+        Register Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: digital contract
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "POST", "Applications", payload)
+
+    async def accept_digital_contract(self, sail_portal, payload):
+        """
+        Accept Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: acceptance
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "PATCH", "DataOwner/Accept", payload)
+
+    async def activate_digital_contract(self, sail_portal, payload):
+        """
+        Activate Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: activation
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "PATCH", "Researcher/Activate", payload)
+
+    async def associate_digital_contract(self, sail_portal, payload):
+        """
+        Associate Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: azure template association
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "PATCH", "AssociateWithAzureTemplate", payload)
+
+    async def provision_digital_contract(self, sail_portal, payload):
+        """
+        provision Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: provisioning
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "POST", "Provision", payload)
+
+    async def get_provision_dc_status(self, sail_portal, payload):
+        """
+        get provision Digital Contract status
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: digital contract guid
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "GET", "GetProvisioningStatus", payload)
+
+    async def deprovision_digital_contract(self, sail_portal, payload):
+        """
+        Deprovision Digital Contract
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: digital contract guid
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        return await self._send(sail_portal, "POST", "Deprovision", payload)
+
+
+class AsyncVirtualMachineApi:
+    """
+    Async Virtual Machine Management Api Class, VirtualMachineApi on an AsyncHttpTransport
+
+    VirtualMachineApi.inventory has no counterpart, VmInventory lists the virtual machines
+    synchronously when its snapshot expires.
+    """
+
+    def __init__(self, base_url, transport=None):
+        self.base_url = base_url
+        self.headers = dict(HEADERS)
+        self.transport = transport or get_default_async_transport()
+
+    async def list_virtual_machines(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
+        """
+        List Virtual Machines associated to user
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param stream: validate the VirtualMachines one by one instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/VirtualMachineManager/ListVirtualMachines",
+            {},
+            stream=stream,
+            transport=self.transport,
+        )
+        if stream:
+            return get_streamed_response_values(response, "VirtualMachines", max_failures)
+        return get_response_values(response)
+
+    async def virtual_machines_status(self, sail_portal, payload):
+        """
+        Get Virtual Machine's Full Status
+
+        :param sail_portal: AsyncSailPortalApi
+        :type sail_portal: class : api_portal.async_api_portal.AsyncSailPortalApi
+        :param payload: virtual machine guid
+        :type payload: dict
+        :return: response, response.json(), user_eosb
+        :rtype: (AsyncResponse, dict, string)
+        """
+        response = await sail_portal.send_with_eosb(
+            "GET",
+            f"{self.base_url}/SAIL/VirtualMachineManager/PullVirtualMachine",
+            dict(payload),
+            transport=self.transport,
+        )
+        return get_response_values(response)
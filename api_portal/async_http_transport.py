@@ -0,0 +1,324 @@
+# -----------------------------------------------------------
+#
+# Class AsyncHttpTransport
+#
+# -----------------------------------------------------------
+import asyncio
+import contextlib
+import contextvars
+import json
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+from config import ASYNC_POOL_MAXSIZE, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, STREAM_CHUNK_SIZE
+from yarl import URL
+
+from api_portal.request_timing import RequestTiming, headers_size, timing_recorder
+from api_portal.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, retry_stats
+
+# True while the running task logs in because the cached eosb was missing or expired
+_implicit_login = contextvars.ContextVar("implicit_login", default=False)
+
+
+@contextlib.contextmanager
+def async_implicit_login():
+    """
+    Mark the requests sent by the running task in the block as implicit re-login
+    """
+    token = _implicit_login.set(True)
+    try:
+        yield
+    finally:
+        _implicit_login.reset(token)
+
+
+class AsyncResponse:
+    """
+    Async Response Class, a response whose body has been read
+
+    Holds the requests.Response attributes the api_portal helpers use, so
+    get_response_values and get_streamed_response_values take it as is.
+    """
+
+    def __init__(self, method, url, status_code, headers, chunks, encoding="utf-8"):
+        """
+        :param method: http method of the request
+        :type method: string
+        :param url: request url
+        :type url: string
+        :param status_code: http status
+        :type status_code: int
+        :param headers: response headers
+        :type headers: multidict.CIMultiDictProxy
+        :param chunks: body as received
+        :type chunks: list
+        :param encoding: charset of the body
+        :type encoding: string
+        """
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.encoding = encoding
+        self._chunks = chunks
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        return b"".join(self._chunks)
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        """
+        :raises ValueError: the body is not json
+        :return: decoded body
+        """
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        """
+        :param chunk_size: unused, the body is iterated in the chunks it arrived in
+        :type chunk_size: int
+        :return: body chunks
+        :rtype: generator
+        """
+        yield from self._chunks
+
+    def close(self):
+        """
+        Nothing to release, the connection went back to the pool once the body was read
+        """
+
+    def __repr__(self):
+        return f"<AsyncResponse [{self.status_code}]>"
+
+
+class AsyncHttpTransport:
+    """
+    Async Http Transport Class, keep-alive aiohttp connection pool shared by the async api_portal classes
+
+    Applies the RetryPolicy and per endpoint circuit breakers of HttpTransport and records a
+    RequestTiming per attempt. dns, connect and tls are not split out, they are part of ttfb.
+    The aiohttp session is opened on first use and bound to the running event loop, close
+    the transport before the loop ends.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize=ASYNC_POOL_MAXSIZE,
+        verify=False,
+        recorder=timing_recorder,
+        retry_policy=None,
+        circuit_failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        circuit_reset_timeout=CIRCUIT_RESET_TIMEOUT,
+        retry_stats=retry_stats,
+        timeout=None,
+    ):
+        """
+        :param pool_maxsize: max connections open at once, further requests wait for a free one
+        :type pool_maxsize: int
+        :param verify: verify portal tls certificate, defaults to False
+        :type verify: bool, optional
+        :param recorder: collects a RequestTiming per request, None disables timing
+        :type recorder: class : api_portal.request_timing.RequestTimingRecorder, optional
+        :param retry_policy: which failed requests are sent again, defaults to RetryPolicy()
+        :type retry_policy: class : api_portal.retry_policy.RetryPolicy, optional
+        :param circuit_failure_threshold: consecutive failures opening the circuit of an endpoint, 0 disables it
+        :type circuit_failure_threshold: int
+        :param circuit_reset_timeout: seconds an open circuit fails fast before a trial request
+        :type circuit_reset_timeout: float
+        :param retry_stats: counts the retries and circuit breaker events per endpoint
+        :type retry_stats: class : api_portal.retry_policy.RetryStats, optional
+        :param timeout: seconds a request may take in total, None waits as long as requests does
+        :type timeout: float, optional
+        """
+        self.pool_maxsize = pool_maxsize
+        self.verify = verify
+        self.recorder = recorder
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_timeout = circuit_reset_timeout
+        self.retry_stats = retry_stats
+        self.timeout = timeout
+        self._breakers = {}
+        self._session = None
+        self._loop = None
+
+    async def request(self, method, url, json=None, params=None, headers=None, idempotent=None, stream=False):
+        """
+        Send a request over a pooled connection, recording the RequestTiming of every attempt
+
+        Failed attempts are sent again as the retry policy allows, a request to an endpoint
+        whose circuit breaker is open fails fast with CircuitOpenError.
+
+        :param method: http method
+        :type method: string
+        :param url: request url
+        :type url: string
+        :param json: params as json
+        :type json: dict, optional
+        :param params: params as an url encoded query string
+        :type params: string, optional
+        :param headers: request headers
+        :type headers: dict, optional
+        :param idempotent: retry this request as idempotent or not whatever its method, defaults to the policy
+        :type idempotent: bool, optional
+        :param stream: keep the body in the chunks it arrived in, for get_streamed_response_values
+        :type stream: bool, optional
+        :raises aiohttp.ClientError: last attempt failed
+        :raises asyncio.TimeoutError: last attempt took longer than timeout
+        :return: response
+        :rtype: class : api_portal.async_http_transport.AsyncResponse
+        """
+        endpoint = f"{method.upper()} {urlparse(url).path}"
+        breaker = self.circuit_breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.retry_stats.add(endpoint, "CircuitRejected")
+                raise CircuitOpenError(f"Circuit breaker open for {endpoint}")
+            response = error = None
+            try:
+                response = await self._send(method, url, attempt, json, params, headers, stream)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as send_error:
+                error = send_error
+            failed = error is not None or response.status_code in self.retry_policy.statuses
+            if breaker.record(failed):
+                self.retry_stats.add(endpoint, "CircuitOpened")
+            if not self._should_retry(method, attempt, failed, error, idempotent):
+                if attempt and failed:
+                    self.retry_stats.add(endpoint, "GaveUp")
+                if error is not None:
+                    raise error
+                return response
+            delay = self.retry_policy.backoff(attempt, response)
+            self.retry_stats.add(endpoint, "Retries")
+            if not attempt:
+                self.retry_stats.add(endpoint, "RetriedRequests")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _should_retry(self, method, attempt, failed, error, idempotent):
+        """
+        RetryPolicy.should_retry for aiohttp errors
+        """
+        if attempt >= self.retry_policy.max_retries:
+            return False
+        # A connection that could not be opened never reached the portal
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        if idempotent is None:
+            idempotent = method.upper() in self.retry_policy.methods
+        return idempotent and failed
+
+    def circuit_breaker(self, endpoint):
+        """
+        :param endpoint: "METHOD /path"
+        :type endpoint: string
+        :return: circuit breaker of the endpoint
+        :rtype: class : api_portal.retry_policy.CircuitBreaker
+        """
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                self.circuit_failure_threshold, self.circuit_reset_timeout
+            )
+        return breaker
+
+    def _get_session(self):
+        """
+        :return: aiohttp session of the running event loop
+        :rtype: aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, ssl=None if self.verify else False)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+        return self._session
+
+    async def _send(self, method, url, attempt, json_params, params, headers, stream):
+        """
+        Send one attempt of a request and read its body
+        """
+        if params:
+            # Already url encoded, yarl must not quote it again
+            url = URL(f"{url}?{params}", encoded=True)
+        headers = dict(headers or {})
+        body = None
+        if json_params is not None:
+            body = json.dumps(json_params).encode()
+            headers["Content-Type"] = "application/json"
+        record = None
+        if self.recorder is not None:
+            record = RequestTiming(
+                method.upper(), urlparse(str(url)).path, implicit_login=_implicit_login.get(), attempt=attempt
+            )
+        start = time.perf_counter()
+        try:
+            async with self._get_session().request(method, url, data=body, headers=headers) as response:
+                ttfb = time.perf_counter() - start
+                if stream:
+                    chunks = [chunk async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE)]
+                else:
+                    chunks = [await response.read()]
+                async_response = AsyncResponse(
+                    method.upper(), str(url), response.status, response.headers, chunks, response.charset or "utf-8"
+                )
+                sent_headers = response.request_info.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if record is not None:
+                record.error = type(error).__name__
+                record.total = time.perf_counter() - start
+                self.recorder.add(record)
+            raise
+        if record is not None:
+            record.total = time.perf_counter() - start
+            record.ttfb = ttfb
+            record.status_code = async_response.status_code
+            record.bytes_sent = len(f"{method.upper()} {URL(url).raw_path_qs} HTTP/1.1\r\n") + headers_size(
+                sent_headers
+            )
+            record.bytes_sent += len(body or b"")
+            record.bytes_received = sum(len(chunk) for chunk in chunks) + headers_size(async_response.headers)
+            self.recorder.add(record)
+        return async_response
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_default_transport = None
+
+
+def get_default_async_transport():
+    """
+    Get the process wide AsyncHttpTransport used by async api clients created without a transport
+
+    :return: transport
+    :rtype: class : api_portal.async_http_transport.AsyncHttpTransport
+    """
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = AsyncHttpTransport()
+    return _default_transport
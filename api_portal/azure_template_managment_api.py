@@ -6,15 +6,18 @@
 import requests
 from utils.helpers import get_response_values
 
+from api_portal.http_transport import get_default_transport
+
 
 class AzureTemplateApi:
     """
     Azure Template Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
     def list_azure_templates(self, sail_portal):
         """
@@ -25,12 +28,13 @@ class AzureTemplateApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
         try:
             #  params as json
-            response = requests.get(f"{self.base_url}/SAIL/AzureManager/ListTemplates", json=json_params, verify=False)
+            response = sail_portal.send_with_eosb(
+                "GET", f"{self.base_url}/SAIL/AzureManager/ListTemplates", json_params, transport=self.transport
+            )
             # params query string
             # response = requests.gn
             # et(
@@ -38,6 +42,7 @@ class AzureTemplateApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -52,12 +57,13 @@ class AzureTemplateApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        # query_params = url_encoded({"Eosb": user_eosb, "TemplateGuid": template_guid})
-        json_params = {"Eosb": user_eosb, "TemplateGuid": payload}
+        # query_params = url_encoded({"TemplateGuid": template_guid})
+        json_params = {"TemplateGuid": payload}
         try:
             #  params as json
-            response = requests.get(f"{self.base_url}/SAIL/AzureManager/PullTemplate", json=json_params, verify=False)
+            response = sail_portal.send_with_eosb(
+                "GET", f"{self.base_url}/SAIL/AzureManager/PullTemplate", json_params, transport=self.transport
+            )
             # params query string
             # response = requests.gn
             # et(
@@ -65,6 +71,7 @@ class AzureTemplateApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -79,18 +86,15 @@ class AzureTemplateApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.post(
-                f"{self.base_url}/SAIL/AzureManager/RegisterTemplate",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "POST", f"{self.base_url}/SAIL/AzureManager/RegisterTemplate", json_params, transport=self.transport
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -105,18 +109,15 @@ class AzureTemplateApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.put(
-                f"{self.base_url}/SAIL/AzureManager/UpdateTemplate",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "PUT", f"{self.base_url}/SAIL/AzureManager/UpdateTemplate", json_params, transport=self.transport
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -131,17 +132,14 @@ class AzureTemplateApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.delete(
-                f"{self.base_url}/SAIL/AzureManager/DeleteTemplate",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "DELETE", f"{self.base_url}/SAIL/AzureManager/DeleteTemplate", json_params, transport=self.transport
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
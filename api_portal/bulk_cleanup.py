@@ -0,0 +1,275 @@
+# -----------------------------------------------------------
+#
+# Class BulkCleanup
+#
+# -----------------------------------------------------------
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CLEANUP_MAX_WORKERS
+
+
+class CleanupResource:
+    """
+    Cleanup Resource Class, how to list and delete one kind of portal resource
+    """
+
+    def __init__(self, kind, list_method, list_key, title_field, owner_field, delete):
+        """
+        :param kind: name of the resource kind in reports
+        :type kind: string
+        :param list_method: name of the api method listing the resources of a user
+        :type list_method: string
+        :param list_key: key of the guid -> resource map in the listing
+        :type list_key: string
+        :param title_field: resource field matched against the owns filter
+        :type title_field: string
+        :param owner_field: resource field holding the owner organization guid, None when listings are per organization
+        :type owner_field: string
+        :param delete: called with api, sail_portal, guid, returns response, response.json(), user_eosb
+        :type delete: callable
+        """
+        self.kind = kind
+        self.list_method = list_method
+        self.list_key = list_key
+        self.title_field = title_field
+        self.owner_field = owner_field
+        self.delete = delete
+
+
+DATASET_FAMILIES = CleanupResource(
+    "DatasetFamily",
+    "list_dataset_families",
+    "DatasetFamilies",
+    "DatasetFamilyTitle",
+    "DatasetFamilyOwnerGuid",
+    lambda api, sail_portal, guid: api.delete_dataset_family(sail_portal, guid),
+)
+DATA_FEDERATIONS = CleanupResource(
+    "DataFederation",
+    "list_data_federations",
+    "DataFederations",
+    "Name",
+    "OrganizationIdentifier",
+    lambda api, sail_portal, guid: api.delete_data_federation(sail_portal, guid),
+)
+AZURE_TEMPLATES = CleanupResource(
+    "AzureTemplate",
+    "list_azure_templates",
+    "Templates",
+    "Name",
+    None,
+    lambda api, sail_portal, guid: api.delete_azure_template(sail_portal, {"TemplateGuid": guid}),
+)
+
+
+class CleanupFailure:
+    """
+    Cleanup Failure Class, one resource that could not be listed or deleted
+    """
+
+    def __init__(self, kind, guid, user, status_code=None, error=None):
+        self.kind = kind
+        self.guid = guid
+        self.user = user
+        self.status_code = status_code
+        self.error = error
+
+    def __repr__(self):
+        reason = self.error or f"status {self.status_code}"
+        return f"{self.kind} {self.guid or '(listing)'} of {self.user}: {reason}"
+
+
+class CleanupReport:
+    """
+    Cleanup Report Class, outcome of a BulkCleanup run
+    """
+
+    def __init__(self):
+        self.deleted = []
+        self.skipped = []
+        self.failures = []
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def merge(self, other):
+        """
+        :param other: report added to this one
+        :type other: class : api_portal.bulk_cleanup.CleanupReport
+        :return: self
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        self.deleted.extend(other.deleted)
+        self.skipped.extend(other.skipped)
+        self.failures.extend(other.failures)
+        return self
+
+    def raise_for_failures(self):
+        """
+        :raises ValueError: some resources could not be deleted
+        """
+        if self.failures:
+            raise ValueError(f"Cleanup failed for {len(self.failures)} resources: {self.failures}")
+
+    def __repr__(self):
+        return f"CleanupReport(deleted={len(self.deleted)}, skipped={len(self.skipped)}, failures={self.failures})"
+
+
+class BulkCleanup:
+    """
+    Bulk Cleanup Class, delete the resources of a set of users concurrently
+
+    Lists each resource kind once per user, deletes every resource with the user of its
+    owner organization, so nothing is deleted twice or by a user bound to get a 404, and
+    fans the deletes out over a bounded thread pool. Failures are collected per resource
+    in a CleanupReport instead of stopping the run.
+    """
+
+    def __init__(self, sail_portals, owns=None, max_workers=CLEANUP_MAX_WORKERS):
+        """
+        :param sail_portals: users whose resources are deleted
+        :type sail_portals: list of class : api_portal.sail_portal_api.SailPortalApi
+        :param owns: called with a resource title, only resources it returns True for are deleted
+        :type owns: callable, optional
+        :param max_workers: max concurrent portal calls
+        :type max_workers: int
+        """
+        self.sail_portals = list(sail_portals)
+        self.owns = owns
+        self.max_workers = max_workers
+        self._organization_guids = {}
+
+    def organization_guid(self, sail_portal):
+        """
+        :return: organization guid of the user, fetched once
+        :rtype: string
+        """
+        if sail_portal.email not in self._organization_guids:
+            _, user_info_json, _ = sail_portal.get_basic_user_info()
+            self._organization_guids[sail_portal.email] = (user_info_json or {}).get("OrganizationGuid")
+        return self._organization_guids[sail_portal.email]
+
+    def clear_dataset_families(self, datasetfamily_management):
+        """
+        :param datasetfamily_management: DatasetFamilyManagementApi
+        :type datasetfamily_management: class : api_portal.datasetfamily_management_api.DatasetFamilyManagementApi
+        :return: report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        return self.clear(datasetfamily_management, DATASET_FAMILIES)
+
+    def clear_data_federations(self, datafederation_management):
+        """
+        :param datafederation_management: DataFederationManagementApi
+        :type datafederation_management: class : api_portal.datafederation_management_api.DataFederationManagementApi
+        :return: report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        return self.clear(datafederation_management, DATA_FEDERATIONS)
+
+    def clear_azure_templates(self, azuretemplate_management):
+        """
+        :param azuretemplate_management: AzureTemplateApi
+        :type azuretemplate_management: class : api_portal.azure_template_managment_api.AzureTemplateApi
+        :return: report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        return self.clear(azuretemplate_management, AZURE_TEMPLATES)
+
+    def clear_all(self, datasetfamily_management=None, datafederation_management=None, azuretemplate_management=None):
+        """
+        Clear every resource kind an api is given for
+
+        :return: merged report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        report = CleanupReport()
+        for api, resource in (
+            (datasetfamily_management, DATASET_FAMILIES),
+            (datafederation_management, DATA_FEDERATIONS),
+            (azuretemplate_management, AZURE_TEMPLATES),
+        ):
+            if api is not None:
+                report.merge(self.clear(api, resource))
+        return report
+
+    def clear(self, api, resource):
+        """
+        Delete all resources of one kind
+
+        :param api: api_portal class listing and deleting resource
+        :param resource: kind of resource
+        :type resource: class : api_portal.bulk_cleanup.CleanupResource
+        :return: report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        report = CleanupReport()
+        if not self.sail_portals:
+            return report
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sail-cleanup") as executor:
+            listings = list(executor.map(lambda sail_portal: self._list(api, resource, sail_portal), self.sail_portals))
+
+            deletes = {}
+            for sail_portal, listing in zip(self.sail_portals, listings):
+                if isinstance(listing, CleanupFailure):
+                    report.failures.append(listing)
+                    continue
+                for guid, item in listing.items():
+                    if guid in deletes:
+                        continue
+                    # Milestone 3 listings hold the title only
+                    fields = item if isinstance(item, dict) else {resource.title_field: item}
+                    if self.owns is not None and not self.owns(fields.get(resource.title_field)):
+                        continue
+                    owner = self._owner(sail_portal, resource, fields)
+                    if owner is None:
+                        # Listed to the users, owned by an organization none of them belongs to
+                        if (resource.kind, guid) not in report.skipped:
+                            report.skipped.append((resource.kind, guid))
+                        continue
+                    deletes[guid] = owner
+
+            futures = {
+                guid: executor.submit(resource.delete, api, sail_portal, guid) for guid, sail_portal in deletes.items()
+            }
+            for guid, future in futures.items():
+                user = deletes[guid].email
+                try:
+                    response, _, _ = future.result()
+                except Exception as error:
+                    report.failures.append(CleanupFailure(resource.kind, guid, user, error=repr(error)))
+                    continue
+                if response is None or response.status_code != 200:
+                    status_code = getattr(response, "status_code", None)
+                    report.failures.append(CleanupFailure(resource.kind, guid, user, status_code=status_code))
+                else:
+                    report.deleted.append((resource.kind, guid))
+        return report
+
+    def _list(self, api, resource, sail_portal):
+        """
+        :return: guid -> resource listed to the user, CleanupFailure when the listing failed
+        """
+        try:
+            response, response_json, _ = getattr(api, resource.list_method)(sail_portal)
+            if resource.owner_field:
+                self.organization_guid(sail_portal)
+        except Exception as error:
+            return CleanupFailure(resource.kind, None, sail_portal.email, error=repr(error))
+        if response is None or response.status_code != 200 or not response_json:
+            status_code = getattr(response, "status_code", None)
+            return CleanupFailure(resource.kind, None, sail_portal.email, status_code=status_code)
+        return response_json.get(resource.list_key) or {}
+
+    def _owner(self, sail_portal, resource, fields):
+        """
+        :return: the user to delete with, None when no user belongs to the owner organization
+        """
+        owner_guid = fields.get(resource.owner_field) if resource.owner_field else None
+        if owner_guid is None:
+            return sail_portal
+        for candidate in self.sail_portals:
+            if self.organization_guid(candidate) == owner_guid:
+                return candidate
+        return None
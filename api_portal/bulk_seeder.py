@@ -0,0 +1,217 @@
+# -----------------------------------------------------------
+#
+# Class BulkDatasetSeeder
+#
+# -----------------------------------------------------------
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SEED_MAX_WORKERS
+from utils.dataset_helpers import get_generated_dataset_payload
+
+from api_portal.bulk_cleanup import CleanupFailure, CleanupReport
+
+MANIFEST_VERSION = 1
+
+
+class SeedReport:
+    """
+    Seed Report Class, outcome of a BulkDatasetSeeder run
+
+    created maps the guid of every registered dataset to its name and table guids,
+    failures holds a CleanupFailure per dataset the portal did not register.
+    """
+
+    def __init__(self):
+        self.created = {}
+        self.failures = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    @property
+    def throughput(self):
+        """
+        :return: datasets registered per second
+        :rtype: float
+        """
+        return len(self.created) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (
+            f"SeedReport(created={len(self.created)}, failures={len(self.failures)}, "
+            f"elapsed={self.elapsed:.1f}s, throughput={self.throughput:.1f}/s)"
+        )
+
+
+def write_manifest(path, email, report, seed=None):
+    """
+    Write the guids created by a seed run, replacing the file only once it is complete
+
+    :param path: manifest file
+    :type path: string
+    :param email: user the datasets were registered with
+    :type email: string
+    :param report: seed run
+    :type report: class : api_portal.bulk_seeder.SeedReport
+    :param seed: seed of the generated payloads
+    :type seed: int, optional
+    """
+    manifest = {
+        "Version": MANIFEST_VERSION,
+        "Email": email,
+        "Seed": seed,
+        "Datasets": report.created,
+        "Failures": [repr(failure) for failure in report.failures],
+    }
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(temporary_path, path)
+
+
+def read_manifest(path):
+    """
+    :param path: manifest file written by a seed run
+    :type path: string
+    :raises ValueError: not a seed manifest
+    :return: manifest
+    :rtype: dict
+    """
+    with open(path, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("Version") != MANIFEST_VERSION:
+        raise ValueError(f"{path} is not a version {MANIFEST_VERSION} seed manifest")
+    return manifest
+
+
+class BulkDatasetSeeder:
+    """
+    Bulk Dataset Seeder Class, register many generated datasets concurrently
+
+    Payloads are generated one at a time as workers free up, at most max_workers
+    registrations are in flight and at most twice that many payloads held. The guids
+    of the registered datasets go into a manifest, written even when the run is
+    interrupted, which clear_manifest deletes them from.
+    """
+
+    def __init__(self, sail_portal, dataset_management, max_workers=SEED_MAX_WORKERS):
+        """
+        :param sail_portal: user the datasets are registered with
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param dataset_management: DataSetManagementApi
+        :type dataset_management: class : api_portal.dataset_management_api.DataSetManagementApi
+        :param max_workers: max concurrent portal calls
+        :type max_workers: int
+        """
+        self.sail_portal = sail_portal
+        self.dataset_management = dataset_management
+        self.max_workers = max_workers
+
+    def seed(
+        self,
+        number_datasets,
+        number_tables,
+        number_rows=100,
+        number_columns=5,
+        manifest_path=None,
+        seed=None,
+        name_prefix="seed-",
+        on_progress=None,
+    ):
+        """
+        Generate and register number_datasets datasets of number_tables tables each
+
+        :param number_datasets: datasets registered
+        :type number_datasets: int
+        :param number_tables: tables per dataset
+        :type number_tables: int
+        :param number_rows: rows per table, or (low, high) range of rows
+        :type number_rows: int or tuple
+        :param number_columns: columns per table, or (low, high) range of columns
+        :type number_columns: int or tuple
+        :param manifest_path: file the created guids are written to, None keeps them in the report only
+        :type manifest_path: string, optional
+        :param seed: seed of the generated guids and table sizes, the same seed regenerates the same payloads
+        :type seed: int, optional
+        :param name_prefix: start of the dataset names
+        :type name_prefix: string
+        :param on_progress: called with (done, number_datasets) after each registration
+        :type on_progress: callable, optional
+        :return: report
+        :rtype: class : api_portal.bulk_seeder.SeedReport
+        """
+        rng = random.Random(seed)
+        report = SeedReport()
+        lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        start = time.monotonic()
+
+        def register(dataset_payload, dataset_guid, dataset_name):
+            try:
+                response, _, _ = self.dataset_management.register_dataset(self.sail_portal, payload=dataset_payload)
+                failure = None
+                if response.status_code != 201:
+                    failure = CleanupFailure("Dataset", dataset_guid, self.sail_portal.email, response.status_code)
+            except Exception as error:
+                failure = CleanupFailure("Dataset", dataset_guid, self.sail_portal.email, error=repr(error))
+            with lock:
+                if failure is None:
+                    tables = list(dataset_payload["DatasetData"]["Tables"])
+                    report.created[dataset_guid] = {"DatasetName": dataset_name, "Tables": tables}
+                else:
+                    report.failures.append(failure)
+                done = len(report.created) + len(report.failures)
+            in_flight.release()
+            if on_progress is not None:
+                on_progress(done, number_datasets)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sail-seed") as executor:
+                for index in range(number_datasets):
+                    in_flight.acquire()
+                    payload = get_generated_dataset_payload(
+                        rng, index, number_tables, number_rows, number_columns, name_prefix
+                    )
+                    executor.submit(register, *payload)
+        finally:
+            report.elapsed = time.monotonic() - start
+            if manifest_path is not None:
+                with lock:
+                    write_manifest(manifest_path, self.sail_portal.email, report, seed)
+        return report
+
+    def clear_manifest(self, manifest_path):
+        """
+        Delete the datasets of a manifest concurrently
+
+        :param manifest_path: manifest file written by seed
+        :type manifest_path: string
+        :return: report
+        :rtype: class : api_portal.bulk_cleanup.CleanupReport
+        """
+        manifest = read_manifest(manifest_path)
+        report = CleanupReport()
+
+        def delete(dataset_guid):
+            try:
+                response, _, _ = self.dataset_management.delete_dataset(self.sail_portal, {"DatasetGuid": dataset_guid})
+            except Exception as error:
+                return CleanupFailure("Dataset", dataset_guid, self.sail_portal.email, error=repr(error))
+            if response.status_code != 200:
+                return CleanupFailure("Dataset", dataset_guid, self.sail_portal.email, response.status_code)
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sail-seed") as executor:
+            for dataset_guid, failure in zip(manifest["Datasets"], executor.map(delete, manifest["Datasets"])):
+                if failure is None:
+                    report.deleted.append(("Dataset", dataset_guid))
+                else:
+                    report.failures.append(failure)
+        return report
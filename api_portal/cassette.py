@@ -0,0 +1,226 @@
+# -----------------------------------------------------------
+#
+# Record and replay of the api_portal HttpTransport traffic
+#
+# -----------------------------------------------------------
+import gzip
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+from http.client import responses
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+from urllib3.response import HTTPResponse
+
+from api_portal.request_timing import TimedHTTPAdapter
+
+CASSETTE_MODES = ("record", "replay")
+CASSETTE_VERSION = 1
+
+# Braced portal GUIDs and bare uuids, anywhere in a string
+_GUID_RE = re.compile(r"\{?[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}\}?")
+_EOSB_KEYS = {"Eosb"}
+_SECRET_KEYS = {"Password", "CurrentPassword", "NewPassword"}
+# Response headers kept in the cassette, the others describe the recording connection
+_KEPT_HEADERS = ("Content-Type",)
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """
+    Raised in replay for a request that was never recorded, as no network is reached
+    """
+
+
+def _secret_digest(secret):
+    return "<SECRET " + hashlib.sha256(str(secret).encode("utf-8")).hexdigest()[:8] + ">"
+
+
+def normalize(value):
+    """
+    Replace the parts of request params that change from run to run with placeholders
+
+    Eosb values become "<EOSB>" and GUIDs inside any string "<GUID>". Passwords are only
+    kept as a short hash, a good and a bad password still make different keys.
+
+    :param value: decoded json body or query params
+    :return: normalized copy
+    """
+    if isinstance(value, dict):
+        return {
+            key: "<EOSB>" if key in _EOSB_KEYS else _secret_digest(item) if key in _SECRET_KEYS else normalize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    if isinstance(value, str):
+        return _GUID_RE.sub("<GUID>", value)
+    return value
+
+
+def request_key(method, url, body):
+    """
+    Cassette key of a request, method, path and the normalized query and body
+
+    :param method: http method
+    :type method: string
+    :param url: full request url
+    :type url: string
+    :param body: encoded request body
+    :type body: bytes or string
+    :return: key, e.g. 'GET /SAIL/DatasetManager/PullDataset {"DatasetGuid":"<GUID>","Eosb":"<EOSB>"}'
+    :rtype: string
+    """
+    parsed = urlparse(url)
+    key = f"{method.upper()} {parsed.path}"
+    if parsed.query:
+        query = normalize(dict(parse_qsl(parsed.query, keep_blank_values=True)))
+        key += "?" + json.dumps(query, sort_keys=True, separators=(",", ":"))
+    if body:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        try:
+            body = json.dumps(normalize(json.loads(body)), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            body = normalize(body)
+        key += f" {body}"
+    return key
+
+
+def _endpoint(key):
+    method, target = key.split(" ", 2)[:2]
+    return f"{method} {target.split('?', 1)[0]}"
+
+
+class Cassette:
+    """
+    Cassette Class, the responses to the requests of a run, recorded once and replayed with zero network
+
+    Interactions are kept in request order per key. Replay serves the recorded responses of a
+    key in turn and repeats the last one once they run out, e.g. for polling. A request whose
+    key was never recorded, typically a payload with random names or timestamps, gets the next
+    unplayed response recorded for the same method and path.
+
+    seed is saved with the interactions, seeding random with it before each test makes the
+    random names of a replayed run the recorded ones.
+    """
+
+    def __init__(self, path, mode="replay"):
+        """
+        :param path: cassette file, gzip compressed when it ends in .gz
+        :type path: string
+        :param mode: "record" to capture the traffic, "replay" to serve it back
+        :type mode: string
+        :raises ValueError: unknown mode
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Cassette mode must be one of {CASSETTE_MODES}, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        # key -> [[status, headers, body], ...]
+        self.interactions = {}
+        self._played = {}
+        self.seed = random.randrange(2**32)
+        if mode == "replay":
+            self.load()
+
+    def _open(self, mode):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def load(self):
+        with self._open("r") as cassette_file:
+            data = json.load(cassette_file)
+        if data.get("Version") != CASSETTE_VERSION:
+            raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette")
+        self.interactions = data["Interactions"]
+        self.seed = data["Seed"]
+        self._played = {}
+
+    def save(self):
+        """
+        Write the recorded interactions, a cassette being replayed is left untouched
+        """
+        if self.mode != "record":
+            return
+        with self._lock:
+            data = {"Version": CASSETTE_VERSION, "Seed": self.seed, "Interactions": self.interactions}
+            with self._open("w") as cassette_file:
+                json.dump(data, cassette_file, separators=(",", ":"))
+
+    def record(self, request, response):
+        """
+        :param request: request sent to the portal
+        :type request: requests.PreparedRequest
+        :param response: portal response, its body is read
+        :type response: requests.Response
+        """
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        body = response.content.decode("utf-8", errors="replace")
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            self.interactions.setdefault(key, []).append([response.status_code, headers, body])
+
+    def play(self, request):
+        """
+        :param request: request to answer
+        :type request: requests.PreparedRequest
+        :raises CassetteMiss: nothing was recorded for the method and path
+        :return: status_code, headers, body
+        :rtype: (int, dict, string)
+        """
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            if key not in self.interactions:
+                key = self._endpoint_fallback(key)
+            recorded = self.interactions[key]
+            turn = self._played.get(key, 0)
+            self._played[key] = turn + 1
+            return tuple(recorded[min(turn, len(recorded) - 1)])
+
+    def _endpoint_fallback(self, key):
+        endpoint = _endpoint(key)
+        candidates = [recorded_key for recorded_key in self.interactions if _endpoint(recorded_key) == endpoint]
+        if not candidates:
+            raise CassetteMiss(f"No recorded response in {self.path} for {key}")
+        # First recording of the endpoint not served yet, in recording order
+        for recorded_key in candidates:
+            if self._played.get(recorded_key, 0) < len(self.interactions[recorded_key]):
+                return recorded_key
+        return candidates[-1]
+
+
+class CassetteAdapter(TimedHTTPAdapter):
+    """
+    TimedHTTPAdapter recording every response into a Cassette, or serving them from it without network
+    """
+
+    def __init__(self, cassette, **kwargs):
+        """
+        :param cassette: cassette recorded or replayed
+        :type cassette: class : api_portal.cassette.Cassette
+        """
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "record":
+            response = super().send(request, **kwargs)
+            self.cassette.record(request, response)
+            return response
+
+        status_code, headers, body = self.cassette.play(request)
+        raw = HTTPResponse(
+            body=io.BytesIO(body.encode("utf-8")),
+            headers=headers,
+            status=status_code,
+            reason=responses.get(status_code, ""),
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
@@ -6,30 +6,33 @@
 import requests
 from utils.helpers import get_response_values
 
+from api_portal.http_transport import get_default_transport
+
 
 class DataFederationManagementApi:
     """
     Data Federation Management Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
     def list_data_federations(self, sail_portal):
-        _, _, user_eosb = sail_portal.login()
-        payload = {}
-        payload["Eosb"] = user_eosb
+        json_params = {}
 
         try:
             #  params as json
-            response = requests.get(
+            response = sail_portal.send_with_eosb(
+                "GET",
                 f"{self.base_url}/SAIL/DataFederationManager/ListDataFederations",
-                json=payload,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
 
         # Return request response
         return get_response_values(response)
@@ -45,26 +48,50 @@ class DataFederationManagementApi:
         :return: response
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-
-        # Attach the logged in user's EOSB
-        payload["Eosb"] = user_eosb
+        json_params = dict(payload)
 
         try:
             #  params as json
-            response = requests.post(
+            response = sail_portal.send_with_eosb(
+                "POST",
                 f"{self.base_url}/SAIL/DataFederationManager/RegisterDataFederation",
-                json=payload,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
 
         # Return request response
         return get_response_values(response)
 
-    def delete_data_federation(self, sail_portal, dataset_family_guid):
-        return ""
+    def delete_data_federation(self, sail_portal, data_federation_guid):
+        """
+        Delete Data federation
+
+        :param sail_portal: fixture, SailPortalApi
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param data_federation_guid: data federation guid
+        :type data_federation_guid: string
+        :return: response, response.json(), user_eosb
+        :rtype: (string, string, string)
+        """
+        json_params = {"DataFederationGuid": data_federation_guid}
+
+        try:
+            #  params as json
+            response = sail_portal.send_with_eosb(
+                "DELETE",
+                f"{self.base_url}/SAIL/DataFederationManager/DeleteDataFederation",
+                json_params,
+                transport=self.transport,
+            )
+        except requests.exceptions.RequestException as error:
+            print(f"\n{error}")
+            raise
+
+        # Return request response
+        return get_response_values(response)
 
     def update_data_federation(self, sail_portal, dataset_family):
         return ""
@@ -4,7 +4,11 @@
 #
 # -----------------------------------------------------------
 import requests
+from config import STREAM_MAX_FAILURES
 from utils.helpers import get_response_values
+from utils.stream_helpers import get_streamed_response_values
+
+from api_portal.http_transport import get_default_transport
 
 
 class DataSetManagementApi:
@@ -12,33 +16,46 @@ class DataSetManagementApi:
     DataSets Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
-    def list_datasets(self, sail_portal):
+    def list_datasets(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
         """
         List Datasets
 
         :param sail_portal: fixture, SailPortalApi
         :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
-        :return: response, response.json(), user_eosb
+        :param stream: validate the Datasets one by one as they download instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
         # Attempt to list applicable dataset for logined user
         try:
             #  params as json
-            response = requests.get(f"{self.base_url}/SAIL/DatasetManager/ListDatasets", json=json_params, verify=False)
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/DatasetManager/ListDatasets",
+                json_params,
+                stream=stream,
+                transport=self.transport,
+            )
             # params query string
             # response = requests.get(
             #     f"{self.base_url}/SAIL/DatasetManager/ListDatasets", params=query_params, verify=False
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
+        if stream:
+            return get_streamed_response_values(response, "Datasets", max_failures)
         return get_response_values(response)
 
     def pull_dataset(self, sail_portal, dataset_guid):
@@ -50,19 +67,21 @@ class DataSetManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb, "DatasetGuid": dataset_guid}
+        json_params = {"DatasetGuid": dataset_guid}
         # Attempt to pull applicable dataset information
         try:
             #  params as json
-            response = requests.get(f"{self.base_url}/SAIL/DatasetManager/PullDataset", json=json_params, verify=False)
+            response = sail_portal.send_with_eosb(
+                "GET", f"{self.base_url}/SAIL/DatasetManager/PullDataset", json_params, transport=self.transport
+            )
             # params query string
             # response = requests.get(
             #     f"{self.base_url}/SAIL/DatasetManager/PullDataset", params=query_params, verify=False
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -77,18 +96,15 @@ class DataSetManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.post(
-                f"{self.base_url}/SAIL/DatasetManager/RegisterDataset",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "POST", f"{self.base_url}/SAIL/DatasetManager/RegisterDataset", json_params, transport=self.transport
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -103,17 +119,13 @@ class DataSetManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         # query_params = url_encoded(json_params)
         try:
             # params as json
             # returns a 404 BOARD-314
-            response = requests.delete(
-                f"{self.base_url}/SAIL/DatasetManager/DeleteDataset",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "DELETE", f"{self.base_url}/SAIL/DatasetManager/DeleteDataset", json_params, transport=self.transport
             )
 
             # params query string
@@ -122,5 +134,6 @@ class DataSetManagementApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
@@ -4,7 +4,11 @@
 #
 # -----------------------------------------------------------
 import requests
+from config import STREAM_MAX_FAILURES
 from utils.helpers import get_response_values
+from utils.stream_helpers import get_streamed_response_values
+
+from api_portal.http_transport import get_default_transport
 
 
 class DatasetFamilyManagementApi:
@@ -12,31 +16,41 @@ class DatasetFamilyManagementApi:
     Dataset Family Management Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
-    def list_dataset_families(self, sail_portal):
+    def list_dataset_families(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
         """
         List Dataset Family Information
 
         :param sail_portal: fixture, SailPortalApi
         :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
-        :return: response, response.json(), user_eosb
+        :param stream: validate the DatasetFamilies one by one as they download instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/DatasetFamilyManager/ListDatasetFamilies", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/DatasetFamilyManager/ListDatasetFamilies",
+                json_params,
+                stream=stream,
+                transport=self.transport,
             )
 
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
+        if stream:
+            return get_streamed_response_values(response, "DatasetFamilies", max_failures)
         return get_response_values(response)
 
     def pull_dataset_family(self, sail_portal, dataset_family_guid):
@@ -50,18 +64,21 @@ class DatasetFamilyManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb, "DatasetFamilyGuid": dataset_family_guid}
+        json_params = {"DatasetFamilyGuid": dataset_family_guid}
         # Attempt to pull applicable dataset information
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/DatasetFamilyManager/PullDatasetFamily", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/DatasetFamilyManager/PullDatasetFamily",
+                json_params,
+                transport=self.transport,
             )
 
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -76,20 +93,19 @@ class DatasetFamilyManagementApi:
         :return: response
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-
-        # Attach the logged in user's EOSB
-        payload["Eosb"] = user_eosb
-        print(payload)
+        json_params = dict(payload)
+        print(json_params)
         try:
             #  params as json
-            response = requests.post(
+            response = sail_portal.send_with_eosb(
+                "POST",
                 f"{self.base_url}/SAIL/DatasetFamilyManager/RegisterDatasetFamily",
-                json=payload,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
 
         # Return request response
         return get_response_values(response)
@@ -105,18 +121,21 @@ class DatasetFamilyManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb, "DatasetFamilyGuid": dataset_family_guid}
+        json_params = {"DatasetFamilyGuid": dataset_family_guid}
         # Attempt to pull applicable dataset information
         try:
             #  params as json
-            response = requests.delete(
-                f"{self.base_url}/SAIL/DatasetFamilyManager/DeleteDatasetFamily", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "DELETE",
+                f"{self.base_url}/SAIL/DatasetFamilyManager/DeleteDatasetFamily",
+                json_params,
+                transport=self.transport,
             )
 
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -131,17 +150,20 @@ class DatasetFamilyManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb, "DatasetFamily": dataset_family}
+        json_params = {"DatasetFamily": dataset_family}
         # Attempt to pull applicable dataset information
         try:
             #  params as json
-            response = requests.put(
-                f"{self.base_url}/SAIL/DatasetFamilyManager/UpdateDatasetFamily", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "PUT",
+                f"{self.base_url}/SAIL/DatasetFamilyManager/UpdateDatasetFamily",
+                json_params,
+                transport=self.transport,
             )
 
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
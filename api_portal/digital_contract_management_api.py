@@ -4,9 +4,13 @@
 #
 # -----------------------------------------------------------
 import requests
+from config import STREAM_MAX_FAILURES
 
 # from utils.helpers import url_encoded
 from utils.helpers import get_response_values
+from utils.stream_helpers import get_streamed_response_values
+
+from api_portal.http_transport import get_default_transport
 
 
 class DigitalContractManagementApi:
@@ -14,27 +18,35 @@ class DigitalContractManagementApi:
     Digital Contract Management Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
-    def list_digital_contracts(self, sail_portal):
+    def list_digital_contracts(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
         """
         List Digital Contract Information
 
         :param sail_portal: fixture, SailPortalApi
         :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
-        :return: response, response.json(), user_eosb
+        :param stream: validate the DigitalContracts one by one as they download instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         sail_portal.get_basic_user_info()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/DigitalContractManager/DigitalContracts", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/DigitalContractManager/DigitalContracts",
+                json_params,
+                stream=stream,
+                transport=self.transport,
             )
             # params query string
             # response = requests.gn
@@ -43,7 +55,10 @@ class DigitalContractManagementApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
+        if stream:
+            return get_streamed_response_values(response, "DigitalContracts", max_failures)
         return get_response_values(response)
 
     def pull_digital_contract(self, sail_portal, digital_contract_guid):
@@ -57,14 +72,16 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb, "DigitalContractGuid": digital_contract_guid}
+        json_params = {"DigitalContractGuid": digital_contract_guid}
         # Attempt to pull applicable dataset information
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/DigitalContractManager/PullDigitalContract", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/DigitalContractManager/PullDigitalContract",
+                json_params,
+                transport=self.transport,
             )
             # params query string
             # response = requests.get(
@@ -72,6 +89,7 @@ class DigitalContractManagementApi:
             # )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -86,20 +104,20 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
 
         try:
             #  params as json
-            response = requests.post(
+            response = sail_portal.send_with_eosb(
+                "POST",
                 f"{self.base_url}/SAIL/DigitalContractManager/Applications",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -114,20 +132,20 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
 
         try:
             #  params as json
-            response = requests.patch(
+            response = sail_portal.send_with_eosb(
+                "PATCH",
                 f"{self.base_url}/SAIL/DigitalContractManager/DataOwner/Accept",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -142,19 +160,19 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.patch(
+            response = sail_portal.send_with_eosb(
+                "PATCH",
                 f"{self.base_url}/SAIL/DigitalContractManager/Researcher/Activate",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -169,19 +187,19 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.patch(
+            response = sail_portal.send_with_eosb(
+                "PATCH",
                 f"{self.base_url}/SAIL/DigitalContractManager/AssociateWithAzureTemplate",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -196,19 +214,16 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.post(
-                f"{self.base_url}/SAIL/DigitalContractManager/Provision",
-                json=json_params,
-                verify=False,
+            response = sail_portal.send_with_eosb(
+                "POST", f"{self.base_url}/SAIL/DigitalContractManager/Provision", json_params, transport=self.transport
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -223,19 +238,19 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.get(
+            response = sail_portal.send_with_eosb(
+                "GET",
                 f"{self.base_url}/SAIL/DigitalContractManager/GetProvisioningStatus",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -250,18 +265,18 @@ class DigitalContractManagementApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
         # query_params = url_encoded({"Eosb": user_eosb})
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
         try:
             #  params as json
-            response = requests.post(
+            response = sail_portal.send_with_eosb(
+                "POST",
                 f"{self.base_url}/SAIL/DigitalContractManager/Deprovision",
-                json=json_params,
-                verify=False,
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
@@ -0,0 +1,245 @@
+# -----------------------------------------------------------
+#
+# Class HttpTransport
+#
+# -----------------------------------------------------------
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    HTTP_POOL_BLOCK,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+)
+
+from api_portal.cassette import CassetteAdapter
+from api_portal.request_timing import (
+    RequestTiming,
+    TimedHTTPAdapter,
+    headers_size,
+    is_implicit_login,
+    set_current_timing,
+    timing_recorder,
+)
+from api_portal.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, retry_stats
+
+
+class HttpTransport:
+    """
+    Http Transport Class, keep-alive connection pool shared by the api_portal classes
+    """
+
+    def __init__(
+        self,
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=HTTP_POOL_BLOCK,
+        verify=False,
+        recorder=timing_recorder,
+        cassette=None,
+        retry_policy=None,
+        circuit_failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        circuit_reset_timeout=CIRCUIT_RESET_TIMEOUT,
+        retry_stats=retry_stats,
+    ):
+        """
+        :param pool_connections: number of per host connection pools kept alive
+        :type pool_connections: int
+        :param pool_maxsize: max connections kept alive per host
+        :type pool_maxsize: int
+        :param pool_block: block when a host has pool_maxsize connections in use instead of opening more
+        :type pool_block: bool
+        :param verify: verify portal tls certificate, defaults to False
+        :type verify: bool, optional
+        :param recorder: collects a RequestTiming per request, None disables timing
+        :type recorder: class : api_portal.request_timing.RequestTimingRecorder, optional
+        :param cassette: records every response, or in replay mode serves them instead of the portal
+        :type cassette: class : api_portal.cassette.Cassette, optional
+        :param retry_policy: which failed requests are sent again, defaults to RetryPolicy()
+        :type retry_policy: class : api_portal.retry_policy.RetryPolicy, optional
+        :param circuit_failure_threshold: consecutive failures opening the circuit of an endpoint, 0 disables it
+        :type circuit_failure_threshold: int
+        :param circuit_reset_timeout: seconds an open circuit fails fast before a trial request
+        :type circuit_reset_timeout: float
+        :param retry_stats: counts the retries and circuit breaker events per endpoint
+        :type retry_stats: class : api_portal.retry_policy.RetryStats, optional
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.recorder = recorder
+        self.verify = verify
+        self.cassette = cassette
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_timeout = circuit_reset_timeout
+        self.retry_stats = retry_stats
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self.session = requests.Session()
+        pool_kwargs = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        if cassette is None:
+            adapter = TimedHTTPAdapter(**pool_kwargs)
+        else:
+            adapter = CassetteAdapter(cassette, **pool_kwargs)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request over a pooled connection, recording the RequestTiming of every attempt
+
+        Failed attempts are sent again as the retry policy allows, a request to an endpoint
+        whose circuit breaker is open fails fast with CircuitOpenError.
+
+        :param method: http method
+        :type method: string
+        :param url: request url
+        :type url: string
+        :param idempotent: retry this request as idempotent or not whatever its method, defaults to the policy
+        :type idempotent: bool, optional
+        :raises requests.exceptions.RequestException: last attempt failed
+        :return: response
+        :rtype: requests.Response
+        """
+        # verify is passed per request, a session level verify loses to REQUESTS_CA_BUNDLE in requests
+        kwargs.setdefault("verify", self.verify)
+        idempotent = kwargs.pop("idempotent", None)
+        endpoint = f"{method.upper()} {urlparse(url).path}"
+        breaker = self.circuit_breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.retry_stats.add(endpoint, "CircuitRejected")
+                raise CircuitOpenError(f"Circuit breaker open for {endpoint}")
+            response = error = None
+            try:
+                response = self._send(method, url, attempt, **kwargs)
+            except requests.exceptions.RequestException as send_error:
+                error = send_error
+            failed = self.retry_policy.is_failure(response, error)
+            if breaker.record(failed):
+                self.retry_stats.add(endpoint, "CircuitOpened")
+            if not self.retry_policy.should_retry(method, attempt, response, error, idempotent):
+                if attempt and failed:
+                    self.retry_stats.add(endpoint, "GaveUp")
+                if error is not None:
+                    raise error
+                return response
+            delay = self.retry_policy.backoff(attempt, response)
+            if response is not None:
+                # Hand the connection back to the pool, the body of a streamed response is never read
+                response.close()
+            self.retry_stats.add(endpoint, "Retries")
+            if not attempt:
+                self.retry_stats.add(endpoint, "RetriedRequests")
+            attempt += 1
+            time.sleep(delay)
+
+    def circuit_breaker(self, endpoint):
+        """
+        :param endpoint: "METHOD /path"
+        :type endpoint: string
+        :return: circuit breaker of the endpoint
+        :rtype: class : api_portal.retry_policy.CircuitBreaker
+        """
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    self.circuit_failure_threshold, self.circuit_reset_timeout
+                )
+            return breaker
+
+    def _send(self, method, url, attempt, **kwargs):
+        """
+        Send one attempt of a request
+        """
+        if self.recorder is None:
+            return self.session.request(method, url, **kwargs)
+
+        record = RequestTiming(method.upper(), urlparse(url).path, implicit_login=is_implicit_login(), attempt=attempt)
+        set_current_timing(record)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as error:
+            record.error = type(error).__name__
+            record.total = time.perf_counter() - start
+            self.recorder.add(record)
+            raise
+        finally:
+            set_current_timing(None)
+        record.total = time.perf_counter() - start
+
+        sent = response.request
+        record.status_code = response.status_code
+        record.bytes_sent = len(f"{sent.method} {sent.path_url} HTTP/1.1\r\n") + headers_size(sent.headers)
+        if sent.body:
+            record.bytes_sent += len(sent.body)
+        if kwargs.get("stream"):
+            # The body is read later by the caller, count its announced length
+            body_size = int(response.headers.get("Content-Length") or 0)
+        else:
+            body_size = len(response.content)
+        record.bytes_received = body_size + headers_size(response.headers)
+        record.ttfb = response.elapsed.total_seconds()
+        self.recorder.add(record)
+        return response
+
+    def close(self):
+        """
+        Close all pooled connections, saving the cassette being recorded
+        """
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.save()
+
+
+def measurement_transport(**kwargs):
+    """
+    Get an HttpTransport sending every request exactly once, for the stress and benchmark tools
+
+    Retries would hide the failed attempts from the error rate and add their backoff to the
+    latency, an open circuit breaker would turn the calls into instant CircuitOpenErrors.
+
+    :param kwargs: other HttpTransport arguments, e.g. pool_maxsize
+    :type kwargs: dict
+    :return: transport without retries and circuit breakers
+    :rtype: class : api_portal.http_transport.HttpTransport
+    """
+    return HttpTransport(retry_policy=RetryPolicy(max_retries=0), circuit_failure_threshold=0, **kwargs)
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """
+    Get the process wide HttpTransport used by api clients created without a transport
+
+    :return: transport
+    :rtype: class : api_portal.http_transport.HttpTransport
+    """
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
+
+
+def set_default_transport(transport):
+    """
+    Replace the process wide HttpTransport
+
+    :param transport: transport shared by api clients created without a transport
+    :type transport: class : api_portal.http_transport.HttpTransport
+    """
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -0,0 +1,244 @@
+# -----------------------------------------------------------
+#
+# Class ProvisioningMultiplexer
+#
+# -----------------------------------------------------------
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config import PROVISIONING_POLL_INITIAL_INTERVAL, PROVISIONING_POLL_MAX_INTERVAL, VM_WAIT_TIMEOUT
+from utils.digital_contract_helpers import PROVISIONING_FAILED, PROVISIONING_STATUSES
+from utils.helpers import get_response_values
+
+
+class ProvisioningWatchError(ValueError):
+    """
+    Raised when a watched digital contract is no longer listed, or can not get to the awaited status
+    """
+
+
+def provisioning_status_name(status):
+    """
+    :param status: ProvisioningStatus of a digital contract
+    :type status: number
+    :return: readable status name
+    :rtype: string
+    """
+    return PROVISIONING_STATUSES.get(status, f"Unknown({status})")
+
+
+class ProvisioningMultiplexer:
+    """
+    Provisioning Multiplexer Class, one poller for the provisioning status of many digital contracts
+
+    Callers watch contract guids and get a Future, a single background thread lists the
+    digital contracts once per poll, the listing carrying the ProvisioningStatus
+    and NumberOfVirtualMachinesReady of every contract, and resolves the Futures of the
+    contracts whose status or ready count changed. The poll load on the portal is one
+    listing per interval however many contracts and callers wait.
+
+    The interval restarts from initial_interval whenever a contract changes or is newly
+    watched and doubles after each poll without changes, up to max_interval. The poller
+    stops while nothing is watched.
+    """
+
+    def __init__(
+        self,
+        digitalcontract_management,
+        sail_portal,
+        initial_interval=PROVISIONING_POLL_INITIAL_INTERVAL,
+        max_interval=PROVISIONING_POLL_MAX_INTERVAL,
+        clock=time.monotonic,
+    ):
+        """
+        :param digitalcontract_management: DigitalContractManagementApi polled for the statuses
+        :type digitalcontract_management:
+            class : api_portal.digital_contract_management_api.DigitalContractManagementApi
+        :param sail_portal: user session party to every watched contract
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param initial_interval: seconds between polls while contracts change, also the least between two polls
+        :type initial_interval: float
+        :param max_interval: cap of the seconds between polls
+        :type max_interval: float
+        """
+        self.digitalcontract_management = digitalcontract_management
+        self.sail_portal = sail_portal
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.polls = 0
+        self.poll_errors = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._watchers = {}
+        self._last = {}
+        self._interval = initial_interval
+        self._last_poll = None
+        self._thread = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def watch(self, dc_guid, since=None):
+        """
+        Future of the next provisioning status of a contract
+
+        :param dc_guid: DigitalContractGuid
+        :type dc_guid: string
+        :param since: status the caller knows, the Future resolves once ProvisioningStatus or
+            NumberOfVirtualMachinesReady differ from it, None resolves on the next poll
+        :type since: dict, optional
+        :return: Future of the status dict, DigitalContractGuid, ProvisioningStatus,
+            NumberOfVirtualMachinesReady and NumberOfVirtualMachines
+        :rtype: concurrent.futures.Future
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ProvisioningMultiplexer is closed")
+            self._watchers.setdefault(dc_guid, []).append((future, None if since is None else _status_key(since)))
+            self._interval = self.initial_interval
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sail-provisioning", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return future
+
+    def wait_for(self, dc_guid, statuses, timeout=VM_WAIT_TIMEOUT, on_change=None):
+        """
+        Wait until a contract is in one of statuses
+
+        :param dc_guid: DigitalContractGuid
+        :type dc_guid: string
+        :param statuses: awaited ProvisioningStatus values
+        :type statuses: iterable
+        :param timeout: seconds the wait may take
+        :type timeout: float
+        :param on_change: called with the status dict on every change seen
+        :type on_change: callable, optional
+        :raises ProvisioningWatchError: provisioning failed, the contract is not listed or the deadline passed
+        :return: status dict reached
+        :rtype: dict
+        """
+        statuses = set(statuses)
+        deadline = self._clock() + timeout
+        status = None
+        while True:
+            try:
+                status = self.watch(dc_guid, since=status).result(timeout=max(0.0, deadline - self._clock()))
+            except FutureTimeoutError:
+                raise ProvisioningWatchError(
+                    f"Digital contract {dc_guid} still "
+                    f"{provisioning_status_name(status and status['ProvisioningStatus'])} after {timeout}s"
+                ) from None
+            if on_change is not None:
+                on_change(status)
+            if status["ProvisioningStatus"] in statuses:
+                return status
+            if status["ProvisioningStatus"] == PROVISIONING_FAILED:
+                raise ProvisioningWatchError(f"Digital contract {dc_guid} failed to provision: {status}")
+
+    def close(self):
+        """
+        Stop the poller, the Futures still pending are cancelled
+        """
+        with self._lock:
+            self._closed = True
+            watchers, self._watchers = self._watchers, {}
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        for futures in watchers.values():
+            for future, _ in futures:
+                future.cancel()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._closed or not self._watchers:
+                    self._thread = None
+                    return
+                # A new watch restarts the interval and wakes the poller to reschedule the next poll
+                delay = 0.0 if self._last_poll is None else self._last_poll + self._interval - self._clock()
+                self._wake.clear()
+            if delay > 0 and self._wake.wait(delay):
+                continue
+            self._poll()
+
+    def _poll(self):
+        self._last_poll = self._clock()
+        self.polls += 1
+        try:
+            # Sent directly, list_digital_contracts also pulls the user information first
+            response = self.sail_portal.send_with_eosb(
+                "GET",
+                f"{self.digitalcontract_management.base_url}/SAIL/DigitalContractManager/DigitalContracts",
+                {},
+                transport=self.digitalcontract_management.transport,
+            )
+            _, response_json, _ = get_response_values(response)
+            contracts = response_json.get("DigitalContracts") if response.status_code == 200 else None
+        except Exception:
+            contracts = None
+        with self._lock:
+            if contracts is None:
+                # The watchers wait for the next poll, backing off like an unchanged one
+                self.poll_errors += 1
+                self._interval = min(self.max_interval, self._interval * 2)
+                return
+            changed = False
+            # Futures are resolved once the lock is released, their callbacks may watch again
+            resolved = []
+            for dc_guid in list(self._watchers):
+                contract = contracts.get(dc_guid)
+                if contract is None:
+                    error = ProvisioningWatchError(
+                        f"Digital contract {dc_guid} is not listed for {self.sail_portal.email}"
+                    )
+                    resolved.extend((future, None, error) for future, _ in self._watchers.pop(dc_guid))
+                    continue
+                status = {
+                    "DigitalContractGuid": dc_guid,
+                    "ProvisioningStatus": contract.get("ProvisioningStatus"),
+                    "NumberOfVirtualMachinesReady": contract.get("NumberOfVirtualMachinesReady", 0),
+                    "NumberOfVirtualMachines": contract.get("NumberOfVirtualMachines"),
+                }
+                key = _status_key(status)
+                changed |= self._last.get(dc_guid, key) != key
+                self._last[dc_guid] = key
+                pending = []
+                for future, since in self._watchers[dc_guid]:
+                    if future.cancelled():
+                        continue
+                    if since != key:
+                        resolved.append((future, status, None))
+                    else:
+                        pending.append((future, since))
+                if pending:
+                    self._watchers[dc_guid] = pending
+                else:
+                    del self._watchers[dc_guid]
+            self._interval = self.initial_interval if changed else min(self.max_interval, self._interval * 2)
+            self._last = {dc_guid: key for dc_guid, key in self._last.items() if dc_guid in self._watchers}
+        for future, status, error in resolved:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(dict(status))
+
+
+def _status_key(status):
+    """
+    :return: the fields a watch resolves on
+    :rtype: tuple
+    """
+    return status["ProvisioningStatus"], status["NumberOfVirtualMachinesReady"]
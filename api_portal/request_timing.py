@@ -0,0 +1,256 @@
+# -----------------------------------------------------------
+#
+# Per request timing of the api_portal HttpTransport
+#
+# -----------------------------------------------------------
+import contextlib
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+_local = threading.local()
+
+
+class RequestTiming:
+    """
+    Request Timing Class, what one portal request cost
+
+    Times are in seconds. dns, connect and tls stay 0 when a pooled keep-alive
+    connection was reused. ttfb runs from send until the response headers arrived,
+    total until the body was read. attempt is 0 for the first send of a request and
+    counts up for its retries.
+    """
+
+    def __init__(self, method, path, implicit_login=False, attempt=0):
+        self.method = method
+        self.path = path
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.ttfb = 0.0
+        self.total = 0.0
+        self.implicit_login = implicit_login
+        self.attempt = attempt
+        self.error = None
+
+    @property
+    def endpoint(self):
+        return f"{self.method} {self.path}"
+
+    def to_dict(self):
+        """
+        :return: timing fields
+        :rtype: dict
+        """
+        return dict(vars(self))
+
+
+class RequestTimingRecorder:
+    """
+    Thread safe collector of RequestTiming records
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = []
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        """
+        :return: copy of the recorded timings
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records = []
+
+
+# Process wide recorder, HttpTransport records here unless given another one
+timing_recorder = RequestTimingRecorder()
+
+
+def current_timing():
+    """
+    :return: RequestTiming of the request being sent on this thread, None outside a request
+    :rtype: class : api_portal.request_timing.RequestTiming
+    """
+    return getattr(_local, "timing", None)
+
+
+def set_current_timing(record):
+    _local.timing = record
+
+
+def is_implicit_login():
+    """
+    :return: True while this thread logs in because the cached eosb was missing or expired
+    :rtype: bool
+    """
+    return getattr(_local, "implicit_login", False)
+
+
+@contextlib.contextmanager
+def implicit_login():
+    """
+    Mark the requests sent by this thread in the block as implicit re-login
+    """
+    previous = is_implicit_login()
+    _local.implicit_login = True
+    try:
+        yield
+    finally:
+        _local.implicit_login = previous
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """
+    HTTPConnection recording dns and tcp connect time into the current RequestTiming
+    """
+
+    def _new_conn(self):
+        record = current_timing()
+        if record is None:
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # urllib3 fails the same lookup again and raises its NewConnectionError
+            addresses = []
+        resolved = time.perf_counter()
+        record.dns += resolved - start
+        if not addresses:
+            return super()._new_conn()
+        # Connect to the resolved addresses, the lookup is not repeated and not counted as connect.
+        # server_hostname and the Host header still come from self.host
+        dns_host = self._dns_host
+        try:
+            for index, (_, _, _, _, sockaddr) in enumerate(addresses):
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    # Covers NewConnectionError, try the next address like urllib3 does
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+            record.connect += time.perf_counter() - resolved
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """
+    HTTPSConnection also recording the tls handshake time into the current RequestTiming
+    """
+
+    def connect(self):
+        record = current_timing()
+        if record is None:
+            return super().connect()
+        socket_time = record.dns + record.connect
+        start = time.perf_counter()
+        super().connect()
+        record.tls += time.perf_counter() - start - (record.dns + record.connect - socket_time)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pooled connections record connection setup times
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def headers_size(headers):
+    """
+    Approximate size on the wire of a header block
+
+    :param headers: http headers
+    :type headers: dict
+    :return: size in bytes
+    :rtype: int
+    """
+    return sum(len(f"{key}: {value}\r\n") for key, value in headers.items()) + 2
+
+
+# Upper bounds in milliseconds of the total time histogram buckets, slower requests land in "+Inf"
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def summarize_timings(records):
+    """
+    Aggregate RequestTiming records into a per endpoint summary and total time histogram
+
+    :param records: request timings
+    :type records: list
+    :return: summary keyed by "METHOD /path"
+    :rtype: dict
+    """
+    summary = {}
+    for record in records:
+        endpoint = summary.get(record.endpoint)
+        if endpoint is None:
+            endpoint = summary[record.endpoint] = {
+                "Requests": 0,
+                "Errors": 0,
+                "ImplicitLogins": 0,
+                "Retries": 0,
+                "StatusCodes": {},
+                "BytesSent": 0,
+                "BytesReceived": 0,
+                "Dns": 0.0,
+                "Connect": 0.0,
+                "Tls": 0.0,
+                "Ttfb": 0.0,
+                "Total": 0.0,
+                "MaxTotal": 0.0,
+                "Histogram": {**{f"{bucket}ms": 0 for bucket in HISTOGRAM_BUCKETS_MS}, "+Inf": 0},
+            }
+        endpoint["Requests"] += 1
+        endpoint["Errors"] += 1 if record.error else 0
+        endpoint["ImplicitLogins"] += 1 if record.implicit_login else 0
+        endpoint["Retries"] += 1 if record.attempt else 0
+        status = str(record.status_code or record.error)
+        endpoint["StatusCodes"][status] = endpoint["StatusCodes"].get(status, 0) + 1
+        endpoint["BytesSent"] += record.bytes_sent
+        endpoint["BytesReceived"] += record.bytes_received
+        for field in ("dns", "connect", "tls", "ttfb", "total"):
+            endpoint[field.capitalize()] += getattr(record, field)
+        endpoint["MaxTotal"] = max(endpoint["MaxTotal"], record.total)
+        total_ms = record.total * 1000
+        bucket = next((f"{bucket}ms" for bucket in HISTOGRAM_BUCKETS_MS if total_ms <= bucket), "+Inf")
+        endpoint["Histogram"][bucket] += 1
+
+    # Turn the summed times into means
+    for endpoint in summary.values():
+        for field in ("Dns", "Connect", "Tls", "Ttfb", "Total"):
+            endpoint[f"Mean{field}"] = endpoint.pop(field) / endpoint["Requests"]
+    return dict(sorted(summary.items()))
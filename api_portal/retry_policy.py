@@ -0,0 +1,229 @@
+# -----------------------------------------------------------
+#
+# Retry and circuit breaker policy of the api_portal HttpTransport
+#
+# -----------------------------------------------------------
+import random
+import threading
+import time
+
+import requests
+from config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_MAX_BACKOFF,
+    RETRY_MAX_RETRIES,
+    RETRY_METHODS,
+    RETRY_STATUSES,
+)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised without sending the request while the circuit breaker of its endpoint is open
+    """
+
+
+class RetryPolicy:
+    """
+    Retry Policy Class, which failed requests are sent again and after how long
+
+    Connection errors and the retry statuses are retried for the idempotent methods only,
+    or for a request sent as idempotent, e.g. a login. A connection that could not be
+    opened never reached the portal, it is retried for every method.
+    """
+
+    def __init__(
+        self,
+        max_retries=RETRY_MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        max_backoff=RETRY_MAX_BACKOFF,
+        methods=RETRY_METHODS,
+        statuses=RETRY_STATUSES,
+    ):
+        """
+        :param max_retries: retries after the first attempt, 0 disables retrying
+        :type max_retries: int
+        :param backoff_factor: seconds, the nth retry waits up to backoff_factor * 2 ** n
+        :type backoff_factor: float
+        :param max_backoff: cap in seconds of a single wait, also of a Retry-After header
+        :type max_backoff: float
+        :param methods: idempotent http methods, e.g. ("GET",)
+        :type methods: tuple
+        :param statuses: response status codes retried, e.g. (502, 503, 504)
+        :type statuses: tuple
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.methods = frozenset(method.upper() for method in methods)
+        self.statuses = frozenset(statuses)
+        # Own generator, the jitter must not shift the random names of the tests
+        self._random = random.Random()
+
+    def is_failure(self, response=None, error=None):
+        """
+        :return: True when the attempt counts against the circuit breaker of its endpoint
+        :rtype: bool
+        """
+        if error is not None:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return response.status_code in self.statuses
+
+    def should_retry(self, method, attempt, response=None, error=None, idempotent=None):
+        """
+        :param method: http method
+        :type method: string
+        :param attempt: retries already made
+        :type attempt: int
+        :param response: response of the attempt
+        :type response: requests.Response, optional
+        :param error: error raised by the attempt
+        :type error: requests.exceptions.RequestException, optional
+        :param idempotent: overrides the idempotence of method for this request
+        :type idempotent: bool, optional
+        :return: True when the request is to be sent again
+        :rtype: bool
+        """
+        if attempt >= self.max_retries or isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout) or _is_refused_connection(error):
+            return True
+        if idempotent is None:
+            idempotent = method.upper() in self.methods
+        if not idempotent:
+            return False
+        return self.is_failure(response, error)
+
+    def backoff(self, attempt, response=None):
+        """
+        :param attempt: retries already made
+        :type attempt: int
+        :param response: response retried, its Retry-After header is honoured
+        :type response: requests.Response, optional
+        :return: seconds to wait before the next attempt, exponential with full jitter
+        :rtype: float
+        """
+        delay = self._random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+        return delay
+
+
+def _is_refused_connection(error):
+    """
+    :return: True when the connection failed before the request was sent
+    :rtype: bool
+    """
+    if not isinstance(error, requests.exceptions.ConnectionError) or isinstance(error, CircuitOpenError):
+        return False
+    reason = error.args[0] if error.args else None
+    # urllib3 wraps the connect failure into a MaxRetryError
+    reason = getattr(reason, "reason", reason)
+    return type(reason).__name__ in ("NewConnectionError", "ConnectTimeoutError")
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker Class, stop sending to an endpoint after consecutive failures
+
+    After failure_threshold failures in a row the circuit opens and requests fail fast with
+    CircuitOpenError. Once reset_timeout has passed one trial request is let through, its
+    success closes the circuit and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        """
+        :param failure_threshold: consecutive failures opening the circuit, 0 disables the breaker
+        :type failure_threshold: int
+        :param reset_timeout: seconds the circuit stays open before a trial request
+        :type reset_timeout: float
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        :return: False when the request is to fail fast
+        :rtype: bool
+        """
+        if not self.failure_threshold:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record(self, failed):
+        """
+        :param failed: outcome of a request let through
+        :type failed: bool
+        :return: True when this outcome opened the circuit
+        :rtype: bool
+        """
+        if not self.failure_threshold:
+            return False
+        with self._lock:
+            self._trial_running = False
+            if not failed:
+                self.state = self.CLOSED
+                self.failures = 0
+                return False
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return opened
+            return False
+
+
+class RetryStats:
+    """
+    Thread safe per endpoint counters of the retry policy and circuit breakers
+    """
+
+    FIELDS = ("Retries", "RetriedRequests", "GaveUp", "CircuitOpened", "CircuitRejected")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def add(self, endpoint, field, count=1):
+        with self._lock:
+            counters = self._counters.get(endpoint)
+            if counters is None:
+                counters = self._counters[endpoint] = dict.fromkeys(self.FIELDS, 0)
+            counters[field] += count
+
+    def snapshot(self):
+        """
+        :return: counters keyed by "METHOD /path"
+        :rtype: dict
+        """
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in sorted(self._counters.items())}
+
+    def clear(self):
+        with self._lock:
+            self._counters = {}
+
+
+# Process wide counters, HttpTransport counts here unless given others
+retry_stats = RetryStats()
@@ -3,8 +3,14 @@
 # Class SailPortal
 #
 # -----------------------------------------------------------
-import requests
-from utils.helpers import get_response_values
+import threading
+import time
+
+from config import EOSB_TTL
+from utils.helpers import get_response_values, url_encoded
+
+from api_portal.http_transport import get_default_transport
+from api_portal.request_timing import implicit_login
 
 
 class SailPortalApi:
@@ -12,11 +18,17 @@ class SailPortalApi:
     Sail Portal Api Class
     """
 
-    def __init__(self, base_url, email, password):
+    def __init__(self, base_url, email, password, eosb_ttl=EOSB_TTL, transport=None):
         self.base_url = base_url
         self.email = email
         self.password = password
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
+        # Cached user eosb, shared by every api call made with this session
+        self.eosb_ttl = eosb_ttl
+        self._eosb = None
+        self._eosb_login_time = 0.0
+        self._eosb_lock = threading.RLock()
 
     # TODO Remote Attestation Certificate
 
@@ -30,20 +42,108 @@ class SailPortalApi:
         json_params = {"Email": self.email, "Password": self.password}
         # query_params = url_encoded({"Email": self.email, "Password": self.password})
         # Attempt to login to SAIL PORTAL via POST request
-        try:
-            #  params as json
-            response = requests.post(
-                f"{self.base_url}/SAIL/AuthenticationManager/User/Login", json=json_params, verify=False
-            )
-            # params query string
-            # response = requests.post(
-            #     f"{self.base_url}/SAIL/AuthenticationManager/User/Login", params=query_params, verify=False
-            # )
-            # response.raise_for_status()
-        except requests.exceptions.RequestException as error:
-            print(f"\n{error}")
+        #  params as json
+        # Logging in again only issues another eosb, it is retried like a GET
+        response = self.transport.request(
+            "POST", f"{self.base_url}/SAIL/AuthenticationManager/User/Login", json=json_params, idempotent=True
+        )
+        # params query string
+        # response = requests.post(
+        #     f"{self.base_url}/SAIL/AuthenticationManager/User/Login", params=query_params, verify=False
+        # )
+        # response.raise_for_status()
+        login_response, login_response_json, user_eosb = get_response_values(response)
+        # Cache the eosb of a successful login for the following api calls
+        if user_eosb:
+            with self._eosb_lock:
+                self._eosb = user_eosb
+                self._eosb_login_time = time.monotonic()
         # Return request response: status code, output and user eosb
-        return get_response_values(response)
+        return login_response, login_response_json, user_eosb
+
+    def get_eosb(self):
+        """
+        Get the cached user eosb, login only when there is none or it is older than eosb_ttl
+
+        :return: user_eosb
+        :rtype: string
+        """
+        with self._eosb_lock:
+            if self._eosb is None or time.monotonic() - self._eosb_login_time >= self.eosb_ttl:
+                self._eosb = None
+                with implicit_login():
+                    self.login()
+            return self._eosb
+
+    def refresh_eosb(self, expired_eosb):
+        """
+        Drop an eosb rejected by the portal and login again
+
+        Only the first caller holding the expired eosb logs in, concurrent callers
+        reuse the refreshed one.
+
+        :param expired_eosb: eosb rejected by the portal
+        :type expired_eosb: string
+        :return: user_eosb
+        :rtype: string
+        """
+        with self._eosb_lock:
+            if self._eosb == expired_eosb:
+                self._eosb = None
+            return self.get_eosb()
+
+    def invalidate_eosb(self):
+        """
+        Forget the cached eosb, next api call will login again
+        """
+        with self._eosb_lock:
+            self._eosb = None
+
+    def send_with_eosb(self, method, url, json_params=None, query_params=None, transport=None, **kwargs):
+        """
+        Send a request authenticated with the cached user eosb
+
+        The eosb is attached to query_params when given, otherwise to json_params.
+        A 401 response means the eosb expired, it is refreshed once and the request is resent
+        once whatever its method. The portal rejects an expired eosb before applying the call,
+        so a register or a delete is not applied twice.
+
+        :param method: http method
+        :type method: string
+        :param url: request url
+        :type url: string
+        :param json_params: params as json, defaults to None
+        :type json_params: dict, optional
+        :param query_params: params as query string, defaults to None
+        :type query_params: dict, optional
+        :param transport: HttpTransport of the api client sending the request, defaults to the one of this session
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        :return: response
+        :rtype: requests.Response
+        """
+        transport = transport or self.transport
+        user_eosb = self.get_eosb()
+        response = self._send_eosb_request(transport, method, url, user_eosb, json_params, query_params, **kwargs)
+        if response.status_code == 401:
+            user_eosb = self.refresh_eosb(user_eosb)
+            # Hand the connection back to the pool, the body of a streamed response is never read
+            response.close()
+            response = self._send_eosb_request(transport, method, url, user_eosb, json_params, query_params, **kwargs)
+        return response
+
+    def _send_eosb_request(self, transport, method, url, user_eosb, json_params, query_params, **kwargs):
+        """
+        Attach the user eosb to the request params and send the request
+        """
+        if query_params is not None:
+            query_params = dict(query_params)
+            query_params["Eosb"] = user_eosb
+            kwargs["params"] = url_encoded(query_params)
+        else:
+            json_params = dict(json_params or {})
+            json_params["Eosb"] = user_eosb
+            kwargs["json"] = json_params
+        return transport.request(method, url, **kwargs)
 
     def get_basic_user_info(self):
         """
@@ -52,21 +152,14 @@ class SailPortalApi:
         :return: response, response.json()
         :rtype: (string, string)
         """
-        _, _, user_eosb = self.login()
-        json_params = {"Eosb": user_eosb}
         # query_params = url_encoded({"Eosb": user_eosb})
         # Attempt to get basic user information
-        try:
-            #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/AuthenticationManager/GetBasicUserInformation", json=json_params, verify=False
-            )
-            # params query string
-            # response = requests.get(
-            #     f"{self.base_url}/SAIL/AuthenticationManager/GetBasicUserInformation", params=query_params, verify=False
-            # )
-        except requests.exceptions.RequestException as error:
-            print(f"\n{error}")
+        #  params as json
+        response = self.send_with_eosb("GET", f"{self.base_url}/SAIL/AuthenticationManager/GetBasicUserInformation")
+        # params query string
+        # response = requests.get(
+        #     f"{self.base_url}/SAIL/AuthenticationManager/GetBasicUserInformation", params=query_params, verify=False
+        # )
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -94,17 +187,14 @@ class SailPortalApi:
         #     {"Eosb": user_eosb, "Email": self.email, "CurrentPassword": current_password, "NewPassword": new_password}
         # )
         # Attempt to update user password
-        try:
-            #  params as json
-            response = requests.patch(
-                f"{self.base_url}/SAIL/AuthenticationManager/User/Password", json=json_params, verify=False
-            )
-            # params query string
-            # response = requests.patch(
-            #     f"{self.base_url}/SAIL/AuthenticationManager/User/Password", params=query_params, verify=False
-            # )
-        except requests.exceptions.RequestException as error:
-            print(f"\n{error}")
+        #  params as json
+        response = self.transport.request(
+            "PATCH", f"{self.base_url}/SAIL/AuthenticationManager/User/Password", json=json_params
+        )
+        # params query string
+        # response = requests.patch(
+        #     f"{self.base_url}/SAIL/AuthenticationManager/User/Password", params=query_params, verify=False
+        # )
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
 
@@ -121,13 +211,10 @@ class SailPortalApi:
         """
         #  params as json
         json_params = {"Eosb": eosb}
-        try:
-            #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/AuthenticationManager/CheckEosb", json=json_params, verify=False
-            )
-        except requests.exceptions.RequestException as error:
-            print(f"\n{error}")
+        #  params as json
+        response = self.transport.request(
+            "GET", f"{self.base_url}/SAIL/AuthenticationManager/CheckEosb", json=json_params
+        )
 
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
@@ -4,7 +4,12 @@
 #
 # -----------------------------------------------------------
 import requests
+from config import STREAM_MAX_FAILURES
 from utils.helpers import get_response_values
+from utils.stream_helpers import get_streamed_response_values
+
+from api_portal.http_transport import get_default_transport
+from api_portal.vm_inventory import VmInventory
 
 
 class VirtualMachineApi:
@@ -12,32 +17,57 @@ class VirtualMachineApi:
     Virtual Machine Management Api Class
     """
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport=None):
         self.base_url = base_url
         self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        self.transport = transport or get_default_transport()
 
-    def list_virtual_machines(self, sail_portal):
+    def list_virtual_machines(self, sail_portal, stream=False, max_failures=STREAM_MAX_FAILURES):
         """
         List Virtual Machines associated to user
 
         :param sail_portal: fixture, SailPortalApi
         :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
-        :return: response, response.json(), user_eosb
+        :param stream: validate the VirtualMachines one by one as they download instead of loading the response
+        :type stream: bool, optional
+        :param max_failures: invalid entries reported in full when stream
+        :type max_failures: int, optional
+        :return: response, response.json() or a StreamValidationReport when stream, user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
+        json_params = {}
 
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/VirtualMachineManager/ListVirtualMachines", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/VirtualMachineManager/ListVirtualMachines",
+                json_params,
+                stream=stream,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
+        if stream:
+            return get_streamed_response_values(response, "VirtualMachines", max_failures)
         return get_response_values(response)
 
+    def inventory(self, sail_portal, max_age=None):
+        """
+        Inventory of the Virtual Machines associated to user, listed once and indexed by
+        digital contract, vm and state
+
+        :param sail_portal: fixture, SailPortalApi
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param max_age: seconds a snapshot is served before listing again, None keeps it until refresh
+        :type max_age: float, optional
+        :return: VmInventory, its snapshot() is listed on first use
+        :rtype: class : api_portal.vm_inventory.VmInventory
+        """
+        return VmInventory(self, sail_portal, max_age=max_age)
+
     def virtual_machines_status(self, sail_portal, payload):
         """
         Get Virtual Machine's Full Status
@@ -47,16 +77,18 @@ class VirtualMachineApi:
         :return: response, response.json(), user_eosb
         :rtype: (string, string, string)
         """
-        _, _, user_eosb = sail_portal.login()
-        json_params = {"Eosb": user_eosb}
-        json_params.update(payload)
+        json_params = dict(payload)
 
         try:
             #  params as json
-            response = requests.get(
-                f"{self.base_url}/SAIL/VirtualMachineManager/PullVirtualMachine", json=json_params, verify=False
+            response = sail_portal.send_with_eosb(
+                "GET",
+                f"{self.base_url}/SAIL/VirtualMachineManager/PullVirtualMachine",
+                json_params,
+                transport=self.transport,
             )
         except requests.exceptions.RequestException as error:
             print(f"\n{error}")
+            raise
         # Return request response: status code, output, and user eosb
         return get_response_values(response)
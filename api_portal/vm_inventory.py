@@ -0,0 +1,152 @@
+# -----------------------------------------------------------
+#
+# Class VmInventory
+#
+# -----------------------------------------------------------
+import threading
+import time
+
+
+class VmInventoryError(ValueError):
+    """
+    Raised when the virtual machines could not be listed
+    """
+
+
+class VmInventorySnapshot:
+    """
+    Vm Inventory Snapshot Class, the virtual machines of one ListVirtualMachines call
+
+    The listing is walked once into contract -> vms, vm -> contract and vm -> state
+    indexes, every lookup afterwards is a dict access without calling the portal.
+    """
+
+    def __init__(self, virtual_machines, taken_at=None):
+        """
+        :param virtual_machines: "VirtualMachines" of a ListVirtualMachines response
+        :type virtual_machines: dict
+        :param taken_at: time.monotonic() of the listing
+        :type taken_at: float, optional
+        """
+        self.taken_at = time.monotonic() if taken_at is None else taken_at
+        self.vms_by_contract = {}
+        self.contract_by_vm = {}
+        self.state_by_vm = {}
+        self.virtual_machines = {}
+        for contract_guid, contract_vms in (virtual_machines or {}).items():
+            associated = (contract_vms or {}).get("VirtualMachinesAssociatedWithDc") or {}
+            self.vms_by_contract[contract_guid] = list(associated)
+            for vm_guid, vm in associated.items():
+                self.contract_by_vm[vm_guid] = contract_guid
+                self.virtual_machines[vm_guid] = vm
+                if isinstance(vm, dict) and vm.get("State") is not None:
+                    self.state_by_vm[vm_guid] = int(vm["State"])
+
+    def contracts(self):
+        """
+        :return: guids of the digital contracts with virtual machines
+        :rtype: list
+        """
+        return list(self.vms_by_contract)
+
+    def vms(self, contract_guid):
+        """
+        :param contract_guid: DigitalContractGuid
+        :type contract_guid: string
+        :return: VirtualMachineGuids of the contract, empty when it has none
+        :rtype: list
+        """
+        return list(self.vms_by_contract.get(contract_guid, ()))
+
+    def contract(self, vm_guid):
+        """
+        :param vm_guid: VirtualMachineGuid
+        :type vm_guid: string
+        :return: DigitalContractGuid of the vm, None when not listed
+        :rtype: string
+        """
+        return self.contract_by_vm.get(vm_guid)
+
+    def state(self, vm_guid):
+        """
+        :param vm_guid: VirtualMachineGuid
+        :type vm_guid: string
+        :return: State code of the vm when listed, None otherwise
+        :rtype: int
+        """
+        return self.state_by_vm.get(vm_guid)
+
+    def age(self, clock=time.monotonic):
+        """
+        :return: seconds since the listing
+        :rtype: float
+        """
+        return clock() - self.taken_at
+
+    def __len__(self):
+        return len(self.contract_by_vm)
+
+    def __repr__(self):
+        return f"VmInventorySnapshot(contracts={len(self.vms_by_contract)}, vms={len(self)})"
+
+
+class VmInventory:
+    """
+    Vm Inventory Class, a VmInventorySnapshot shared by its callers and refreshed only if stale
+
+    With max_age None the snapshot is listed once and kept until refresh is called, otherwise
+    it is listed again by the first caller finding it older than max_age seconds while the
+    concurrent callers wait for that listing.
+    """
+
+    def __init__(self, virtualmachine_management, sail_portal, max_age=None, clock=time.monotonic):
+        """
+        :param virtualmachine_management: VirtualMachineApi listing the vms
+        :type virtualmachine_management: class : api_portal.virtual_machine_api.VirtualMachineApi
+        :param sail_portal: user session the vms are listed with
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param max_age: seconds a snapshot is served for, None keeps it until refresh
+        :type max_age: float, optional
+        """
+        self.virtualmachine_management = virtualmachine_management
+        self.sail_portal = sail_portal
+        self.max_age = max_age
+        self._clock = clock
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        """
+        :return: True when the next snapshot call lists the vms again
+        :rtype: bool
+        """
+        snapshot = self._snapshot
+        return snapshot is None or (self.max_age is not None and snapshot.age(self._clock) >= self.max_age)
+
+    def snapshot(self):
+        """
+        :raises VmInventoryError: the vms could not be listed
+        :return: current snapshot, listed again only when stale
+        :rtype: class : api_portal.vm_inventory.VmInventorySnapshot
+        """
+        with self._lock:
+            if self.is_stale():
+                self._snapshot = self._list()
+            return self._snapshot
+
+    def refresh(self):
+        """
+        :raises VmInventoryError: the vms could not be listed
+        :return: snapshot listed now
+        :rtype: class : api_portal.vm_inventory.VmInventorySnapshot
+        """
+        with self._lock:
+            self._snapshot = self._list()
+            return self._snapshot
+
+    def _list(self):
+        taken_at = self._clock()
+        response, response_json, _ = self.virtualmachine_management.list_virtual_machines(self.sail_portal)
+        if response is None or response.status_code != 200 or response_json is None:
+            raise VmInventoryError(f"Could not list vms: {response}")
+        return VmInventorySnapshot(response_json.get("VirtualMachines"), taken_at)
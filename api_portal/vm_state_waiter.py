@@ -0,0 +1,240 @@
+# -----------------------------------------------------------
+#
+# Class VmStateWaiter
+#
+# -----------------------------------------------------------
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import VM_WAIT_INITIAL_INTERVAL, VM_WAIT_MAX_INTERVAL, VM_WAIT_MAX_WORKERS, VM_WAIT_TIMEOUT
+from utils.digital_contract_helpers import (
+    VM_CONFIGURING,
+    VM_DELETE_FAILED,
+    VM_DELETED,
+    VM_DELETING,
+    VM_IN_USE,
+    VM_INITIALIZING,
+    VM_PROVISIONING_FAILED,
+    VM_READY_FOR_COMPUTATION,
+    VM_STARTING,
+    VM_WAITING_FOR_DATA,
+)
+
+VM_STATE_NAMES = {
+    VM_STARTING: "Starting",
+    VM_CONFIGURING: "Configuring",
+    VM_INITIALIZING: "Initializing",
+    VM_WAITING_FOR_DATA: "WaitingForData",
+    VM_READY_FOR_COMPUTATION: "ReadyForComputation",
+    VM_IN_USE: "InUse",
+    VM_DELETING: "Deleting",
+    VM_DELETED: "Deleted",
+    VM_DELETE_FAILED: "DeleteFailed",
+    VM_PROVISIONING_FAILED: "ProvisioningFailed",
+}
+
+# State -> states a vm can move to next, terminal states have none
+VM_STATE_TRANSITIONS = {
+    VM_STARTING: {VM_CONFIGURING, VM_PROVISIONING_FAILED},
+    VM_CONFIGURING: {VM_INITIALIZING, VM_PROVISIONING_FAILED},
+    VM_INITIALIZING: {VM_WAITING_FOR_DATA, VM_PROVISIONING_FAILED},
+    VM_WAITING_FOR_DATA: {VM_READY_FOR_COMPUTATION, VM_DELETING},
+    VM_READY_FOR_COMPUTATION: {VM_IN_USE, VM_DELETING},
+    VM_IN_USE: {VM_READY_FOR_COMPUTATION, VM_DELETING},
+    VM_DELETING: {VM_DELETED, VM_DELETE_FAILED},
+    VM_DELETED: set(),
+    VM_DELETE_FAILED: set(),
+    VM_PROVISIONING_FAILED: set(),
+}
+
+# A vm in one of these states can be deprovisioned
+VM_RUNNING_STATES = frozenset({VM_WAITING_FOR_DATA, VM_READY_FOR_COMPUTATION, VM_IN_USE})
+VM_STOPPED_STATES = frozenset({VM_DELETING, VM_DELETED})
+
+
+def vm_state_name(state):
+    """
+    :param state: State code of a vm
+    :type state: number
+    :return: readable state name
+    :rtype: string
+    """
+    return VM_STATE_NAMES.get(state, f"Unknown({state})")
+
+
+def reachable_vm_states(state):
+    """
+    All states a vm can still get to from state, state included
+
+    :param state: State code of a vm
+    :type state: int
+    :return: reachable states
+    :rtype: set
+    """
+    reachable = {state}
+    pending = [state]
+    while pending:
+        for next_state in VM_STATE_TRANSITIONS.get(pending.pop(), ()):
+            if next_state not in reachable:
+                reachable.add(next_state)
+                pending.append(next_state)
+    return reachable
+
+
+class VmStateWaitError(ValueError):
+    """
+    Raised when vms can not get to the awaited states, errors maps each vm guid to its error
+    """
+
+    def __init__(self, message, errors=None, states=None):
+        super().__init__(message)
+        self.errors = errors or {}
+        self.states = states or {}
+
+
+class VmStateWaiter:
+    """
+    Vm State Waiter Class, wait for virtual machines to get to a state
+
+    Polls PullVirtualMachine with exponential backoff and full jitter, restarting from
+    initial_interval whenever the state moves, so a waiter reacts quickly to progress and
+    backs off while a vm is stuck. A wait fails early once the awaited states are no longer
+    reachable in VM_STATE_TRANSITIONS and gives up at the deadline.
+    """
+
+    def __init__(
+        self,
+        virtualmachine_management,
+        sail_portal,
+        timeout=VM_WAIT_TIMEOUT,
+        initial_interval=VM_WAIT_INITIAL_INTERVAL,
+        max_interval=VM_WAIT_MAX_INTERVAL,
+        max_workers=VM_WAIT_MAX_WORKERS,
+        rng=None,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        """
+        :param virtualmachine_management: VirtualMachineApi polled for the vm states
+        :type virtualmachine_management: class : api_portal.virtual_machine_api.VirtualMachineApi
+        :param sail_portal: user session allowed to pull the vms
+        :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+        :param timeout: seconds a wait may take
+        :type timeout: float
+        :param initial_interval: seconds between the first polls, doubled after each unchanged poll
+        :type initial_interval: float
+        :param max_interval: cap of the seconds between polls
+        :type max_interval: float
+        :param max_workers: max vms polled concurrently by wait_for_all
+        :type max_workers: int
+        """
+        self.virtualmachine_management = virtualmachine_management
+        self.sail_portal = sail_portal
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.max_workers = max_workers
+        self._rng = rng or random.Random()
+        self._sleep = sleep
+        self._clock = clock
+
+    def get_state(self, vm_guid):
+        """
+        :param vm_guid: VirtualMachineGuid
+        :type vm_guid: string
+        :return: State code of the vm
+        :rtype: int
+        """
+        response, response_json, _ = self.virtualmachine_management.virtual_machines_status(
+            self.sail_portal, {"VirtualMachineGuid": vm_guid}
+        )
+        if response is None or response.status_code != 200 or not response_json:
+            raise VmStateWaitError(f"Could not pull vm {vm_guid}: {response}")
+        return int(response_json["VirtualMachine"]["State"])
+
+    def backoff(self, attempt):
+        """
+        :param attempt: number of polls since the state last changed
+        :type attempt: int
+        :return: seconds to wait before the next poll
+        :rtype: float
+        """
+        ceiling = min(self.max_interval, self.initial_interval * 2**attempt)
+        return self._rng.uniform(0.0, ceiling)
+
+    def wait_for(self, vm_guid, states, on_change=None):
+        """
+        Wait until a vm is in one of states
+
+        :param vm_guid: VirtualMachineGuid
+        :type vm_guid: string
+        :param states: awaited State codes
+        :type states: iterable
+        :param on_change: called with vm_guid, state on every state seen, e.g. for logging
+        :type on_change: callable, optional
+        :raises VmStateWaitError: states became unreachable or the deadline passed
+        :return: State code reached
+        :rtype: int
+        """
+        states = set(states)
+        deadline = self._clock() + self.timeout
+        previous_state = None
+        attempt = 0
+        while True:
+            state = self.get_state(vm_guid)
+            if state != previous_state:
+                if on_change is not None:
+                    on_change(vm_guid, state)
+                previous_state = state
+                attempt = 0
+            if state in states:
+                return state
+            if not reachable_vm_states(state) & states:
+                raise VmStateWaitError(
+                    f"Vm {vm_guid} is {vm_state_name(state)}, it can not get to "
+                    f"{sorted(vm_state_name(awaited) for awaited in states)}",
+                    states={vm_guid: state},
+                )
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise VmStateWaitError(
+                    f"Vm {vm_guid} still {vm_state_name(state)} after {self.timeout}s", states={vm_guid: state}
+                )
+            self._sleep(min(self.backoff(attempt), remaining))
+            attempt += 1
+
+    def wait_for_all(self, vm_guids, states, on_change=None):
+        """
+        Wait for many vms concurrently, each vm has the full timeout
+
+        :param vm_guids: VirtualMachineGuids
+        :type vm_guids: iterable
+        :param states: awaited State codes
+        :type states: iterable
+        :param on_change: called with vm_guid, state on every state seen
+        :type on_change: callable, optional
+        :raises VmStateWaitError: some vms did not get to states, after all waits ended
+        :return: vm_guid -> State code reached
+        :rtype: dict
+        """
+        vm_guids = list(vm_guids)
+        if not vm_guids:
+            return {}
+        reached = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(len(vm_guids), self.max_workers)) as executor:
+            futures = {vm_guid: executor.submit(self.wait_for, vm_guid, states, on_change) for vm_guid in vm_guids}
+            for vm_guid, future in futures.items():
+                try:
+                    reached[vm_guid] = future.result()
+                except Exception as error:
+                    errors[vm_guid] = error
+        if errors:
+            raise VmStateWaitError(
+                f"{len(errors)} of {len(vm_guids)} vms did not get to the awaited state: "
+                + "; ".join(str(error) for error in errors.values()),
+                errors=errors,
+                states=reached,
+            )
+        return reached
@@ -8,3 +8,45 @@ TEMP_PASS = "1235sailpassword"
 SAFE_FUNCTION_DIRECTORY = "test_api/test_orchestrator/test_safe_funcs/milestone5"
 ORCHESTRATOR_PATH = "/tmp_engineering/Orchestrator/sail"
 TEST_SAFE_FUNCTION_GUID = "{473001DB-64AF-456E-9712-96418B6194FE}"
+EOSB_TTL = 600
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 50
+HTTP_POOL_BLOCK = False
+ASYNC_POOL_MAXSIZE = 200
+STRESS_USERS = 10
+STRESS_RAMP_UP = 10.0
+STRESS_DURATION = 60.0
+STRESS_REQUEST_MIX = "list_datasets=70,pull_dataset=20,register_dataset=10"
+STRESS_MAX_ERROR_RATE = 0.01
+MOCK_PORTAL_LATENCY = 0.0
+MOCK_PORTAL_JITTER = 0.0
+MOCK_PORTAL_ERROR_RATE = 0.0
+MOCK_PORTAL_ERROR_STATUS = 503
+MOCK_PORTAL_VM_STATE_INTERVAL = 0.1
+VM_WAIT_TIMEOUT = 900.0
+VM_WAIT_INITIAL_INTERVAL = 1.0
+VM_WAIT_MAX_INTERVAL = 30.0
+VM_WAIT_MAX_WORKERS = 50
+CLEANUP_MAX_WORKERS = 8
+STREAM_MAX_FAILURES = 10
+STREAM_CHUNK_SIZE = 65536
+RETRY_MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.2
+RETRY_MAX_BACKOFF = 5.0
+RETRY_METHODS = ("GET", "HEAD", "OPTIONS")
+RETRY_STATUSES = (502, 503, 504)
+CIRCUIT_FAILURE_THRESHOLD = 10
+CIRCUIT_RESET_TIMEOUT = 30.0
+SEED_MAX_WORKERS = 16
+SCALING_SIZES = (10, 100, 1000, 10000)
+SCALING_REPEATS = 10
+SCALING_MAX_EXPONENT = 1.5
+PROVISIONING_POLL_INITIAL_INTERVAL = 1.0
+PROVISIONING_POLL_MAX_INTERVAL = 30.0
+LIFECYCLE_STAGE_WORKERS = 8
+LIFECYCLE_CONTRACTS = 100
+LIFECYCLE_CONCURRENCY_LEVELS = (1, 2, 4, 8, 16, 32)
+LIFECYCLE_SATURATION_GAIN = 0.1
+AUTH_ACCOUNTS = 100
+AUTH_CONCURRENCY_LEVELS = (1, 2, 4, 8, 16, 32)
+AUTH_LEVEL_DURATION = 10.0
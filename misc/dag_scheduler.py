@@ -0,0 +1,53 @@
+# -----------------------------------------------------------
+#
+# Dependency graph scheduler shared by the azure scripts of misc
+#
+# -----------------------------------------------------------
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_dag(steps, max_workers, on_done=None):
+    """
+    Run steps as soon as the steps they depend on succeeded, independent steps concurrently
+
+    A step whose dependency failed or was skipped is skipped, so is a step depending on a
+    key that is not a step.
+
+    :param steps: step key -> (callable, keys of the steps it depends on)
+    :type steps: dict
+    :param max_workers: max steps running at once
+    :type max_workers: int
+    :param on_done: called with step key, outcome as each step that ran ends
+    :type on_done: callable, optional
+    :return: step key -> ("done", result), ("failed", error) or ("skipped", failed dependency)
+    :rtype: dict
+    """
+    outcomes = {}
+    pending = dict(steps)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for key, (function, dependencies) in list(pending.items()):
+                failed = [dependency for dependency in dependencies if outcomes.get(dependency, ("done",))[0] != "done"]
+                if failed:
+                    outcomes[key] = ("skipped", failed[0])
+                    del pending[key]
+                elif all(dependency in outcomes for dependency in dependencies):
+                    running[executor.submit(function)] = key
+                    del pending[key]
+            if not running:
+                # Left over steps depend on keys that are not steps
+                for key, (_, dependencies) in pending.items():
+                    outcomes[key] = ("skipped", [dependency for dependency in dependencies if dependency not in steps])
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                try:
+                    outcomes[key] = ("done", future.result())
+                except Exception as error:
+                    outcomes[key] = ("failed", error)
+                if on_done is not None:
+                    on_done(key, outcomes[key])
+    return outcomes
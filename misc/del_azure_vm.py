@@ -5,17 +5,39 @@
 # Written by Stanley Lin 11/18/2021
 # -----------------------------------------------------------
 
+import argparse
+import fnmatch
+import json
+import os
 import requests
 import sys
+import threading
 import time
 
 from json import dumps
 
+try:
+    from misc import dag_scheduler
+except ImportError:
+    # Run as a script from misc/
+    import dag_scheduler
+
 # declare values for script
 tennant_id = "3e74e5ef-7e6a-4cf0-8573-680ca49b64d8"
 resource_group = "ScratchpadRg"
 subscription_id = "3d2b9951-a0c8-4dc3-8114-2776b047b15c"
 payload = {}
+# Endpoints, point them at a local stand-in (misc/mock_azure_management.py) to test offline
+management_url = os.environ.get("AZURE_MANAGEMENT_URL", "https://management.azure.com")
+login_url = os.environ.get("AZURE_LOGIN_URL", "https://login.microsoftonline.com:443")
+# Long running operations
+operation_timeout = 1800
+operation_poll_interval = 2.0
+batch_max_workers = 16
+# Access token cache, refreshed this many seconds before it expires
+token_cache_path = os.environ.get("AZURE_TOKEN_CACHE", os.path.join(os.path.expanduser("~"), ".sail_azure_token.json"))
+token_refresh_margin = 300
+token_retry_interval = 30
 
 
 def pretty_print(msg=None, data=None, indent=4):
@@ -55,14 +77,14 @@ def yes_or_no(question):
         return False
 
 
-def get_access_token():
+def fetch_access_token():
     """
-    Get accesstoken using Tennant ID
+    Request a new access token using Tennant ID
 
-    :return: access_token
-    :rtype: string
+    :return: token response, access_token and expires_on among others
+    :rtype: dict
     """
-    url = f"https://login.microsoftonline.com:443/{tennant_id}/oauth2/token"
+    url = f"{login_url}/{tennant_id}/oauth2/token"
     appid = "4f909fab-ad4c-4685-b7a9-7ddaae4efb22"
     password = "1YEn1Y.bVTVk-dzm9voTWyf7DrgQF29xL2"
     payload = f"grant_type=client_credentials&client_id={appid}&client_secret={password}&resource=https%3A%2F%2Fmanagement.core.windows.net%2F"
@@ -75,18 +97,154 @@ def get_access_token():
     except requests.exceptions.RequestException as error:
         print(f"\n{error}")
 
-    access_token = response.json().get("access_token")
+    return response.json()
+
+
+class TokenProvider:
+    """
+    Token Provider Class, access token shared by every del_*/get_* function
+
+    The token is cached in a local file with its expires_on, so runs of the script reuse
+    it, and once started a background thread refreshes it token_refresh_margin seconds
+    before it expires, so long batches never wait on or fail with an expired token.
+    """
+
+    def __init__(self, cache_path=None, refresh_margin=None, fetch=fetch_access_token):
+        """
+        :param cache_path: token cache file, defaults to token_cache_path, None or "" disables the file
+        :param refresh_margin: seconds before expiry the token is refreshed, defaults to token_refresh_margin
+        :param fetch: returns a new token response with access_token and expires_on
+        """
+        self.cache_path = token_cache_path if cache_path is None else cache_path
+        self.refresh_margin = token_refresh_margin if refresh_margin is None else refresh_margin
+        self.fetch = fetch
+        self.access_token = None
+        self.expires_on = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _cache_key(self):
+        return {"login_url": login_url, "tennant_id": tennant_id}
+
+    def _fresh(self):
+        return self.access_token is not None and time.time() < self.expires_on - self.refresh_margin
+
+    def _load(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as cache_file:
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if all(cached.get(key) == value for key, value in self._cache_key().items()):
+            self.access_token = cached.get("access_token")
+            self.expires_on = int(cached.get("expires_on") or 0)
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        cached = dict(self._cache_key(), access_token=self.access_token, expires_on=self.expires_on)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        # The file holds a bearer token, keep it private to the user
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as cache_file:
+            json.dump(cached, cache_file)
+        os.replace(temp_path, self.cache_path)
+
+    def refresh(self):
+        """
+        Fetch a new token and cache it
+
+        :return: access_token
+        :rtype: string
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        # Called with the lock held, threads needing a token meanwhile wait for this one
+        output = self.fetch()
+        self.access_token = output.get("access_token")
+        expires_on = output.get("expires_on")
+        self.expires_on = int(expires_on) if expires_on else int(time.time()) + int(output.get("expires_in", 3599))
+        self._save()
+        return self.access_token
+
+    def get_token(self):
+        """
+        Get the cached token, from the cache file or a new one when it is about to expire
+
+        Only the first thread finding the token stale fetches a new one, the others find it
+        fresh once they hold the lock.
+
+        :return: access_token
+        :rtype: string
+        """
+        with self._lock:
+            if not self._fresh():
+                self._load()
+            if not self._fresh():
+                self._refresh()
+            return self.access_token
+
+    def start(self):
+        """
+        Refresh the token ahead of expiry in a background thread
+        """
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="azure-token-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_loop(self):
+        wait_seconds = 0
+        while not self._stop.wait(wait_seconds):
+            try:
+                self.get_token()
+                wait_seconds = max(self.expires_on - self.refresh_margin - time.time(), 1)
+            except Exception as error:
+                print(f"\nToken refresh failed, retry in {token_retry_interval}s: {error}")
+                wait_seconds = token_retry_interval
+
+
+token_provider = TokenProvider()
+
+
+def get_access_token():
+    """
+    Get accesstoken using Tennant ID, cached and shared with token_provider
+
+    :return: access_token
+    :rtype: string
+    """
+    access_token = token_provider.get_token()
     print(f"Current access token: {access_token}\n")
     return access_token
 
 
-def get_rg(access_token):
+def auth_headers(access_token=None):
+    """
+    Authorization header of a management request, with the token of token_provider unless given one
+    """
+    return {"Authorization": f"Bearer {access_token or token_provider.get_token()}"}
+
+
+def get_rg(access_token=None):
     """
     get resource group of subscription
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourcegroups?api-version=2021-04-01"
+    url = f"{management_url}/subscriptions/{subscription_id}/resourcegroups?api-version=2021-04-01"
     payload = {}
-    headers = {"Authorization": f"Bearer {access_token}"}
+    headers = auth_headers(access_token)
     try:
         response = requests.request("GET", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -94,34 +252,66 @@ def get_rg(access_token):
     return response
 
 
-def get_all_vm_ips(access_token):
+def list_resources(url, access_token=None):
+    """
+    List all resources of an azure list url, following nextLink across pages
+
+    :raises requests.exceptions.RequestException: a page could not be requested
+    :raises RuntimeError: a page was refused, e.g. a 401 or 403, a partial listing is never returned
+    """
+    resources = []
+    while url:
+        # The token may be refreshed while a long listing is paged through
+        response = requests.request("GET", url, headers=auth_headers(access_token), data=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"Listing {url} refused: {response.status_code} {response.text}")
+        output = response.json()
+        resources.extend(output.get("value", []))
+        url = output.get("nextLink")
+    return resources
+
+
+def get_all_vm_ips(access_token=None):
     """
     Get all vm ips in resourcegroup of subscriptions
+
+    Lists the vms and the public ips of the resourcegroup once each and joins them on the
+    nic the ip is configured on, so the requests do not grow with the number of vms.
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines?api-version=2021-07-01"
-    payload = {}
-    headers = {"Authorization": f"Bearer {access_token}"}
-    try:
-        response = requests.request("GET", url, headers=headers, data=payload)
-    except requests.exceptions.RequestException as error:
-        print(f"\n{error}")
+    all_vms = list_resources(
+        f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines?api-version=2021-07-01",
+        access_token,
+    )
+    all_ips = list_resources(
+        f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/publicIPAddresses?api-version=2021-03-01",
+        access_token,
+    )
+    # Resource ids are case insensitive in azure
+    nic_vm_name = {}
+    for vm in all_vms:
+        for nic in vm.get("properties", {}).get("networkProfile", {}).get("networkInterfaces", []):
+            nic_vm_name[nic.get("id", "").lower()] = vm.get("name")
+    vm_name_ip = {}
+    for ip in all_ips:
+        properties = ip.get("properties", {})
+        ip_configuration_id = properties.get("ipConfiguration", {}).get("id", "").lower()
+        vm_name = nic_vm_name.get(ip_configuration_id.split("/ipconfigurations/")[0])
+        if vm_name is not None:
+            vm_name_ip[vm_name] = properties.get("ipAddress")
 
-    all_vms = response.json().get("value")
     map_vm_ip = {}
-
     for vm in all_vms:
         current_vm_name = vm.get("name")
-        vm_ip = get_vm_public_ip(access_token, vm_name=current_vm_name)
-        map_vm_ip.update({vm_ip: current_vm_name})
+        map_vm_ip.update({vm_name_ip.get(current_vm_name): current_vm_name})
     return map_vm_ip
 
 
-def get_vm_nic_info(access_token, vm_name=None):
+def get_vm_nic_info(access_token=None, vm_name=None):
     """
     Get vm nic information
     """
-    url = f"https://management.azure.com//subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/networkInterfaces/{vm_name}-nic?api-version=2021-03-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/networkInterfaces/{vm_name}-nic?api-version=2021-03-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("GET", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -129,12 +319,12 @@ def get_vm_nic_info(access_token, vm_name=None):
     return response, response.json()
 
 
-def get_vm_public_ip(access_token, vm_name=None):
+def get_vm_public_ip(access_token=None, vm_name=None):
     """
     get vm public ip information
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/publicIPAddresses/{vm_name}-ip?api-version=2021-03-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/publicIPAddresses/{vm_name}-ip?api-version=2021-03-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("GET", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -144,12 +334,12 @@ def get_vm_public_ip(access_token, vm_name=None):
     return output.get("properties").get("ipAddress")
 
 
-def get_vm_status(access_token, vm_name):
+def get_vm_status(access_token=None, vm_name=None):
     """
     get current specified azure vm resource status
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}/instanceView?api-version=2021-07-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}/instanceView?api-version=2021-07-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("GET", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -158,12 +348,12 @@ def get_vm_status(access_token, vm_name):
     return vm_state
 
 
-def stop_vm(access_token, vm_name):
+def stop_vm(access_token=None, vm_name=None):
     """
     Stop specified azure vm resource
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}/deallocate?api-version=2021-07-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}/deallocate?api-version=2021-07-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("POST", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -171,12 +361,12 @@ def stop_vm(access_token, vm_name):
     return response
 
 
-def del_vm(access_token, vm_name):
+def del_vm(access_token=None, vm_name=None):
     """
     Delete specified azure vm resource
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}?api-version=2021-07-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines/{vm_name}?api-version=2021-07-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("DELETE", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -184,12 +374,12 @@ def del_vm(access_token, vm_name):
     return response
 
 
-def del_vm_disk(access_token, vm_name):
+def del_vm_disk(access_token=None, vm_name=None):
     """
     Delete specified azure vm disk resource
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/disks/{vm_name}-disk?api-version=2020-12-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/disks/{vm_name}-disk?api-version=2020-12-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("DELETE", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -197,12 +387,12 @@ def del_vm_disk(access_token, vm_name):
     return response
 
 
-def del_vm_nic(access_token, vm_name):
+def del_vm_nic(access_token=None, vm_name=None):
     """
     Delete specified azure vm nic resource
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/networkInterfaces/{vm_name}-nic?api-version=2021-03-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/networkInterfaces/{vm_name}-nic?api-version=2021-03-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("DELETE", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -210,12 +400,12 @@ def del_vm_nic(access_token, vm_name):
     return response
 
 
-def del_vm_ip(access_token, vm_name):
+def del_vm_ip(access_token=None, vm_name=None):
     """
     Delete specified azure vm ip resource
     """
-    url = f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/publicIPAddresses/{vm_name}-ip?api-version=2021-03-01"
-    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Network/publicIPAddresses/{vm_name}-ip?api-version=2021-03-01"
+    headers = auth_headers(access_token)
     try:
         response = requests.request("DELETE", url, headers=headers, data=payload)
     except requests.exceptions.RequestException as error:
@@ -223,18 +413,199 @@ def del_vm_ip(access_token, vm_name):
     return response
 
 
-def main() -> int:
+def list_vm_names(access_token=None):
+    """
+    List the names of all vms in resourcegroup of subscription
+    """
+    url = f"{management_url}/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/Microsoft.Compute/virtualMachines?api-version=2021-07-01"
+    return [vm.get("name") for vm in list_resources(url, access_token)]
+
+
+def wait_for_operation(response, access_token=None, timeout=None):
+    """
+    Wait for the azure long running operation started by response
+
+    Polls the url of the Azure-AsyncOperation header until the operation status is terminal,
+    or the url of the Location header until it stops answering 202, sleeping Retry-After
+    seconds between polls. A response without either header completed synchronously.
+
+    :return: operation status, Succeeded, Failed or Canceled
+    :rtype: string
+    """
+    async_operation_url = response.headers.get("Azure-AsyncOperation")
+    location_url = response.headers.get("Location")
+    if not async_operation_url and not location_url:
+        return "Succeeded" if response.status_code < 400 else "Failed"
+
+    timeout = timeout or operation_timeout
+    deadline = time.monotonic() + timeout
+    retry_after = response.headers.get("Retry-After")
+    while True:
+        time.sleep(float(retry_after) if retry_after else operation_poll_interval)
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Operation {async_operation_url or location_url} still running after {timeout}s")
+        try:
+            # Operations outlive tokens, every poll takes the current token of token_provider
+            poll = requests.request("GET", async_operation_url or location_url, headers=auth_headers(access_token))
+        except requests.exceptions.RequestException as error:
+            print(f"\n{error}")
+            retry_after = None
+            continue
+        retry_after = poll.headers.get("Retry-After")
+        if async_operation_url:
+            status = poll.json().get("status") if poll.status_code == 200 else None
+            if status in ("Succeeded", "Failed", "Canceled"):
+                return status
+        elif poll.status_code != 202:
+            return "Succeeded" if poll.status_code < 400 else "Failed"
+
+
+def start_and_wait(request_function, vm_name, access_token=None, accepted=(200, 202, 204)):
+    """
+    Send the request of one del_*/stop_* function and wait for its long running operation
+
+    :raises RuntimeError: the request was refused or the operation did not succeed
+    :return: operation status
+    :rtype: string
+    """
+    response = request_function(access_token, vm_name)
+    if response is None or response.status_code not in accepted:
+        status_code = getattr(response, "status_code", None)
+        raise RuntimeError(
+            f"{request_function.__name__}({vm_name}) refused: {status_code} {getattr(response, 'text', '')}"
+        )
+    status = wait_for_operation(response, access_token)
+    if status != "Succeeded":
+        raise RuntimeError(f"{request_function.__name__}({vm_name}) operation {status}")
+    return status
+
+
+def deallocate_vm(vm_name, access_token=None):
+    """
+    Deallocate a vm unless it already is, wait until it is deallocated
+    """
+    vm_state = get_vm_status(access_token, vm_name)
+    print(f"VM:{vm_name} state is: {vm_state}")
+    if vm_state == "VM deallocated":
+        return vm_state
+    if vm_state == "VM deallocating":
+        # Started by someone else, there is no operation to wait on
+        deadline = time.monotonic() + operation_timeout
+        while vm_state != "VM deallocated":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"VM:{vm_name} still {vm_state} after {operation_timeout}s")
+            time.sleep(operation_poll_interval)
+            vm_state = get_vm_status(access_token, vm_name)
+        return vm_state
+    start_and_wait(stop_vm, vm_name, access_token)
+    print(f"VM:{vm_name} has stopped!!")
+    return "VM deallocated"
+
+
+def run_dag(steps, max_workers=None):
+    """
+    Run teardown steps with the shared scheduler, see dag_scheduler.run_dag
+
+    :return: step key -> ("done", result), ("failed", error) or ("skipped", failed dependency)
+    :rtype: dict
+    """
+    return dag_scheduler.run_dag(steps, max_workers or batch_max_workers)
+
+
+def get_vm_teardown_steps(vm_name, access_token=None):
+    """
+    Teardown of one vm as dag steps: deallocate, vm, then disk and nic, then ip
+
+    The disk and nic can only go once the vm is gone, the public ip once the nic is gone.
+    """
+    return {
+        (vm_name, "deallocate"): (lambda: deallocate_vm(vm_name, access_token), []),
+        (vm_name, "vm"): (lambda: start_and_wait(del_vm, vm_name, access_token), [(vm_name, "deallocate")]),
+        (vm_name, "disk"): (lambda: start_and_wait(del_vm_disk, vm_name, access_token), [(vm_name, "vm")]),
+        (vm_name, "nic"): (lambda: start_and_wait(del_vm_nic, vm_name, access_token), [(vm_name, "vm")]),
+        (vm_name, "ip"): (lambda: start_and_wait(del_vm_ip, vm_name, access_token), [(vm_name, "nic")]),
+    }
+
+
+def batch_delete_vms(vm_names, max_workers=None, access_token=None):
+    """
+    Deallocate and delete many vms and their disk, nic and ip concurrently
+
+    :return: (vm_name, step) -> outcome, see run_dag
+    :rtype: dict
+    """
+    steps = {}
+    for vm_name in vm_names:
+        steps.update(get_vm_teardown_steps(vm_name, access_token))
+    return run_dag(steps, max_workers)
+
+
+def select_vm_names(names=None, pattern=None, access_token=None):
+    """
+    Names of the existing vms given by name or matching a shell style pattern, e.g. "scn-*"
+    """
+    existing = list_vm_names(access_token)
+    selected = [name for name in existing if (names and name in names) or (pattern and fnmatch.fnmatch(name, pattern))]
+    missing = [name for name in names or [] if name not in existing]
+    if missing:
+        print(f"Not found in {resource_group}: {missing}")
+    return selected
+
+
+def batch_main(args):
+    """
+    Batch mode, delete every vm given with --vm or matching --pattern
+    """
+    vm_names = select_vm_names(names=args.vm, pattern=args.pattern)
+    if not vm_names:
+        print("No vm to delete")
+        return 0
+    print(f"The vms to be deleted are: {vm_names}")
+    if not args.yes and not yes_or_no(f"Delete {len(vm_names)} vms and their disk, nic and ip"):
+        print("Please start program over")
+        return 1
+
+    start = time.monotonic()
+    outcomes = batch_delete_vms(vm_names, max_workers=args.max_workers)
+    failures = {key: outcome for key, outcome in outcomes.items() if outcome[0] != "done"}
+    for (vm_name, step), (result, detail) in sorted(failures.items()):
+        print(f"VM:{vm_name} {step} {result}: {detail}")
+    deleted = len(vm_names) - len({vm_name for vm_name, _ in failures})
+    print(f"Deleted {deleted}/{len(vm_names)} vms in {time.monotonic() - start:.1f}s")
+    return 1 if failures else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Delete azure vms and their disk, nic and ip")
+    parser.add_argument("--vm", action="append", help="vm name, repeat for many vms")
+    parser.add_argument("--pattern", help='shell style vm name pattern, e.g. "scn-*"')
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    parser.add_argument("--max-workers", type=int, default=batch_max_workers)
+    parser.add_argument("--management-url", default=None, help="defaults to AZURE_MANAGEMENT_URL or azure")
+    parser.add_argument("--login-url", default=None, help="defaults to AZURE_LOGIN_URL or azure")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
     """
     main
     states: 'VM deallocated', 'VM running', 'VM deallocating',
     state of 'None' may happen... low chance. and I am unclear how to handle
     """
-    # get subsciption access token
-    current_token = get_access_token()
-    resource_groups = get_rg(current_token)
+    global management_url, login_url
+    args = parse_args(argv)
+    management_url = args.management_url or management_url
+    login_url = args.login_url or login_url
+    # get subsciption access token, kept fresh in the background for the whole run
+    get_access_token()
+    token_provider.start()
+    if args.vm or args.pattern:
+        return batch_main(args)
+
+    resource_groups = get_rg()
     print(resource_groups)
     # list all vms and their ips
-    map_vm_ip = get_all_vm_ips(current_token)
+    map_vm_ip = get_all_vm_ips()
     print(dumps(map_vm_ip, indent=4))
     print("Please note if vm does not have ip, it is represented by null")
 
@@ -243,53 +614,12 @@ def main() -> int:
     if yes_or_no(f"The vm to be deleted is: {user_vm_name}"):
         if user_vm_name in map_vm_ip.values():
             deallocate_vm_name = user_vm_name
-            # check vm status
-            print(f"Getting status of vm: {deallocate_vm_name}")
-            response = get_vm_status(current_token, deallocate_vm_name)
-            print(f"VM:{deallocate_vm_name} state is: {response}")
-
-            if response == "VM running":
-                # Stop vm
-                print(f"Stopping VM: {deallocate_vm_name}")
-                test_response = stop_vm(current_token, deallocate_vm_name)
-                print(f"response status for stop is : {test_response.status_code}")
-                assert test_response.status_code == 202
-                while response != "VM deallocated":
-                    response = get_vm_status(current_token, deallocate_vm_name)
-                    print(f"VM:{deallocate_vm_name} state is: {response}")
-                    time.sleep(2)
-                print("The vm has stopped!!")
-            elif response == "VM deallocating":
-                while response != "VM deallocated":
-                    # wait until vm is deallocated
-                    response = get_vm_status(current_token, deallocate_vm_name)
-                    print(f"VM:{deallocate_vm_name} state is: {response}")
-                    time.sleep(2)
-                print("The vm has stopped!!")
-            else:
-                # vm is currently stopped and deallocated
-                print(f"VM:{deallocate_vm_name} state is: {response}")
-                print("The vm has stopped!!")
-
-            print(f"Deleting VM: {deallocate_vm_name}")
-            # Delete VM
-            test_response = del_vm(current_token, deallocate_vm_name)
-            print(f"response status for deletion of vm is : {test_response.status_code}")
-            assert test_response.status_code == 202
-            # Delete VM DISK
-            test_response = del_vm_disk(current_token, deallocate_vm_name)
-            print(f"response status for deletion of vm disk is : {test_response.status_code}")
-            assert test_response.status_code == 202
-            # Delete vm NIC
-            test_response = del_vm_nic(current_token, deallocate_vm_name)
-            print(f"response status for deletion of vm nic is : {test_response.status_code}")
-            assert test_response.status_code == 202
-            # Delete VM IP
-            test_response = del_vm_ip(current_token, deallocate_vm_name)
-            print(f"response status for deletion of vm ip is : {test_response.status_code}")
-            assert test_response.status_code == 202
-            print("\nPlease wait an additional 1 min to ensure azure resources cleanup correctly")
-            time.sleep(60)
+            print(f"Deleting VM: {deallocate_vm_name} and its disk, nic and ip")
+            outcomes = batch_delete_vms([deallocate_vm_name])
+            for (_, step), (result, detail) in outcomes.items():
+                print(f"{step}: {result} {detail}")
+            if any(result != "done" for result, _ in outcomes.values()):
+                return 1
             print("Script Completed!!")
 
     else:
@@ -4,9 +4,17 @@
 #
 # Written by Stanley Lin 12/09/2021
 # --------------------------------------------------------------------------
-from azure.identity import AzureCliCredential
-from azure.mgmt.resource import ResourceManagementClient
-from azure.mgmt.network import NetworkManagementClient
+import argparse
+import functools
+import sys
+import threading
+import time
+
+try:
+    from misc import dag_scheduler
+except ImportError:
+    # Run as a script from misc/
+    import dag_scheduler
 
 # from azure.mgmt.compute import ComputeManagementClient
 
@@ -42,159 +50,396 @@ IP_NAME = "python-example-ip"
 IP_CONFIG_NAME = "python-example-ip-config"
 NIC_NAME = "python-example-nic"
 
+# Seconds a long running operation takes in dry run, roughly in proportion to azure
+FAKE_OPERATION_SECONDS = {
+    "public_ip_addresses": 0.5,
+    "virtual_networks": 1.0,
+    "subnets": 0.5,
+    "virtual_network_gateways": 6.0,
+    "firewall_policies": 0.5,
+    "azure_firewalls": 4.0,
+}
+
+
+def get_clients(dry_run=False, time_scale=1.0):
+    """
+    Management clients, fakes that only pretend to provision in dry run
+
+    :return: resource_client, network_client
+    """
+    if dry_run:
+        fake_azure = FakeAzure(time_scale=time_scale)
+        return fake_azure.resource_client(), fake_azure.network_client()
 
-# Acquire a credential object using CLI-based authentication.
-credential = AzureCliCredential()
-# Obtain the management object for resources.
-resource_client = ResourceManagementClient(credential, SUBSCRIPTION_ID)
-network_client = NetworkManagementClient(credential, SUBSCRIPTION_ID)
+    from azure.identity import AzureCliCredential
+    from azure.mgmt.network import NetworkManagementClient
+    from azure.mgmt.resource import ResourceManagementClient
 
-# Create resource group
-resource_client.resource_groups.create_or_update(GROUP_NAME, {"location": "eastus"})
-# Retrieve the list of resource groups
-group_list = resource_client.resource_groups.list()
+    # Acquire a credential object using CLI-based authentication.
+    credential = AzureCliCredential()
+    # Obtain the management object for resources.
+    return ResourceManagementClient(credential, SUBSCRIPTION_ID), NetworkManagementClient(credential, SUBSCRIPTION_ID)
 
-# Show the groups in formatted output
-column_width = 40
-print("Resource Group".ljust(column_width) + "Location")
-print("-" * (column_width * 2))
 
-for group in list(group_list):
-    print(f"{group.name:<{column_width}}{group.location}")
+def print_resource_groups(resource_client):
+    # Retrieve the list of resource groups
+    group_list = resource_client.resource_groups.list()
 
+    # Show the groups in formatted output
+    column_width = 40
+    print("Resource Group".ljust(column_width) + "Location")
+    print("-" * (column_width * 2))
 
-def main():
+    for group in list(group_list):
+        print(f"{group.name:<{column_width}}{group.location}")
+
+
+def resource_id(provider, *names):
     """
-    Provision or Updates resources in the Subscription
-    Order matters
-    """
-    # VPN Public IP
-    network_client.public_ip_addresses.begin_create_or_update(
-        GROUP_NAME,
-        VPN_PUBLIC_IP_ADDRESS_NAME,
-        {
-            "location": "eastus",
-            "sku": {"name": "Standard"},
-            "public_ip_allocation_method": "Static",
-            "public_ip_address_version": "IPV4",
-            "idle_timeout_in_minutes": 4,
-        },
-    )
-    # Virtual Network
-    network = network_client.virtual_networks.begin_create_or_update(
-        GROUP_NAME,
-        VIRTUAL_NETWORK_NAME,
-        {
-            "address_space": {"address_prefixes": ["10.0.0.0/16"]},
-            "subnets": [
+    Id of a resource of the resource group, e.g. resource_id("virtualNetworks", vnet, "subnets", subnet)
+    """
+    path = "/".join(names)
+    return f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/{provider}/{path}"
+
+
+def public_ip_parameters():
+    return {
+        "location": "eastus",
+        "sku": {"name": "Standard"},
+        "public_ip_allocation_method": "Static",
+        "public_ip_address_version": "IPV4",
+        "idle_timeout_in_minutes": 4,
+    }
+
+
+def get_provisioning_steps(resource_client, network_client):
+    """
+    The subscription topology as a dependency graph
+
+    Each step starts one operation and returns its poller, or its result when the operation
+    is not long running. A step only starts once the resources it references are provisioned,
+    everything else runs concurrently: the public ips, the firewall policy and the vnet right
+    after the resource group, then the gateway and the firewall side by side.
+
+    :return: step name -> (start callable, names of the steps it depends on)
+    :rtype: dict
+    """
+    return {
+        "resource_group": (
+            lambda: resource_client.resource_groups.create_or_update(GROUP_NAME, {"location": "eastus"}),
+            [],
+        ),
+        # VPN Public IP
+        "vpn_public_ip": (
+            lambda: network_client.public_ip_addresses.begin_create_or_update(
+                GROUP_NAME, VPN_PUBLIC_IP_ADDRESS_NAME, public_ip_parameters()
+            ),
+            ["resource_group"],
+        ),
+        # Firewall Public IP
+        "firewall_public_ip": (
+            lambda: network_client.public_ip_addresses.begin_create_or_update(
+                GROUP_NAME, FIREWALL_PUBLIC_IP_ADDRESS_NAME, public_ip_parameters()
+            ),
+            ["resource_group"],
+        ),
+        # Basic Firewall Policy
+        "firewall_policy": (
+            lambda: network_client.firewall_policies.begin_create_or_update(
+                GROUP_NAME, FIREWALL_POLICY_NAME, {"location": "eastus", "threat_intel_mode": "Alert"}
+            ),
+            ["resource_group"],
+        ),
+        # Virtual Network
+        "virtual_network": (
+            lambda: network_client.virtual_networks.begin_create_or_update(
+                GROUP_NAME,
+                VIRTUAL_NETWORK_NAME,
                 {
-                    "name": "Default",
-                    "properties": {
-                        "addressPrefix": "10.0.0.0/24",
-                    },
+                    "address_space": {"address_prefixes": ["10.0.0.0/16"]},
+                    "subnets": [
+                        {
+                            "name": "Default",
+                            "properties": {
+                                "addressPrefix": "10.0.0.0/24",
+                            },
+                        },
+                        {
+                            "name": "test-subnet",
+                            "properties": {
+                                "addressPrefix": "10.0.1.0/24",
+                            },
+                        },
+                        {
+                            "name": FIREWALL_SUBNET,
+                            "properties": {
+                                "addressPrefix": "10.0.2.0/24",
+                            },
+                        },
+                    ],
+                    "location": "eastus",
                 },
+            ),
+            ["resource_group"],
+        ),
+        # Create gateway subnet
+        "gateway_subnet": (
+            lambda: network_client.subnets.begin_create_or_update(
+                GROUP_NAME, VIRTUAL_NETWORK_NAME, GATEWAY_SUBNET, {"address_prefix": "10.0.128.0/17"}
+            ),
+            ["virtual_network"],
+        ),
+        # Create virtual network gateway
+        "virtual_network_gateway": (
+            lambda: network_client.virtual_network_gateways.begin_create_or_update(
+                GROUP_NAME,
+                VIRTUAL_PRIVATE_NETWORK_GATEWAY_NAME,
                 {
-                    "name": "test-subnet",
-                    "properties": {
-                        "addressPrefix": "10.0.1.0/24",
-                    },
+                    "ip_configurations": [
+                        {
+                            "private_ip_allocation_method": "Dynamic",
+                            "subnet": {
+                                "id": resource_id("virtualNetworks", VIRTUAL_NETWORK_NAME, "subnets", GATEWAY_SUBNET)
+                            },
+                            "public_ip_address": {"id": resource_id("publicIPAddresses", VPN_PUBLIC_IP_ADDRESS_NAME)},
+                            "name": IP_CONFIGURATION_NAME,
+                        }
+                    ],
+                    "gateway_type": "Vpn",
+                    "vpn_type": "RouteBased",
+                    "enable_bgp": False,
+                    "active_active": False,
+                    "enable_dns_forwarding": False,
+                    "sku": {"name": "VpnGw1", "tier": "VpnGw1"},
+                    # "bgp_settings": {"asn": "65515", "bgp_peering_address": "10.0.255.254", "peer_weight": "0"},
+                    "location": "eastus",
                 },
+            ),
+            ["gateway_subnet", "vpn_public_ip"],
+        ),
+        # Firewall
+        "firewall": (
+            lambda: network_client.azure_firewalls.begin_create_or_update(
+                GROUP_NAME,
+                FIREWALL_NAME,
                 {
-                    "name": FIREWALL_SUBNET,
+                    "location": "eastus",
+                    "zones": [],
                     "properties": {
-                        "addressPrefix": "10.0.2.0/24",
+                        "sku": {"name": "AZFW_VNet", "tier": "Standard"},
+                        "threat_intel_mode": "Alert",
+                        "ip_configurations": [
+                            {
+                                "private_ip_allocation_method": "Dynamic",
+                                "subnet": {
+                                    "id": resource_id(
+                                        "virtualNetworks", VIRTUAL_NETWORK_NAME, "subnets", FIREWALL_SUBNET
+                                    )
+                                },
+                                "public_ip_address": {
+                                    "id": resource_id("publicIPAddresses", FIREWALL_PUBLIC_IP_ADDRESS_NAME)
+                                },
+                                "name": IP_CONFIGURATION_NAME,
+                            }
+                        ],
+                        "firewall_policy": {"id": resource_id("firewallPolicies", FIREWALL_POLICY_NAME)},
                     },
                 },
-            ],
-            "location": "eastus",
-        },
-    ).result()
-    print(f"\nCreate virtual network:\n{network}")
-
-    # Create gateway subnet
-    network_client.subnets.begin_create_or_update(
-        GROUP_NAME, VIRTUAL_NETWORK_NAME, GATEWAY_SUBNET, {"address_prefix": "10.0.128.0/17"}
-    ).result()
-    # Create virtual network gateway
-    virtual_network_gateway = network_client.virtual_network_gateways.begin_create_or_update(
-        GROUP_NAME,
-        VIRTUAL_PRIVATE_NETWORK_GATEWAY_NAME,
-        {
-            "ip_configurations": [
-                {
-                    "private_ip_allocation_method": "Dynamic",
-                    "subnet": {
-                        "id": f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/virtualNetworks/{VIRTUAL_NETWORK_NAME}/subnets/{GATEWAY_SUBNET}"
-                    },
-                    "public_ip_address": {
-                        "id": f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/publicIPAddresses/{VPN_PUBLIC_IP_ADDRESS_NAME}"
-                    },
-                    "name": IP_CONFIGURATION_NAME,
-                }
-            ],
-            "gateway_type": "Vpn",
-            "vpn_type": "RouteBased",
-            "enable_bgp": False,
-            "active_active": False,
-            "enable_dns_forwarding": False,
-            "sku": {"name": "VpnGw1", "tier": "VpnGw1"},
-            # "bgp_settings": {"asn": "65515", "bgp_peering_address": "10.0.255.254", "peer_weight": "0"},
-            "location": "eastus",
-        },
-    ).result()
-    print("\nCreate virtual network gateway:\n{}".format(virtual_network_gateway))
-    # Get virtual network gateway
-    virtual_network_gateway = network_client.virtual_network_gateways.get(
-        GROUP_NAME, VIRTUAL_PRIVATE_NETWORK_GATEWAY_NAME
-    )
-    print("\nGet virtual network gateway:\n{}".format(virtual_network_gateway))
-
-    # Firewall Public IP
-    network_client.public_ip_addresses.begin_create_or_update(
-        GROUP_NAME,
-        FIREWALL_PUBLIC_IP_ADDRESS_NAME,
-        {
-            "location": "eastus",
-            "sku": {"name": "Standard"},
-            "public_ip_allocation_method": "Static",
-            "public_ip_address_version": "IPV4",
-            "idle_timeout_in_minutes": 4,
-        },
-    )
-    # Basic Firewall Policy
-    network_client.firewall_policies.begin_create_or_update(
-        GROUP_NAME, FIREWALL_POLICY_NAME, {"location": "eastus", "threat_intel_mode": "Alert"}
-    ).result()
-    # Firewall
-    azure_firewall = network_client.azure_firewalls.begin_create_or_update(
-        GROUP_NAME,
-        FIREWALL_NAME,
-        {
-            "location": "eastus",
-            "zones": [],
-            "properties": {
-                "sku": {"name": "AZFW_VNet", "tier": "Standard"},
-                "threat_intel_mode": "Alert",
-                "ip_configurations": [
-                    {
-                        "private_ip_allocation_method": "Dynamic",
-                        "subnet": {
-                            "id": f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/virtualNetworks/{VIRTUAL_NETWORK_NAME}/subnets/{FIREWALL_SUBNET}"
-                        },
-                        "public_ip_address": {
-                            "id": f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/publicIPAddresses/{FIREWALL_PUBLIC_IP_ADDRESS_NAME}"
-                        },
-                        "name": IP_CONFIGURATION_NAME,
-                    }
-                ],
-                "firewall_policy": {
-                    "id": f"/subscriptions/{SUBSCRIPTION_ID}/resourceGroups/{GROUP_NAME}/providers/Microsoft.Network/firewallPolicies/{FIREWALL_POLICY_NAME}"
-                },
-            },
-        },
-    ).result()
-    print("Create azure firewall:\n{}".format(azure_firewall))
+            ),
+            ["virtual_network", "firewall_public_ip", "firewall_policy"],
+        ),
+    }
+
+
+def run_steps(steps, max_workers=None, on_done=None):
+    """
+    Start every step as soon as the steps it depends on are provisioned, see dag_scheduler.run_dag
+
+    Operations are started right away and their pollers awaited on worker threads, so
+    independent operations run at the same time and a step only blocks on the pollers of
+    its dependencies.
+
+    :param steps: step name -> (start callable, names of the steps it depends on)
+    :type steps: dict
+    :param on_done: called with step name, outcome as each step ends
+    :type on_done: callable, optional
+    :return: step name -> ("done", result), ("failed", error) or ("skipped", failed dependency)
+    :rtype: dict
+    """
+
+    def start_and_wait(start):
+        operation = start()
+        # Long running operations return a poller, the others their result
+        return operation.result() if hasattr(operation, "result") else operation
+
+    steps = {
+        name: (functools.partial(start_and_wait, start), dependencies) for name, (start, dependencies) in steps.items()
+    }
+    return dag_scheduler.run_dag(steps, max_workers or len(steps) or 1, on_done)
+
+
+class FakeResource:
+    def __init__(self, name, parameters=None, location="eastus"):
+        self.name = name
+        self.location = location
+        self.parameters = parameters
+
+    def __repr__(self):
+        return f"FakeResource(name={self.name!r})"
+
+
+class FakePoller:
+    """
+    Fake Poller Class, the operation runs from the moment it is started like an azure poller
+    """
+
+    def __init__(self, fake_azure, name, resource, seconds):
+        self._fake_azure = fake_azure
+        self._name = name
+        self._resource = resource
+        self._done_at = time.monotonic() + seconds
+
+    def done(self):
+        return time.monotonic() >= self._done_at
+
+    def result(self):
+        time.sleep(max(self._done_at - time.monotonic(), 0))
+        self._fake_azure.provisioned(self._name, self._resource.parameters)
+        return self._resource
+
+
+class FakeOperations:
+    """
+    Fake Operations Class, one operation group of a fake management client
+    """
+
+    def __init__(self, fake_azure, group):
+        self._fake_azure = fake_azure
+        self._group = group
+
+    def begin_create_or_update(self, group_name, *names_and_parameters):
+        *names, parameters = names_and_parameters
+        self._fake_azure.check_references(self._group, names, parameters)
+        seconds = FAKE_OPERATION_SECONDS.get(self._group, 0.5) * self._fake_azure.time_scale
+        self._fake_azure.log("begin", self._group, names[-1])
+        return FakePoller(self._fake_azure, names[-1], FakeResource(names[-1], parameters), seconds)
+
+    def create_or_update(self, name, parameters):
+        self._fake_azure.log("create", self._group, name)
+        self._fake_azure.provisioned(name)
+        return FakeResource(name, parameters, parameters.get("location"))
+
+    def get(self, group_name, name):
+        if name not in self._fake_azure.resources:
+            raise LookupError(f"{self._group} {name} not found")
+        return FakeResource(name)
+
+    def list(self):
+        return [FakeResource(name) for name in sorted(self._fake_azure.resource_groups)]
+
+
+class FakeClient:
+    def __init__(self, fake_azure):
+        self._fake_azure = fake_azure
+
+    def __getattr__(self, group):
+        return FakeOperations(self._fake_azure, group)
+
+
+class FakeAzure:
+    """
+    Fake Azure Class, dry run backend of the management clients
+
+    Operations take FAKE_OPERATION_SECONDS * time_scale, and an operation started before a
+    resource it references is provisioned fails, like it would on azure, so a dry run checks
+    the ordering of get_provisioning_steps.
+    """
+
+    def __init__(self, time_scale=1.0):
+        self.time_scale = time_scale
+        self.resources = set()
+        self.resource_groups = set()
+        self.events = []
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def resource_client(self):
+        return FakeClient(self)
+
+    def network_client(self):
+        return FakeClient(self)
+
+    def log(self, action, group, name):
+        with self._lock:
+            self.events.append((round(time.monotonic() - self._started, 3), action, group, name))
+        if group == "resource_groups":
+            self.resource_groups.add(name)
+
+    def provisioned(self, name, parameters=None):
+        # Subnets declared with a virtual network are provisioned with it
+        subnets = [subnet.get("name") for subnet in (parameters or {}).get("subnets", [])]
+        with self._lock:
+            self.resources.add(name)
+            self.resources.update(subnets)
+
+    def check_references(self, group, names, parameters):
+        """
+        :raises ValueError: the parent resource or a resource referenced by id is not provisioned yet
+        """
+        references = [GROUP_NAME] + list(names[:-1])
+        references += [reference.rsplit("/", 1)[-1] for reference in _ids(parameters)]
+        with self._lock:
+            missing = [reference for reference in references if reference not in self.resources]
+        if missing:
+            raise ValueError(f"{group} {names[-1]} references {missing}, not provisioned yet")
+
+
+def _ids(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "id" and isinstance(item, str):
+                yield item
+            else:
+                yield from _ids(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _ids(item)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Setup resource group, vnet, vpn and firewall of a subscription")
+    parser.add_argument("--dry-run", action="store_true", help="provision against fake clients, nothing is created")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="dry run operation duration multiplier")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Provision or Updates resources in the Subscription
+    Independent resources are provisioned concurrently, see get_provisioning_steps
+    """
+    args = parse_args(argv)
+    resource_client, network_client = get_clients(dry_run=args.dry_run, time_scale=args.time_scale)
+    start = time.monotonic()
+
+    def on_done(name, outcome):
+        result, detail = outcome
+        print(f"\n[{time.monotonic() - start:7.1f}s] {name} {result}:\n{detail}")
+
+    outcomes = run_steps(get_provisioning_steps(resource_client, network_client), on_done=on_done)
+    for name, (result, detail) in outcomes.items():
+        if result == "skipped":
+            print(f"\n{name} skipped, {detail} did not provision")
+    print_resource_groups(resource_client)
+    if outcomes.get("virtual_network_gateway", ("",))[0] == "done":
+        # Get virtual network gateway
+        virtual_network_gateway = network_client.virtual_network_gateways.get(
+            GROUP_NAME, VIRTUAL_PRIVATE_NETWORK_GATEWAY_NAME
+        )
+        print("\nGet virtual network gateway:\n{}".format(virtual_network_gateway))
+    print(f"\nProvisioned in {time.monotonic() - start:.1f}s")
+    return 0 if all(result == "done" for result, _ in outcomes.values()) else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
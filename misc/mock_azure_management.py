@@ -0,0 +1,406 @@
+# -----------------------------------------------------------
+#
+# Local stand-in of the azure login and management endpoints used by del_azure_vm.py
+#
+# Run standalone: python -m misc.mock_azure_management --vms 20
+# -----------------------------------------------------------
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+RESOURCE_PATH = re.compile(
+    r"^/subscriptions/(?P<subscription>[^/]+)/resourceGroups/(?P<group>[^/]+)/providers/"
+    r"(?P<provider>Microsoft\.\w+)/(?P<kind>\w+)(?:/(?P<name>[^/]+))?(?:/(?P<action>\w+))?$",
+    re.IGNORECASE,
+)
+TOKEN_PATH = re.compile(r"^/(?P<tenant>[^/]+)/oauth2/token$")
+OPERATION_PATH = re.compile(r"^/operations/(?P<operation>[^/]+)$")
+
+# Resource kind in the url -> (provider, name suffix added to the vm name)
+RESOURCE_KINDS = {
+    "virtualmachines": ("Microsoft.Compute", ""),
+    "disks": ("Microsoft.Compute", "-disk"),
+    "networkinterfaces": ("Microsoft.Network", "-nic"),
+    "publicipaddresses": ("Microsoft.Network", "-ip"),
+}
+
+
+class MockAzureState:
+    """
+    Mock Azure State Class, vms of one resource group and their disk, nic and public ip
+
+    Deallocations and deletions are long running operations finishing operation_delay
+    seconds after they start. Deleting a disk or nic still attached to a vm, or a public ip
+    still attached to a nic, fails the way azure does.
+    """
+
+    def __init__(self, subscription_id, resource_group, operation_delay=0.2, token_lifetime=3600, page_size=100):
+        self.subscription_id = subscription_id
+        self.resource_group = resource_group
+        self.operation_delay = operation_delay
+        self.token_lifetime = token_lifetime
+        self.page_size = page_size
+        # kind -> name -> resource
+        self.resources = {kind: {} for kind in RESOURCE_KINDS}
+        self.power_states = {}
+        self.operations = {}
+        self.tokens = {}
+        self._ip_numbers = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def resource_id(self, kind, name):
+        provider, _ = RESOURCE_KINDS[kind]
+        type_name = {
+            "virtualmachines": "virtualMachines",
+            "disks": "disks",
+            "networkinterfaces": "networkInterfaces",
+            "publicipaddresses": "publicIPAddresses",
+        }[kind]
+        return (
+            f"/subscriptions/{self.subscription_id}/resourceGroups/{self.resource_group}"
+            f"/providers/{provider}/{type_name}/{name}"
+        )
+
+    def add_vm(self, vm_name, power_state="VM running", public_ip=True):
+        """
+        Add a vm named like the SAIL scn vms, with {vm_name}-disk, {vm_name}-nic and {vm_name}-ip
+        """
+        with self._lock:
+            vm_id = self.resource_id("virtualmachines", vm_name)
+            disk_id = self.resource_id("disks", f"{vm_name}-disk")
+            nic_id = self.resource_id("networkinterfaces", f"{vm_name}-nic")
+            ip_id = self.resource_id("publicipaddresses", f"{vm_name}-ip")
+            self.resources["virtualmachines"][vm_name] = {
+                "name": vm_name,
+                "id": vm_id,
+                "properties": {
+                    "networkProfile": {"networkInterfaces": [{"id": nic_id}]},
+                    "storageProfile": {"osDisk": {"name": f"{vm_name}-disk", "managedDisk": {"id": disk_id}}},
+                },
+            }
+            self.power_states[vm_name] = power_state
+            self.resources["disks"][f"{vm_name}-disk"] = {
+                "name": f"{vm_name}-disk",
+                "id": disk_id,
+                "managedBy": vm_id,
+                "properties": {},
+            }
+            ip_configuration = {"name": "ipconfig1", "id": f"{nic_id}/ipConfigurations/ipconfig1", "properties": {}}
+            self.resources["networkinterfaces"][f"{vm_name}-nic"] = {
+                "name": f"{vm_name}-nic",
+                "id": nic_id,
+                "properties": {"virtualMachine": {"id": vm_id}, "ipConfigurations": [ip_configuration]},
+            }
+            if public_ip:
+                number = next(self._ip_numbers)
+                ip_configuration["properties"]["publicIPAddress"] = {"id": ip_id}
+                self.resources["publicipaddresses"][f"{vm_name}-ip"] = {
+                    "name": f"{vm_name}-ip",
+                    "id": ip_id,
+                    "properties": {
+                        "ipAddress": f"20.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}",
+                        "ipConfiguration": {"id": ip_configuration["id"]},
+                    },
+                }
+
+    # -----------------------------------------------------------
+    # Long running operations
+    # -----------------------------------------------------------
+    def _start_operation(self, apply):
+        operation_id = str(uuid.uuid4())
+        self.operations[operation_id] = {"done_at": time.monotonic() + self.operation_delay, "apply": apply}
+        return operation_id
+
+    def settle(self):
+        """
+        Apply the effect of every operation due by now
+        """
+        with self._lock:
+            now = time.monotonic()
+            for operation in self.operations.values():
+                if operation["apply"] is not None and operation["done_at"] <= now:
+                    operation["apply"]()
+                    operation["apply"] = None
+
+    def operation_status(self, operation_id):
+        with self._lock:
+            self.settle()
+            operation = self.operations.get(operation_id)
+            if operation is None:
+                return 404, {"error": {"code": "NotFound"}}
+            return 200, {"status": "InProgress" if operation["apply"] is not None else "Succeeded"}
+
+    # -----------------------------------------------------------
+    # Requests
+    # -----------------------------------------------------------
+    def issue_token(self):
+        with self._lock:
+            token = uuid.uuid4().hex
+            expires_on = int(time.time()) + self.token_lifetime
+            self.tokens[token] = expires_on
+            return {
+                "token_type": "Bearer",
+                "expires_in": str(self.token_lifetime),
+                "expires_on": str(expires_on),
+                "resource": "https://management.core.windows.net/",
+                "access_token": token,
+            }
+
+    def authorized(self, authorization):
+        with self._lock:
+            token = (authorization or "").partition("Bearer ")[2]
+            return self.tokens.get(token, 0) > time.time()
+
+    def list_resource_groups(self):
+        return 200, {"value": [{"name": self.resource_group, "location": "eastus"}]}
+
+    def list_resources(self, kind, skip):
+        with self._lock:
+            self.settle()
+            names = sorted(self.resources[kind])
+            page = [self.resources[kind][name] for name in names[skip : skip + self.page_size]]
+            body = {"value": page}
+            if skip + self.page_size < len(names):
+                body["nextLink"] = skip + self.page_size
+            return 200, body
+
+    def get_resource(self, kind, name):
+        with self._lock:
+            self.settle()
+            resource = self.resources[kind].get(name)
+            if resource is None:
+                return 404, {"error": {"code": "ResourceNotFound"}}
+            return 200, resource
+
+    def instance_view(self, vm_name):
+        with self._lock:
+            self.settle()
+            if vm_name not in self.resources["virtualmachines"]:
+                return 404, {"error": {"code": "ResourceNotFound"}}
+            statuses = [{"displayStatus": "Provisioning succeeded"}, {"displayStatus": self.power_states[vm_name]}]
+            return 200, {"statuses": statuses}
+
+    def deallocate(self, vm_name):
+        with self._lock:
+            self.settle()
+            if vm_name not in self.resources["virtualmachines"]:
+                return 404, {"error": {"code": "ResourceNotFound"}}, None
+            self.power_states[vm_name] = "VM deallocating"
+
+            def apply():
+                if vm_name in self.power_states:
+                    self.power_states[vm_name] = "VM deallocated"
+
+            return 202, None, self._start_operation(apply)
+
+    def delete(self, kind, name):
+        with self._lock:
+            self.settle()
+            resource = self.resources[kind].get(name)
+            if resource is None:
+                return 204, None, None
+            conflict = self._delete_conflict(kind, resource)
+            if conflict:
+                return 400, {"error": {"code": conflict}}, None
+
+            def apply():
+                self._remove(kind, name)
+
+            return 202, None, self._start_operation(apply)
+
+    def _delete_conflict(self, kind, resource):
+        if kind == "disks":
+            vm_name = resource["managedBy"].rsplit("/", 1)[-1]
+            if vm_name in self.resources["virtualmachines"]:
+                return "OperationNotAllowed"
+        elif kind == "networkinterfaces":
+            vm_name = resource["properties"]["virtualMachine"]["id"].rsplit("/", 1)[-1]
+            if vm_name in self.resources["virtualmachines"]:
+                return "NicInUse"
+        elif kind == "publicipaddresses":
+            nic_name = resource["properties"]["ipConfiguration"]["id"].split("/")[-3]
+            if nic_name in self.resources["networkinterfaces"]:
+                return "PublicIPAddressCannotBeDeleted"
+        return None
+
+    def _remove(self, kind, name):
+        self.resources[kind].pop(name, None)
+        if kind == "virtualmachines":
+            self.power_states.pop(name, None)
+
+
+class MockAzureRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the azure stand-in, the serving MockAzureServer is set as class attribute
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockAzureManagement"
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server_ref = None
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status, body, headers = self.server_ref.handle(self.command, self.path, self.headers.get("Authorization"))
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockAzureServer:
+    """
+    Mock Azure Server Class, serves the login and management endpoints of a MockAzureState
+
+    Point del_azure_vm at it with --management-url and --login-url set to base_url.
+    """
+
+    def __init__(self, state, host="127.0.0.1", port=0):
+        self.state = state
+        self.requests = {}
+        self._lock = threading.Lock()
+        handler = type("BoundMockAzureRequestHandler", (MockAzureRequestHandler,), {"server_ref": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-azure", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, key):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def _operation_headers(self, operation_id):
+        url = f"{self.base_url}/operations/{operation_id}"
+        return {"Azure-AsyncOperation": url, "Location": url, "Retry-After": f"{self.state.operation_delay:g}"}
+
+    def handle(self, method, raw_path, authorization):
+        """
+        Route one request
+
+        :return: status_code, body, headers
+        :rtype: (int, dict, dict)
+        """
+        url = urlparse(raw_path)
+        path = url.path.replace("//", "/")
+        query = dict(parse_qsl(url.query))
+
+        if TOKEN_PATH.match(path):
+            self._count(f"{method} token")
+            return 200, self.state.issue_token(), {}
+        if not self.state.authorized(authorization):
+            self._count(f"{method} unauthorized")
+            return 401, {"error": {"code": "AuthenticationFailed"}}, {}
+
+        match = OPERATION_PATH.match(path)
+        if match:
+            self._count("GET operation")
+            status, body = self.state.operation_status(match["operation"])
+            return status, body, {}
+        if re.match(r"^/subscriptions/[^/]+/resourcegroups$", path, re.IGNORECASE):
+            self._count("GET resourcegroups")
+            status, body = self.state.list_resource_groups()
+            return status, body, {}
+
+        match = RESOURCE_PATH.match(path)
+        if match is None or match["kind"].lower() not in RESOURCE_KINDS:
+            return 404, {"error": {"code": "InvalidResourceType"}}, {}
+        kind = match["kind"].lower()
+        name = match["name"]
+        action = (match["action"] or "").lower()
+        self._count(f"{method} {kind}{'/' + action if action else ''}{'' if name else ' list'}")
+
+        if method == "GET" and name is None:
+            status, body = self.state.list_resources(kind, int(query.get("$skiptoken", 0)))
+            if "nextLink" in body:
+                api_version = query.get("api-version", "")
+                body["nextLink"] = f"{self.base_url}{path}?api-version={api_version}&$skiptoken={body['nextLink']}"
+            return status, body, {}
+        if method == "GET" and action == "instanceview":
+            status, body = self.state.instance_view(name)
+            return status, body, {}
+        if method == "GET" and not action:
+            status, body = self.state.get_resource(kind, name)
+            return status, body, {}
+        if method == "POST" and action == "deallocate":
+            status, body, operation_id = self.state.deallocate(name)
+        elif method == "DELETE" and not action:
+            status, body, operation_id = self.state.delete(kind, name)
+        else:
+            return 405, {"error": {"code": "MethodNotAllowed"}}, {}
+        return status, body, self._operation_headers(operation_id) if operation_id else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in of the azure endpoints used by del_azure_vm.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7200)
+    parser.add_argument("--subscription-id", default="3d2b9951-a0c8-4dc3-8114-2776b047b15c")
+    parser.add_argument("--resource-group", default="ScratchpadRg")
+    parser.add_argument("--vms", type=int, default=10, help="number of running vms named scn-vm-<n>")
+    parser.add_argument("--operation-delay", type=float, default=2.0, help="seconds a long running operation takes")
+    args = parser.parse_args()
+
+    state = MockAzureState(args.subscription_id, args.resource_group, operation_delay=args.operation_delay)
+    for number in range(args.vms):
+        state.add_vm(f"scn-vm-{number}")
+    server = MockAzureServer(state, host=args.host, port=args.port).start()
+    print(f"Mock azure management serving on {server.base_url}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# -----------------------------------------------------------
+#
+# Run the mock SAIL portal standalone: python -m mock_portal
+#
+# -----------------------------------------------------------
+import argparse
+import time
+
+from config import (
+    MOCK_PORTAL_ERROR_RATE,
+    MOCK_PORTAL_ERROR_STATUS,
+    MOCK_PORTAL_JITTER,
+    MOCK_PORTAL_LATENCY,
+    MOCK_PORTAL_VM_STATE_INTERVAL,
+    PORT,
+)
+
+from mock_portal.portal_server import FaultProfile, MockPortalServer
+from utils.world_helpers import World, WorldSpec
+
+from mock_portal.portal_state import PortalState
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory stand-in of the SAIL portal api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(PORT))
+    parser.add_argument("--latency", type=float, default=MOCK_PORTAL_LATENCY, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=MOCK_PORTAL_JITTER, help="max random seconds added on top")
+    parser.add_argument("--error-rate", type=float, default=MOCK_PORTAL_ERROR_RATE, help="share of failed requests")
+    parser.add_argument("--error-status", type=int, default=MOCK_PORTAL_ERROR_STATUS)
+    parser.add_argument("--eosb-ttl", type=float, default=None, help="seconds an eosb stays valid")
+    parser.add_argument("--vm-state-interval", type=float, default=MOCK_PORTAL_VM_STATE_INTERVAL)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--world-organizations", type=int, default=0, help="organizations of a synthetic world")
+    parser.add_argument("--world-datasets", type=int, default=10, help="datasets per world organization")
+    parser.add_argument("--world-contracts", type=int, default=1, help="digital contracts per world dataset")
+    parser.add_argument("--world-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    state = PortalState.with_default_accounts(eosb_ttl=args.eosb_ttl, vm_state_interval=args.vm_state_interval)
+    if args.world_organizations:
+        spec = WorldSpec(
+            organizations=args.world_organizations,
+            datasets_per_organization=args.world_datasets,
+            contracts_per_dataset=args.world_contracts,
+            seed=args.world_seed,
+        )
+        state.load_world(World(spec))
+        print(f"Loaded {spec}, users log in as {World(spec).users(0)[0]['Email']} and alike")
+
+    server = MockPortalServer(
+        host=args.host,
+        port=args.port,
+        state=state,
+        faults=FaultProfile(args.latency, args.jitter, args.error_rate, args.error_status),
+        seed=args.seed,
+    )
+    server.start()
+    print(f"Mock SAIL portal serving on {server.base_url}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
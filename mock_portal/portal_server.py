@@ -0,0 +1,278 @@
+# -----------------------------------------------------------
+#
+# Mock SAIL portal http server
+#
+# -----------------------------------------------------------
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from config import MOCK_PORTAL_ERROR_RATE, MOCK_PORTAL_ERROR_STATUS, MOCK_PORTAL_JITTER, MOCK_PORTAL_LATENCY
+
+from mock_portal.portal_state import PortalState
+
+# (method, path) -> (PortalState handler name, whether the route needs an eosb)
+ROUTES = {
+    ("POST", "/SAIL/AuthenticationManager/User/Login"): ("login", False),
+    ("GET", "/SAIL/AuthenticationManager/CheckEosb"): ("check_eosb", True),
+    ("GET", "/SAIL/AuthenticationManager/GetBasicUserInformation"): ("get_basic_user_information", True),
+    ("PATCH", "/SAIL/AuthenticationManager/User/Password"): ("update_password", True),
+    ("GET", "/SAIL/AccountManager/Organization/Information"): ("get_organization_information", True),
+    ("PUT", "/SAIL/AccountManager/Update/Organization"): ("update_organization_information", True),
+    ("PUT", "/SAIL/AccountManager/Update/AccessRight"): ("update_access_rights", True),
+    ("GET", "/SAIL/AccountManager/Organization/Users"): ("list_organization_users", True),
+    ("PUT", "/SAIL/AccountManager/Update/User"): ("update_user_information", True),
+    ("POST", "/SAIL/AccountManager/Admin/RegisterUser"): ("register_user", True),
+    ("DELETE", "/SAIL/AccountManager/Remove/User"): ("remove_user", True),
+    ("PUT", "/SAIL/AccountManager/Update/RecoverUser"): ("recover_user", True),
+    ("GET", "/SAIL/DatasetManager/ListDatasets"): ("list_datasets", True),
+    ("GET", "/SAIL/DatasetManager/PullDataset"): ("pull_dataset", True),
+    ("POST", "/SAIL/DatasetManager/RegisterDataset"): ("register_dataset", True),
+    ("DELETE", "/SAIL/DatasetManager/DeleteDataset"): ("delete_dataset", True),
+    ("GET", "/SAIL/DatasetFamilyManager/ListDatasetFamilies"): ("list_dataset_families", True),
+    ("GET", "/SAIL/DatasetFamilyManager/PullDatasetFamily"): ("pull_dataset_family", True),
+    ("POST", "/SAIL/DatasetFamilyManager/RegisterDatasetFamily"): ("register_dataset_family", True),
+    ("DELETE", "/SAIL/DatasetFamilyManager/DeleteDatasetFamily"): ("delete_dataset_family", True),
+    ("PUT", "/SAIL/DatasetFamilyManager/UpdateDatasetFamily"): ("update_dataset_family", True),
+    ("GET", "/SAIL/DataFederationManager/ListDataFederations"): ("list_data_federations", True),
+    ("POST", "/SAIL/DataFederationManager/RegisterDataFederation"): ("register_data_federation", True),
+    ("DELETE", "/SAIL/DataFederationManager/DeleteDataFederation"): ("delete_data_federation", True),
+    ("GET", "/SAIL/AzureManager/ListTemplates"): ("list_azure_templates", True),
+    ("GET", "/SAIL/AzureManager/PullTemplate"): ("pull_azure_template", True),
+    ("POST", "/SAIL/AzureManager/RegisterTemplate"): ("register_azure_template", True),
+    ("PUT", "/SAIL/AzureManager/UpdateTemplate"): ("update_azure_template", True),
+    ("DELETE", "/SAIL/AzureManager/DeleteTemplate"): ("delete_azure_template", True),
+    ("GET", "/SAIL/DigitalContractManager/DigitalContracts"): ("list_digital_contracts", True),
+    ("GET", "/SAIL/DigitalContractManager/PullDigitalContract"): ("pull_digital_contract", True),
+    ("POST", "/SAIL/DigitalContractManager/Applications"): ("register_digital_contract", True),
+    ("PATCH", "/SAIL/DigitalContractManager/DataOwner/Accept"): ("accept_digital_contract", True),
+    ("PATCH", "/SAIL/DigitalContractManager/Researcher/Activate"): ("activate_digital_contract", True),
+    ("PATCH", "/SAIL/DigitalContractManager/AssociateWithAzureTemplate"): ("associate_digital_contract", True),
+    ("POST", "/SAIL/DigitalContractManager/Provision"): ("provision_digital_contract", True),
+    ("GET", "/SAIL/DigitalContractManager/GetProvisioningStatus"): ("get_provisioning_status", True),
+    ("POST", "/SAIL/DigitalContractManager/Deprovision"): ("deprovision_digital_contract", True),
+    ("GET", "/SAIL/VirtualMachineManager/ListVirtualMachines"): ("list_virtual_machines", True),
+    ("GET", "/SAIL/VirtualMachineManager/PullVirtualMachine"): ("pull_virtual_machine", True),
+}
+
+
+def parse_query(query):
+    """
+    Parse a query string built by utils.helpers.url_encoded
+
+    "+" is kept as is, it is literal in the base64 eosb sent unescaped.
+
+    :param query: query string
+    :type query: string
+    :return: params
+    :rtype: dict
+    """
+    params = {}
+    for item in query.split("&"):
+        if item:
+            key, _, value = item.partition("=")
+            params[unquote(key)] = unquote(value)
+    return params
+
+
+class FaultProfile:
+    """
+    Fault Profile Class, latency and errors injected into mock portal responses
+    """
+
+    def __init__(
+        self,
+        latency=MOCK_PORTAL_LATENCY,
+        jitter=MOCK_PORTAL_JITTER,
+        error_rate=MOCK_PORTAL_ERROR_RATE,
+        error_status=MOCK_PORTAL_ERROR_STATUS,
+    ):
+        """
+        :param latency: seconds added before every response
+        :type latency: float
+        :param jitter: up to this many seconds are added on top of latency, uniformly drawn
+        :type jitter: float
+        :param error_rate: share of requests, 0 to 1, answered with error_status instead
+        :type error_rate: float
+        :param error_status: http status of the injected errors
+        :type error_status: int
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self, rng):
+        """
+        :return: seconds to wait before responding
+        :rtype: float
+        """
+        return self.latency + (rng.uniform(0.0, self.jitter) if self.jitter else 0.0)
+
+    def fails(self, rng):
+        """
+        :return: True when this request gets an injected error
+        :rtype: bool
+        """
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+class MockPortalRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the mock portal, the serving MockPortalServer is set as class attribute
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockSailPortal"
+    # Send headers and body in one segment, a split write stalls on delayed acks
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    portal = None
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_PATCH(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        # Keep the test output clean, MockPortalServer.requests counts what was served
+        pass
+
+    def _handle(self):
+        url = urlparse(self.path)
+        # Always drain the body so the keep-alive connection stays usable
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        status, body = self.portal.handle(self.command, url.path, url.query, raw_body)
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockPortalServer:
+    """
+    Mock Portal Server Class, in-process stand-in of the SAIL portal
+
+    Serves the routes used by api_portal over plain http from a PortalState, adding the
+    latency and errors of a FaultProfile. route_faults overrides the profile per path.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, state=None, faults=None, route_faults=None, seed=None):
+        """
+        :param host: interface to listen on
+        :type host: string
+        :param port: port to listen on, 0 picks a free one
+        :type port: int
+        :param state: portal state, defaults to one holding the config.py accounts
+        :type state: class : mock_portal.portal_state.PortalState, optional
+        :param faults: latency and errors injected into every route
+        :type faults: class : mock_portal.portal_server.FaultProfile, optional
+        :param route_faults: path to FaultProfile replacing faults for that route
+        :type route_faults: dict, optional
+        :param seed: seed of the fault injection random draws
+        :type seed: int, optional
+        """
+        self.state = state or PortalState.with_default_accounts()
+        self.faults = faults or FaultProfile()
+        self.route_faults = route_faults or {}
+        self.requests = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        handler = type("BoundMockPortalRequestHandler", (MockPortalRequestHandler,), {"portal": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Serve in a background thread
+
+        :return: self
+        :rtype: class : mock_portal.portal_server.MockPortalServer
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-sail-portal", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, method, path, query, raw_body):
+        """
+        Route one request to the portal state
+
+        :return: status_code, body
+        :rtype: (int, dict)
+        """
+        with self._lock:
+            self.requests[f"{method} {path}"] += 1
+            faults = self.route_faults.get(path, self.faults)
+            delay = faults.delay(self._rng)
+            fails = faults.fails(self._rng)
+        if delay:
+            time.sleep(delay)
+        if fails:
+            return faults.error_status, None
+
+        route = ROUTES.get((method, path))
+        if route is None:
+            return 404, None
+        try:
+            params = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, None
+        if not isinstance(params, dict):
+            return 400, None
+        params.update(parse_query(query))
+
+        handler_name, needs_eosb = route
+        handler = getattr(self.state, handler_name)
+        if not needs_eosb:
+            status, body = handler(params)
+            return status, dict(body, Status=status) if body is not None else None
+
+        eosb = params.get("Eosb")
+        if not eosb:
+            return 400, None
+        session = self.state.get_session(eosb)
+        if session is None:
+            return 401, {"Status": 401}
+        status, body = handler(session, params)
+        if body is None:
+            return status, None
+        return status, dict(body, Eosb=eosb, Status=status)
@@ -0,0 +1,887 @@
+# -----------------------------------------------------------
+#
+# In-memory state of the mock SAIL portal
+#
+# -----------------------------------------------------------
+import base64
+import os
+import threading
+import time
+import uuid
+
+from config import DATAOWNER_EMAIL, MOCK_PORTAL_VM_STATE_INTERVAL, RESEARCHER_EMAIL, SAIL_PASS
+from utils.digital_contract_helpers import (
+    CONTRACT_ACTIVE,
+    CONTRACT_APPLICATION,
+    CONTRACT_APPROVAL,
+    PROVISIONING,
+    PROVISIONING_FAILED,
+    PROVISIONING_READY,
+    UNPROVISIONED,
+    VM_DELETE_FAILED,
+    VM_DELETED,
+    VM_DELETING,
+    VM_IN_USE,
+    VM_PROVISIONING_FAILED,
+    VM_STARTING,
+    VM_WAITING_FOR_DATA,
+)
+
+# Object type encoded in the leading 6 bits of a portal GUID
+GUID_ORGANIZATION = 1
+GUID_USER = 2
+GUID_DIGITAL_CONTRACT = 4
+GUID_VIRTUAL_MACHINE = 5
+GUID_DATA_FEDERATION = 6
+GUID_DATASET_FAMILY = 7
+GUID_AZURE_TEMPLATE = 8
+
+# enum class AccountStatus
+ACCOUNT_ACTIVE = 1
+ACCOUNT_DELETED = 3
+
+ORGANIZATION_INFORMATION_FIELDS = (
+    "OrganizationAddress",
+    "OrganizationName",
+    "PrimaryContactEmail",
+    "PrimaryContactName",
+    "PrimaryContactPhoneNumber",
+    "PrimaryContactTitle",
+    "SecondaryContactEmail",
+    "SecondaryContactName",
+    "SecondaryContactPhoneNumber",
+    "SecondaryContactTitle",
+)
+
+# Data federation name and description length limits
+FEDERATION_NAME_LENGTH = (2, 255)
+FEDERATION_DESCRIPTION_LENGTH = (2, 1000)
+
+
+def new_guid(object_type):
+    """
+    Generate a portal GUID carrying its object type in the leading 6 bits
+
+    :param object_type: one of the GUID_* object types
+    :type object_type: int
+    :return: guid, e.g. "{1A2B3C4D-....}"
+    :rtype: string
+    """
+    raw = bytearray(uuid.uuid4().bytes)
+    raw[0] = (object_type << 2) | (raw[0] & 0x03)
+    return f"{{{str(uuid.UUID(bytes=bytes(raw))).upper()}}}"
+
+
+def new_eosb():
+    """
+    :return: opaque session token
+    :rtype: string
+    """
+    return base64.b64encode(os.urandom(192)).decode()
+
+
+class PortalState:
+    """
+    Portal State Class, organizations, users and every resource the portal api manages
+
+    Each handler takes the session of the calling user and the request params and
+    returns (status_code, body), body None meaning an empty response. Handlers run on
+    the server threads and serialize on one lock.
+    """
+
+    def __init__(self, eosb_ttl=None, vm_state_interval=MOCK_PORTAL_VM_STATE_INTERVAL):
+        """
+        :param eosb_ttl: seconds an eosb stays valid, None never expires
+        :type eosb_ttl: float, optional
+        :param vm_state_interval: seconds a provisioned virtual machine spends in each boot state
+        :type vm_state_interval: float
+        """
+        self.eosb_ttl = eosb_ttl
+        self.vm_state_interval = vm_state_interval
+        self._lock = threading.RLock()
+        self.organizations = {}
+        self.users = {}
+        self.sessions = {}
+        self.datasets = {}
+        self.dataset_families = {}
+        self.data_federations = {}
+        self.digital_contracts = {}
+        self.azure_templates = {}
+        self.virtual_machines = {}
+
+    @classmethod
+    def with_default_accounts(cls, **kwargs):
+        """
+        Create a state holding the researcher and data owner accounts of config.py
+
+        :return: state
+        :rtype: class : mock_portal.portal_state.PortalState
+        """
+        state = cls(**kwargs)
+        researcher_org = state.add_organization("International Genetics Research")
+        data_owner_org = state.add_organization("Mercy General Hospital Labs")
+        state.add_user(researcher_org, RESEARCHER_EMAIL, SAIL_PASS, name="Lily Bart", title="Researcher")
+        state.add_user(data_owner_org, DATAOWNER_EMAIL, SAIL_PASS, name="Nick Adams", title="Data Owner")
+        return state
+
+    # -----------------------------------------------------------
+    # Seeding
+    # -----------------------------------------------------------
+    def add_organization(self, name):
+        """
+        :param name: organization name
+        :type name: string
+        :return: organization guid
+        :rtype: string
+        """
+        with self._lock:
+            organization_guid = new_guid(GUID_ORGANIZATION)
+            information = {field: "" for field in ORGANIZATION_INFORMATION_FIELDS}
+            information["OrganizationName"] = name
+            self.organizations[organization_guid] = information
+            return organization_guid
+
+    def add_user(self, organization_guid, email, password, name="", title="", phone_number="", access_rights=1):
+        """
+        :return: user guid
+        :rtype: string
+        """
+        with self._lock:
+            user_guid = new_guid(GUID_USER)
+            self.users[user_guid] = {
+                "UserGuid": user_guid,
+                "OrganizationGuid": organization_guid,
+                "Email": email,
+                "Password": password,
+                "Username": name,
+                "Title": title,
+                "PhoneNumber": str(phone_number),
+                "AccessRights": int(access_rights),
+                "AccountStatus": ACCOUNT_ACTIVE,
+                "TimeOfAccountCreation": int(time.time()),
+            }
+            return user_guid
+
+    def load_world(self, world):
+        """
+        Populate the state with a synthetic world, through the same handlers the api calls
+
+        Contracts are moved to their stage with accept and activate, the stages past active
+        have no api and are set directly.
+
+        :param world: world to load
+        :type world: class : utils.world_helpers.World
+        :return: organization guids, in world organization order
+        :rtype: list
+        """
+        with self._lock:
+            organization_guids = []
+            sessions = []
+            for organization in range(world.spec.organizations):
+                organization_guid = self.add_organization(world.organization_name(organization))
+                users = [
+                    self.add_user(
+                        organization_guid,
+                        user["Email"],
+                        user["Password"],
+                        name=user["Name"],
+                        title=user["Title"],
+                        phone_number=user["PhoneNumber"],
+                        access_rights=user["AccessRights"],
+                    )
+                    for user in world.users(organization)
+                ]
+                organization_guids.append(organization_guid)
+                sessions.append({"UserGuid": users[0]})
+
+            for organization, session in enumerate(sessions):
+                for family in world.dataset_families(organization):
+                    self.register_dataset_family(session, family)
+                for dataset_payload, _, _ in world.datasets(organization):
+                    self.register_dataset(session, dataset_payload)
+                for template in world.azure_templates(organization):
+                    self.register_azure_template(session, template)
+                for federation in world.data_federations(organization):
+                    self.register_data_federation(session, federation)
+
+            for organization, session in enumerate(sessions):
+                for contract in world.digital_contracts(organization):
+                    researcher_session = sessions[contract["Researcher"]]
+                    register, _, _ = world.digital_contract_payloads(contract, organization_guids[organization])
+                    _, body = self.register_digital_contract(researcher_session, register)
+                    contract_guid = body["DigitalContractIdentifier"]
+                    _, accept, activate = world.digital_contract_payloads(
+                        contract, organization_guids[organization], contract_guid
+                    )
+                    if contract["Stage"] >= CONTRACT_APPROVAL:
+                        self.accept_digital_contract(session, accept)
+                    if contract["Stage"] >= CONTRACT_ACTIVE:
+                        self.activate_digital_contract(researcher_session, activate)
+                    if contract["Stage"] > CONTRACT_ACTIVE:
+                        self.digital_contracts[contract_guid]["ContractStage"] = contract["Stage"]
+            return organization_guids
+
+    def _user_by_email(self, email):
+        return next((user for user in self.users.values() if user["Email"] == email), None)
+
+    def _session_user(self, session):
+        # The session of a deleted account stays valid, it can still recover the account
+        return self.users.get(session["UserGuid"])
+
+    def _session_organization(self, session):
+        user = self._session_user(session)
+        return None if user is None else user["OrganizationGuid"]
+
+    def _organization_name(self, organization_guid):
+        return self.organizations.get(organization_guid, {}).get("OrganizationName", "")
+
+    # -----------------------------------------------------------
+    # AuthenticationManager
+    # -----------------------------------------------------------
+    def login(self, params):
+        with self._lock:
+            user = self._user_by_email(params.get("Email"))
+            if user is None or user["Password"] != params.get("Password") or user["AccountStatus"] != ACCOUNT_ACTIVE:
+                return 401, {}
+            eosb = new_eosb()
+            self.sessions[eosb] = {"UserGuid": user["UserGuid"], "LoginTime": time.monotonic()}
+            return 201, {"Eosb": eosb}
+
+    def get_session(self, eosb):
+        """
+        :param eosb: eosb sent by the client
+        :type eosb: string
+        :return: session of the user, None when unknown, expired or its user is gone
+        :rtype: dict
+        """
+        with self._lock:
+            session = self.sessions.get(eosb)
+            if session is None:
+                return None
+            expired = self.eosb_ttl is not None and time.monotonic() - session["LoginTime"] >= self.eosb_ttl
+            if expired or self._session_user(session) is None:
+                del self.sessions[eosb]
+                return None
+            return session
+
+    def check_eosb(self, session, params):
+        return 200, {}
+
+    def get_basic_user_information(self, session, params):
+        with self._lock:
+            user = self._session_user(session)
+            if user is None:
+                return 401, {}
+            return 200, {
+                "AccessRights": user["AccessRights"],
+                "Email": user["Email"],
+                "OrganizationGuid": user["OrganizationGuid"],
+                "OrganizationName": self._organization_name(user["OrganizationGuid"]),
+                "PhoneNumber": user["PhoneNumber"],
+                "Title": user["Title"],
+                "UserGuid": user["UserGuid"],
+                "Username": user["Username"],
+            }
+
+    def update_password(self, session, params):
+        with self._lock:
+            user = self._session_user(session)
+            if user is None:
+                return 401, {}
+            if user["Email"] != params.get("Email") or user["Password"] != params.get("CurrentPassword"):
+                return 401, {}
+            if not params.get("NewPassword"):
+                return 400, None
+            user["Password"] = params["NewPassword"]
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # AccountManager
+    # -----------------------------------------------------------
+    def get_organization_information(self, session, params):
+        with self._lock:
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            return 200, {"OrganizationInformation": dict(self.organizations[organization_guid])}
+
+    def update_organization_information(self, session, params):
+        with self._lock:
+            information = self.organizations.get(params.get("OrganizationGuid"))
+            if information is None:
+                return 404, {}
+            for field, value in (params.get("OrganizationInformation") or {}).items():
+                if field in ORGANIZATION_INFORMATION_FIELDS:
+                    information[field] = value
+            return 200, {}
+
+    def update_access_rights(self, session, params):
+        with self._lock:
+            user = self.users.get(params.get("UserGuid"))
+            if user is None:
+                return 404, {}
+            user["AccessRights"] = int(params.get("AccessRights", user["AccessRights"]))
+            return 200, {}
+
+    def list_organization_users(self, session, params):
+        with self._lock:
+            organization_users = {
+                user_guid: {
+                    field: user[field]
+                    for field in (
+                        "AccessRights",
+                        "AccountStatus",
+                        "Email",
+                        "PhoneNumber",
+                        "TimeOfAccountCreation",
+                        "Title",
+                        "UserGuid",
+                        "Username",
+                    )
+                }
+                for user_guid, user in self.users.items()
+                if user["OrganizationGuid"] == params.get("OrganizationGuid")
+            }
+            return 200, {"OrganizationUsers": organization_users}
+
+    def update_user_information(self, session, params):
+        with self._lock:
+            user = self.users.get(params.get("UserGuid"))
+            if user is None:
+                return 404, {}
+            information = params.get("UserInformation") or {}
+            user["Username"] = information.get("Name", user["Username"])
+            user["Title"] = information.get("Title", user["Title"])
+            user["PhoneNumber"] = str(information.get("PhoneNumber", user["PhoneNumber"]))
+            return 200, {}
+
+    def register_user(self, session, params):
+        with self._lock:
+            if params.get("OrganizationGuid") not in self.organizations or not params.get("Email"):
+                return 400, None
+            if self._user_by_email(params["Email"]) is not None:
+                return 409, {}
+            self.add_user(
+                params["OrganizationGuid"],
+                params["Email"],
+                params.get("Password"),
+                name=params.get("Name", ""),
+                title=params.get("Title", ""),
+                phone_number=params.get("PhoneNumber", ""),
+                access_rights=params.get("AccessRights", 1),
+            )
+            return 201, {}
+
+    def remove_user(self, session, params):
+        with self._lock:
+            user = self.users.get(params.get("UserGuid"))
+            if user is None:
+                return 404, {}
+            user["AccountStatus"] = ACCOUNT_DELETED
+            return 200, {}
+
+    def recover_user(self, session, params):
+        with self._lock:
+            user = self.users.get(params.get("UserGuid"))
+            if user is None:
+                return 404, {}
+            user["AccountStatus"] = ACCOUNT_ACTIVE
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # DatasetManager
+    # -----------------------------------------------------------
+    def list_datasets(self, session, params):
+        with self._lock:
+            return 200, {"Datasets": {guid: dict(dataset) for guid, dataset in self.datasets.items()}}
+
+    def pull_dataset(self, session, params):
+        with self._lock:
+            dataset = self.datasets.get(params.get("DatasetGuid"))
+            if dataset is None:
+                return 404, {}
+            return 200, {"Dataset": dict(dataset)}
+
+    def register_dataset(self, session, params):
+        with self._lock:
+            dataset_guid = params.get("DatasetGuid")
+            dataset_data = params.get("DatasetData")
+            if not dataset_guid or not isinstance(dataset_data, dict) or not dataset_data.get("DatasetName"):
+                return 400, None
+            if dataset_guid in self.datasets:
+                return 409, {}
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            tables = {}
+            for table_guid, table in (dataset_data.get("Tables") or {}).items():
+                tables[table_guid] = {
+                    **table,
+                    "TableIdentifier": table_guid,
+                    "Title": table.get("Name", ""),
+                    "Description": table.get("Description", ""),
+                    "Tags": table.get("Hashtags", ""),
+                    "ColumnName": table.get("ColumnName", ""),
+                    "NumberOfColumns": table.get("NumberColumns", 0),
+                    "NumberOfRows": table.get("NumberRows", 0),
+                    "CompressedDataSizeInBytes": 0,
+                    "DataSizeInBytes": 0,
+                    "AllColumnProperties": {},
+                }
+            self.datasets[dataset_guid] = {
+                "DataOwnerGuid": organization_guid,
+                "DatasetGuid": dataset_guid,
+                "DatasetName": dataset_data["DatasetName"],
+                "Description": dataset_data.get("Description", ""),
+                "JurisdictionalLimitations": dataset_data.get("JurisdictionalLimitations", ""),
+                "Keywords": dataset_data.get("Keywords", ""),
+                "OrganizationName": self._organization_name(organization_guid),
+                "PrivacyLevel": dataset_data.get("PrivacyLevel", 1),
+                "PublishDate": dataset_data.get("PublishDate", time.time()),
+                "Tables": tables,
+                "VersionNumber": dataset_data.get("VersionNumber", "0x00000001"),
+            }
+            return 201, {}
+
+    def delete_dataset(self, session, params):
+        with self._lock:
+            dataset = self.datasets.get(params.get("DatasetGuid"))
+            if dataset is None or dataset["DataOwnerGuid"] != self._session_organization(session):
+                return 404, {}
+            del self.datasets[dataset["DatasetGuid"]]
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # DatasetFamilyManager
+    # -----------------------------------------------------------
+    def list_dataset_families(self, session, params):
+        with self._lock:
+            dataset_families = {
+                guid: {
+                    field: family[field]
+                    for field in (
+                        "DatasetFamilyActive",
+                        "DatasetFamilyOwnerGuid",
+                        "DatasetFamilyTags",
+                        "DatasetFamilyTitle",
+                        "OrganizationName",
+                    )
+                }
+                for guid, family in self.dataset_families.items()
+            }
+            return 200, {"DatasetFamilies": dataset_families}
+
+    def pull_dataset_family(self, session, params):
+        with self._lock:
+            family = self.dataset_families.get(params.get("DatasetFamilyGuid"))
+            if family is None:
+                return 404, {}
+            return 200, {"DatasetFamily": dict(family)}
+
+    def register_dataset_family(self, session, params):
+        with self._lock:
+            if not params.get("DatasetFamilyTitle") or not params.get("DatasetFamilyDescription"):
+                return 400, None
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            family_guid = new_guid(GUID_DATASET_FAMILY)
+            self.dataset_families[family_guid] = {
+                "DatasetFamilyActive": True,
+                "DatasetFamilyDescription": params["DatasetFamilyDescription"],
+                "DatasetFamilyGuid": family_guid,
+                "DatasetFamilyOwnerGuid": organization_guid,
+                "DatasetFamilyTags": params.get("DatasetFamilyTags", ""),
+                "DatasetFamilyTitle": params["DatasetFamilyTitle"],
+                "OrganizationName": self._organization_name(organization_guid),
+                "VersionNumber": "0x00000001",
+            }
+            return 201, {}
+
+    def delete_dataset_family(self, session, params):
+        with self._lock:
+            family = self.dataset_families.get(params.get("DatasetFamilyGuid"))
+            if family is None or family["DatasetFamilyOwnerGuid"] != self._session_organization(session):
+                return 404, {}
+            del self.dataset_families[family["DatasetFamilyGuid"]]
+            return 200, {}
+
+    def update_dataset_family(self, session, params):
+        with self._lock:
+            update = params.get("DatasetFamily") or {}
+            family = self.dataset_families.get(update.get("DatasetFamilyGuid"))
+            # The guid and owner of a family cannot change, a mismatch means no such family
+            if family is None or family["DatasetFamilyOwnerGuid"] != update.get("DatasetFamilyOwnerGuid"):
+                return 404, {}
+            for field in ("DatasetFamilyActive", "DatasetFamilyDescription", "DatasetFamilyTags", "DatasetFamilyTitle"):
+                if field in update:
+                    family[field] = update[field]
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # DataFederationManager
+    # -----------------------------------------------------------
+    def list_data_federations(self, session, params):
+        with self._lock:
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            data_federations = {
+                guid: dict(federation)
+                for guid, federation in self.data_federations.items()
+                if organization_guid == federation["OrganizationIdentifier"]
+                or organization_guid in federation["DataSubmitterOrganizations"]
+                or organization_guid in federation["ResearcherOrganizations"]
+            }
+            return 200, {"DataFederations": data_federations}
+
+    def register_data_federation(self, session, params):
+        with self._lock:
+            name = params.get("DataFederationName") or ""
+            description = params.get("DataFederationDescription") or ""
+            if not (
+                FEDERATION_NAME_LENGTH[0] <= len(name) <= FEDERATION_NAME_LENGTH[1]
+                and FEDERATION_DESCRIPTION_LENGTH[0] <= len(description) <= FEDERATION_DESCRIPTION_LENGTH[1]
+            ):
+                return 400, None
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            federation_guid = new_guid(GUID_DATA_FEDERATION)
+            self.data_federations[federation_guid] = {
+                "Identifier": federation_guid,
+                "Name": name,
+                "Description": description,
+                "OrganizationIdentifier": organization_guid,
+                "OrganizationName": self._organization_name(organization_guid),
+                "DataSubmitterOrganizations": {},
+                "ResearcherOrganizations": {},
+                "DatasetFamilies": {},
+            }
+            return 201, {}
+
+    def delete_data_federation(self, session, params):
+        with self._lock:
+            federation = self.data_federations.get(params.get("DataFederationGuid"))
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            if federation is None or federation["OrganizationIdentifier"] != organization_guid:
+                return 404, {}
+            del self.data_federations[federation["Identifier"]]
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # AzureManager
+    # -----------------------------------------------------------
+    def _organization_template(self, session, template_guid):
+        template = self.azure_templates.get(template_guid)
+        if template is None or template["OrganizationGuid"] != self._session_organization(session):
+            return None
+        return template
+
+    def list_azure_templates(self, session, params):
+        with self._lock:
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            templates = {
+                guid: {"Name": template["Name"], "Description": template["Description"], "State": template["State"]}
+                for guid, template in self.azure_templates.items()
+                if template["OrganizationGuid"] == organization_guid
+            }
+            return 200, {"Templates": templates}
+
+    def pull_azure_template(self, session, params):
+        with self._lock:
+            template = self._organization_template(session, params.get("TemplateGuid"))
+            if template is None:
+                return 404, {}
+            return 200, {"Template": {key: value for key, value in template.items() if key != "OrganizationGuid"}}
+
+    def register_azure_template(self, session, params):
+        with self._lock:
+            template_data = params.get("TemplateData")
+            if not isinstance(template_data, dict) or not template_data.get("Name"):
+                return 400, None
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            template_guid = new_guid(GUID_AZURE_TEMPLATE)
+            self.azure_templates[template_guid] = {
+                **template_data,
+                "Description": template_data.get("Description", ""),
+                "State": 1,
+                "OrganizationGuid": organization_guid,
+            }
+            return 201, {}
+
+    def update_azure_template(self, session, params):
+        with self._lock:
+            template = self._organization_template(session, params.get("TemplateGuid"))
+            if template is None:
+                return 404, {}
+            template.update(params.get("TemplateData") or {})
+            return 200, {}
+
+    def delete_azure_template(self, session, params):
+        with self._lock:
+            template = self._organization_template(session, params.get("TemplateGuid"))
+            if template is None:
+                return 404, {}
+            del self.azure_templates[params["TemplateGuid"]]
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # DigitalContractManager
+    # -----------------------------------------------------------
+    def _party_contract(self, session, contract_guid):
+        contract = self.digital_contracts.get(contract_guid)
+        organization_guid = self._session_organization(session)
+        if contract is None or organization_guid not in (
+            contract["DataOwnerOrganization"],
+            contract["ResearcherOrganization"],
+        ):
+            return None
+        return contract
+
+    def _contract_view(self, contract):
+        view = dict(contract)
+        vms = [
+            vm for vm in self.virtual_machines.values() if vm["DigitalContractGuid"] == contract["DigitalContractGuid"]
+        ]
+        if vms:
+            states = [self._vm_state(vm) for vm in vms]
+            ready = sum(1 for state in states if VM_WAITING_FOR_DATA <= state <= VM_IN_USE)
+            view["NumberOfVirtualMachinesReady"] = ready
+            if any(state in (VM_PROVISIONING_FAILED, VM_DELETE_FAILED) for state in states):
+                view["ProvisioningStatus"] = PROVISIONING_FAILED
+            elif all(state >= VM_DELETING for state in states):
+                view["ProvisioningStatus"] = UNPROVISIONED
+            elif ready == len(states):
+                view["ProvisioningStatus"] = PROVISIONING_READY
+            else:
+                view["ProvisioningStatus"] = PROVISIONING
+        return view
+
+    def list_digital_contracts(self, session, params):
+        with self._lock:
+            organization_guid = self._session_organization(session)
+            if organization_guid is None:
+                return 401, {}
+            digital_contracts = {
+                guid: self._contract_view(contract)
+                for guid, contract in self.digital_contracts.items()
+                if organization_guid in (contract["DataOwnerOrganization"], contract["ResearcherOrganization"])
+            }
+            return 200, {"DigitalContracts": digital_contracts}
+
+    def pull_digital_contract(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            digital_contract = self._contract_view(contract)
+            body = {
+                field: digital_contract.pop(field)
+                for field in ("DOOName", "DataOwnerOrganization", "ROName", "ResearcherOrganization")
+            }
+            body["DigitalContract"] = digital_contract
+            return 200, body
+
+    def register_digital_contract(self, session, params):
+        with self._lock:
+            dataset = self.datasets.get(params.get("DatasetGuid"))
+            data_owner_guid = params.get("DataOwnerOrganization")
+            if dataset is None or data_owner_guid not in self.organizations or not params.get("Title"):
+                return 400, None
+            researcher_guid = self._session_organization(session)
+            if researcher_guid is None:
+                return 401, {}
+            contract_guid = new_guid(GUID_DIGITAL_CONTRACT)
+            self.digital_contracts[contract_guid] = {
+                "ActivationTime": 0,
+                "ContractStage": CONTRACT_APPLICATION,
+                "DOOName": self._organization_name(data_owner_guid),
+                "DataOwnerOrganization": data_owner_guid,
+                "DatasetDRMMetadata": params.get("DatasetDRMMetadata", {}),
+                "DatasetDRMMetadataSize": params.get("DatasetDRMMetadataSize", 0),
+                "DatasetGuid": dataset["DatasetGuid"],
+                "DatasetName": dataset["DatasetName"],
+                "Description": params.get("Description", ""),
+                "DigitalContractGuid": contract_guid,
+                "Eula": params.get("LegalAgreement", ""),
+                "EulaAcceptedByDOOAuthorizedUser": "",
+                "EulaAcceptedByROAuthorizedUser": params.get("LegalAgreement", ""),
+                "ExpirationTime": 0,
+                "HostForVirtualMachines": "",
+                "HostRegion": "",
+                "LastActivity": int(time.time()),
+                "LegalAgreement": params.get("LegalAgreement", ""),
+                "Note": "",
+                "NumberOfVirtualMachines": 0,
+                "ProvisioningStatus": UNPROVISIONED,
+                "ROName": self._organization_name(researcher_guid),
+                "ResearcherOrganization": researcher_guid,
+                "RetentionTime": 0,
+                "SubscriptionDays": params.get("SubscriptionDays", 0),
+                "Title": params["Title"],
+                "VersionNumber": params.get("VersionNumber", "0x0000000100000001"),
+            }
+            return 201, {"DigitalContractIdentifier": contract_guid}
+
+    def accept_digital_contract(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            if contract["ContractStage"] != CONTRACT_APPLICATION:
+                return 400, None
+            if contract["DataOwnerOrganization"] != self._session_organization(session):
+                return 400, None
+            contract.update(
+                {
+                    "ContractStage": CONTRACT_APPROVAL,
+                    "Description": params.get("Description", contract["Description"]),
+                    "EulaAcceptedByDOOAuthorizedUser": params.get("LegalAgreement", ""),
+                    "HostForVirtualMachines": params.get("HostForVirtualMachines", ""),
+                    "HostRegion": params.get("HostRegion", ""),
+                    "LastActivity": int(time.time()),
+                    "NumberOfVirtualMachines": params.get("NumberOfVirtualMachines", 1),
+                    "RetentionTime": params.get("RetentionTime", 0),
+                }
+            )
+            return 200, {"Instructions": "", "RootEventStatus": 0}
+
+    def activate_digital_contract(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            if contract["ContractStage"] != CONTRACT_APPROVAL:
+                return 400, None
+            if contract["ResearcherOrganization"] != self._session_organization(session):
+                return 400, None
+            now = int(time.time())
+            contract.update(
+                {
+                    "ContractStage": CONTRACT_ACTIVE,
+                    "ActivationTime": now,
+                    "ExpirationTime": now + contract["SubscriptionDays"] * 86400,
+                    "LastActivity": now,
+                }
+            )
+            return 200, {"Instructions": "", "RootEventStatus": 0}
+
+    def associate_digital_contract(self, session, params):
+        with self._lock:
+            template = self._organization_template(session, params.get("AzureTemplateGuid"))
+            if template is None:
+                return 404, {"ErrorMessage": "Unknown azure template"}
+            contracts = [
+                self._party_contract(session, contract_guid)
+                for contract_guid in params.get("ListOfDigitalContracts", [])
+            ]
+            if not contracts or None in contracts:
+                return 404, {"ErrorMessage": "Unknown digital contract"}
+            for contract in contracts:
+                contract["AzureTemplateGuid"] = params["AzureTemplateGuid"]
+            return 200, {"ErrorMessage": ""}
+
+    def provision_digital_contract(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            active_vms = [
+                vm
+                for vm in self.virtual_machines.values()
+                if vm["DigitalContractGuid"] == contract["DigitalContractGuid"] and self._vm_state(vm) < VM_DELETING
+            ]
+            if contract["ContractStage"] != CONTRACT_ACTIVE or active_vms:
+                return 400, {"Message": "Digital contract is not active or already provisioned"}
+            now = time.monotonic()
+            vm_guid = None
+            for _ in range(max(1, contract["NumberOfVirtualMachines"])):
+                vm_guid = new_guid(GUID_VIRTUAL_MACHINE)
+                index = len(self.virtual_machines) + 1
+                self.virtual_machines[vm_guid] = {
+                    "VirtualMachineGuid": vm_guid,
+                    "DigitalContractGuid": contract["DigitalContractGuid"],
+                    "DigitalContractTitle": contract["Title"],
+                    "IPAddress": f"10.0.{index // 256}.{index % 256}",
+                    "HostRegion": contract["HostRegion"],
+                    "VirtualMachineType": params.get("VirtualMachineType", ""),
+                    "ProvisionTime": now,
+                    "DeprovisionTime": None,
+                    "StartTime": int(time.time()),
+                }
+            return 200, {"SecureNodeGuid": vm_guid, "Message": "Provisioning started"}
+
+    def get_provisioning_status(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            virtual_machines = {
+                vm_guid: self._vm_state(vm)
+                for vm_guid, vm in self.virtual_machines.items()
+                if vm["DigitalContractGuid"] == contract["DigitalContractGuid"]
+            }
+            return 200, {
+                "ProvisioningStatus": self._contract_view(contract)["ProvisioningStatus"],
+                "VirtualMachines": virtual_machines,
+            }
+
+    def deprovision_digital_contract(self, session, params):
+        with self._lock:
+            contract = self._party_contract(session, params.get("DigitalContractGuid"))
+            if contract is None:
+                return 404, {}
+            now = time.monotonic()
+            for vm in self.virtual_machines.values():
+                if vm["DigitalContractGuid"] == contract["DigitalContractGuid"] and vm["DeprovisionTime"] is None:
+                    vm["DeprovisionTime"] = now
+            return 200, {}
+
+    # -----------------------------------------------------------
+    # VirtualMachineManager
+    # -----------------------------------------------------------
+    def _vm_state(self, vm, now=None):
+        """
+        State of a virtual machine, stepping through the boot states every vm_state_interval
+        seconds after provisioning and through deleting to deleted after deprovisioning
+        """
+        now = time.monotonic() if now is None else now
+        interval = self.vm_state_interval
+        if vm["DeprovisionTime"] is not None:
+            elapsed = now - vm["DeprovisionTime"]
+            return VM_DELETED if interval <= 0 or elapsed >= interval else VM_DELETING
+        if interval <= 0:
+            return VM_WAITING_FOR_DATA
+        steps = int((now - vm["ProvisionTime"]) / interval)
+        return min(VM_STARTING + steps, VM_WAITING_FOR_DATA)
+
+    def _vm_view(self, vm):
+        view = {key: value for key, value in vm.items() if key not in ("ProvisionTime", "DeprovisionTime")}
+        view["State"] = self._vm_state(vm)
+        return view
+
+    def list_virtual_machines(self, session, params):
+        with self._lock:
+            virtual_machines = {}
+            for vm_guid, vm in self.virtual_machines.items():
+                if self._party_contract(session, vm["DigitalContractGuid"]) is None:
+                    continue
+                contract_vms = virtual_machines.setdefault(
+                    vm["DigitalContractGuid"], {"VirtualMachinesAssociatedWithDc": {}}
+                )
+                contract_vms["VirtualMachinesAssociatedWithDc"][vm_guid] = self._vm_view(vm)
+            return 200, {"VirtualMachines": virtual_machines}
+
+    def pull_virtual_machine(self, session, params):
+        with self._lock:
+            vm = self.virtual_machines.get(params.get("VirtualMachineGuid"))
+            if vm is None or self._party_contract(session, vm["DigitalContractGuid"]) is None:
+                return 404, {}
+            return 200, {"VirtualMachine": self._vm_view(vm)}
@@ -0,0 +1,358 @@
+# -----------------------------------------------------------
+#
+# Authentication throughput benchmark
+#
+# -----------------------------------------------------------
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    AUTH_ACCOUNTS,
+    AUTH_CONCURRENCY_LEVELS,
+    AUTH_LEVEL_DURATION,
+    DATAOWNER_EMAIL,
+    SAIL_PASS,
+    SEED_MAX_WORKERS,
+)
+from utils.account_helpers import get_add_user_payload
+from utils.helpers import random_name
+
+from api_portal.account_management_api import AccountManagementApi
+from api_portal.http_transport import measurement_transport
+from api_portal.sail_portal_api import SailPortalApi
+from stress.latency_stats import LatencyStats
+
+REPORT_VERSION = 1
+
+# Operation -> call on the SailPortalApi of an account and the statuses of a success
+AUTH_OPERATIONS = {
+    "login": (lambda sail_portal, eosb: sail_portal.login(), (200, 201)),
+    "check_eosb": (lambda sail_portal, eosb: sail_portal.check_eosb(eosb), (200,)),
+    "get_basic_user_info": (lambda sail_portal, eosb: sail_portal.get_basic_user_info(), (200,)),
+}
+
+
+def provision_accounts(base_url, number_accounts, admin_email=DATAOWNER_EMAIL, password=SAIL_PASS, transport=None):
+    """
+    Add number_accounts users to the organization of admin_email, concurrently
+
+    :param base_url: portal under test
+    :type base_url: string
+    :param number_accounts: users added
+    :type number_accounts: int
+    :param admin_email: user adding them, its organization gets the users
+    :type admin_email: string
+    :param password: password of the admin
+    :type password: string
+    :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+    :type transport: class : api_portal.http_transport.HttpTransport, optional
+    :raises ValueError: a user could not be added
+    :return: (email, password) of the added users
+    :rtype: list
+    """
+    transport = transport or measurement_transport()
+    admin_portal = SailPortalApi(base_url, admin_email, password, transport=transport)
+    account_management = AccountManagementApi(base_url, transport=transport)
+    prefix = f"auth-{random_name(6).lower()}-"
+
+    def add(_):
+        payload, email = get_add_user_payload(prefix=prefix)
+        response, _, _ = account_management.add_user(admin_portal, payload=payload)
+        if response is None or response.status_code != 201:
+            raise ValueError(f"Could not add benchmark user {email}: {response}")
+        return email, payload["Password"]
+
+    with ThreadPoolExecutor(max_workers=SEED_MAX_WORKERS, thread_name_prefix="sail-auth") as executor:
+        return list(executor.map(add, range(number_accounts)))
+
+
+def delete_accounts(base_url, accounts, transport=None):
+    """
+    Delete the users added by provision_accounts
+
+    :param accounts: (email, password) of the users
+    :type accounts: list
+    :return: emails of the users that could not be deleted
+    :rtype: list
+    """
+    account_management = AccountManagementApi(base_url, transport=transport or measurement_transport())
+
+    def delete(account):
+        try:
+            response, _, _, _ = account_management.delete_user(None, base_url, Email=account[0], Password=account[1])
+        except Exception:
+            return account[0]
+        return None if response.status_code == 200 else account[0]
+
+    with ThreadPoolExecutor(max_workers=SEED_MAX_WORKERS, thread_name_prefix="sail-auth") as executor:
+        return [email for email in executor.map(delete, accounts) if email is not None]
+
+
+def read_accounts(path):
+    """
+    :param path: file of one "email" or "email,password" per line, the password defaults to SAIL_PASS
+    :type path: string
+    :return: (email, password) of every account
+    :rtype: list
+    """
+    accounts = []
+    with open(path, encoding="utf-8") as accounts_file:
+        for line in accounts_file:
+            email, _, password = line.strip().partition(",")
+            if email:
+                accounts.append((email, password or SAIL_PASS))
+    return accounts
+
+
+class AuthBenchmark:
+    """
+    Auth Benchmark Class, login, check_eosb and GetBasicUserInformation throughput at rising concurrency
+
+    Every account has its own SailPortalApi, at each concurrency level the workers go
+    round-robin over the accounts for duration seconds, so the portal sees logins of many
+    distinct users. The login storm logs storm_size accounts in at the same instant, as
+    every client does when a test session or a deployment starts.
+    """
+
+    def __init__(self, base_url, accounts, duration=AUTH_LEVEL_DURATION, transport=None):
+        """
+        :param base_url: portal under test
+        :type base_url: string
+        :param accounts: (email, password) of existing users
+        :type accounts: list
+        :param duration: seconds each operation runs at each level
+        :type duration: float
+        :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        """
+        if not accounts:
+            raise ValueError("The auth benchmark needs at least one account")
+        transport = transport or measurement_transport()
+        self.duration = duration
+        self.sail_portals = [
+            SailPortalApi(base_url, email, password, transport=transport) for email, password in accounts
+        ]
+        self._eosbs = [None] * len(self.sail_portals)
+
+    def _call(self, operation, index, stats):
+        """
+        One operation as account index, recorded into stats
+        """
+        call, statuses = AUTH_OPERATIONS[operation]
+        start = time.perf_counter()
+        try:
+            response, _, eosb = call(self.sail_portals[index], self._eosbs[index])
+            failed = response.status_code not in statuses
+        except Exception:
+            failed, eosb = True, None
+        stats.record(operation, time.perf_counter() - start, is_error=failed)
+        if operation == "login" and eosb:
+            self._eosbs[index] = eosb
+
+    def login_all(self):
+        """
+        Log every account in once, check_eosb checks their eosb
+
+        :return: accounts logged in
+        :rtype: int
+        """
+        stats = LatencyStats()
+        with ThreadPoolExecutor(max_workers=SEED_MAX_WORKERS, thread_name_prefix="sail-auth") as executor:
+            list(executor.map(lambda index: self._call("login", index, stats), range(len(self.sail_portals))))
+        return sum(1 for eosb in self._eosbs if eosb)
+
+    def run_level(self, operation, concurrency):
+        """
+        Run an operation with concurrency workers for duration seconds
+
+        :param operation: name in AUTH_OPERATIONS
+        :type operation: string
+        :param concurrency: workers
+        :type concurrency: int
+        :return: Requests, Errors, ErrorRate, Throughput, Mean, P50, P95, P99 and Max of the operation
+        :rtype: dict
+        """
+        stats = LatencyStats()
+        deadline = time.monotonic() + self.duration
+        number_accounts = len(self.sail_portals)
+
+        def work(worker):
+            index = worker
+            while time.monotonic() < deadline:
+                self._call(operation, index % number_accounts, stats)
+                index += concurrency
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=work, args=(worker,), name=f"sail-auth-{worker}") for worker in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return dict(stats.summary(time.monotonic() - start)[operation], Concurrency=concurrency)
+
+    def login_storm(self, storm_size=None):
+        """
+        Log storm_size accounts in at once, every login released by the same barrier
+
+        :param storm_size: logins of the storm, defaults to one per account
+        :type storm_size: int, optional
+        :return: login latencies and error rate, Elapsed until the last login answered
+        :rtype: dict
+        """
+        storm_size = storm_size or len(self.sail_portals)
+        stats = LatencyStats()
+        barrier = threading.Barrier(storm_size + 1)
+
+        def login(index):
+            barrier.wait()
+            self._call("login", index % len(self.sail_portals), stats)
+
+        threads = [
+            threading.Thread(target=login, args=(index,), name=f"sail-storm-{index}") for index in range(storm_size)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.monotonic()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        return dict(stats.summary(elapsed)["login"], StormSize=storm_size, Elapsed=elapsed)
+
+    def run(self, levels=AUTH_CONCURRENCY_LEVELS, storm_size=None, on_level=None):
+        """
+        Login storm first, then every operation at every concurrency level
+
+        :param levels: workers at each level, e.g. (1, 2, 4, 8)
+        :type levels: tuple
+        :param storm_size: logins of the storm, defaults to one per account
+        :type storm_size: int, optional
+        :param on_level: called with (operation, concurrency, summary) after each level
+        :type on_level: callable, optional
+        :return: report, json serializable
+        :rtype: dict
+        """
+        levels = sorted(levels)
+        login_storm = self.login_storm(storm_size)
+        self.login_all()
+        operations = {}
+        for operation in AUTH_OPERATIONS:
+            operations[operation] = []
+            for concurrency in levels:
+                summary = self.run_level(operation, concurrency)
+                operations[operation].append(summary)
+                if on_level is not None:
+                    on_level(operation, concurrency, summary)
+        return {
+            "Version": REPORT_VERSION,
+            "Accounts": len(self.sail_portals),
+            "Duration": self.duration,
+            "Levels": levels,
+            "LoginStorm": login_storm,
+            "Operations": operations,
+            "PeakThroughput": {
+                operation: max(summary["Throughput"] for summary in summaries)
+                for operation, summaries in operations.items()
+            },
+        }
+
+
+def report_table(report):
+    """
+    Human readable table of the throughput and latency of every operation at every level
+
+    :param report: report of AuthBenchmark.run
+    :type report: dict
+    :return: table
+    :rtype: string
+    """
+    header = f"{'Operation':<22}{'Workers':>8}{'Req/s':>10}{'Errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for operation, summaries in report["Operations"].items():
+        for summary in summaries:
+            lines.append(
+                f"{operation:<22}{summary['Concurrency']:>8}{summary['Throughput']:>10.1f}{summary['Errors']:>8}"
+                f"{summary['P50'] * 1000:>10.1f}{summary['P95'] * 1000:>10.1f}{summary['P99'] * 1000:>10.1f}"
+            )
+    storm = report["LoginStorm"]
+    lines.append(
+        f"Login storm of {storm['StormSize']}: all answered in {storm['Elapsed']:.2f}s, {storm['Errors']} errors, "
+        f"p50 {storm['P50'] * 1000:.1f} ms, p99 {storm['P99'] * 1000:.1f} ms, max {storm['Max'] * 1000:.1f} ms"
+    )
+    return "\n".join(lines)
+
+
+def parse_levels(value):
+    """
+    :param value: e.g. "1,2,4,8"
+    :type value: string
+    :return: levels
+    :rtype: tuple
+    """
+    levels = tuple(int(level) for level in value.split(","))
+    if min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"Concurrency levels must be positive: {value}")
+    return levels
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Login, check_eosb and GetBasicUserInformation throughput")
+    parser.add_argument("--base-url", default=None, help="portal under test, defaults to an in-process mock portal")
+    parser.add_argument("--admin-email", default=DATAOWNER_EMAIL, help="user adding the benchmark accounts")
+    parser.add_argument("--password", default=SAIL_PASS)
+    parser.add_argument("--accounts", type=int, default=AUTH_ACCOUNTS, help="benchmark accounts added and deleted")
+    parser.add_argument("--accounts-file", default=None, help="existing accounts, one email[,password] per line")
+    parser.add_argument("--levels", type=parse_levels, default=AUTH_CONCURRENCY_LEVELS, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=AUTH_LEVEL_DURATION, help="seconds per operation and level")
+    parser.add_argument("--storm-size", type=int, default=None, help="logins of the storm, defaults to --accounts")
+    parser.add_argument("--output", default="auth.json", help="file the json report is written to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mock_portal = None
+    base_url = args.base_url
+    if base_url is None:
+        from mock_portal.portal_server import MockPortalServer
+
+        mock_portal = MockPortalServer().start()
+        base_url = mock_portal.base_url
+    transport = measurement_transport()
+    provisioned = []
+    try:
+        if args.accounts_file:
+            accounts = read_accounts(args.accounts_file)
+        else:
+            accounts = provisioned = provision_accounts(
+                base_url, args.accounts, args.admin_email, args.password, transport
+            )
+        benchmark = AuthBenchmark(base_url, accounts, duration=args.duration, transport=transport)
+
+        def on_level(operation, concurrency, summary):
+            print(f"{operation} x{concurrency}: {summary['Throughput']:.1f}/s, {summary['Errors']} errors", flush=True)
+
+        report = benchmark.run(args.levels, args.storm_size, on_level=on_level)
+    finally:
+        if provisioned:
+            undeleted = delete_accounts(base_url, provisioned, transport)
+            if undeleted:
+                print(f"Could not delete {len(undeleted)} benchmark accounts, e.g. {undeleted[0]}")
+        transport.close()
+        if mock_portal is not None:
+            mock_portal.stop()
+    print(report_table(report))
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
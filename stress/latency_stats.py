@@ -0,0 +1,115 @@
+# -----------------------------------------------------------
+#
+# Latency Statistics for stress runs
+#
+# -----------------------------------------------------------
+import math
+import threading
+from json import dumps
+
+
+def percentile(sorted_values, percent):
+    """
+    Nearest rank percentile of an already sorted list
+
+    :param sorted_values: sorted samples
+    :type sorted_values: list
+    :param percent: percentile wanted, 0 - 100
+    :type percent: float
+    :return: percentile value, None when there are no samples
+    :rtype: float
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyStats:
+    """
+    Thread safe per endpoint latency recorder
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._errors = {}
+
+    def record(self, endpoint, latency, is_error=False):
+        """
+        Record one request
+
+        :param endpoint: endpoint or operation name
+        :type endpoint: string
+        :param latency: request latency in seconds
+        :type latency: float
+        :param is_error: request failed, defaults to False
+        :type is_error: bool, optional
+        """
+        with self._lock:
+            self._latencies.setdefault(endpoint, []).append(latency)
+            self._errors.setdefault(endpoint, 0)
+            if is_error:
+                self._errors[endpoint] += 1
+
+    def endpoints(self):
+        """
+        :return: recorded endpoint names
+        :rtype: list
+        """
+        with self._lock:
+            return sorted(self._latencies)
+
+    def summary(self, elapsed):
+        """
+        Summarize throughput, error rate and p50/p95/p99 latency per endpoint
+
+        :param elapsed: wall time of the run in seconds, used for throughput
+        :type elapsed: float
+        :return: summary keyed by endpoint
+        :rtype: dict
+        """
+        with self._lock:
+            latencies = {endpoint: sorted(values) for endpoint, values in self._latencies.items()}
+            errors = dict(self._errors)
+        summary = {}
+        for endpoint, values in sorted(latencies.items()):
+            summary[endpoint] = {
+                "Requests": len(values),
+                "Errors": errors[endpoint],
+                "ErrorRate": errors[endpoint] / len(values),
+                "Throughput": len(values) / elapsed if elapsed else 0.0,
+                "Mean": sum(values) / len(values),
+                "P50": percentile(values, 50),
+                "P95": percentile(values, 95),
+                "P99": percentile(values, 99),
+                "Max": values[-1],
+            }
+        return summary
+
+    def report(self, elapsed):
+        """
+        Human readable table of the run summary, latencies in milliseconds
+
+        :param elapsed: wall time of the run in seconds
+        :type elapsed: float
+        :return: report
+        :rtype: string
+        """
+        header = f"{'Endpoint':<32}{'Requests':>10}{'Errors':>8}{'Req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        lines = [header, "-" * len(header)]
+        for endpoint, values in self.summary(elapsed).items():
+            lines.append(
+                f"{endpoint:<32}{values['Requests']:>10}{values['Errors']:>8}{values['Throughput']:>10.2f}"
+                f"{values['P50'] * 1000:>10.1f}{values['P95'] * 1000:>10.1f}{values['P99'] * 1000:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def to_json(self, elapsed, indent=4):
+        """
+        :param elapsed: wall time of the run in seconds
+        :type elapsed: float
+        :return: run summary as json
+        :rtype: string
+        """
+        return dumps({"Elapsed": elapsed, "Endpoints": self.summary(elapsed)}, indent=indent)
@@ -0,0 +1,319 @@
+# -----------------------------------------------------------
+#
+# Digital contract lifecycle throughput benchmark
+#
+# -----------------------------------------------------------
+import argparse
+import json
+import sys
+
+from config import (
+    DATAOWNER_EMAIL,
+    LIFECYCLE_CONCURRENCY_LEVELS,
+    LIFECYCLE_SATURATION_GAIN,
+    RESEARCHER_EMAIL,
+    SAIL_PASS,
+)
+from utils.az_template_helpers import get_az_template_payload
+from utils.dataset_helpers import get_dataset_payload
+from utils.helpers import random_name
+
+from api_portal.azure_template_managment_api import AzureTemplateApi
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.http_transport import measurement_transport
+from api_portal.sail_portal_api import SailPortalApi
+from stress.lifecycle_pipeline import DigitalContractPipeline
+
+REPORT_VERSION = 1
+
+
+def register_lifecycle_resources(base_url, data_owner_email=DATAOWNER_EMAIL, password=SAIL_PASS, transport=None):
+    """
+    Register the dataset the contracts are registered on and the azure template they are associated with
+
+    :param base_url: portal under test
+    :type base_url: string
+    :param data_owner_email: data owner of the dataset and template
+    :type data_owner_email: string
+    :param password: password of the data owner
+    :type password: string
+    :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+    :type transport: class : api_portal.http_transport.HttpTransport, optional
+    :raises ValueError: the portal did not register them
+    :return: dataset_guid, azure_template_guid
+    :rtype: (string, string)
+    """
+    transport = transport or measurement_transport()
+    data_owner = SailPortalApi(base_url, data_owner_email, password, transport=transport)
+    dataset_payload, _, _ = get_dataset_payload()
+    response, _, _ = DataSetManagementApi(base_url, transport=transport).register_dataset(data_owner, dataset_payload)
+    if response.status_code != 201:
+        raise ValueError(f"Could not register the lifecycle dataset: {response}")
+    azuretemplate_management = AzureTemplateApi(base_url, transport=transport)
+    template_name = f"Lifecycle template {random_name(8)}"
+    azuretemplate_management.register_azure_template(data_owner, get_az_template_payload(template_name))
+    templates = azuretemplate_management.list_azure_templates(data_owner)[1].get("Templates") or {}
+    template_guid = next((guid for guid, template in templates.items() if template["Name"] == template_name), None)
+    if template_guid is None:
+        raise ValueError(f"Could not register the lifecycle azure template {template_name}")
+    return dataset_payload["DatasetGuid"], template_guid
+
+
+def saturation_level(levels, throughputs, gain=LIFECYCLE_SATURATION_GAIN):
+    """
+    :param levels: concurrency levels, increasing
+    :type levels: list
+    :param throughputs: throughput at each level
+    :type throughputs: list
+    :param gain: least relative throughput increase of an unsaturated step
+    :type gain: float
+    :return: first level whose throughput grew less than gain over the level before, None when never
+    :rtype: int
+    """
+    for index in range(1, len(levels)):
+        if throughputs[index] < throughputs[index - 1] * (1.0 + gain):
+            return levels[index - 1]
+    return None
+
+
+class LifecycleBenchmark:
+    """
+    Lifecycle Benchmark Class, digital contract transition throughput at rising concurrency
+
+    At every concurrency level a DigitalContractPipeline with that many workers per stage
+    pushes contracts_per_worker contracts per worker from registration to deprovisioning.
+    The latency, error rate and throughput of every transition are kept per level.
+
+    A stage saturates at the level after which more workers add less than saturation_gain
+    throughput. The saturation stage is the one with the lowest peak throughput, it caps
+    the contracts per second of the whole lifecycle.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        researcher_email=RESEARCHER_EMAIL,
+        data_owner_email=DATAOWNER_EMAIL,
+        password=SAIL_PASS,
+        contracts_per_worker=20,
+        saturation_gain=LIFECYCLE_SATURATION_GAIN,
+        transport=None,
+    ):
+        """
+        :param base_url: portal under test
+        :type base_url: string
+        :param researcher_email: researcher registering and activating the contracts
+        :type researcher_email: string
+        :param data_owner_email: data owner accepting the contracts and hosting their vms
+        :type data_owner_email: string
+        :param password: password of both users
+        :type password: string
+        :param contracts_per_worker: contracts pushed through per worker of a stage at each level
+        :type contracts_per_worker: int
+        :param saturation_gain: least relative throughput increase of an unsaturated level
+        :type saturation_gain: float
+        :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        """
+        self.base_url = base_url
+        self.researcher_email = researcher_email
+        self.data_owner_email = data_owner_email
+        self.password = password
+        self.contracts_per_worker = contracts_per_worker
+        self.saturation_gain = saturation_gain
+        self.transport = transport or measurement_transport()
+
+    def run(self, levels=LIFECYCLE_CONCURRENCY_LEVELS, on_level=None):
+        """
+        Run the lifecycle at every concurrency level
+
+        :param levels: workers per stage at each level, e.g. (1, 2, 4, 8)
+        :type levels: tuple
+        :param on_level: called with (level, PipelineReport) after each level
+        :type on_level: callable, optional
+        :return: report, json serializable
+        :rtype: dict
+        """
+        levels = sorted(levels)
+        dataset_guid, template_guid = register_lifecycle_resources(
+            self.base_url, self.data_owner_email, self.password, self.transport
+        )
+        runs = []
+        for level in levels:
+            pipeline = DigitalContractPipeline(
+                self.base_url,
+                self.researcher_email,
+                self.data_owner_email,
+                self.password,
+                workers=level,
+                azure_template_guid=template_guid,
+                transport=self.transport,
+            )
+            pipeline_report = pipeline.run([dataset_guid], level * self.contracts_per_worker)
+            runs.append(
+                {
+                    "Concurrency": level,
+                    "Contracts": level * self.contracts_per_worker,
+                    "Completed": len(pipeline_report.completed),
+                    "Failures": [repr(failure) for failure in pipeline_report.failures[:20]],
+                    "Elapsed": pipeline_report.elapsed,
+                    "Throughput": pipeline_report.throughput,
+                    "Stages": pipeline_report.summary(),
+                }
+            )
+            if on_level is not None:
+                on_level(level, pipeline_report)
+
+        stages = {}
+        for stage in runs[0]["Stages"]:
+            series = {
+                field: [run["Stages"][stage].get(field) for run in runs]
+                for field in ("Throughput", "ErrorRate", "P50", "P95", "P99", "MaxQueueDepth")
+            }
+            series["PeakThroughput"] = max(series["Throughput"])
+            series["SaturationConcurrency"] = saturation_level(levels, series["Throughput"], self.saturation_gain)
+            stages[stage] = series
+        saturation_stage = min(stages, key=lambda stage: stages[stage]["PeakThroughput"])
+        return {
+            "Version": REPORT_VERSION,
+            "Levels": levels,
+            "ContractsPerWorker": self.contracts_per_worker,
+            "SaturationGain": self.saturation_gain,
+            "Runs": runs,
+            "Stages": stages,
+            "SaturationStage": saturation_stage,
+            "SaturationConcurrency": stages[saturation_stage]["SaturationConcurrency"],
+            "PeakThroughput": max(run["Throughput"] for run in runs),
+        }
+
+
+def compare_reports(baseline, report, max_regression=0.2):
+    """
+    Compare the peak throughput and p95 latency of every stage with a report of another portal build
+
+    :param baseline: report of LifecycleBenchmark.run
+    :type baseline: dict
+    :param report: report of LifecycleBenchmark.run
+    :type report: dict
+    :param max_regression: relative peak throughput drop tolerated
+    :type max_regression: float
+    :return: stage -> baseline and current peak throughput and worst p95, Regressed when the drop exceeds max_regression
+    :rtype: dict
+    """
+    comparison = {}
+    for stage, values in report["Stages"].items():
+        before = baseline["Stages"].get(stage)
+        if before is None:
+            continue
+        comparison[stage] = {
+            "BaselinePeakThroughput": before["PeakThroughput"],
+            "PeakThroughput": values["PeakThroughput"],
+            "BaselineP95": max((p95 for p95 in before["P95"] if p95 is not None), default=None),
+            "P95": max((p95 for p95 in values["P95"] if p95 is not None), default=None),
+            "Regressed": values["PeakThroughput"] < before["PeakThroughput"] * (1.0 - max_regression),
+        }
+    return comparison
+
+
+def report_table(report):
+    """
+    Human readable table of the throughput of every stage at every level
+
+    :param report: report of LifecycleBenchmark.run
+    :type report: dict
+    :return: table
+    :rtype: string
+    """
+    levels = report["Levels"]
+    header = f"{'Stage':<14}" + "".join(f"{f'c={level} /s':>12}" for level in levels) + f"{'Saturates':>11}"
+    lines = [header, "-" * len(header)]
+    for stage, values in report["Stages"].items():
+        saturation = values["SaturationConcurrency"]
+        lines.append(
+            f"{stage:<14}"
+            + "".join(f"{throughput:>12.2f}" for throughput in values["Throughput"])
+            + f"{saturation if saturation is not None else '-':>11}"
+        )
+    lines.append(
+        f"Saturation stage {report['SaturationStage']} at concurrency {report['SaturationConcurrency']}, "
+        f"peak {report['PeakThroughput']:.2f} contracts/s"
+    )
+    return "\n".join(lines)
+
+
+def parse_levels(value):
+    """
+    :param value: e.g. "1,2,4,8"
+    :type value: string
+    :return: levels
+    :rtype: tuple
+    """
+    levels = tuple(int(level) for level in value.split(","))
+    if min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"Concurrency levels must be positive: {value}")
+    return levels
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Digital contract lifecycle throughput at rising concurrency")
+    parser.add_argument("--base-url", default=None, help="portal under test, defaults to an in-process mock portal")
+    parser.add_argument("--researcher-email", default=RESEARCHER_EMAIL)
+    parser.add_argument("--data-owner-email", default=DATAOWNER_EMAIL)
+    parser.add_argument("--password", default=SAIL_PASS)
+    parser.add_argument("--levels", type=parse_levels, default=LIFECYCLE_CONCURRENCY_LEVELS, help="workers per stage")
+    parser.add_argument("--contracts-per-worker", type=int, default=20, help="contracts per worker at each level")
+    parser.add_argument("--saturation-gain", type=float, default=LIFECYCLE_SATURATION_GAIN)
+    parser.add_argument("--output", default="lifecycle.json", help="file the json report is written to")
+    parser.add_argument("--baseline", default=None, help="report of another portal build to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="peak throughput drop failing --baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mock_portal = None
+    base_url = args.base_url
+    if base_url is None:
+        from mock_portal.portal_server import MockPortalServer
+
+        mock_portal = MockPortalServer().start()
+        base_url = mock_portal.base_url
+    transport = measurement_transport()
+    try:
+        benchmark = LifecycleBenchmark(
+            base_url,
+            args.researcher_email,
+            args.data_owner_email,
+            args.password,
+            contracts_per_worker=args.contracts_per_worker,
+            saturation_gain=args.saturation_gain,
+            transport=transport,
+        )
+
+        def on_level(level, pipeline_report):
+            print(f"c={level}: {pipeline_report}", flush=True)
+
+        report = benchmark.run(args.levels, on_level=on_level)
+    finally:
+        transport.close()
+        if mock_portal is not None:
+            mock_portal.stop()
+    print(report_table(report))
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            report["Comparison"] = compare_reports(json.load(baseline_file), report, args.max_regression)
+        for stage, values in report["Comparison"].items():
+            print(
+                f"{stage:<14}{values['BaselinePeakThroughput']:>10.2f} -> {values['PeakThroughput']:.2f} /s"
+                f"{'  REGRESSION' if values['Regressed'] else ''}"
+            )
+        exit_code = 1 if any(values["Regressed"] for values in report["Comparison"].values()) else 0
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Report written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+# -----------------------------------------------------------
+#
+# Digital contract lifecycle pipeline
+#
+# -----------------------------------------------------------
+import queue
+import threading
+import time
+
+from config import (
+    DATAOWNER_EMAIL,
+    LIFECYCLE_STAGE_WORKERS,
+    PROVISIONING_POLL_INITIAL_INTERVAL,
+    PROVISIONING_POLL_MAX_INTERVAL,
+    RESEARCHER_EMAIL,
+    SAIL_PASS,
+    VM_WAIT_TIMEOUT,
+)
+from utils.digital_contract_helpers import (
+    PROVISIONING_FAILED,
+    PROVISIONING_READY,
+    get_digital_contract_acceptance_payload,
+    get_digital_contract_activate_payload,
+    get_digital_contract_associate_payload,
+    get_digital_contract_deprovision_payload,
+    get_digital_contract_payload,
+    get_digital_contract_provision_payload,
+)
+
+from api_portal.bulk_cleanup import CleanupFailure
+from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.http_transport import measurement_transport
+from api_portal.provisioning_multiplexer import ProvisioningMultiplexer
+from api_portal.sail_portal_api import SailPortalApi
+from stress.latency_stats import LatencyStats
+
+# Stages in lifecycle order, the role whose session makes the call
+LIFECYCLE_STAGES = {
+    "register": "researcher",
+    "accept": "data_owner",
+    "activate": "researcher",
+    "associate": "host",
+    "provision": "host",
+    "ready": "host",
+    "deprovision": "host",
+}
+
+
+class PipelineReport:
+    """
+    Pipeline Report Class, outcome of a DigitalContractPipeline run
+
+    stats holds the latency and errors of every stage call, windows the first start and last
+    end of the calls of each stage, the throughput of a stage is measured over its window,
+    queue_depths the depth of each stage queue sampled whenever a contract enters or leaves
+    it. completed lists the guids of the contracts through every stage, failures holds a
+    CleanupFailure per contract dropped, its kind naming the stage.
+    """
+
+    def __init__(self, stages, workers):
+        self.stages = list(stages)
+        self.workers = dict(workers)
+        self.stats = LatencyStats()
+        self.windows = {}
+        self.queue_depths = {stage: [] for stage in self.stages}
+        self.completed = []
+        self.failures = []
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    @property
+    def throughput(self):
+        """
+        :return: contracts through every stage per second
+        :rtype: float
+        """
+        return len(self.completed) / self.elapsed if self.elapsed else 0.0
+
+    def record(self, stage, start, is_error=False):
+        """
+        Record one stage call ending now
+
+        :param stage: stage name
+        :type stage: string
+        :param start: time.perf_counter() at the start of the call
+        :type start: float
+        :param is_error: call failed
+        :type is_error: bool
+        """
+        end = time.perf_counter()
+        self.stats.record(stage, end - start, is_error)
+        with self._lock:
+            first_start, last_end = self.windows.get(stage, (start, end))
+            self.windows[stage] = (min(first_start, start), max(last_end, end))
+
+    def summary(self):
+        """
+        Throughput, error rate, latency percentiles and queue depth per stage
+
+        :return: summary keyed by stage, in lifecycle order
+        :rtype: dict
+        """
+        stats = self.stats.summary(self.elapsed)
+        summary = {}
+        for stage in self.stages:
+            depths = self.queue_depths[stage]
+            first_start, last_end = self.windows.get(stage, (0.0, 0.0))
+            values = stats.get(stage, {"Requests": 0, "Errors": 0, "ErrorRate": 0.0})
+            summary[stage] = dict(
+                values,
+                Throughput=values["Requests"] / (last_end - first_start) if last_end > first_start else 0.0,
+                Workers=self.workers.get(stage, 0),
+                MaxQueueDepth=max(depths, default=0),
+                MeanQueueDepth=sum(depths) / len(depths) if depths else 0.0,
+            )
+        return summary
+
+    def report(self):
+        """
+        Human readable table of the run, latencies in milliseconds
+
+        :return: report
+        :rtype: string
+        """
+        header = (
+            f"{'Stage':<14}{'Workers':>8}{'Calls':>8}{'Errors':>8}{'Calls/s':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'MaxQueue':>10}{'MeanQueue':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for stage, values in self.summary().items():
+            p50 = values.get("P50")
+            p95 = values.get("P95")
+            lines.append(
+                f"{stage:<14}{values['Workers']:>8}{values['Requests']:>8}{values['Errors']:>8}"
+                f"{values['Throughput']:>10.2f}{(p50 or 0) * 1000:>10.1f}{(p95 or 0) * 1000:>10.1f}"
+                f"{values['MaxQueueDepth']:>10}{values['MeanQueueDepth']:>10.1f}"
+            )
+        lines.append(f"{len(self.completed)} contracts in {self.elapsed:.1f}s, {self.throughput:.2f}/s")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (
+            f"PipelineReport(completed={len(self.completed)}, failures={len(self.failures)}, "
+            f"elapsed={self.elapsed:.1f}s, throughput={self.throughput:.2f}/s)"
+        )
+
+
+class DigitalContractPipeline:
+    """
+    Digital Contract Pipeline Class, push many digital contracts through their lifecycle concurrently
+
+    Every stage, register, accept, activate, associate, provision and deprovision, has its
+    own queue and worker pool, a contract moves to the queue of the next stage as soon as
+    its call succeeds so all stages work at once. The researcher, data owner and vm host
+    each log in once, the workers of a role share its session and cached eosb.
+
+    Without an azure template the associate stage is left out, association is not needed
+    on KCA portals. With await_ready a contract is deprovisioned only once its vms are up,
+    the ready stage waits on a ProvisioningMultiplexer without holding a worker.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        researcher_email=RESEARCHER_EMAIL,
+        data_owner_email=DATAOWNER_EMAIL,
+        password=SAIL_PASS,
+        workers=LIFECYCLE_STAGE_WORKERS,
+        azure_template_guid=None,
+        await_ready=False,
+        ready_timeout=VM_WAIT_TIMEOUT,
+        poll_interval=PROVISIONING_POLL_INITIAL_INTERVAL,
+        max_poll_interval=PROVISIONING_POLL_MAX_INTERVAL,
+        transport=None,
+    ):
+        """
+        :param base_url: portal under test
+        :type base_url: string
+        :param researcher_email: researcher registering and activating the contracts
+        :type researcher_email: string
+        :param data_owner_email: data owner of the datasets, accepts the contracts and hosts their vms
+        :type data_owner_email: string
+        :param password: password of both users
+        :type password: string
+        :param workers: workers of every stage, or stage -> workers
+        :type workers: int or dict
+        :param azure_template_guid: template of the data owner organization the contracts are associated with
+        :type azure_template_guid: string, optional
+        :param await_ready: wait for the vms of a contract to be up before deprovisioning it
+        :type await_ready: bool
+        :param ready_timeout: seconds a contract may take to get ready
+        :type ready_timeout: float
+        :param poll_interval: initial seconds between provisioning status polls
+        :type poll_interval: float
+        :param max_poll_interval: cap of the seconds between provisioning status polls
+        :type max_poll_interval: float
+        :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        """
+        transport = transport or measurement_transport()
+        self.sessions = {
+            "researcher": SailPortalApi(base_url, researcher_email, password, transport=transport),
+            "data_owner": SailPortalApi(base_url, data_owner_email, password, transport=transport),
+        }
+        self.sessions["host"] = self.sessions["data_owner"]
+        self.digitalcontract_management = DigitalContractManagementApi(base_url, transport=transport)
+        self.azure_template_guid = azure_template_guid
+        self.await_ready = await_ready
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.stages = [
+            stage
+            for stage in LIFECYCLE_STAGES
+            if (stage != "associate" or azure_template_guid) and (stage != "ready" or await_ready)
+        ]
+        if isinstance(workers, int):
+            workers = dict.fromkeys(self.stages, workers)
+        # The ready stage waits on futures, no worker is held
+        self.workers = {stage: workers.get(stage, LIFECYCLE_STAGE_WORKERS) for stage in self.stages if stage != "ready"}
+        self._data_owner_guid = None
+
+    def _call(self, stage, job):
+        """
+        Make the portal call of a stage for one contract
+
+        :return: response
+        :rtype: requests.Response
+        """
+        sail_portal = self.sessions[LIFECYCLE_STAGES[stage]]
+        api = self.digitalcontract_management
+        dc_guid = job.get("DigitalContractGuid")
+        if stage == "register":
+            payload = get_digital_contract_payload(self._data_owner_guid, job["DatasetGuid"].strip("{}"))
+            payload["Title"] = f"Pipeline Contract {job['Index']:06d}"
+            response, response_json, _ = api.register_digital_contract(sail_portal, payload)
+            if response.status_code == 201:
+                job["DigitalContractGuid"] = response_json["DigitalContractIdentifier"]
+            return response
+        if stage == "accept":
+            payload = get_digital_contract_acceptance_payload(dc_guid)
+            response, _, _ = api.accept_digital_contract(sail_portal, payload)
+        elif stage == "activate":
+            response, _, _ = api.activate_digital_contract(sail_portal, get_digital_contract_activate_payload(dc_guid))
+        elif stage == "associate":
+            payload = get_digital_contract_associate_payload(self.azure_template_guid, dc_guid)
+            response, _, _ = api.associate_digital_contract(sail_portal, payload)
+        elif stage == "provision":
+            response, _, _ = api.provision_digital_contract(
+                sail_portal, get_digital_contract_provision_payload(dc_guid)
+            )
+        else:
+            payload = get_digital_contract_deprovision_payload(dc_guid)
+            response, _, _ = api.deprovision_digital_contract(sail_portal, payload)
+        return response
+
+    def run(self, dataset_guids, number_contracts, on_progress=None):
+        """
+        Push number_contracts contracts through the lifecycle, on the datasets in turn
+
+        :param dataset_guids: datasets of the data owner the contracts are registered on
+        :type dataset_guids: list
+        :param number_contracts: contracts pushed through
+        :type number_contracts: int
+        :param on_progress: called with (done, number_contracts) after each contract completes or fails
+        :type on_progress: callable, optional
+        :return: report
+        :rtype: class : stress.lifecycle_pipeline.PipelineReport
+        """
+        if not dataset_guids:
+            raise ValueError("The contracts need a dataset of the data owner to be registered on")
+        if self._data_owner_guid is None:
+            _, user_information, _ = self.sessions["data_owner"].get_basic_user_info()
+            self._data_owner_guid = user_information["OrganizationGuid"]
+        report = PipelineReport(self.stages, self.workers)
+        queues = {stage: queue.Queue() for stage in self.workers}
+        lock = threading.Lock()
+        all_done = threading.Event()
+        done = [0]
+        # Contract guid -> start of its ready stage
+        waiting = {}
+        multiplexer = None
+        if self.await_ready:
+            multiplexer = ProvisioningMultiplexer(
+                self.digitalcontract_management,
+                self.sessions["host"],
+                initial_interval=self.poll_interval,
+                max_interval=self.max_poll_interval,
+            )
+
+        def sample(stage, depth):
+            with lock:
+                report.queue_depths[stage].append(depth)
+
+        def finish(job, failed_stage=None, status_code=None, error=None):
+            with lock:
+                if failed_stage is None:
+                    report.completed.append(job["DigitalContractGuid"])
+                else:
+                    email = self.sessions[LIFECYCLE_STAGES[failed_stage]].email
+                    guid = job.get("DigitalContractGuid") or f"#{job['Index']}"
+                    report.failures.append(
+                        CleanupFailure(f"DigitalContract {failed_stage}", guid, email, status_code, error)
+                    )
+                done[0] += 1
+                finished = done[0]
+            if on_progress is not None:
+                on_progress(finished, number_contracts)
+            if finished == number_contracts:
+                all_done.set()
+
+        def advance(stage, job):
+            position = self.stages.index(stage) + 1
+            if position == len(self.stages):
+                finish(job)
+            elif self.stages[position] == "ready":
+                await_ready(job, time.perf_counter(), None)
+            else:
+                next_stage = self.stages[position]
+                queues[next_stage].put(job)
+                sample(next_stage, queues[next_stage].qsize())
+
+        def await_ready(job, start, since):
+            dc_guid = job["DigitalContractGuid"]
+            try:
+                future = multiplexer.watch(dc_guid, since=since)
+            except RuntimeError as error:
+                finish(job, "ready", error=repr(error))
+                return
+            with lock:
+                waiting[dc_guid] = start
+                report.queue_depths["ready"].append(len(waiting))
+
+            def expire():
+                # A contract stuck in one status never resolves its future
+                if future.cancel():
+                    with lock:
+                        waiting.pop(dc_guid, None)
+                    report.record("ready", start, is_error=True)
+                    finish(job, "ready", error=f"not ready after {self.ready_timeout}s")
+
+            timer = threading.Timer(max(0.0, start + self.ready_timeout - time.perf_counter()), expire)
+            timer.daemon = True
+
+            def on_status(future):
+                timer.cancel()
+                if future.cancelled():
+                    return
+                with lock:
+                    waiting.pop(dc_guid, None)
+                error = future.exception()
+                if error is not None:
+                    report.record("ready", start, is_error=True)
+                    finish(job, "ready", error=repr(error))
+                    return
+                status = future.result()
+                if status["ProvisioningStatus"] == PROVISIONING_READY:
+                    report.record("ready", start)
+                    advance("ready", job)
+                elif status["ProvisioningStatus"] == PROVISIONING_FAILED:
+                    report.record("ready", start, is_error=True)
+                    finish(job, "ready", error=f"provisioning status {status['ProvisioningStatus']}")
+                else:
+                    await_ready(job, start, status)
+
+            timer.start()
+            future.add_done_callback(on_status)
+
+        def work(stage):
+            stage_queue = queues[stage]
+            while True:
+                job = stage_queue.get()
+                if job is None:
+                    return
+                sample(stage, stage_queue.qsize())
+                start = time.perf_counter()
+                try:
+                    response = self._call(stage, job)
+                except Exception as error:
+                    report.record(stage, start, is_error=True)
+                    finish(job, stage, error=repr(error))
+                    continue
+                failed = response.status_code not in (200, 201)
+                report.record(stage, start, is_error=failed)
+                if failed:
+                    finish(job, stage, response.status_code)
+                else:
+                    advance(stage, job)
+
+        threads = [
+            threading.Thread(target=work, args=(stage,), name=f"sail-pipeline-{stage}", daemon=True)
+            for stage, workers in self.workers.items()
+            for _ in range(workers)
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        try:
+            first = self.stages[0]
+            for index in range(number_contracts):
+                queues[first].put({"Index": index, "DatasetGuid": dataset_guids[index % len(dataset_guids)]})
+                sample(first, queues[first].qsize())
+            if number_contracts:
+                all_done.wait()
+        finally:
+            report.elapsed = time.monotonic() - start
+            for stage, workers in self.workers.items():
+                for _ in range(workers):
+                    queues[stage].put(None)
+            for thread in threads:
+                thread.join()
+            if multiplexer is not None:
+                multiplexer.close()
+        return report
@@ -0,0 +1,228 @@
+# -----------------------------------------------------------
+#
+# Load Generator for stressing the SAIL portal
+#
+# -----------------------------------------------------------
+import random
+import threading
+import time
+
+from utils.dataset_helpers import get_dataset_payload
+
+from api_portal.azure_template_managment_api import AzureTemplateApi
+from api_portal.datafederation_management_api import DataFederationManagementApi
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.datasetfamily_management_api import DatasetFamilyManagementApi
+from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.http_transport import measurement_transport
+from api_portal.sail_portal_api import SailPortalApi
+from api_portal.virtual_machine_api import VirtualMachineApi
+from stress.latency_stats import LatencyStats
+
+DEFAULT_REQUEST_MIX = {"list_datasets": 70, "pull_dataset": 20, "register_dataset": 10}
+
+
+class LoadProfile:
+    """
+    Load Profile Class, shape of a stress run
+    """
+
+    def __init__(self, users=10, ramp_up=10.0, duration=60.0, request_mix=None, think_time=0.0):
+        """
+        :param users: number of concurrent virtual users
+        :type users: int
+        :param ramp_up: seconds over which the users are started
+        :type ramp_up: float
+        :param duration: seconds the run lasts, ramp up included
+        :type duration: float
+        :param request_mix: operation name to relative weight, defaults to DEFAULT_REQUEST_MIX
+        :type request_mix: dict, optional
+        :param think_time: seconds a user waits between two requests
+        :type think_time: float
+        """
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.request_mix = request_mix or dict(DEFAULT_REQUEST_MIX)
+        self.think_time = think_time
+        unknown = set(self.request_mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unknown stress operations: {sorted(unknown)}")
+
+    @staticmethod
+    def parse_request_mix(request_mix):
+        """
+        Parse a request mix given on the command line
+
+        :param request_mix: e.g. "list_datasets=70,pull_dataset=20,register_dataset=10"
+        :type request_mix: string
+        :return: operation name to weight
+        :rtype: dict
+        """
+        mix = {}
+        for item in request_mix.split(","):
+            name, _, weight = item.partition("=")
+            mix[name.strip()] = float(weight)
+        return mix
+
+
+class StressUser:
+    """
+    Stress User Class, one virtual user with its own portal session
+    """
+
+    def __init__(self, base_url, email, password, transport=None):
+        transport = transport or measurement_transport()
+        self.sail_portal = SailPortalApi(base_url=base_url, email=email, password=password, transport=transport)
+        self.dataset_management = DataSetManagementApi(base_url=base_url, transport=transport)
+        self.digitalcontract_management = DigitalContractManagementApi(base_url=base_url, transport=transport)
+        self.datasetfamily_management = DatasetFamilyManagementApi(base_url=base_url, transport=transport)
+        self.datafederation_management = DataFederationManagementApi(base_url=base_url, transport=transport)
+        self.azuretemplate_management = AzureTemplateApi(base_url=base_url, transport=transport)
+        self.virtualmachine_management = VirtualMachineApi(base_url=base_url, transport=transport)
+        # Dataset guids seen by this user, targets for pull_dataset
+        self.dataset_guids = []
+
+    def warm_up(self):
+        """
+        Login and learn the visible datasets before the measured requests
+        """
+        self.sail_portal.get_eosb()
+        list_datasets(self)
+
+
+def list_datasets(user):
+    response, response_json, _ = user.dataset_management.list_datasets(user.sail_portal)
+    if response_json and response_json.get("Datasets"):
+        user.dataset_guids = list(response_json.get("Datasets").keys())
+    return response
+
+
+def pull_dataset(user):
+    if not user.dataset_guids:
+        return None
+    return user.dataset_management.pull_dataset(user.sail_portal, random.choice(user.dataset_guids))[0]
+
+
+def register_dataset(user):
+    dataset_payload, dataset_uuid, _ = get_dataset_payload()
+    response = user.dataset_management.register_dataset(user.sail_portal, payload=dataset_payload)[0]
+    if response.status_code < 400:
+        user.dataset_guids.append(f"{{{dataset_uuid}}}")
+    return response
+
+
+def get_basic_user_info(user):
+    return user.sail_portal.get_basic_user_info()[0]
+
+
+def list_digital_contracts(user):
+    return user.digitalcontract_management.list_digital_contracts(user.sail_portal)[0]
+
+
+def list_dataset_families(user):
+    return user.datasetfamily_management.list_dataset_families(user.sail_portal)[0]
+
+
+def list_data_federations(user):
+    return user.datafederation_management.list_data_federations(user.sail_portal)[0]
+
+
+def list_azure_templates(user):
+    return user.azuretemplate_management.list_azure_templates(user.sail_portal)[0]
+
+
+def list_virtual_machines(user):
+    return user.virtualmachine_management.list_virtual_machines(user.sail_portal)[0]
+
+
+# Operations a stress user can run, each returns the response or None when it had nothing to do
+OPERATIONS = {
+    "list_datasets": list_datasets,
+    "pull_dataset": pull_dataset,
+    "register_dataset": register_dataset,
+    "get_basic_user_info": get_basic_user_info,
+    "list_digital_contracts": list_digital_contracts,
+    "list_dataset_families": list_dataset_families,
+    "list_data_federations": list_data_federations,
+    "list_azure_templates": list_azure_templates,
+    "list_virtual_machines": list_virtual_machines,
+}
+
+
+class LoadGenerator:
+    """
+    Load Generator Class, drives virtual users against the portal following a LoadProfile
+    """
+
+    def __init__(self, base_url, email, password, profile, transport=None):
+        """
+        :param base_url: portal base url
+        :type base_url: string
+        :param email: account used by every virtual user
+        :type email: string
+        :param password: account password
+        :type password: string
+        :param profile: shape of the run
+        :type profile: class : stress.load_generator.LoadProfile
+        :param transport: HttpTransport shared by the users, defaults to a measurement_transport() sending
+            every request once, so the stats see every failure
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        """
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.profile = profile
+        self.transport = transport or measurement_transport()
+        self.stats = LatencyStats()
+        self.elapsed = 0.0
+
+    def run(self):
+        """
+        Run the stress profile, blocks for profile.duration seconds
+
+        :return: stats, elapsed
+        :rtype: (stress.latency_stats.LatencyStats, float)
+        """
+        names = list(self.profile.request_mix)
+        weights = [self.profile.request_mix[name] for name in names]
+        start = time.monotonic()
+        deadline = start + self.profile.duration
+        ramp_up_step = self.profile.ramp_up / self.profile.users if self.profile.users else 0
+
+        threads = []
+        for index in range(self.profile.users):
+            user_thread = threading.Thread(
+                target=self._run_user,
+                args=(start + index * ramp_up_step, deadline, names, weights),
+                name=f"stress-user-{index}",
+            )
+            user_thread.start()
+            threads.append(user_thread)
+        for user_thread in threads:
+            user_thread.join()
+
+        self.elapsed = time.monotonic() - start
+        return self.stats, self.elapsed
+
+    def _run_user(self, start_time, deadline, names, weights):
+        """
+        Loop of one virtual user, picks operations following the request mix until deadline
+        """
+        time.sleep(max(0.0, start_time - time.monotonic()))
+        user = StressUser(self.base_url, self.email, self.password, transport=self.transport)
+        user.warm_up()
+        while time.monotonic() < deadline:
+            name = random.choices(names, weights)[0]
+            request_start = time.perf_counter()
+            try:
+                response = OPERATIONS[name](user)
+                is_error = response is not None and response.status_code >= 400
+            except Exception as error:
+                print(f"\n{name}: {error}")
+                response = error
+                is_error = True
+            if response is not None:
+                self.stats.record(name, time.perf_counter() - request_start, is_error)
+            if self.profile.think_time:
+                time.sleep(self.profile.think_time)
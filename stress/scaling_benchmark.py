@@ -0,0 +1,402 @@
+# -----------------------------------------------------------
+#
+# Scaling benchmark of the portal list endpoints
+#
+# -----------------------------------------------------------
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    DATAOWNER_EMAIL,
+    RESEARCHER_EMAIL,
+    SAIL_PASS,
+    SCALING_MAX_EXPONENT,
+    SCALING_REPEATS,
+    SCALING_SIZES,
+    SEED_MAX_WORKERS,
+)
+from utils.digital_contract_helpers import get_digital_contract_payload
+from utils.world_helpers import World, WorldSpec
+
+from api_portal.azure_template_managment_api import AzureTemplateApi
+from api_portal.datafederation_management_api import DataFederationManagementApi
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.datasetfamily_management_api import DatasetFamilyManagementApi
+from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.http_transport import measurement_transport
+from api_portal.sail_portal_api import SailPortalApi
+from stress.latency_stats import percentile
+
+REPORT_VERSION = 1
+
+# List endpoint to the key of its listed objects, in the order the objects are grown,
+# a digital contract is registered on a dataset grown before it
+LIST_ENDPOINTS = {
+    "list_datasets": "Datasets",
+    "list_dataset_families": "DatasetFamilies",
+    "list_azure_templates": "Templates",
+    "list_data_federations": "DataFederations",
+    "list_digital_contracts": "DigitalContracts",
+}
+
+
+def fit_power_law(sizes, latencies):
+    """
+    Least squares fit of latency = coefficient * size ** exponent in log-log space
+
+    :param sizes: objects listed at each step
+    :type sizes: list
+    :param latencies: median latency in seconds at each step
+    :type latencies: list
+    :return: Coefficient, Exponent and R2 of the fit, TailExponent the slope between the two largest steps
+    :rtype: dict
+    """
+    points = [
+        (math.log(size), math.log(latency)) for size, latency in zip(sizes, latencies) if size > 0 and latency > 0
+    ]
+    if len(points) < 2:
+        raise ValueError("A scaling curve needs two steps with objects listed")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if not sxx:
+        raise ValueError("A scaling curve needs two steps of different sizes")
+    exponent = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    intercept = mean_y - exponent * mean_x
+    total = sum((y - mean_y) ** 2 for _, y in points)
+    residual = sum((y - intercept - exponent * x) ** 2 for x, y in points)
+    (x_before, y_before), (x_last, y_last) = points[-2], points[-1]
+    return {
+        "Coefficient": math.exp(intercept),
+        "Exponent": exponent,
+        "R2": 1.0 - residual / total if total else 1.0,
+        "TailExponent": (y_last - y_before) / (x_last - x_before) if x_last != x_before else exponent,
+    }
+
+
+def complexity(exponent):
+    """
+    :param exponent: fitted exponent of the scaling curve
+    :type exponent: float
+    :return: nearest complexity class, e.g. "O(n)"
+    :rtype: string
+    """
+    power = max(0, round(exponent))
+    return {0: "O(1)", 1: "O(n)"}.get(power, f"O(n^{power})")
+
+
+class ScalingBenchmark:
+    """
+    Scaling Benchmark Class, time the list endpoints while the objects of a tenant grow
+
+    The tenant is the organization of the data owner. At each step its datasets, dataset
+    families, azure templates and data federations are topped up to the step size by the
+    data owner and its digital contracts by the researcher, then each list endpoint is
+    timed repeats times. The curve is fitted on the objects actually listed, so objects
+    of the tenant already on the portal are counted too.
+
+    Nothing registered is deleted, run it against a mock or a throwaway portal.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        data_owner_email=DATAOWNER_EMAIL,
+        researcher_email=RESEARCHER_EMAIL,
+        password=SAIL_PASS,
+        repeats=SCALING_REPEATS,
+        max_workers=SEED_MAX_WORKERS,
+        seed=0,
+        transport=None,
+    ):
+        """
+        :param base_url: portal under test
+        :type base_url: string
+        :param data_owner_email: data owner of the tenant, registers and lists the objects
+        :type data_owner_email: string
+        :param researcher_email: researcher of another organization, registers the digital contracts
+        :type researcher_email: string
+        :param password: password of both users
+        :type password: string
+        :param repeats: timed calls of each endpoint per step
+        :type repeats: int
+        :param max_workers: concurrent registrations while growing
+        :type max_workers: int
+        :param seed: seed of the generated payloads
+        :type seed: int
+        :param transport: HttpTransport, defaults to a measurement_transport() without retries and circuit breakers
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        """
+        transport = transport or measurement_transport()
+        self.repeats = repeats
+        self.max_workers = max_workers
+        self.data_owner = SailPortalApi(base_url, data_owner_email, password, transport=transport)
+        self.researcher = SailPortalApi(base_url, researcher_email, password, transport=transport)
+        self.dataset_management = DataSetManagementApi(base_url, transport=transport)
+        self.datasetfamily_management = DatasetFamilyManagementApi(base_url, transport=transport)
+        self.azuretemplate_management = AzureTemplateApi(base_url, transport=transport)
+        self.datafederation_management = DataFederationManagementApi(base_url, transport=transport)
+        self.digitalcontract_management = DigitalContractManagementApi(base_url, transport=transport)
+        # A world of one organization generates the payloads, any one of them on its own
+        self.world = World(WorldSpec(organizations=1, seed=seed))
+        self.seed = seed
+        self.grown = dict.fromkeys(LIST_ENDPOINTS, 0)
+        self._dataset_guids = []
+        self._data_owner_guid = None
+
+    def _register(self, endpoint, index):
+        """
+        Register object index of the collection listed by endpoint
+
+        :return: True when the portal registered it
+        :rtype: bool
+        """
+        if endpoint == "list_datasets":
+            payload, dataset_guid, _ = self.world.dataset(0, index)
+            response, _, _ = self.dataset_management.register_dataset(self.data_owner, payload)
+            if response.status_code == 201:
+                self._dataset_guids.append((index, dataset_guid))
+            return response.status_code == 201
+        if endpoint == "list_dataset_families":
+            payload = self.world.dataset_family(0, index)
+            response, _, _ = self.datasetfamily_management.register_dataset_family(self.data_owner, payload)
+        elif endpoint == "list_azure_templates":
+            payload = self.world.azure_template(0, index)
+            response, _, _ = self.azuretemplate_management.register_azure_template(self.data_owner, payload)
+        elif endpoint == "list_data_federations":
+            payload = self.world.data_federation(0, index)
+            response, _, _ = self.datafederation_management.register_data_federation(self.data_owner, payload)
+        else:
+            _, dataset_guid = self._dataset_guids[index % len(self._dataset_guids)]
+            payload = get_digital_contract_payload(self._data_owner_guid, dataset_guid.strip("{}"))
+            payload["Title"] = f"Scaling Contract {index:06d}"
+            response, _, _ = self.digitalcontract_management.register_digital_contract(self.researcher, payload)
+        return response.status_code in (200, 201)
+
+    def grow(self, size):
+        """
+        Top up every collection of the tenant to size objects registered by this benchmark
+
+        :param size: objects per collection
+        :type size: int
+        :return: failed registrations per endpoint
+        :rtype: dict
+        """
+        if self._data_owner_guid is None:
+            _, user_information, _ = self.data_owner.get_basic_user_info()
+            self._data_owner_guid = user_information["OrganizationGuid"]
+        failures = {}
+        lock = threading.Lock()
+        for endpoint in LIST_ENDPOINTS:
+            failures[endpoint] = 0
+            if endpoint == "list_digital_contracts" and not self._dataset_guids:
+                failures[endpoint] = size - self.grown[endpoint]
+                continue
+
+            def register(index, endpoint=endpoint):
+                try:
+                    registered = self._register(endpoint, index)
+                except Exception:
+                    registered = False
+                if not registered:
+                    with lock:
+                        failures[endpoint] += 1
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sail-scaling") as executor:
+                list(executor.map(register, range(self.grown[endpoint], size)))
+            self._dataset_guids.sort()
+            self.grown[endpoint] = max(self.grown[endpoint], size)
+        return failures
+
+    def measure(self, endpoint):
+        """
+        Time repeats calls of a list endpoint as the data owner, after one untimed warm up call
+
+        :param endpoint: name in LIST_ENDPOINTS
+        :type endpoint: string
+        :return: Objects listed, response Bytes and Median, P95, Min latencies in seconds
+        :rtype: dict
+        """
+        api = {
+            "list_datasets": self.dataset_management,
+            "list_dataset_families": self.datasetfamily_management,
+            "list_azure_templates": self.azuretemplate_management,
+            "list_data_federations": self.datafederation_management,
+            "list_digital_contracts": self.digitalcontract_management,
+        }[endpoint]
+        list_objects = getattr(api, endpoint)
+        list_objects(self.data_owner)
+        latencies = []
+        errors = 0
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            response, response_json, _ = list_objects(self.data_owner)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+        latencies.sort()
+        return {
+            "Objects": len((response_json or {}).get(LIST_ENDPOINTS[endpoint]) or {}),
+            "Bytes": len(response.content),
+            "Errors": errors,
+            "Median": percentile(latencies, 50),
+            "P95": percentile(latencies, 95),
+            "Min": latencies[0],
+        }
+
+    def run(self, sizes=SCALING_SIZES, max_exponent=SCALING_MAX_EXPONENT, on_step=None):
+        """
+        Grow the tenant through sizes, time every list endpoint at each step and fit its curve
+
+        :param sizes: objects per collection at each step, e.g. (10, 100, 1000, 10000)
+        :type sizes: tuple
+        :param max_exponent: an endpoint whose TailExponent exceeds it is reported as a regression
+        :type max_exponent: float
+        :param on_step: called with (size, step report) after each step
+        :type on_step: callable, optional
+        :return: report, json serializable
+        :rtype: dict
+        """
+        sizes = sorted(sizes)
+        steps = []
+        for size in sizes:
+            start = time.monotonic()
+            failures = self.grow(size)
+            grow_elapsed = time.monotonic() - start
+            step = {
+                "Size": size,
+                "GrowElapsed": grow_elapsed,
+                "RegistrationFailures": failures,
+                "Endpoints": {endpoint: self.measure(endpoint) for endpoint in LIST_ENDPOINTS},
+            }
+            steps.append(step)
+            if on_step is not None:
+                on_step(size, step)
+
+        endpoints = {}
+        regressions = []
+        for endpoint in LIST_ENDPOINTS:
+            objects = [step["Endpoints"][endpoint]["Objects"] for step in steps]
+            medians = [step["Endpoints"][endpoint]["Median"] for step in steps]
+            try:
+                fit = fit_power_law(objects, medians)
+            except ValueError as error:
+                endpoints[endpoint] = {"Objects": objects, "Median": medians, "Fit": None, "Error": str(error)}
+                regressions.append(endpoint)
+                continue
+            fit["Complexity"] = complexity(fit["TailExponent"])
+            endpoints[endpoint] = {"Objects": objects, "Median": medians, "Fit": fit}
+            if fit["TailExponent"] > max_exponent:
+                regressions.append(endpoint)
+        return {
+            "Version": REPORT_VERSION,
+            "Sizes": sizes,
+            "Repeats": self.repeats,
+            "Seed": self.seed,
+            "MaxExponent": max_exponent,
+            "Steps": steps,
+            "Endpoints": endpoints,
+            "Regressions": regressions,
+        }
+
+
+def report_table(report):
+    """
+    Human readable table of a scaling report, latencies in milliseconds
+
+    :param report: report of ScalingBenchmark.run
+    :type report: dict
+    :return: table
+    :rtype: string
+    """
+    sizes = report["Sizes"]
+    header = (
+        f"{'Endpoint':<26}" + "".join(f"{f'n={size} ms':>14}" for size in sizes) + f"{'Exponent':>10}{'Tail':>8}  Class"
+    )
+    lines = [header, "-" * len(header)]
+    for endpoint, values in report["Endpoints"].items():
+        fit = values["Fit"] or {}
+        line = f"{endpoint:<26}" + "".join(f"{median * 1000:>14.2f}" for median in values["Median"])
+        if fit:
+            line += f"{fit['Exponent']:>10.2f}{fit['TailExponent']:>8.2f}  {fit['Complexity']}"
+        else:
+            line += f"  {values['Error']}"
+        if endpoint in report["Regressions"]:
+            line += "  REGRESSION"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_sizes(value):
+    """
+    :param value: e.g. "10,100,1000,10000"
+    :type value: string
+    :return: sizes
+    :rtype: tuple
+    """
+    sizes = tuple(int(size) for size in value.split(","))
+    if len(set(sizes)) < 2 or min(sizes) < 1:
+        raise argparse.ArgumentTypeError(f"Need two or more distinct positive sizes: {value}")
+    return sizes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the scaling curve of the portal list endpoints")
+    parser.add_argument("--base-url", default=None, help="portal under test, defaults to an in-process mock portal")
+    parser.add_argument("--data-owner-email", default=DATAOWNER_EMAIL)
+    parser.add_argument("--researcher-email", default=RESEARCHER_EMAIL)
+    parser.add_argument("--password", default=SAIL_PASS)
+    parser.add_argument("--sizes", type=parse_sizes, default=SCALING_SIZES, help="objects per tenant at each step")
+    parser.add_argument("--repeats", type=int, default=SCALING_REPEATS, help="timed calls per endpoint and step")
+    parser.add_argument("--max-workers", type=int, default=SEED_MAX_WORKERS, help="concurrent registrations")
+    parser.add_argument("--max-exponent", type=float, default=SCALING_MAX_EXPONENT, help="regression threshold")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated payloads")
+    parser.add_argument("--output", default="scaling.json", help="file the json report is written to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mock_portal = None
+    base_url = args.base_url
+    if base_url is None:
+        from mock_portal.portal_server import MockPortalServer
+
+        mock_portal = MockPortalServer().start()
+        base_url = mock_portal.base_url
+    transport = measurement_transport()
+    try:
+        benchmark = ScalingBenchmark(
+            base_url,
+            args.data_owner_email,
+            args.researcher_email,
+            args.password,
+            repeats=args.repeats,
+            max_workers=args.max_workers,
+            seed=args.seed,
+            transport=transport,
+        )
+
+        def on_step(size, step):
+            failed = sum(step["RegistrationFailures"].values())
+            print(f"n={size} grown in {step['GrowElapsed']:.1f}s, {failed} registrations failed", flush=True)
+
+        report = benchmark.run(args.sizes, args.max_exponent, on_step=on_step)
+    finally:
+        transport.close()
+        if mock_portal is not None:
+            mock_portal.stop()
+    print(report_table(report))
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Report written to {args.output}")
+    return 1 if report["Regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# -----------------------------------------------------------
+#
+# Seed a portal with generated datasets for performance runs
+#
+# -----------------------------------------------------------
+import argparse
+import sys
+
+from config import API_PORTAL_IP, DATAOWNER_EMAIL, PORT, SAIL_PASS, SEED_MAX_WORKERS
+
+from api_portal.bulk_seeder import BulkDatasetSeeder
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.sail_portal_api import SailPortalApi
+
+
+def parse_size(value):
+    """
+    :param value: "100" or a range "10-1000"
+    :type value: string
+    :return: size, or (low, high) range
+    :rtype: int or tuple
+    """
+    if "-" in value:
+        low, high = (int(bound) for bound in value.split("-", 1))
+        if low > high:
+            raise argparse.ArgumentTypeError(f"Empty range {value}")
+        return low, high
+    return int(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Register generated datasets concurrently and write their manifest")
+    parser.add_argument("--base-url", default=f"https://{API_PORTAL_IP}:{PORT}")
+    parser.add_argument("--email", default=DATAOWNER_EMAIL)
+    parser.add_argument("--password", default=SAIL_PASS)
+    parser.add_argument("--datasets", type=int, default=100, help="datasets registered")
+    parser.add_argument("--tables", type=int, default=3, help="tables per dataset")
+    parser.add_argument("--rows", type=parse_size, default=100, help="rows per table, e.g. 100 or 10-1000")
+    parser.add_argument("--columns", type=parse_size, default=5, help="columns per table, e.g. 5 or 2-40")
+    parser.add_argument("--max-workers", type=int, default=SEED_MAX_WORKERS, help="concurrent registrations")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the generated payloads")
+    parser.add_argument("--name-prefix", default="seed-")
+    parser.add_argument("--manifest", default="seed_manifest.json", help="file the created guids are written to")
+    parser.add_argument("--cleanup", action="store_true", help="delete the datasets of --manifest instead of seeding")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sail_portal = SailPortalApi(base_url=args.base_url, email=args.email, password=args.password)
+    seeder = BulkDatasetSeeder(sail_portal, DataSetManagementApi(base_url=args.base_url), args.max_workers)
+    if args.cleanup:
+        report = seeder.clear_manifest(args.manifest)
+        print(report)
+        return 0 if report.ok else 1
+
+    step = max(1, args.datasets // 20)
+
+    def on_progress(done, total):
+        if done % step == 0 or done == total:
+            print(f"{done}/{total} datasets", flush=True)
+
+    report = seeder.seed(
+        args.datasets,
+        args.tables,
+        args.rows,
+        args.columns,
+        manifest_path=args.manifest,
+        seed=args.seed,
+        name_prefix=args.name_prefix,
+        on_progress=on_progress,
+    )
+    print(report)
+    for failure in report.failures[:10]:
+        print(f"  {failure}")
+    print(f"Manifest written to {args.manifest}")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,47 @@
 """
 Pytest fixtures
 """
+import os
+import random
 import sys
 
 import pytest
 from api_portal.account_management_api import AccountManagementApi
 from api_portal.azure_template_managment_api import AzureTemplateApi
+from api_portal.bulk_cleanup import BulkCleanup
+from api_portal.cassette import CASSETTE_MODES, Cassette
 from api_portal.datafederation_management_api import DataFederationManagementApi
 from api_portal.dataset_management_api import DataSetManagementApi
 from api_portal.datasetfamily_management_api import DatasetFamilyManagementApi
 from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.http_transport import HttpTransport, measurement_transport, set_default_transport
+from api_portal.retry_policy import RetryPolicy
 from api_portal.sail_portal_api import SailPortalApi
 from api_portal.virtual_machine_api import VirtualMachineApi
-from config import API_PORTAL_IP, DATAOWNER_EMAIL, ORCHESTRATOR_PATH, PORT, RESEARCHER_EMAIL, SAIL_PASS
+from config import (
+    API_PORTAL_IP,
+    AUTH_ACCOUNTS,
+    AUTH_CONCURRENCY_LEVELS,
+    AUTH_LEVEL_DURATION,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    LIFECYCLE_CONCURRENCY_LEVELS,
+    LIFECYCLE_CONTRACTS,
+    MOCK_PORTAL_ERROR_RATE,
+    MOCK_PORTAL_JITTER,
+    MOCK_PORTAL_LATENCY,
+    ORCHESTRATOR_PATH,
+    PORT,
+    RETRY_MAX_RETRIES,
+    SCALING_SIZES,
+    STRESS_DURATION,
+    STRESS_RAMP_UP,
+    STRESS_REQUEST_MIX,
+    STRESS_USERS,
+)
+from mock_portal.portal_server import FaultProfile, MockPortalServer
+from test_api.request_timing_plugin import RequestTimingPlugin
+from utils.tenant_helpers import Tenant
 
 
 def pytest_addoption(parser):
@@ -24,114 +53,327 @@ def pytest_addoption(parser):
     """
     parser.addoption("--ip", action="store", default=API_PORTAL_IP)
     parser.addoption("--port", action="store", default=PORT)
+    parser.addoption("--pool-connections", action="store", type=int, default=HTTP_POOL_CONNECTIONS)
+    parser.addoption("--pool-maxsize", action="store", type=int, default=HTTP_POOL_MAXSIZE)
+    parser.addoption("--pool-block", action="store_true", default=False)
+    parser.addoption("--stress-users", action="store", type=int, default=STRESS_USERS)
+    parser.addoption("--stress-ramp-up", action="store", type=float, default=STRESS_RAMP_UP)
+    parser.addoption("--stress-duration", action="store", type=float, default=STRESS_DURATION)
+    parser.addoption("--stress-mix", action="store", default=STRESS_REQUEST_MIX)
+    parser.addoption("--stress-report", action="store", default=None)
+    parser.addoption("--lifecycle-contracts", action="store", type=int, default=LIFECYCLE_CONTRACTS)
+    parser.addoption(
+        "--lifecycle-levels", action="store", default=",".join(str(level) for level in LIFECYCLE_CONCURRENCY_LEVELS)
+    )
+    parser.addoption("--auth-accounts", action="store", type=int, default=AUTH_ACCOUNTS)
+    parser.addoption("--auth-levels", action="store", default=",".join(str(level) for level in AUTH_CONCURRENCY_LEVELS))
+    parser.addoption("--auth-duration", action="store", type=float, default=AUTH_LEVEL_DURATION)
+    parser.addoption("--scaling-sizes", action="store", default=",".join(str(size) for size in SCALING_SIZES))
+    parser.addoption("--mock-portal", action="store_true", default=False)
+    parser.addoption("--mock-latency", action="store", type=float, default=MOCK_PORTAL_LATENCY)
+    parser.addoption("--mock-jitter", action="store", type=float, default=MOCK_PORTAL_JITTER)
+    parser.addoption("--mock-error-rate", action="store", type=float, default=MOCK_PORTAL_ERROR_RATE)
+    parser.addoption("--isolated-tenants", action="store_true", default=False)
+    parser.addoption("--max-retries", action="store", type=int, default=RETRY_MAX_RETRIES)
+    parser.addoption("--cassette", action="store", default=None)
+    parser.addoption("--cassette-mode", action="store", choices=CASSETTE_MODES, default="replay")
 
     sys.path.insert(0, ORCHESTRATOR_PATH)
 
 
-@pytest.fixture(autouse=True)
-def get_base_url(pytestconfig):
+def pytest_configure(config):
     """
-    Fixture to set base_url for tests in session
+    Pytest configure, register the per endpoint request timing report
+
+    :param config:
+    :type config:
+    """
+    config.pluginmanager.register(RequestTimingPlugin(), "request_timing")
+
+
+@pytest.fixture(scope="session")
+def http_transport(pytestconfig):
+    """
+    Fixture for the keep-alive HttpTransport shared by all api clients in session
+
+    With --cassette the traffic is recorded into the cassette file (--cassette-mode record)
+    or served from it without network (--cassette-mode replay).
+
+    :param pytestconfig:
+    :type pytestconfig:
+    :return: HttpTransport
+    :rtype: class : api_portal.http_transport.HttpTransport
+    """
+    cassette_path = pytestconfig.getoption("cassette")
+    cassette = Cassette(cassette_path, pytestconfig.getoption("cassette_mode")) if cassette_path else None
+    transport = HttpTransport(
+        pool_connections=pytestconfig.getoption("pool_connections"),
+        pool_maxsize=pytestconfig.getoption("pool_maxsize"),
+        pool_block=pytestconfig.getoption("pool_block"),
+        cassette=cassette,
+        retry_policy=RetryPolicy(max_retries=pytestconfig.getoption("max_retries")),
+    )
+    # Api clients created directly in tests share the session transport too
+    set_default_transport(transport)
+    yield transport
+    transport.close()
+
+
+@pytest.fixture(scope="session")
+def stress_transport(pytestconfig):
+    """
+    Fixture for the HttpTransport of the stress and benchmark tests, every request sent once
+
+    The retries and circuit breakers of the session transport would hide failures from the
+    error rates and add their backoff to the latencies.
+
+    :param pytestconfig:
+    :type pytestconfig:
+    :return: HttpTransport
+    :rtype: class : api_portal.http_transport.HttpTransport
+    """
+    transport = measurement_transport(
+        pool_connections=pytestconfig.getoption("pool_connections"),
+        pool_maxsize=pytestconfig.getoption("pool_maxsize"),
+        pool_block=pytestconfig.getoption("pool_block"),
+    )
+    yield transport
+    transport.close()
+
+
+@pytest.fixture(scope="session")
+def mock_portal(pytestconfig):
+    """
+    Fixture for the in-process mock SAIL portal, started only with --mock-portal
 
     :param pytestconfig:
     :type pytestconfig:
+    :return: MockPortalServer, None when testing against a real portal
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    if not pytestconfig.getoption("mock_portal"):
+        yield None
+        return
+    faults = FaultProfile(
+        latency=pytestconfig.getoption("mock_latency"),
+        jitter=pytestconfig.getoption("mock_jitter"),
+        error_rate=pytestconfig.getoption("mock_error_rate"),
+    )
+    with MockPortalServer(faults=faults) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def portal_base_url(pytestconfig, mock_portal):
+    """
+    Fixture for the base_url of the portal under test
+
+    :param pytestconfig:
+    :type pytestconfig:
+    :param mock_portal: fixture, mock portal served instead of --ip/--port when given --mock-portal
+    :type mock_portal: class : mock_portal.portal_server.MockPortalServer
     :return: base_url
     :rtype: string
     """
-    base_url = f"https://{pytestconfig.getoption('ip')}:{pytestconfig.getoption('port')}"
-    return base_url
+    if mock_portal is not None:
+        return mock_portal.base_url
+    return f"https://{pytestconfig.getoption('ip')}:{pytestconfig.getoption('port')}"
+
+
+@pytest.fixture(autouse=True)
+def get_base_url(portal_base_url, http_transport):
+    """
+    Fixture to set base_url for tests in session
+
+    :param portal_base_url: fixture, base_url of the portal under test
+    :type portal_base_url: string
+    :param http_transport: fixture, HttpTransport shared by the api clients using base_url
+    :type http_transport: class : api_portal.http_transport.HttpTransport
+    :return: base_url
+    :rtype: string
+    """
+    return portal_base_url
+
+
+@pytest.fixture(autouse=True)
+def cassette_seed(request, http_transport):
+    """
+    Fixture seeding random per test from the cassette, a replayed test generates the random names it was recorded with
+
+    :param http_transport: fixture, HttpTransport recording or replaying a cassette
+    :type http_transport: class : api_portal.http_transport.HttpTransport
+    """
+    if http_transport.cassette is not None:
+        random.seed(f"{http_transport.cassette.seed}-{request.node.nodeid}")
+
+
+@pytest.fixture(scope="session")
+def tenant(pytestconfig, portal_base_url, http_transport):
+    """
+    Fixture for the researcher and data owner users of this test process
+
+    With --isolated-tenants, or when run by a pytest-xdist worker, a fresh user pair is
+    added to the config.py organizations and deleted at the end of the session, and the
+    resource titles of the process are namespaced. Otherwise the config.py users are shared.
+
+    :param pytestconfig:
+    :type pytestconfig:
+    :param portal_base_url: fixture, base_url of the portal under test
+    :type portal_base_url: string
+    :param http_transport: fixture, HttpTransport shared by all api clients in session
+    :type http_transport: class : api_portal.http_transport.HttpTransport
+    :return: Tenant
+    :rtype: class : utils.tenant_helpers.Tenant
+    """
+    if not (pytestconfig.getoption("isolated_tenants") or os.environ.get("PYTEST_XDIST_WORKER")):
+        yield Tenant()
+        return
+    account_management = AccountManagementApi(base_url=portal_base_url, transport=http_transport)
+    worker_tenant = Tenant.for_worker()
+    worker_tenant.provision(portal_base_url, account_management, transport=http_transport)
+    yield worker_tenant
+    worker_tenant.teardown(portal_base_url, account_management)
 
 
 @pytest.fixture
-def researcher_sail_portal(get_base_url):
+def researcher_sail_portal(get_base_url, http_transport, tenant):
     """
     Fixture for SailPortalApi with researcher session
 
     :return: SailPortalApi
     :rtype: class : api_portal.sail_portal_api.SailPortalApi
     """
-    return SailPortalApi(base_url=get_base_url, email=RESEARCHER_EMAIL, password=SAIL_PASS)
+    return SailPortalApi(
+        base_url=get_base_url, email=tenant.researcher_email, password=tenant.password, transport=http_transport
+    )
 
 
 @pytest.fixture
-def data_owner_sail_portal(get_base_url):
+def data_owner_sail_portal(get_base_url, http_transport, tenant):
     """
     Fixture for SailPortalApi with datowner session
 
     :return: SailPortalApi
     :rtype: class : api_portal.sail_portal_api.SailPortalApi
     """
-    return SailPortalApi(base_url=get_base_url, email=DATAOWNER_EMAIL, password=SAIL_PASS)
+    return SailPortalApi(
+        base_url=get_base_url, email=tenant.data_owner_email, password=tenant.password, transport=http_transport
+    )
+
+
+@pytest.fixture(scope="session")
+def session_bulk_cleanup(portal_base_url, http_transport, tenant):
+    """
+    Fixture for a BulkCleanup of the tenant users shared by the session, clears the
+    dataset families, data federations and azure templates of an isolated tenant at session end
+
+    The shared tenant owns every resource of the config.py accounts, also those not made
+    by this run, so nothing is cleared for it.
+
+    :param portal_base_url: fixture, base_url of the portal under test
+    :type portal_base_url: string
+    :param http_transport: fixture, HttpTransport shared by all api clients in session
+    :type http_transport: class : api_portal.http_transport.HttpTransport
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    :return: BulkCleanup
+    :rtype: class : api_portal.bulk_cleanup.BulkCleanup
+    """
+    sail_portals = [
+        SailPortalApi(base_url=portal_base_url, email=email, password=tenant.password, transport=http_transport)
+        for email in (tenant.data_owner_email, tenant.researcher_email)
+    ]
+    cleanup = BulkCleanup(sail_portals, owns=tenant.owns)
+    yield cleanup
+    if not tenant.isolated:
+        return
+    report = cleanup.clear_all(
+        DatasetFamilyManagementApi(base_url=portal_base_url, transport=http_transport),
+        DataFederationManagementApi(base_url=portal_base_url, transport=http_transport),
+        AzureTemplateApi(base_url=portal_base_url, transport=http_transport),
+    )
+    print(f"\nSession cleanup: {report}")
+
+
+@pytest.fixture
+def bulk_cleanup(data_owner_sail_portal, researcher_sail_portal, tenant):
+    """
+    Fixture for a BulkCleanup of the tenant resources of the researcher and data owner
+
+    :return: BulkCleanup
+    :rtype: class : api_portal.bulk_cleanup.BulkCleanup
+    """
+    return BulkCleanup([data_owner_sail_portal, researcher_sail_portal], owns=tenant.owns)
 
 
 @pytest.fixture
-def account_management(get_base_url):
+def account_management(get_base_url, http_transport):
     """
     Fixture for AccountManagementApi
 
     :return: AccountManagementApi
     :rtype: class : api_portal.account_management_api.AccountManagementApi
     """
-    return AccountManagementApi(base_url=get_base_url)
+    return AccountManagementApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def dataset_management(get_base_url):
+def dataset_management(get_base_url, http_transport):
     """
     Fixture for DataSetManagementApi
 
     :return: DataSetManagementApi
     :rtype: class : api_portal.dataset_management_api.DataSetManagementApi
     """
-    return DataSetManagementApi(base_url=get_base_url)
+    return DataSetManagementApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def digitalcontract_management(get_base_url):
+def digitalcontract_management(get_base_url, http_transport):
     """
     Fixture for DigitalContractManagementApi
 
     :return: DigitalContractManagementApi
     :rtype: class : api_portal.digital_contract_management_api.DigitalContractManagementApi
     """
-    return DigitalContractManagementApi(base_url=get_base_url)
+    return DigitalContractManagementApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def azuretemplate_management(get_base_url):
+def azuretemplate_management(get_base_url, http_transport):
     """
     Fixture for DigitalContractManagementApi
 
     :return: DigitalContractManagementApi
     :rtype: class : api_portal.digital_contract_management_api.DigitalContractManagementApi
     """
-    return AzureTemplateApi(base_url=get_base_url)
+    return AzureTemplateApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def datasetfamily_management(get_base_url):
+def datasetfamily_management(get_base_url, http_transport):
     """
     Fixture for DatasetFamilyManagementApi
 
     :return: DatasetFamilyManagementApi
     :rtype: class : api_portal.datasetfamily_management_api.DatasetFamilyManagementApi
     """
-    return DatasetFamilyManagementApi(base_url=get_base_url)
+    return DatasetFamilyManagementApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def datafederation_management(get_base_url):
+def datafederation_management(get_base_url, http_transport):
     """
     Fixture for DataFederationManagementApi
 
     :return: DataFederationManagementApi
     :rtype: class : api_portal.datafederation_management.DataFederationManagementApi
     """
-    return DataFederationManagementApi(base_url=get_base_url)
+    return DataFederationManagementApi(base_url=get_base_url, transport=http_transport)
 
 
 @pytest.fixture
-def virtualmachine_management(get_base_url):
+def virtualmachine_management(get_base_url, http_transport):
     """
     [summary]
 
@@ -140,4 +382,4 @@ def virtualmachine_management(get_base_url):
     :return: [description]
     :rtype: [type]
     """
-    return VirtualMachineApi(base_url=get_base_url)
+    return VirtualMachineApi(base_url=get_base_url, transport=http_transport)
@@ -0,0 +1,67 @@
+# -----------------------------------------------------------
+#
+# Pytest plugin reporting per endpoint request timings
+#
+# -----------------------------------------------------------
+from json import dumps
+
+import pytest
+from _pytest.junitxml import xml_key
+from api_portal.request_timing import summarize_timings, timing_recorder
+from api_portal.retry_policy import RetryStats, retry_stats
+
+
+class RequestTimingPlugin:
+    """
+    Request Timing Plugin Class
+
+    Aggregates the RequestTiming of every api_portal call made during the session into a
+    per endpoint histogram, written into the junit xml properties and the terminal summary
+    together with the retry and circuit breaker counters of the endpoints that had any.
+    """
+
+    def __init__(self, recorder=timing_recorder, stats=retry_stats):
+        self.recorder = recorder
+        self.stats = stats
+        self.summary = {}
+        self.retries = {}
+
+    def pytest_sessionstart(self, session):
+        self.recorder.clear()
+        self.stats.clear()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session):
+        # tryfirst so the properties are added before the junitxml plugin writes its file
+        self.summary = summarize_timings(self.recorder.records())
+        self.retries = self.stats.snapshot()
+        config = session.config
+        store = config.stash if hasattr(config, "stash") else config._store
+        log_xml = store.get(xml_key, None)
+        if log_xml is None:
+            return
+        for endpoint, timings in self.summary.items():
+            log_xml.add_global_property(f"request_timing {endpoint}", dumps(timings, separators=(",", ":")))
+        for endpoint, counters in self.retries.items():
+            log_xml.add_global_property(f"retry_policy {endpoint}", dumps(counters, separators=(",", ":")))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.summary:
+            terminalreporter.section("request timing")
+            terminalreporter.write_line(
+                f"{'Endpoint':<64}{'Requests':>9}{'Errors':>7}{'Relogin':>8}{'Retries':>8}"
+                f"{'TTFB ms':>9}{'Total ms':>9}{'Max ms':>9}"
+            )
+            for endpoint, timings in self.summary.items():
+                terminalreporter.write_line(
+                    f"{endpoint:<64}{timings['Requests']:>9}{timings['Errors']:>7}{timings['ImplicitLogins']:>8}"
+                    f"{timings['Retries']:>8}{timings['MeanTtfb'] * 1000:>9.1f}{timings['MeanTotal'] * 1000:>9.1f}"
+                    f"{timings['MaxTotal'] * 1000:>9.1f}"
+                )
+        if self.retries:
+            terminalreporter.section("retry policy")
+            terminalreporter.write_line(f"{'Endpoint':<64}" + "".join(f"{field:>16}" for field in RetryStats.FIELDS))
+            for endpoint, counters in self.retries.items():
+                terminalreporter.write_line(
+                    f"{endpoint:<64}" + "".join(f"{counters[field]:>16}" for field in RetryStats.FIELDS)
+                )
@@ -6,10 +6,10 @@
 import pytest
 from api_portal.sail_portal_api import SailPortalApi
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from config import SAIL_PASS
 from utils.account_helpers import get_add_user_payload
 from utils.helpers import pretty_print, random_name
+from utils.schema_helpers import get_validator
 
 
 def debug_helper(response):
@@ -37,26 +37,7 @@ def test_get_user_organization_info(sail_portal, account_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "OrganizationInformation": {
-            "type": "dict",
-            "schema": {
-                "OrganizationAddress": {"type": "string"},
-                "OrganizationName": {"type": "string"},
-                "PrimaryContactEmail": {"type": "string"},
-                "PrimaryContactName": {"type": "string"},
-                "PrimaryContactPhoneNumber": {"type": "string"},
-                "PrimaryContactTitle": {"type": "string"},
-                "SecondaryContactEmail": {"type": "string"},
-                "SecondaryContactName": {"type": "string"},
-                "SecondaryContactPhoneNumber": {"type": "string"},
-                "SecondaryContactTitle": {"type": "string"},
-            },
-        },
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("OrganizationInformation")
 
     # Act
     test_response, test_response_json, user_eosb = account_management.get_user_organization_info(sail_portal)
@@ -89,8 +70,7 @@ def test_update_organization_information(sail_portal, account_management, reques
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     test_payload = {
         "OrganizationInformation": {
             "OrganizationName": "Raptors12345",
@@ -152,8 +132,7 @@ def test_update_user_access_rights(sail_portal, account_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_response, test_response_json, user_eosb = account_management.update_user_access_rights(sail_portal)
@@ -185,27 +164,7 @@ def test_list_organization_users(sail_portal, account_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "OrganizationUsers": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "AccessRights": {"type": "number"},
-                    "AccountStatus": {"type": "number"},
-                    "Email": {"type": "string"},
-                    "PhoneNumber": {"type": "string"},
-                    "TimeOfAccountCreation": {"type": "number"},
-                    "Title": {"type": "string"},
-                    "UserGuid": {"type": "string"},
-                    "Username": {"type": "string"},
-                },
-            },
-        },
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("OrganizationUsers")
 
     # Act
     test_response, test_response_json, user_eosb = account_management.list_organization_users(sail_portal)
@@ -237,8 +196,7 @@ def test_update_user_information(sail_portal, account_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     test_payload = {
         "UserInformation": {
             "Name": "lowry",
@@ -278,8 +236,7 @@ def test_add_user(sail_portal, get_base_url, account_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_payload, user_email = get_add_user_payload()
@@ -315,8 +272,7 @@ def test_delete_user(sail_portal, account_management, get_base_url, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     test_payload, user_email = get_add_user_payload()
     account_management.add_user(sail_portal, payload=test_payload)
 
@@ -354,8 +310,7 @@ def test_recover_user(sail_portal, account_management, get_base_url, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     test_payload, user_email = get_add_user_payload()
     account_management.add_user(sail_portal, payload=test_payload)
     _, _, deleted_user_eosb, deleted_user_guid = account_management.delete_user(
@@ -5,9 +5,9 @@
 # -----------------------------------------------------------
 import pytest
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from utils.az_template_helpers import get_az_template_payload
 from utils.helpers import pretty_print
+from utils.schema_helpers import get_validator
 
 
 def debug_helper(response):
@@ -16,23 +16,35 @@ def debug_helper(response):
     print(f"------------END--------------")
 
 
-@pytest.fixture(scope="function", autouse=True)
-def delete_all_azure_template(data_owner_sail_portal, researcher_sail_portal, azuretemplate_management):
+def get_tenant_template_guids(sail_portal, azuretemplate_management, tenant):
     """
-    Helper Function to delete all azure templates
+    Helper Function to list the guids of the azure templates of the tenant
 
     :param sail_portal: fixture, SailPortalApi
     :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
     :param azuretemplate_management: fixture, AzureTemplateApi
     :type azuretemplate_management: class  : api_portal.azure_template_managment_api.AzureTemplateApi
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    :return: template guids
+    :rtype: list
+    """
+    templates = azuretemplate_management.list_azure_templates(sail_portal)[1].get("Templates")
+    return [template_guid for template_guid, template in templates.items() if tenant.owns(template.get("Name"))]
+
+
+@pytest.fixture(scope="function", autouse=True)
+def delete_all_azure_template(bulk_cleanup, azuretemplate_management):
+    """
+    Helper Function to delete all azure templates of the tenant
+
+    :param bulk_cleanup: fixture, BulkCleanup of the data owner and researcher
+    :type bulk_cleanup: class : api_portal.bulk_cleanup.BulkCleanup
+    :param azuretemplate_management: fixture, AzureTemplateApi
+    :type azuretemplate_management: class  : api_portal.azure_template_managment_api.AzureTemplateApi
     """
-    roles = [data_owner_sail_portal, researcher_sail_portal]
-    for role in roles:
-        _, response_json, _ = azuretemplate_management.list_azure_templates(role)
-        for template_guid in response_json.get("Templates").keys():
-            payload = {"TemplateGuid": template_guid}
-            del_response, _, _ = azuretemplate_management.delete_azure_template(role, payload)
-            assert_that(del_response.status_code).is_equal_to(200)
+    report = bulk_cleanup.clear_azure_templates(azuretemplate_management)
+    assert_that(report.failures, description=f"{report}").is_empty()
 
 
 # TODO Register azure template
@@ -44,7 +56,7 @@ def delete_all_azure_template(data_owner_sail_portal, researcher_sail_portal, az
         "data_owner_sail_portal",
     ],
 )
-def test_register_azure_templates(sail_portal, azuretemplate_management, request):
+def test_register_azure_templates(sail_portal, azuretemplate_management, tenant, request):
     """
     Test Register of Azure Templates
 
@@ -55,15 +67,11 @@ def test_register_azure_templates(sail_portal, azuretemplate_management, request
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_response, test_response_json, user_eosb = azuretemplate_management.register_azure_template(
-        sail_portal, payload=get_az_template_payload()
+        sail_portal, payload=get_az_template_payload(tenant.namespaced("Test_template"))
     )
 
     # Assert
@@ -83,7 +91,7 @@ def test_register_azure_templates(sail_portal, azuretemplate_management, request
         "data_owner_sail_portal",
     ],
 )
-def test_list_azure_templates(sail_portal, azuretemplate_management, request):
+def test_list_azure_templates(sail_portal, azuretemplate_management, tenant, request):
     """
     Test List of Azure Templates
     :param sail_portal: fixture, SailPortalApi
@@ -93,14 +101,11 @@ def test_list_azure_templates(sail_portal, azuretemplate_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-        "Templates": {"type": "dict"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("AzureTemplates")
     # Register Unique Azure Templates
-    azuretemplate_management.register_azure_template(sail_portal, payload=get_az_template_payload())
+    azuretemplate_management.register_azure_template(
+        sail_portal, payload=get_az_template_payload(tenant.namespaced("Test_template"))
+    )
 
     # Act
     test_response, test_response_json, user_eosb = azuretemplate_management.list_azure_templates(sail_portal)
@@ -122,7 +127,7 @@ def test_list_azure_templates(sail_portal, azuretemplate_management, request):
         "data_owner_sail_portal",
     ],
 )
-def test_pull_azure_templates(sail_portal, azuretemplate_management, request):
+def test_pull_azure_templates(sail_portal, azuretemplate_management, tenant, request):
     """
     Test Pull of Azure Template
 
@@ -133,15 +138,12 @@ def test_pull_azure_templates(sail_portal, azuretemplate_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-        "Template": {"type": "dict"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("AzureTemplate")
     # Register Unique Azure Templates
-    azuretemplate_management.register_azure_template(sail_portal, payload=get_az_template_payload())
-    list_template_guids = list(azuretemplate_management.list_azure_templates(sail_portal)[1].get("Templates").keys())
+    azuretemplate_management.register_azure_template(
+        sail_portal, payload=get_az_template_payload(tenant.namespaced("Test_template"))
+    )
+    list_template_guids = get_tenant_template_guids(sail_portal, azuretemplate_management, tenant)
     template_guid_under_test = list_template_guids[0]
     print(f"This is full list of azure templates registered: {list_template_guids}")
     print(f"This is the template guid under test: {template_guid_under_test}")
@@ -169,7 +171,7 @@ def test_pull_azure_templates(sail_portal, azuretemplate_management, request):
         "data_owner_sail_portal",
     ],
 )
-def test_update_azure_templates(sail_portal, azuretemplate_management, request):
+def test_update_azure_templates(sail_portal, azuretemplate_management, tenant, request):
     """
     Test Update of Azure Template (Name, Description)
 
@@ -180,21 +182,19 @@ def test_update_azure_templates(sail_portal, azuretemplate_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Register Unique Azure Templates
-    azuretemplate_management.register_azure_template(sail_portal, payload=get_az_template_payload())
-    list_template_guids = list(azuretemplate_management.list_azure_templates(sail_portal)[1].get("Templates").keys())
+    azuretemplate_management.register_azure_template(
+        sail_portal, payload=get_az_template_payload(tenant.namespaced("Test_template"))
+    )
+    list_template_guids = get_tenant_template_guids(sail_portal, azuretemplate_management, tenant)
     template_guid_under_test = list_template_guids[0]
     print(f"This is full list of azure templates registered: {list_template_guids}")
     print(f"This is the template guid under test: {template_guid_under_test}")
     update_payload = {
         "TemplateGuid": template_guid_under_test,
         "TemplateData": {
-            "Name": "Test_template4Update",
+            "Name": tenant.namespaced("Test_template4Update"),
             "Description": "Test_template_spices1",
             "SubscriptionID": "3d2b9951-a0c8-4dc3-8114-2776b047b15c",
             "Secret": "1YEn1Y.bVTVk-dzm9voTWyf7DrgQF29xL2",
@@ -235,7 +235,7 @@ def test_update_azure_templates(sail_portal, azuretemplate_management, request):
         "data_owner_sail_portal",
     ],
 )
-def test_delete_azure_templates(sail_portal, azuretemplate_management, request):
+def test_delete_azure_templates(sail_portal, azuretemplate_management, tenant, request):
     """
     Test Delete of Azure Template
 
@@ -246,15 +246,13 @@ def test_delete_azure_templates(sail_portal, azuretemplate_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Register Unique Azure Template
-    azuretemplate_management.register_azure_template(sail_portal, payload=get_az_template_payload())
+    azuretemplate_management.register_azure_template(
+        sail_portal, payload=get_az_template_payload(tenant.namespaced("Test_template"))
+    )
     # List Azure Template
-    list_template_guids = list(azuretemplate_management.list_azure_templates(sail_portal)[1].get("Templates").keys())
+    list_template_guids = get_tenant_template_guids(sail_portal, azuretemplate_management, tenant)
     template_guid_under_test = list_template_guids[0]
     print(f"This is full list of azure templates registered: {list_template_guids}")
     print(f"This is the template guid under test: {template_guid_under_test}")
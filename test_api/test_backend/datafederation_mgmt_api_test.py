@@ -6,9 +6,10 @@
 import json
 
 import pytest
+from api_portal.datafederation_management_api import DataFederationManagementApi
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from utils.helpers import pretty_print
+from utils.schema_helpers import get_validator
 
 datasetfederation_payload = {
     "DataFederationDescription": "This data federation has been created for the purposes of unit testing",
@@ -68,8 +69,33 @@ datasetfederation_payload_long_desc_long_name = {
 }
 
 
+@pytest.fixture(scope="module", autouse=True)
+def clear_all_data_federations(session_bulk_cleanup, portal_base_url, http_transport, tenant):
+    """
+    Fixture Function to setup and teardown, clear the data federations of an isolated tenant around the module,
+    those of the shared tenant include federations not made by this run and are kept
+
+    :param session_bulk_cleanup: fixture, BulkCleanup of the tenant users
+    :type session_bulk_cleanup: class : api_portal.bulk_cleanup.BulkCleanup
+    :param portal_base_url: fixture, base_url of the portal under test
+    :type portal_base_url: string
+    :param http_transport: fixture, HttpTransport shared by all api clients in session
+    :type http_transport: class : api_portal.http_transport.HttpTransport
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    """
+    if not tenant.isolated:
+        yield
+        return
+    datafederation_management = DataFederationManagementApi(base_url=portal_base_url, transport=http_transport)
+    session_bulk_cleanup.clear_data_federations(datafederation_management)
+    yield
+    report = session_bulk_cleanup.clear_data_federations(datafederation_management)
+    print(f"\nData federation cleanup: {report}")
+
+
 @pytest.mark.active
-def test_register_good_data_federation(data_owner_sail_portal, datafederation_management):
+def test_register_good_data_federation(data_owner_sail_portal, datafederation_management, tenant):
     """
     Test Dataowner register of a good data federation
 
@@ -77,14 +103,19 @@ def test_register_good_data_federation(data_owner_sail_portal, datafederation_ma
     :type data_owner_sail_portal: class : api_portal.sail_portal_api.SailPortalApi
     :param datafederation_management: fixture, DataFederationManagementApi
     :type datafederation_management: datafederation_management_api.DataFederationManagementApi
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
     """
     # Arrange
-    expect_json_schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(expect_json_schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_response, test_response_json, user_eosb = datafederation_management.register_data_federation(
-        data_owner_sail_portal, payload=datasetfederation_payload
+        data_owner_sail_portal,
+        payload=dict(
+            datasetfederation_payload,
+            DataFederationName=tenant.namespaced(datasetfederation_payload["DataFederationName"]),
+        ),
     )
 
     # Assert
@@ -140,49 +171,7 @@ def test_list_data_federations(data_owner_sail_portal, datafederation_management
     :type datafederation_management: datafederation_management_api.DataFederationManagementApi
     """
     # Arrange
-    schema = {
-        "DataFederations": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "Description": {"type": "string"},
-                    "Name": {"type": "string"},
-                    "DataSubmitterOrganizations": {
-                        "type": "dict",
-                        "keysrules": {
-                            "type": "string",
-                            "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                        },
-                    },
-                    "DatasetFamilies": {"type": "dict"},
-                    "ResearcherOrganizations": {
-                        "type": "dict",
-                        "keysrules": {
-                            "type": "string",
-                            "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                        },
-                    },
-                    "Identifier": {
-                        "type": "string",
-                        "regex": r"{1[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                    },
-                    "OrganizationName": {"type": "string"},
-                    "OrganizationIdentifier": {
-                        "type": "string",
-                        "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                    },
-                },
-            },
-            "keysrules": {
-                "type": "string",
-                "regex": r"{1[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DataFederations")
 
     # Act
     test_response, test_response_json, user_eosb = datafederation_management.list_data_federations(
@@ -207,49 +196,7 @@ def test_list_data_federations_none_linked(researcher_sail_portal, datafederatio
     :type datafederation_management: datafederation_management_api.DataFederationManagementApi
     """
     # Arrange
-    schema = {
-        "DataFederations": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "Description": {"type": "string"},
-                    "Name": {"type": "string"},
-                    "DataSubmitterOrganizations": {
-                        "type": "dict",
-                        "keysrules": {
-                            "type": "string",
-                            "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                        },
-                    },
-                    "DatasetFamilies": {"type": "dict"},
-                    "ResearcherOrganizations": {
-                        "type": "dict",
-                        "keysrules": {
-                            "type": "string",
-                            "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                        },
-                    },
-                    "Identifier": {
-                        "type": "string",
-                        "regex": r"{1[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                    },
-                    "OrganizationName": {"type": "string"},
-                    "OrganizationIdentifier": {
-                        "type": "string",
-                        "regex": r"{0[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-                    },
-                },
-            },
-            "keysrules": {
-                "type": "string",
-                "regex": r"{1[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DataFederations")
 
     # Act
     test_response, test_response_json, user_eosb = datafederation_management.list_data_federations(
@@ -4,10 +4,11 @@
 #
 # -----------------------------------------------------------
 import pytest
+from api_portal.bulk_seeder import BulkDatasetSeeder, read_manifest
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from utils.dataset_helpers import get_dataset_payload
 from utils.helpers import pretty_print
+from utils.schema_helpers import get_validator
 
 
 def debug_helper(response):
@@ -53,64 +54,7 @@ def test_list_datasets(sail_portal, dataset_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Datasets": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "DataOwnerGuid": {"type": "string"},
-                    "DatasetGuid": {"type": "string"},
-                    "DatasetName": {"type": "string"},
-                    "Description": {"type": "string"},
-                    "JurisdictionalLimitations": {"type": "string"},
-                    "Keywords": {"type": "string"},
-                    "OrganizationName": {"type": "string"},
-                    "PrivacyLevel": {"type": "number"},
-                    "PublishDate": {"type": "number"},
-                    "Tables": {
-                        "type": "dict",
-                        "valueschema": {
-                            "type": "dict",
-                            "schema": {
-                                "TableIdentifier":{"type":"string"},
-                                "ColumnName": {"type": "string"},
-                                "Description": {"type": "string"},
-                                "Tags": {"type": "string"},
-                                "Hashtags": {"type": "string", "required": False},
-                                "Name": {"type": "string", "required": False},
-                                "NumberColumns": {"type": "number", "required": False},
-                                "NumberRows": {"type": "number", "required": False},
-                                "Title": {"type": "string"},
-                                "NumberOfColumns": {"type": "number"},
-                                "NumberOfRows": {"type": "number"},
-                                "CompressedDataSizeInBytes": {"type": "number"},
-                                "DataSizeInBytes": {"type": "number"},
-                                "AllColumnProperties": {
-                                    "type": "dict",
-                                    "valueschema": {
-                                        "type": "dict",
-                                        "schema": {
-                                            "ColumnIdentifier":{"type":"string"},
-                                            "Description":{"type":"string"},
-                                            "Tags":{"type":"string"},
-                                            "Title":{"type":"string"},
-                                            "Type":{"type":"string"},
-                                            "Units":{"type":"string"},
-                                        },
-                                    },
-                                },
-                            },
-                        },
-                    },
-                    "VersionNumber": {"type": "string"},
-                },
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("Datasets")
     # Act
     test_response, test_response_json, user_eosb = dataset_management.list_datasets(sail_portal)
     # Assert
@@ -121,6 +65,36 @@ def test_list_datasets(sail_portal, dataset_management, request):
     assert_that(test_response.status_code).is_equal_to(200)
 
 
+@pytest.mark.active
+@pytest.mark.parametrize(
+    "sail_portal",
+    [
+        "researcher_sail_portal",
+        "data_owner_sail_portal",
+    ],
+)
+def test_list_datasets_streamed(sail_portal, dataset_management, request):
+    """
+    Test List of Datasets validated dataset by dataset while it downloads
+
+    :param sail_portal: fixture, SailPortalApi
+    :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+    :param dataset_management: fixture, DataSetManagementApi
+    :type dataset_management: .dataset_mgmt_api.DataSetManagementApi
+    """
+    # Arrange
+    sail_portal = request.getfixturevalue(sail_portal)
+    expected_count = len(datasets_guids(sail_portal, dataset_management))
+    # Act
+    test_response, report, user_eosb = dataset_management.list_datasets(sail_portal, stream=True)
+    # Assert
+    print(f"\n{report}")
+    assert_that(report.ok, description=f"{report}").is_true()
+    assert_that(report.count).is_equal_to(expected_count)
+    assert_that(user_eosb)
+    assert_that(test_response.status_code).is_equal_to(200)
+
+
 # TODO run list of dataset_guid as individual tests
 @pytest.mark.active
 @pytest.mark.parametrize(
@@ -143,61 +117,7 @@ def test_pull_dataset(sail_portal, dataset_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Dataset": {
-            "type": "dict",
-            "schema": {
-                "DataOwnerGuid": {"type": "string"},
-                "DatasetGuid": {"type": "string"},
-                "DatasetName": {"type": "string"},
-                "Description": {"type": "string"},
-                "JurisdictionalLimitations": {"type": "string"},
-                "Keywords": {"type": "string"},
-                "OrganizationName": {"type": "string"},
-                "PrivacyLevel": {"type": "number"},
-                "PublishDate": {"type": "number"},
-                "Tables": {
-                    "type": "dict",
-                    "valueschema": {
-                        "type": "dict",
-                        "schema": {
-                            "TableIdentifier":{"type":"string"},
-                            "ColumnName": {"type": "string"},
-                            "Description": {"type": "string"},
-                            "Tags": {"type": "string"},
-                            "Hashtags": {"type": "string", "required": False},
-                            "Name": {"type": "string", "required": False},
-                            "NumberColumns": {"type": "number", "required": False},
-                            "NumberRows": {"type": "number", "required": False},
-                            "Title": {"type": "string"},
-                            "NumberOfColumns": {"type": "number"},
-                            "NumberOfRows": {"type": "number"},
-                            "CompressedDataSizeInBytes": {"type": "number"},
-                            "DataSizeInBytes": {"type": "number"},
-                            "AllColumnProperties": {
-                                "type": "dict",
-                                "valueschema": {
-                                    "type": "dict",
-                                    "schema": {
-                                        "ColumnIdentifier":{"type":"string"},
-                                        "Description":{"type":"string"},
-                                        "Tags":{"type":"string"},
-                                        "Title":{"type":"string"},
-                                        "Type":{"type":"string"},
-                                        "Units":{"type":"string"},
-                                    },
-                                },
-                            },
-                        },
-                    },
-                },
-                "VersionNumber": {"type": "string"},
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("Dataset")
 
     # Act
     dataset_id_tested = list()
@@ -240,8 +160,7 @@ def test_register_dataset(sail_portal, dataset_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     dataset_payload, _, _ = get_dataset_payload()
@@ -257,6 +176,43 @@ def test_register_dataset(sail_portal, dataset_management, request):
     assert_that(test_response.status_code).is_equal_to(201)
 
 
+@pytest.mark.active
+def test_bulk_seed_datasets(data_owner_sail_portal, dataset_management, tenant, tmp_path):
+    """
+    Test seeding generated datasets concurrently, each registered dataset lands in the manifest and the listing
+
+    :param data_owner_sail_portal: fixture, SailPortalApi
+    :type data_owner_sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+    :param dataset_management: fixture, DataSetManagementApi
+    :type dataset_management: .dataset_mgmt_api.DataSetManagementApi
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    """
+    # Arrange
+    seeder = BulkDatasetSeeder(data_owner_sail_portal, dataset_management, max_workers=4)
+    manifest_path = str(tmp_path / "seed_manifest.json")
+
+    # Act
+    report = seeder.seed(
+        12,
+        3,
+        number_rows=(10, 500),
+        number_columns=(2, 8),
+        manifest_path=manifest_path,
+        name_prefix=tenant.namespaced("seed-"),
+    )
+
+    # Assert
+    print(f"\n{report}")
+    assert_that(report.ok, description=f"{report.failures}").is_true()
+    manifest = read_manifest(manifest_path)
+    assert_that(manifest["Datasets"]).is_length(12)
+    assert_that(manifest["Datasets"]).is_equal_to(report.created)
+    assert_that(list(datasets_guids(data_owner_sail_portal, dataset_management))).contains(*manifest["Datasets"])
+    for dataset in manifest["Datasets"].values():
+        assert_that(dataset["Tables"]).is_length(3)
+
+
 @pytest.mark.broken
 @pytest.mark.skip(reason="BOARD-314")
 @pytest.mark.parametrize(
@@ -5,8 +5,8 @@
 # -----------------------------------------------------------
 import pytest
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from utils.helpers import pretty_print
+from utils.schema_helpers import get_validator
 
 datasetfamily_payload = {
     "DatasetFamilyDescription": "This dataset family is used for unit testing",
@@ -36,22 +36,57 @@ def debug_helper(response):
     print(f"------------END--------------")
 
 
+def tenant_payload(tenant, payload):
+    """
+    Helper Function to namespace the title of a dataset family payload to the tenant
+
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    :param payload: dataset family payload
+    :type payload: dict
+    :return: payload copy, title prefixed with the tenant namespace when present
+    :rtype: dict
+    """
+    payload = dict(payload)
+    if "DatasetFamilyTitle" in payload:
+        payload["DatasetFamilyTitle"] = tenant.namespaced(payload["DatasetFamilyTitle"])
+    return payload
+
+
+def get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant):
+    """
+    Helper Function to list the guids of the dataset families of the tenant
+
+    :param sail_portal: SailPortalApi
+    :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+    :param datasetfamily_management: fixture, DataSetFamilyManagementApi
+    :type datasetfamily_management: api_portal.datasetfamily_mgmt_api.DataSetFamilyManagementApi
+    :param tenant: fixture, Tenant
+    :type tenant: class : utils.tenant_helpers.Tenant
+    :return: dataset family guids
+    :rtype: list
+    """
+    dataset_families = datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies")
+    return [
+        dataset_family_guid
+        for dataset_family_guid, dataset_family in dataset_families.items()
+        # Milestone 3 portals list the title only, later ones the whole family
+        if tenant.owns(dataset_family if isinstance(dataset_family, str) else dataset_family.get("DatasetFamilyTitle"))
+    ]
+
+
 @pytest.fixture(scope="function", autouse=True)
-def clear_all_datasetfamily(data_owner_sail_portal, researcher_sail_portal, datasetfamily_management):
+def clear_all_datasetfamily(bulk_cleanup, datasetfamily_management):
     """
-    Fixture Function to setup and teardown, clear all dataset families
+    Fixture Function to setup and teardown, clear all dataset families of the tenant
 
-    :param data_owner_sail_portal: fixture, SailPortalApi
-    :type data_owner_sail_portal: class : api_portal.sail_portal_api.SailPortalApi
+    :param bulk_cleanup: fixture, BulkCleanup of the data owner and researcher
+    :type bulk_cleanup: class : api_portal.bulk_cleanup.BulkCleanup
     :param datasetfamily_management: fixture, DataSetFamilyManagementApi
     :type datasetfamily_management: api_portal.datasetfamily_mgmt_api.DataSetFamilyManagementApi
     """
     # Setup, clear all dataset families [data owner, researcher]
-    roles = [data_owner_sail_portal, researcher_sail_portal]
-    for role in roles:
-        _, response_json, _ = datasetfamily_management.list_dataset_families(role)
-        for dataset_family_guid in response_json.get("DatasetFamilies").keys():
-            datasetfamily_management.delete_dataset_family(role, dataset_family_guid)
+    bulk_cleanup.clear_dataset_families(datasetfamily_management)
 
 
 def get_dataset_family_guid(data_owner_sail_portal, datasetfamily_management, dataset_family_guid):
@@ -96,7 +131,7 @@ def get_dataset_organization_guid(data_owner_sail_portal, datasetfamily_manageme
         "data_owner_sail_portal",
     ],
 )
-def test_clear_all_datasetfamilies(sail_portal, datasetfamily_management, request):
+def test_clear_all_datasetfamilies(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Clearing of all Dataset Families
 
@@ -107,20 +142,7 @@ def test_clear_all_datasetfamilies(sail_portal, datasetfamily_management, reques
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DatasetFamilies": {
-            "type": "dict",
-            "valueschema": {"type": "string"},
-            # All Dataset family GUIDs have the leading 5 bits set to "01100" so we check for a leading 'C' character in the GUID
-            "keysrules": {
-                "type": "string",
-                "regex": r"{C[A-Z0-9]{7}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamiliesM3")
 
     # Act
     test_response, test_response_json, user_eosb = datasetfamily_management.list_dataset_families(sail_portal)
@@ -129,7 +151,7 @@ def test_clear_all_datasetfamilies(sail_portal, datasetfamily_management, reques
     is_valid = validator.validate(test_response_json)
     assert_that(is_valid, description=validator.errors).is_true()
     assert_that(test_response.status_code).is_equal_to(200)
-    assert_that(len(test_response_json.get("DatasetFamilies").keys())).is_equal_to(0)
+    assert_that(get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)).is_length(0)
     assert_that(user_eosb)
 
 
@@ -153,7 +175,9 @@ def test_clear_all_datasetfamilies(sail_portal, datasetfamily_management, reques
         {"DatasetFamilyTitle": "UnitTest-Family", "DatasetFamilyTags": "SAIL, UnitTest, TDD"},
     ],
 )
-def test_register_bad_dataset_family(sail_portal, datasetfamily_management, malformed_datasetfamily_payload, request):
+def test_register_bad_dataset_family(
+    sail_portal, datasetfamily_management, malformed_datasetfamily_payload, tenant, request
+):
     """
     Test Data owner register of a Dataset Family
 
@@ -170,7 +194,7 @@ def test_register_bad_dataset_family(sail_portal, datasetfamily_management, malf
     # Try to register with bad data, we expect to get an error back and no JSON
     test_response, test_response_json, user_eosb = datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=malformed_datasetfamily_payload,
+        payload=tenant_payload(tenant, malformed_datasetfamily_payload),
     )
 
     # Assert
@@ -187,7 +211,7 @@ def test_register_bad_dataset_family(sail_portal, datasetfamily_management, malf
         "data_owner_sail_portal",
     ],
 )
-def test_register_good_dataset_family(sail_portal, datasetfamily_management, request):
+def test_register_good_dataset_family(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Dataowner register of a good dataset family
 
@@ -198,13 +222,12 @@ def test_register_good_dataset_family(sail_portal, datasetfamily_management, req
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    expect_json_schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}, "DatasetFamilyIdentifier": {"type": "string"},}
-    validator = Validator(expect_json_schema)
+    validator = get_validator("DatasetFamilyRegistration")
 
     # Act
     test_response, test_response_json, user_eosb = datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=datasetfamily_payload,
+        payload=tenant_payload(tenant, datasetfamily_payload),
     )
 
     # Assert
@@ -216,7 +239,7 @@ def test_register_good_dataset_family(sail_portal, datasetfamily_management, req
 
 
 @pytest.mark.active_m3
-def test_list_dataset_families_m3(sail_portal, datasetfamily_management):
+def test_list_dataset_families_m3(sail_portal, datasetfamily_management, tenant):
     """
     Test List of Dataset Families
 
@@ -226,20 +249,7 @@ def test_list_dataset_families_m3(sail_portal, datasetfamily_management):
     :type datasetfamily_management: class  : api_portal.datasetfamily_management_api.DatasetFamilyManagementApi
     """
     # Arrange
-    schema = {
-        "DatasetFamilies": {
-            "type": "dict",
-            "valueschema": {"type": "string"},
-            # All Dataset family GUIDs have the leading 5 bits set to "01100" so we check for a leading 'C' character in the GUID
-            "keysrules": {
-                "type": "string",
-                "regex": r"{C[A-Z0-9]{7}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamiliesM3")
     datasetfamily_payload = {
         "DatasetFamilyDescription": "This dataset family is for pulling",
         "DatasetFamilyTags": "SAIL, UnitTest, TDD",
@@ -247,7 +257,9 @@ def test_list_dataset_families_m3(sail_portal, datasetfamily_management):
     }
 
     for x in range(2):
-        datasetfamily_management.register_dataset_family(sail_portal, payload=datasetfamily_payload)
+        datasetfamily_management.register_dataset_family(
+            sail_portal, payload=tenant_payload(tenant, datasetfamily_payload)
+        )
 
     # Act
     test_response, test_response_json, user_eosb = datasetfamily_management.list_dataset_families(sail_portal)
@@ -271,7 +283,7 @@ def test_list_dataset_families_m3(sail_portal, datasetfamily_management):
     ],
 )
 def test_list_dataset_families_m5(
-    data_owner_sail_portal, researcher_sail_portal, sail_portal, datasetfamily_management, request
+    data_owner_sail_portal, researcher_sail_portal, sail_portal, datasetfamily_management, tenant, request
 ):
     """
     Test List of Dataset Families
@@ -289,33 +301,13 @@ def test_list_dataset_families_m5(
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DatasetFamilies": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "DatasetFamilyActive": {"type": "boolean"},
-                    "DatasetFamilyOwnerGuid": {"type": "string"},
-                    "DatasetFamilyTags": {"type": "string"},
-                    "DatasetFamilyTitle": {"type": "string"},
-                    "OrganizationName": {"type": "string"},
-                },
-            },
-            # Dataset GUIDs have their leading 5 bits as: 1C, which means the first two bytes can be 1C, 1D, 1E, or 1F
-            "keysrules": {
-                "type": "string",
-                "regex": r"{1[CDEF][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamilies")
 
     portals = [data_owner_sail_portal, researcher_sail_portal]
     for portal in portals:
-        datasetfamily_management.register_dataset_family(portal, payload=datasetfamily_pull_payload)
+        datasetfamily_management.register_dataset_family(
+            portal, payload=tenant_payload(tenant, datasetfamily_pull_payload)
+        )
 
     # Act
     test_response, test_response_json, user_eosb = datasetfamily_management.list_dataset_families(sail_portal)
@@ -327,7 +319,7 @@ def test_list_dataset_families_m5(
     assert_that(is_valid, description=validator.errors).is_true()
     assert_that(user_eosb)
     assert_that(test_response.status_code).is_equal_to(200)
-    assert_that(len(test_response_json.get("DatasetFamilies").keys())).is_equal_to(2)
+    assert_that(get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)).is_length(2)
 
 
 @pytest.mark.active
@@ -338,7 +330,7 @@ def test_list_dataset_families_m5(
         "data_owner_sail_portal",
     ],
 )
-def test_pulling_known_dataset_family(sail_portal, datasetfamily_management, request):
+def test_pulling_known_dataset_family(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Pulling a known dataset family
 
@@ -349,30 +341,13 @@ def test_pulling_known_dataset_family(sail_portal, datasetfamily_management, req
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DatasetFamily": {
-            "type": "dict",
-            "schema": {
-                "DatasetFamilyActive": {"type": "boolean"},
-                "DatasetFamilyDescription": {"type": "string"},
-                "DatasetFamilyGuid": {"type": "string"},
-                "DatasetFamilyOwnerGuid": {"type": "string"},
-                "DatasetFamilyTags": {"type": "string"},
-                "DatasetFamilyTitle": {"type": "string"},
-                "OrganizationName": {"type": "string"},
-                "VersionNumber": {"type": "string"},
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamily")
 
-    datasetfamily_management.register_dataset_family(sail_portal, payload=datasetfamily_pull_payload)
-    # Now get a list of our dataset families
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
+    datasetfamily_management.register_dataset_family(
+        sail_portal, payload=tenant_payload(tenant, datasetfamily_pull_payload)
     )
+    # Now get a list of our dataset families
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
 
     test_dataset_family_guid = list_datasetfamily_guids[0]
 
@@ -400,7 +375,7 @@ def test_pulling_known_dataset_family(sail_portal, datasetfamily_management, req
         "data_owner_sail_portal",
     ],
 )
-def test_delete_known_dataset_family(sail_portal, datasetfamily_management, request):
+def test_delete_known_dataset_family(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Data owner deleting a known dataset family
 
@@ -412,15 +387,14 @@ def test_delete_known_dataset_family(sail_portal, datasetfamily_management, requ
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
 
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Make sure we have at least one dataset in the database
-    test_response = datasetfamily_management.register_dataset_family(sail_portal, payload=datasetfamily_delete_payload)
-
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
+    test_response = datasetfamily_management.register_dataset_family(
+        sail_portal, payload=tenant_payload(tenant, datasetfamily_delete_payload)
     )
 
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
+
     test_dataset_family_guid = list_datasetfamily_guids[0]
 
     # Act
@@ -443,7 +417,7 @@ def test_delete_known_dataset_family(sail_portal, datasetfamily_management, requ
         "data_owner_sail_portal",
     ],
 )
-def test_delete_not_existing_dataset_family(sail_portal, datasetfamily_management, request):
+def test_delete_not_existing_dataset_family(sail_portal, datasetfamily_management, tenant, request):
 
     """
     Test Data owner deleting a guid that doesn't exist
@@ -456,8 +430,7 @@ def test_delete_not_existing_dataset_family(sail_portal, datasetfamily_managemen
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
     bad_guid = "{C123456-1234-4321-1324-ABCDEFFEDCBA}"
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_response, test_response_json, user_eosb = datasetfamily_management.delete_dataset_family(sail_portal, bad_guid)
@@ -477,7 +450,7 @@ def test_delete_not_existing_dataset_family(sail_portal, datasetfamily_managemen
         "data_owner_sail_portal",
     ],
 )
-def test_modify_dataset_correctly(sail_portal, datasetfamily_management, request):
+def test_modify_dataset_correctly(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Data owner modify of a Dataset Family
 
@@ -488,40 +461,21 @@ def test_modify_dataset_correctly(sail_portal, datasetfamily_management, request
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DatasetFamily": {
-            "type": "dict",
-            "schema": {
-                "DatasetFamilyActive": {"type": "boolean"},
-                "DatasetFamilyDescription": {"type": "string"},
-                "DatasetFamilyGuid": {"type": "string"},
-                "DatasetFamilyOwnerGuid": {"type": "string"},
-                "DatasetFamilyTags": {"type": "string"},
-                "DatasetFamilyTitle": {"type": "string"},
-                "OrganizationName": {"type": "string"},
-                "VersionNumber": {"type": "string"},
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamily")
     # Add a known dataset
     # register sample dataset
     datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=datasetfamily_modify_payload,
+        payload=tenant_payload(tenant, datasetfamily_modify_payload),
     )
     # Now get a list of our dataset families
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
-    )
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
     test_dataset_family_guid = list_datasetfamily_guids[0]
     # Pull dataset family
     _, pull_response_json, _ = datasetfamily_management.pull_dataset_family(sail_portal, test_dataset_family_guid)
 
     dataset_family = pull_response_json.get("DatasetFamily")
-    dataset_family["DatasetFamilyTitle"] = "Modified Dataset Family Title"
+    dataset_family["DatasetFamilyTitle"] = tenant.namespaced("Modified Dataset Family Title")
 
     datasetfamily_management.update_datset_family(sail_portal, dataset_family)
 
@@ -535,7 +489,7 @@ def test_modify_dataset_correctly(sail_portal, datasetfamily_management, request
     assert_that(is_valid, description=validator.errors).is_true()
     assert_that(test_response.status_code).is_equal_to(200)
     assert_that(test_response_json.get("DatasetFamily")["DatasetFamilyTitle"]).is_equal_to(
-        "Modified Dataset Family Title"
+        tenant.namespaced("Modified Dataset Family Title")
     )
     assert_that(user_eosb)
 
@@ -548,7 +502,7 @@ def test_modify_dataset_correctly(sail_portal, datasetfamily_management, request
         "data_owner_sail_portal",
     ],
 )
-def test_modify_dataset_add_tags(sail_portal, datasetfamily_management, request):
+def test_modify_dataset_add_tags(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Data owner modify of a Dataset Family
 
@@ -559,24 +513,7 @@ def test_modify_dataset_add_tags(sail_portal, datasetfamily_management, request)
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DatasetFamily": {
-            "type": "dict",
-            "schema": {
-                "DatasetFamilyActive": {"type": "boolean"},
-                "DatasetFamilyDescription": {"type": "string"},
-                "DatasetFamilyGuid": {"type": "string"},
-                "DatasetFamilyOwnerGuid": {"type": "string"},
-                "DatasetFamilyTags": {"type": "string"},
-                "DatasetFamilyTitle": {"type": "string"},
-                "OrganizationName": {"type": "string"},
-                "VersionNumber": {"type": "string"},
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DatasetFamily")
     # Add a known dataset without tags
     datasetfamily_payload = {
         "DatasetFamilyDescription": "This dataset family is used for unit testing",
@@ -585,12 +522,10 @@ def test_modify_dataset_add_tags(sail_portal, datasetfamily_management, request)
     # register sample dataset
     datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=datasetfamily_payload,
+        payload=tenant_payload(tenant, datasetfamily_payload),
     )
     # Now get a list of our dataset families
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
-    )
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
     test_dataset_family_guid = list_datasetfamily_guids[0]
     # Pull dataset family
     _, pull_response_json, _ = datasetfamily_management.pull_dataset_family(sail_portal, test_dataset_family_guid)
@@ -622,7 +557,7 @@ def test_modify_dataset_add_tags(sail_portal, datasetfamily_management, request)
         "data_owner_sail_portal",
     ],
 )
-def test_modify_dataset_guid(sail_portal, datasetfamily_management, request):
+def test_modify_dataset_guid(sail_portal, datasetfamily_management, tenant, request):
     """
     Test Data owner modify of a Dataset Family's guid, not allowed
 
@@ -633,18 +568,15 @@ def test_modify_dataset_guid(sail_portal, datasetfamily_management, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Add a known dataset
     # register sample dataset
     datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=datasetfamily_modify_payload,
+        payload=tenant_payload(tenant, datasetfamily_modify_payload),
     )
     # Now get a list of our dataset families
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
-    )
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
 
     test_dataset_family_guid = list_datasetfamily_guids[0]
     # Pull dataset family
@@ -679,7 +611,7 @@ def test_modify_dataset_guid(sail_portal, datasetfamily_management, request):
         "data_owner_sail_portal",
     ],
 )
-def test_modify_dataset_organization_guid(sail_portal, datasetfamily_management, request):
+def test_modify_dataset_organization_guid(sail_portal, datasetfamily_management, tenant, request):
     """
     Test modify of a Dataset Family's organization guid, not allowed
 
@@ -690,19 +622,16 @@ def test_modify_dataset_organization_guid(sail_portal, datasetfamily_management,
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Add a known dataset
     # register sample dataset
     datasetfamily_management.register_dataset_family(
         sail_portal,
-        payload=datasetfamily_modify_payload,
+        payload=tenant_payload(tenant, datasetfamily_modify_payload),
     )
     # Pull the dataset
     # Now get a list of our dataset families
-    list_datasetfamily_guids = list(
-        datasetfamily_management.list_dataset_families(sail_portal)[1].get("DatasetFamilies").keys()
-    )
+    list_datasetfamily_guids = get_tenant_dataset_family_guids(sail_portal, datasetfamily_management, tenant)
     test_dataset_family_guid = list_datasetfamily_guids[0]
     # Pull dataset family
     _, pull_response_json, _ = datasetfamily_management.pull_dataset_family(sail_portal, test_dataset_family_guid)
@@ -3,17 +3,21 @@
 # Digital Contract Management API test file
 #
 # -----------------------------------------------------------
-import time
-
 import pytest
 from api_portal.digital_contract_management_api import DigitalContractManagementApi
 from api_portal.sail_portal_api import SailPortalApi
 from api_portal.virtual_machine_api import VirtualMachineApi
+from api_portal.vm_state_waiter import (
+    VM_RUNNING_STATES,
+    VM_STOPPED_STATES,
+    VmStateWaiter,
+    VmStateWaitError,
+    vm_state_name,
+)
 from assertpy.assertpy import assert_that
-from cerberus import Validator
-from config import DATAOWNER_EMAIL, SAIL_PASS
 from utils.dataset_helpers import get_dataset_payload
 from utils.digital_contract_helpers import (
+    DIGITAL_CONTRACT_TITLE,
     get_digital_contract_acceptance_payload,
     get_digital_contract_activate_payload,
     get_digital_contract_associate_payload,
@@ -21,6 +25,7 @@ from utils.digital_contract_helpers import (
     get_digital_contract_provision_payload,
 )
 from utils.helpers import pretty_print
+from utils.schema_helpers import get_validator
 
 
 def debug_helper(response):
@@ -29,29 +34,31 @@ def debug_helper(response):
     print(f"------------END--------------")
 
 
-def list_virtualmachine(sail_portal, virtualmachine_management):
+def list_virtualmachine(sail_portal, virtualmachine_management, digitalcontract_management, tenant):
     """
-    Helper for return list of virtual machine guids pertaining to eosb
+    Helper for return list of virtual machine guids of the digital contracts the tenant registered
 
     :param sail_portal: fixture, sail_portal
     :type sail_portal: class : api_portal.sail_portal_api.SailPortalApi
     :param virtualmachine_management: fixture, VirtualMachineApi
     :type virtualmachine_management: class  : api_portal.api_portal.virtual_machine_api.VirtualMachineApi
+    :param digitalcontract_management: fixture, DigitalContractManagementApi
+    :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     :return: list_virtualmachine_guids
     :rtype: dict
     """
-    vms = {}
-    list_virtualmachine_dc = list(
-        virtualmachine_management.list_virtual_machines(sail_portal)[1].get("VirtualMachines").keys()
-    )
-    for vm_dc_guid in list_virtualmachine_dc:
-        vm_ip = list(
-            virtualmachine_management.list_virtual_machines(sail_portal)[1]
-            .get("VirtualMachines")[f"{vm_dc_guid}"]["VirtualMachinesAssociatedWithDc"]
-            .keys()
-        )[0]
-        vms.update({f"{vm_dc_guid}": f"{vm_ip}"})
-    return vms
+    # The organizations are shared by the workers, only the contracts titled in the tenant namespace are ours
+    contracts = digitalcontract_management.list_digital_contracts(sail_portal)[1].get("DigitalContracts", {})
+    tenant_contracts = {guid for guid, contract in contracts.items() if tenant.owns(contract.get("Title"))}
+    # One listing for every contract, the first vm of each
+    snapshot = virtualmachine_management.inventory(sail_portal).snapshot()
+    return {
+        dc_guid: vm_guids[0]
+        for dc_guid, vm_guids in snapshot.vms_by_contract.items()
+        if vm_guids and dc_guid in tenant_contracts
+    }
 
 
 def list_digitalcontract(sail_portal, digitalcontract_management):
@@ -72,75 +79,62 @@ def list_digitalcontract(sail_portal, digitalcontract_management):
 
 
 @pytest.fixture(scope="module", autouse=True)
-def get_base_url(pytestconfig):
+def get_base_url(portal_base_url, http_transport):
     """
     Fixture to set base_url for tests in session
 
-    :param pytestconfig:
-    :type pytestconfig:
+    :param portal_base_url: fixture, base_url of the portal under test
+    :type portal_base_url: string
+    :param http_transport: fixture, HttpTransport shared by the api clients using base_url
+    :type http_transport: class : api_portal.http_transport.HttpTransport
     :return: base_url
     :rtype: string
     """
-    base_url = f"https://{pytestconfig.getoption('ip')}:{pytestconfig.getoption('port')}"
-    return base_url
+    return portal_base_url
 
 
 @pytest.fixture(scope="module", autouse=True)
-def setup_teardown(get_base_url):
+def setup_teardown(get_base_url, tenant):
     """
     Setup and Teardown fixture for digital contract mgmt tests
 
     :param get_base_url:
     :type get_base_url:
-    :raises ValueError:
-    :raises ValueError:
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
+    :raises VmStateWaitError: a provisioned vm failed or did not start in time
     """
     print(f"\n*******SETUP DC API TESTS*******\n")
-    o_sail_portal = SailPortalApi(base_url=get_base_url, email=DATAOWNER_EMAIL, password=SAIL_PASS)
+    o_sail_portal = SailPortalApi(base_url=get_base_url, email=tenant.data_owner_email, password=tenant.password)
     dc_m_sail = DigitalContractManagementApi(base_url=get_base_url)
     vm_m_sail = VirtualMachineApi(base_url=get_base_url)
     yield
 
     print(f"\n*******TEARDOWN DC API TESTS*******\n")
-    digital_contract_provisioned_payload = {"DigitalContractGuid": "{16F2A719-C772-477F-8C61-987EC3078E61}"}
-    vm = list_virtualmachine(o_sail_portal, vm_m_sail)
-    # Deprovision all dc in provisioned vm list
+    vm = list_virtualmachine(o_sail_portal, vm_m_sail, dc_m_sail, tenant)
+    # Wait for every vm to finish starting, then deprovision the dc of each running vm
+    waiter = VmStateWaiter(vm_m_sail, o_sail_portal)
+    wait_error = None
+    try:
+        vm_states = waiter.wait_for_all(
+            vm.values(),
+            VM_RUNNING_STATES | VM_STOPPED_STATES,
+            on_change=lambda vm_guid, state: print(f"SCN_VM {vm_guid} State : {vm_state_name(state)}"),
+        )
+    except VmStateWaitError as error:
+        # Still deprovision every vm that did start, the failed ones are raised afterwards
+        wait_error = error
+        vm_states = error.states
+    deprovision_status_codes = {}
     for key in vm:
-        # Update Payloads
-        digital_contract_provisioned_payload.update({"DigitalContractGuid": f"{key}"})
-        vm_guid_payload = {
-            "VirtualMachineGuid": f"{vm[key]}",
-        }
-        print(f"Shutting down vm: {vm[key]}, spawned from digital contract: {key}")
-        print(f"This is the vm guid: {vm_guid_payload} ")
-        # Get SCN_VM state values
-        vm_status = vm_m_sail.virtual_machines_status(o_sail_portal, vm_guid_payload)[1]["VirtualMachine"]["State"]
-        # Wait while provisioning status is not 4, 5, 6
-        while True:
-            vm_status = vm_m_sail.virtual_machines_status(o_sail_portal, vm_guid_payload)[1]["VirtualMachine"]["State"]
-            if vm_status == 10.0:
-                raise ValueError("SCN_VM State: Provisioning Failed")
-            elif vm_status == 9.0:
-                raise ValueError("SCN_VM State : Delete Previously Failed")
-            elif vm_status == 8.0:
-                print("SCN_VM State : Deleted")
-                break
-            elif vm_status == 7.0:
-                print("SCN_VM : Shutting Down")
-                break
-            elif vm_status == 6.0 or vm_status == 5.0 or vm_status == 4.0:
-                # Deprovision vm in list
-                output, _, _ = dc_m_sail.deprovision_digital_contract(
-                    o_sail_portal, digital_contract_provisioned_payload
-                )
-                print(f"Response for Deprovision SCN: {output}")
-                assert_that(output.status_code).is_equal_to(200)
-                break
-            elif vm_status == 1.0 or vm_status == 2.0:
-                # Sleep for 4 min awaiting vm start and configuration
-                print(f"Sleep for 4 min awaiting vm start and configuration!!!")
-                time.sleep(240)
-                continue
+        if vm_states.get(vm[key]) in VM_RUNNING_STATES:
+            print(f"Shutting down vm: {vm[key]}, spawned from digital contract: {key}")
+            output, _, _ = dc_m_sail.deprovision_digital_contract(o_sail_portal, {"DigitalContractGuid": f"{key}"})
+            print(f"Response for Deprovision SCN: {output}")
+            deprovision_status_codes[key] = output.status_code
+    if wait_error is not None:
+        raise wait_error
+    assert_that(deprovision_status_codes).is_equal_to(dict.fromkeys(deprovision_status_codes, 200))
 
 
 # TODO list_digitial_contracts-active
@@ -165,51 +159,7 @@ def test_list_digital_contracts(digitalcontract_management, sail_portal, request
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DigitalContracts": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "ActivationTime": {"type": "number"},
-                    "AzureTemplateGuid": {"required": False, "type": "string"},
-                    "ContractStage": {"type": "number"},
-                    "DOOName": {"type": "string"},
-                    "DataOwnerOrganization": {"type": "string"},
-                    "DatasetDRMMetadata": {"type": "dict"},
-                    "DatasetDRMMetadataSize": {"type": "number"},
-                    "DatasetGuid": {"type": "string"},
-                    "DatasetName": {"type": "string"},
-                    "Description": {"type": "string"},
-                    "DigitalContractGuid": {"type": "string"},
-                    "Eula": {"type": "string"},
-                    "EulaAcceptedByDOOAuthorizedUser": {"type": "string"},
-                    "EulaAcceptedByROAuthorizedUser": {"type": "string"},
-                    "ExpirationTime": {"type": "number"},
-                    "HostForVirtualMachines": {"type": "string"},
-                    "HostRegion": {"type": "string"},
-                    "LastActivity": {"type": "number"},
-                    "LegalAgreement": {"type": "string"},
-                    "Note": {"type": "string"},
-                    "NumberOfVirtualMachines": {"type": "number"},
-                    "NumberOfVirtualMachinesReady": {
-                        "required": False,
-                        "type": "number",
-                    },
-                    "ProvisioningStatus": {"type": "number"},
-                    "ROName": {"type": "string"},
-                    "ResearcherOrganization": {"type": "string"},
-                    "RetentionTime": {"type": "number"},
-                    "SubscriptionDays": {"type": "number"},
-                    "Title": {"type": "string"},
-                    "VersionNumber": {"type": "string"},
-                },
-            },
-        },
-        "Eosb": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContracts")
 
     # Act
     (
@@ -248,45 +198,7 @@ def test_pull_digital_contract(digitalcontract_management, sail_portal, request)
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "DOOName": {"type": "string"},
-        "DataOwnerOrganization": {"type": "string"},
-        "DigitalContract": {
-            "type": "dict",
-            "schema": {
-                "ActivationTime": {"type": "number"},
-                "AzureTemplateGuid": {"required": False, "type": "string"},
-                "ContractStage": {"type": "number"},
-                "DatasetDRMMetadata": {"type": "dict"},
-                "DatasetDRMMetadataSize": {"type": "number"},
-                "DatasetGuid": {"type": "string"},
-                "DatasetName": {"type": "string"},
-                "Description": {"type": "string"},
-                "DigitalContractGuid": {"type": "string"},
-                "Eula": {"type": "string"},
-                "EulaAcceptedByDOOAuthorizedUser": {"type": "string"},
-                "EulaAcceptedByROAuthorizedUser": {"type": "string"},
-                "ExpirationTime": {"type": "number"},
-                "HostForVirtualMachines": {"type": "string"},
-                "HostRegion": {"type": "string"},
-                "LastActivity": {"type": "number"},
-                "LegalAgreement": {"type": "string"},
-                "Note": {"type": "string"},
-                "NumberOfVirtualMachines": {"type": "number"},
-                "NumberOfVirtualMachinesReady": {"required": False, "type": "number"},
-                "ProvisioningStatus": {"type": "number"},
-                "RetentionTime": {"type": "number"},
-                "SubscriptionDays": {"type": "number"},
-                "Title": {"type": "string"},
-                "VersionNumber": {"type": "string"},
-            },
-        },
-        "Eosb": {"type": "string"},
-        "ROName": {"type": "string"},
-        "ResearcherOrganization": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContract")
 
     # Act
     digital_contracts_id_tested = list()
@@ -318,6 +230,7 @@ def test_register_digital_contract(
     data_owner_sail_portal,
     dataset_management,
     digitalcontract_management,
+    tenant,
 ):
     """
     Test Researcher can register a Digital Contract
@@ -330,10 +243,11 @@ def test_register_digital_contract(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     """
     # Arrange
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}, "DigitalContractIdentifier": {"type":"string"}, }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractRegistration")
 
     # register sample dataset
     dataset_payload, test_uuid, _ = get_dataset_payload()
@@ -353,7 +267,9 @@ def test_register_digital_contract(
     # Test Researcher role Register of Digital Contract
     (test_response, test_response_json, user_eosb,) = digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
 
     # Assert
@@ -371,6 +287,7 @@ def test_accept_digital_contract(
     data_owner_sail_portal,
     dataset_management,
     digitalcontract_management,
+    tenant,
 ):
     """
     Verify Dataowner can accept Digital Contracts
@@ -384,15 +301,11 @@ def test_accept_digital_contract(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     """
     # Arrange
-    schema = {
-        "Eosb": {"type": "string"},
-        "Instructions": {"type": "string"},
-        "RootEventStatus": {"type": "number"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractEvent")
 
     # register sample dataset
     dataset_payload, test_uuid, dataset_name = get_dataset_payload()
@@ -410,7 +323,9 @@ def test_accept_digital_contract(
     # Register of Digital Contract
     digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
     # list all digital contracts
     list_digitalcontract_guids = list_digitalcontract(researcher_sail_portal, digitalcontract_management)
@@ -452,6 +367,7 @@ def test_activate_digital_contract(
     data_owner_sail_portal,
     dataset_management,
     digitalcontract_management,
+    tenant,
 ):
     """
     Test Researcher can activate accepted Digital contracts
@@ -464,15 +380,11 @@ def test_activate_digital_contract(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     """
     # Arrange
-    schema = {
-        "Eosb": {"type": "string"},
-        "Instructions": {"type": "string"},
-        "RootEventStatus": {"type": "number"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractEvent")
 
     # register sample dataset
     dataset_payload, test_uuid, dataset_name = get_dataset_payload()
@@ -490,7 +402,9 @@ def test_activate_digital_contract(
     # Register of Digital Contract
     digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
     # list all digital contracts
     list_digitalcontract_guids = list_digitalcontract(researcher_sail_portal, digitalcontract_management)
@@ -550,6 +464,7 @@ def test_associate_digital_contract(
     digitalcontract_management,
     azuretemplate_management,
     request,
+    tenant,
 ):
     """
     Test hoster of vm defined in DC can associate accepted Digital contracts
@@ -562,6 +477,8 @@ def test_associate_digital_contract(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     :param azuretemplate_management: fixture, AzureTemplateApi
     :type azuretemplate_management: class : api_portal.azure_template_managment_api.AzureTemplateApi
     """
@@ -572,12 +489,7 @@ def test_associate_digital_contract(
         host_name = "Data Owner"
     sail_portal = request.getfixturevalue(sail_portal)
 
-    schema = {
-        "Eosb": {"type": "string"},
-        "ErrorMessage": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractAssociation")
     azure_template_payload = {
         "TemplateData": {
             "Name": "Test_template",
@@ -610,7 +522,9 @@ def test_associate_digital_contract(
     # Register of Digital Contract
     digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
     # list all digital contracts
     list_digitalcontract_guids = list_digitalcontract(researcher_sail_portal, digitalcontract_management)
@@ -681,6 +595,7 @@ def test_provision_digital_contract(
     digitalcontract_management,
     # azuretemplate_management,  # Deprecated for KCA 3/11/2022
     request,
+    tenant,
 ):
     """
     Test provision accepted Digital contracts,
@@ -695,6 +610,8 @@ def test_provision_digital_contract(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     :param request:
     :type request:
     """
@@ -704,13 +621,7 @@ def test_provision_digital_contract(
     else:
         host_name = "Data Owner"
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "Eosb": {"type": "string"},
-        "Message": {"required": False, "type": "string"},
-        "SecureNodeGuid": {"type": "string"},
-        "Status": {"type": "number"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractProvision")
     # azure_template_payload = { # Deprecated for KCA 3/11/2022
     #     "TemplateData": {
     #         "Name": "Test_template",
@@ -743,7 +654,9 @@ def test_provision_digital_contract(
     # Register of Digital Contract
     digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
     # list all digital contracts
     list_digitalcontract_guids = list_digitalcontract(researcher_sail_portal, digitalcontract_management)
@@ -820,6 +733,7 @@ def test_get_dc_provision_status(
     digitalcontract_management,
     azuretemplate_management,
     request,
+    tenant,
 ):
     """
     Test get provision digital contract status api
@@ -832,6 +746,8 @@ def test_get_dc_provision_status(
     :type dataset_management: fixture, DataSetManagementApi
     :param digitalcontract_management: fixture, DigitalContractManagementApi
     :type digitalcontract_management: class  : api_portal.digital_contract_management_api.DigitalContractManagementApi
+    :param tenant: fixture, users of this test process
+    :type tenant: class : utils.tenant_helpers.Tenant
     :param azuretemplate_management: fixture, AzureTemplateApi
     :type azuretemplate_management: class : api_portal.azure_template_managment_api.AzureTemplateApi
     :param request:
@@ -850,12 +766,7 @@ def test_get_dc_provision_status(
     else:
         host_name = "Data Owner"
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "ProvisioningStatus": {"type": "number"},
-        "Status": {"type": "number"},
-        "VirtualMachines": {"required": False, "type": "dict"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("DigitalContractProvisioningStatus")
     azure_template_payload = {
         "TemplateData": {
             "Name": "Test_template",
@@ -888,7 +799,9 @@ def test_get_dc_provision_status(
     # Register of Digital Contract
     digitalcontract_management.register_digital_contract(
         researcher_sail_portal,
-        payload=get_digital_contract_payload(data_owner_guid, dataset_guid=test_uuid),
+        payload=get_digital_contract_payload(
+            data_owner_guid, dataset_guid=test_uuid, title=tenant.namespaced(DIGITAL_CONTRACT_TITLE)
+        ),
     )
     # list all digital contracts
     list_digitalcontract_guids = list_digitalcontract(researcher_sail_portal, digitalcontract_management)
@@ -8,8 +8,8 @@ import threading
 import pytest
 from api_portal.sail_portal_api import SailPortalApi
 from assertpy.assertpy import assert_that
-from cerberus import Validator
 from config import DATAOWNER_EMAIL, RESEARCHER_EMAIL, SAIL_PASS, TEMP_PASS
+from utils.schema_helpers import get_validator
 
 
 def debug_helper(response):
@@ -40,8 +40,7 @@ def test_valid_login_entry(get_base_url: str, email: str, password: str):
     """
     # Arrange
     sail_portal = SailPortalApi(base_url=get_base_url, email=email, password=password)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
     # Act
     for x in range(10):
         login_response, login_response_json, user_eosb = sail_portal.login()
@@ -77,8 +76,7 @@ def test_bad_login_invalid_user_entry(get_base_url: str, email: str, password: s
     """
     # Arrange
     sail_portal = SailPortalApi(base_url=get_base_url, email=email, password=password)
-    schema = {"Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("Status")
 
     # Act
     login_response, login_response_json, _ = sail_portal.login()
@@ -106,19 +104,7 @@ def test_get_basic_user_information(sail_portal, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {
-        "AccessRights": {"type": "number"},
-        "Email": {"type": "string"},
-        "Eosb": {"type": "string"},
-        "OrganizationGuid": {"type": "string"},
-        "OrganizationName": {"type": "string"},
-        "PhoneNumber": {"type": "string"},
-        "Status": {"type": "number"},
-        "Title": {"type": "string"},
-        "UserGuid": {"type": "string"},
-        "Username": {"type": "string"},
-    }
-    validator = Validator(schema)
+    validator = get_validator("BasicUserInformation")
 
     # Act
     test_response, test_response_json, user_eosb = sail_portal.get_basic_user_info()
@@ -152,8 +138,7 @@ def test_update_password(sail_portal, request, current_password: str, new_passwo
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     # Act
     test_response, test_response_json, user_eosb = sail_portal.update_password(current_password, new_password)
@@ -182,8 +167,7 @@ def test_check_good_eosb(sail_portal, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Eosb": {"type": "string"}, "Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("EosbStatus")
 
     _, _, login_eosb = sail_portal.login()
 
@@ -266,8 +250,7 @@ def test_check_bad_eosb(sail_portal, bad_eosb, request):
     """
     # Arrange
     sail_portal = request.getfixturevalue(sail_portal)
-    schema = {"Status": {"type": "number"}}
-    validator = Validator(schema)
+    validator = get_validator("Status")
 
     # Act
     test_response, test_response_json, user_eosb = sail_portal.check_eosb(bad_eosb)
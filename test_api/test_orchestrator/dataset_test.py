@@ -9,7 +9,7 @@ import json
 import pytest
 import sail.core
 from assertpy.assertpy import assert_that
-from cerberus import Validator
+from utils.schema_helpers import get_validator
 
 
 @pytest.mark.active
@@ -50,62 +50,7 @@ def test_list_datasets():
     Test getting a dataset list once we're logged in
     """
     # Arrange
-    schema = {
-        "return_value": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "DataOwnerGuid": {"type": "string"},
-                    "DatasetGuid": {"type": "string"},
-                    "DatasetName": {"type": "string"},
-                    "Description": {"type": "string"},
-                    "JurisdictionalLimitations": {"type": "string"},
-                    "Keywords": {"type": "string"},
-                    "OrganizationName": {"type": "string"},
-                    "PrivacyLevel": {"type": "number"},
-                    "PublishDate": {"type": "number"},
-                    "Tables": {
-                        "type": "dict",
-                        "valueschema": {
-                            "type": "dict",
-                            "schema": {
-                                "TableIdentifier":{"type":"string"},
-                                "ColumnName": {"type": "string"},
-                                "Description": {"type": "string"},
-                                "Tags": {"type": "string"},
-                                "Hashtags": {"type": "string", "required": False},
-                                "Name": {"type": "string", "required": False},
-                                "NumberColumns": {"type": "number", "required": False},
-                                "NumberRows": {"type": "number", "required": False},
-                                "Title": {"type": "string"},
-                                "NumberOfColumns": {"type": "number"},
-                                "NumberOfRows": {"type": "number"},
-                                "CompressedDataSizeInBytes": {"type": "number"},
-                                "DataSizeInBytes": {"type": "number"},
-                                "AllColumnProperties": {
-                                    "type": "dict",
-                                    "valueschema": {
-                                        "type": "dict",
-                                        "schema": {
-                                            "ColumnIdentifier":{"type":"string"},
-                                            "Description":{"type":"string"},
-                                            "Tags":{"type":"string"},
-                                            "Title":{"type":"string"},
-                                            "Type":{"type":"string"},
-                                            "Units":{"type":"string"},
-                                        },
-                                    },
-                                },
-                            },
-                        },
-                    },
-                    "VersionNumber": {"type": "string"},
-                },
-            },
-        },
-    }
-    validator = Validator(schema)
+    validator = get_validator("OrchestratorDatasets")
 
     # Act
     test_response = sail.core.get_datasets()
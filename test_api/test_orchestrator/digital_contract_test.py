@@ -9,7 +9,7 @@ import json
 import pytest
 import sail.core
 from assertpy.assertpy import assert_that
-from cerberus import Validator
+from utils.schema_helpers import get_validator
 
 
 @pytest.mark.active
@@ -33,50 +33,7 @@ def test_list_logged_in():
     Test getting a digital contract list once we are properly logged in
     """
 
-    schema = {
-        "return_value": {
-            "type": "dict",
-            "valueschema": {
-                "type": "dict",
-                "schema": {
-                    "ActivationTime": {"type": "number"},
-                    "AzureTemplateGuid": {"type": "string", "required": False},
-                    "ContractStage": {"type": "number"},
-                    "DOOName": {"type": "string"},
-                    "DataOwnerOrganization": {"type": "string"},
-                    "DatasetDRMMetadata": {"type": "dict"},
-                    "DatasetDRMMetadataSize": {"type": "number"},
-                    "DatasetGuid": {"type": "string"},
-                    "DatasetName": {"type": "string"},
-                    "Description": {"type": "string"},
-                    "DigitalContractGuid": {"type": "string"},
-                    "Eula": {"type": "string"},
-                    "EulaAcceptedByDOOAuthorizedUser": {"type": "string"},
-                    "EulaAcceptedByROAuthorizedUser": {"type": "string"},
-                    "ExpirationTime": {"type": "number"},
-                    "HostForVirtualMachines": {"type": "string"},
-                    "HostRegion": {"type": "string"},
-                    "LastActivity": {"type": "number"},
-                    "LegalAgreement": {"type": "string"},
-                    "Note": {"type": "string"},
-                    "NumberOfVirtualMachines": {"type": "number"},
-                    "NumberOfVirtualMachinesReady": {"type": "number", "required": False},
-                    "ProvisioningStatus": {"type": "number"},
-                    "ROName": {"type": "string"},
-                    "ResearcherOrganization": {"type": "string"},
-                    "RetentionTime": {"type": "number"},
-                    "SubscriptionDays": {"type": "number"},
-                    "Title": {"type": "string"},
-                    "VersionNumber": {"type": "string"},
-                },
-            },
-            "keysrules": {
-                "type": "string",
-                "regex": r"{1[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-        },
-    }
-    validator = Validator(schema)
+    validator = get_validator("OrchestratorDigitalContracts")
 
     # Act
     test_response = sail.core.get_digital_contracts()
@@ -10,7 +10,7 @@ import json
 import pytest
 import sail.core
 from assertpy.assertpy import assert_that
-from cerberus import Validator
+from utils.schema_helpers import get_validator
 
 
 @pytest.mark.active
@@ -24,13 +24,7 @@ def test_run_valid_guid(get_safe_function_guid):
     :type get_safe_function_guid: string
     """
     # Arrange
-    schema = {
-        "return_value": {
-            "type": "string",
-            "regex": r"{4[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-        }
-    }
-    validator = Validator(schema)
+    validator = get_validator("JobGuid")
 
     # Act
     test_response = sail.core.run_job(get_safe_function_guid)
@@ -193,13 +187,7 @@ def test_pushing_user_parameter(user_parameter):
     :type user_parameter:
     """
     # Arrange
-    schema = {
-        "return_value": {
-            "type": "string",
-            "regex": r"{5[4567][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-        }
-    }
-    validator = Validator(schema)
+    validator = get_validator("UserDataGuid")
 
     # Act
     test_response = sail.core.push_user_data(user_parameter)
@@ -226,13 +214,7 @@ def test_setting_valid_parameter(get_safe_function_guid):
     input_parameter = safe_function["InputParameters"]["0"]["Uuid"]
     pushed_parameter = sail.core.push_user_data(12)
 
-    schema = {
-        "return_value": {
-            "type": "string",
-            "regex": r"{4[89AB][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}.{4[CDEF][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-        }
-    }
-    validator = Validator(schema)
+    validator = get_validator("JobParameter")
 
     # Act
     test_response = sail.core.set_parameter(job_id, input_parameter, pushed_parameter)
@@ -11,7 +11,7 @@ import time
 import pytest
 import sail.core
 from assertpy.assertpy import assert_that
-from cerberus import Validator
+from utils.schema_helpers import get_validator
 
 
 @pytest.mark.active
@@ -150,16 +150,7 @@ class TestProvisionScn:
         provision_dc = orchestrator_get_digital_contract_guid_fixture
         provision_ds = orchestrator_get_dataset_guid_fixture
 
-        schema = {
-            "SCNGuid": {
-                "type": "string",
-                "regex": r"{4[0123][A-Z0-9]{6}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}",
-            },
-            "Message": {"type": "string", "required": False},
-            "Status": {"type": "boolean"},
-        }
-
-        validator = Validator(schema)
+        validator = get_validator("SecureNodeProvision")
 
         # Act
         test_response = sail.core.provision_secure_computational_node(provision_dc, provision_ds, "Standard_D8s_v4")
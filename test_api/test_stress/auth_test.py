@@ -0,0 +1,50 @@
+# -----------------------------------------------------------
+#
+# Authentication throughput stress test file
+#
+# -----------------------------------------------------------
+import json
+
+import pytest
+from assertpy.assertpy import assert_that
+from config import STRESS_MAX_ERROR_RATE
+from stress.auth_benchmark import AUTH_OPERATIONS, AuthBenchmark, delete_accounts, provision_accounts, report_table
+
+
+@pytest.mark.stress
+def test_authentication_throughput(get_base_url, stress_transport, pytestconfig):
+    """
+    Log --auth-accounts users in at once, then run login, check_eosb and GetBasicUserInformation
+    at each of --auth-levels workers, report the throughput and latency percentiles of each
+
+    :param get_base_url: fixture, gets base url
+    :type get_base_url: string
+    :param stress_transport: fixture, HttpTransport without retries and circuit breakers
+    :type stress_transport: class : api_portal.http_transport.HttpTransport
+    """
+    # Arrange
+    levels = tuple(int(level) for level in pytestconfig.getoption("auth_levels").split(","))
+    accounts = provision_accounts(get_base_url, pytestconfig.getoption("auth_accounts"), transport=stress_transport)
+    benchmark = AuthBenchmark(
+        get_base_url, accounts, duration=pytestconfig.getoption("auth_duration"), transport=stress_transport
+    )
+
+    # Act
+    try:
+        report = benchmark.run(levels)
+    finally:
+        undeleted = delete_accounts(get_base_url, accounts, transport=stress_transport)
+
+    # Assert
+    print(f"\n{report_table(report)}")
+    report_path = pytestconfig.getoption("stress_report")
+    if report_path:
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    assert_that(undeleted).is_empty()
+    assert_that(report["LoginStorm"]["ErrorRate"]).is_less_than_or_equal_to(STRESS_MAX_ERROR_RATE)
+    assert_that(report["Operations"]).contains_only(*AUTH_OPERATIONS)
+    for operation, summaries in report["Operations"].items():
+        assert_that(summaries, description=operation).is_length(len(levels))
+        for summary in summaries:
+            assert_that(summary["ErrorRate"], description=operation).is_less_than_or_equal_to(STRESS_MAX_ERROR_RATE)
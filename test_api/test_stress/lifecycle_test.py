@@ -0,0 +1,84 @@
+# -----------------------------------------------------------
+#
+# Digital contract lifecycle pipeline stress test file
+#
+# -----------------------------------------------------------
+import json
+
+import pytest
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, RESEARCHER_EMAIL, SAIL_PASS, STRESS_MAX_ERROR_RATE
+from stress.lifecycle_benchmark import LifecycleBenchmark, register_lifecycle_resources, report_table
+from stress.lifecycle_pipeline import DigitalContractPipeline
+
+
+@pytest.mark.stress
+def test_digital_contract_lifecycle_pipeline(get_base_url, stress_transport, pytestconfig):
+    """
+    Push --lifecycle-contracts digital contracts from registration to deprovisioning through
+    the pipeline, report throughput and queue depth per stage
+
+    :param get_base_url: fixture, gets base url
+    :type get_base_url: string
+    :param stress_transport: fixture, HttpTransport without retries and circuit breakers
+    :type stress_transport: class : api_portal.http_transport.HttpTransport
+    """
+    # Arrange
+    dataset_guid, template_guid = register_lifecycle_resources(get_base_url, transport=stress_transport)
+    number_contracts = pytestconfig.getoption("lifecycle_contracts")
+    pipeline = DigitalContractPipeline(
+        get_base_url,
+        RESEARCHER_EMAIL,
+        DATAOWNER_EMAIL,
+        SAIL_PASS,
+        azure_template_guid=template_guid,
+        await_ready=True,
+        transport=stress_transport,
+    )
+
+    # Act
+    report = pipeline.run([dataset_guid], number_contracts)
+
+    # Assert
+    print(f"\n{report.report()}")
+    for failure in report.failures[:10]:
+        print(f"  {failure}")
+    summary = report.summary()
+    assert_that(summary).contains_key(
+        "register", "accept", "activate", "associate", "provision", "ready", "deprovision"
+    )
+    assert_that(len(report.completed) + len(report.failures)).is_equal_to(number_contracts)
+    for stage, values in summary.items():
+        assert_that(values["ErrorRate"], description=stage).is_less_than_or_equal_to(STRESS_MAX_ERROR_RATE)
+
+
+@pytest.mark.stress
+def test_digital_contract_lifecycle_throughput(get_base_url, stress_transport, pytestconfig):
+    """
+    Run the lifecycle at each of --lifecycle-levels workers per stage, report the throughput of
+    every transition and the stage it saturates at
+
+    :param get_base_url: fixture, gets base url
+    :type get_base_url: string
+    :param stress_transport: fixture, HttpTransport without retries and circuit breakers
+    :type stress_transport: class : api_portal.http_transport.HttpTransport
+    """
+    # Arrange
+    levels = tuple(int(level) for level in pytestconfig.getoption("lifecycle_levels").split(","))
+    benchmark = LifecycleBenchmark(
+        get_base_url, RESEARCHER_EMAIL, DATAOWNER_EMAIL, SAIL_PASS, transport=stress_transport
+    )
+
+    # Act
+    report = benchmark.run(levels)
+
+    # Assert
+    print(f"\n{report_table(report)}")
+    report_path = pytestconfig.getoption("stress_report")
+    if report_path:
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    assert_that(report["Stages"]).contains_key(report["SaturationStage"])
+    for stage, values in report["Stages"].items():
+        assert_that(values["Throughput"], description=stage).is_length(len(levels))
+        assert_that(max(values["ErrorRate"]), description=stage).is_less_than_or_equal_to(STRESS_MAX_ERROR_RATE)
@@ -0,0 +1,60 @@
+# -----------------------------------------------------------
+#
+# Load generation stress test file
+#
+# -----------------------------------------------------------
+import pytest
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS, STRESS_MAX_ERROR_RATE
+from stress.load_generator import LoadGenerator, LoadProfile
+
+
+@pytest.fixture
+def load_profile(pytestconfig):
+    """
+    Fixture for the LoadProfile given by the --stress-* cmdline arguments
+
+    :param pytestconfig:
+    :type pytestconfig:
+    :return: LoadProfile
+    :rtype: class : stress.load_generator.LoadProfile
+    """
+    return LoadProfile(
+        users=pytestconfig.getoption("stress_users"),
+        ramp_up=pytestconfig.getoption("stress_ramp_up"),
+        duration=pytestconfig.getoption("stress_duration"),
+        request_mix=LoadProfile.parse_request_mix(pytestconfig.getoption("stress_mix")),
+    )
+
+
+@pytest.mark.stress
+def test_request_mix_load(get_base_url, stress_transport, load_profile, pytestconfig):
+    """
+    Drive the portal with the configured users and request mix, report throughput and
+    p50/p95/p99 latency per endpoint
+
+    :param get_base_url: fixture, gets base url
+    :type get_base_url: string
+    :param stress_transport: fixture, HttpTransport without retries and circuit breakers
+    :type stress_transport: class : api_portal.http_transport.HttpTransport
+    :param load_profile: fixture, LoadProfile
+    :type load_profile: class : stress.load_generator.LoadProfile
+    """
+    # Arrange
+    load_generator = LoadGenerator(
+        get_base_url, DATAOWNER_EMAIL, SAIL_PASS, profile=load_profile, transport=stress_transport
+    )
+
+    # Act
+    stats, elapsed = load_generator.run()
+
+    # Assert
+    print(f"\n{stats.report(elapsed)}")
+    report_path = pytestconfig.getoption("stress_report")
+    if report_path:
+        with open(report_path, "w") as report_file:
+            report_file.write(stats.to_json(elapsed))
+    summary = stats.summary(elapsed)
+    assert_that(summary).is_not_empty()
+    for endpoint, values in summary.items():
+        assert_that(values["ErrorRate"], description=endpoint).is_less_than_or_equal_to(STRESS_MAX_ERROR_RATE)
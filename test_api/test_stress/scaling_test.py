@@ -0,0 +1,46 @@
+# -----------------------------------------------------------
+#
+# List endpoint scaling stress test file
+#
+# -----------------------------------------------------------
+import json
+
+import pytest
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, RESEARCHER_EMAIL, SAIL_PASS
+from stress.scaling_benchmark import LIST_ENDPOINTS, ScalingBenchmark, report_table
+
+
+@pytest.mark.stress
+def test_list_endpoints_scaling(get_base_url, stress_transport, pytestconfig):
+    """
+    Grow the objects of the data owner organization through --scaling-sizes, fit the latency
+    curve of every list endpoint and fail on a super linear one
+
+    :param get_base_url: fixture, gets base url
+    :type get_base_url: string
+    :param stress_transport: fixture, HttpTransport without retries and circuit breakers
+    :type stress_transport: class : api_portal.http_transport.HttpTransport
+    """
+    # Arrange
+    benchmark = ScalingBenchmark(get_base_url, DATAOWNER_EMAIL, RESEARCHER_EMAIL, SAIL_PASS, transport=stress_transport)
+    sizes = tuple(int(size) for size in pytestconfig.getoption("scaling_sizes").split(","))
+
+    # Act
+    report = benchmark.run(sizes)
+
+    # Assert
+    print(f"\n{report_table(report)}")
+    report_path = pytestconfig.getoption("stress_report")
+    if report_path:
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    assert_that(report["Endpoints"]).contains_only(*LIST_ENDPOINTS)
+    for step in report["Steps"]:
+        assert_that(step["RegistrationFailures"], description=f"n={step['Size']}").contains_only(*LIST_ENDPOINTS)
+        for endpoint, values in step["Endpoints"].items():
+            assert_that(values["Errors"], description=f"{endpoint} n={step['Size']}").is_zero()
+            assert_that(values["Objects"], description=f"{endpoint} n={step['Size']}").is_greater_than_or_equal_to(
+                step["Size"] - step["RegistrationFailures"][endpoint]
+            )
+    assert_that(report["Regressions"]).is_empty()
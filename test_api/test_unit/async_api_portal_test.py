@@ -0,0 +1,256 @@
+# -----------------------------------------------------------
+#
+# Async api portal classes unit test file
+#
+# -----------------------------------------------------------
+import asyncio
+import inspect
+
+import pytest
+from api_portal.account_management_api import AccountManagementApi
+from api_portal.async_api_portal import (
+    AsyncAccountManagementApi,
+    AsyncAzureTemplateApi,
+    AsyncDataFederationManagementApi,
+    AsyncDataSetManagementApi,
+    AsyncDatasetFamilyManagementApi,
+    AsyncDigitalContractManagementApi,
+    AsyncSailPortalApi,
+    AsyncVirtualMachineApi,
+)
+from api_portal.async_http_transport import AsyncHttpTransport
+from api_portal.azure_template_managment_api import AzureTemplateApi
+from api_portal.datafederation_management_api import DataFederationManagementApi
+from api_portal.datasetfamily_management_api import DatasetFamilyManagementApi
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.request_timing import RequestTimingRecorder
+from api_portal.retry_policy import RetryPolicy, RetryStats
+from api_portal.sail_portal_api import SailPortalApi
+from api_portal.virtual_machine_api import VirtualMachineApi
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS
+from mock_portal.portal_server import FaultProfile, MockPortalServer
+from utils.dataset_helpers import get_dataset_payload
+
+LOGIN = "POST /SAIL/AuthenticationManager/User/Login"
+USER_INFO_ROUTE = "/SAIL/AuthenticationManager/GetBasicUserInformation"
+
+CLIENTS = [
+    (SailPortalApi, AsyncSailPortalApi),
+    (AccountManagementApi, AsyncAccountManagementApi),
+    (AzureTemplateApi, AsyncAzureTemplateApi),
+    (DataFederationManagementApi, AsyncDataFederationManagementApi),
+    (DataSetManagementApi, AsyncDataSetManagementApi),
+    (DatasetFamilyManagementApi, AsyncDatasetFamilyManagementApi),
+    (DigitalContractManagementApi, AsyncDigitalContractManagementApi),
+    (VirtualMachineApi, AsyncVirtualMachineApi),
+]
+
+
+def public_methods(cls):
+    """
+    :param cls: api class
+    :type cls: type
+    :return: name -> function of the public methods of cls
+    :rtype: dict
+    """
+    return {name: function for name, function in vars(cls).items() if callable(function) and name[0] != "_"}
+
+
+def run(coroutine_function, **transport_kwargs):
+    """
+    Run coroutine_function(transport) on a new event loop with a private AsyncHttpTransport, closed afterwards
+
+    :param coroutine_function: takes the transport, returns a coroutine
+    :type coroutine_function: callable
+    :return: transport, result of the coroutine
+    :rtype: (AsyncHttpTransport, object)
+    """
+    transport_kwargs.setdefault("recorder", RequestTimingRecorder())
+    transport_kwargs.setdefault("retry_stats", RetryStats())
+    transport = AsyncHttpTransport(**transport_kwargs)
+
+    async def main():
+        async with transport:
+            return await coroutine_function(transport)
+
+    return transport, asyncio.run(main())
+
+
+@pytest.fixture
+def portal():
+    """
+    Fixture for a mock portal holding the config.py accounts
+
+    :return: MockPortalServer
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    with MockPortalServer() as server:
+        yield server
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sync_class, async_class", CLIENTS)
+def test_signatures_mirror_sync_class(sync_class, async_class):
+    """
+    Test every public method of an api class has a coroutine twin taking the same arguments
+
+    :param sync_class: parameterized value
+    :type sync_class: type
+    :param async_class: parameterized value
+    :type async_class: type
+    """
+    # Arrange
+    sync_methods = public_methods(sync_class)
+    async_methods = public_methods(async_class)
+    # VmInventory refreshes itself synchronously, it has no async twin
+    sync_methods.pop("inventory", None)
+
+    # Act
+    signatures = {name: str(inspect.signature(function)) for name, function in async_methods.items()}
+
+    # Assert
+    assert_that(str(inspect.signature(async_class))).is_equal_to(str(inspect.signature(sync_class)))
+    assert_that(signatures).is_equal_to(
+        {name: str(inspect.signature(function)) for name, function in sync_methods.items()}
+    )
+    for name, function in async_methods.items():
+        assert_that(inspect.iscoroutinefunction(function) or name == "invalidate_eosb").is_true()
+
+
+@pytest.mark.unit
+def test_gathered_calls_share_one_login():
+    """
+    Test 200 calls gathered on one event loop against a slow portal share a single login and overlap
+    """
+    # Arrange
+    with MockPortalServer(faults=FaultProfile(latency=0.05)) as portal:
+
+        async def calls(transport):
+            sail_portal = AsyncSailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+            return await asyncio.gather(*(sail_portal.get_basic_user_info() for _ in range(200)))
+
+        # Act
+        _, results = run(calls)
+
+        # Assert
+        assert_that([response.status_code for response, _, _ in results]).is_equal_to([200] * 200)
+        assert_that(portal.requests[LOGIN]).is_equal_to(1)
+        assert_that(portal.requests[f"GET {USER_INFO_ROUTE}"]).is_equal_to(200)
+
+
+@pytest.mark.unit
+def test_same_values_as_sync_clients(mock_world):
+    """
+    Test the async clients return the same listings as the sync clients
+
+    :param mock_world: fixture, MockWorld
+    :type mock_world: class : test_api.test_unit.conftest.MockWorld
+    """
+    # Arrange
+    base_url = mock_world.server.base_url
+    sync_contracts = mock_world.list_digital_contracts()
+    _, sync_vms, _ = mock_world.virtualmachine_management.list_virtual_machines(mock_world.sail_portal)
+
+    async def listings(transport):
+        sail_portal = AsyncSailPortalApi(
+            base_url, mock_world.data_owner["Email"], mock_world.data_owner["Password"], transport=transport
+        )
+        digitalcontract_management = AsyncDigitalContractManagementApi(base_url, transport=transport)
+        virtualmachine_management = AsyncVirtualMachineApi(base_url, transport=transport)
+        return await asyncio.gather(
+            digitalcontract_management.list_digital_contracts(sail_portal),
+            virtualmachine_management.list_virtual_machines(sail_portal),
+        )
+
+    # Act
+    _, ((contracts_response, contracts, eosb), (_, vms, _)) = run(listings)
+
+    # Assert
+    assert_that(contracts_response.status_code).is_equal_to(200)
+    assert_that(eosb).is_equal_to(contracts["Eosb"])
+    assert_that(contracts["DigitalContracts"]).is_equal_to(sync_contracts)
+    assert_that(vms["VirtualMachines"]).is_equal_to(sync_vms["VirtualMachines"])
+
+
+@pytest.mark.unit
+def test_rejected_eosb_refreshed_and_post_resent(portal):
+    """
+    Test a POST rejected with a 401 is resent once with a new eosb and applied once
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    """
+    # Arrange
+    payload = get_dataset_payload()[0]
+
+    async def register(transport):
+        sail_portal = AsyncSailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+        dataset_management = AsyncDataSetManagementApi(portal.base_url, transport=transport)
+        await sail_portal.get_eosb()
+        portal.state.sessions.clear()
+        return await dataset_management.register_dataset(sail_portal, payload)
+
+    # Act
+    _, (test_response, _, _) = run(register)
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(201)
+    assert_that(portal.requests["POST /SAIL/DatasetManager/RegisterDataset"]).is_equal_to(2)
+    assert_that(portal.requests[LOGIN]).is_equal_to(2)
+    assert_that(portal.state.datasets).is_length(1)
+
+
+@pytest.mark.unit
+def test_get_retried_on_503():
+    """
+    Test transient 503 responses of an idempotent request are retried away, counted and timed per attempt
+    """
+    # Arrange
+    route_faults = {USER_INFO_ROUTE: FaultProfile(error_rate=0.5)}
+    with MockPortalServer(route_faults=route_faults, seed=17) as portal:
+
+        async def calls(transport):
+            sail_portal = AsyncSailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+            return [(await sail_portal.get_basic_user_info())[0].status_code for _ in range(20)]
+
+        # Act
+        transport, status_codes = run(calls, retry_policy=RetryPolicy(max_retries=8, backoff_factor=0.001))
+
+    # Assert
+    endpoint = transport.retry_stats.snapshot()[f"GET {USER_INFO_ROUTE}"]
+    assert_that(status_codes).is_equal_to([200] * 20)
+    assert_that(endpoint["Retries"]).is_greater_than(0)
+    assert_that(endpoint["GaveUp"]).is_equal_to(0)
+    attempts = [record for record in transport.recorder.records() if record.path == USER_INFO_ROUTE]
+    assert_that(attempts).is_length(20 + endpoint["Retries"])
+
+
+@pytest.mark.unit
+def test_streamed_listing_validated(mock_world):
+    """
+    Test a listing sent with stream=True comes back as a validation report of every entry
+
+    :param mock_world: fixture, MockWorld
+    :type mock_world: class : test_api.test_unit.conftest.MockWorld
+    """
+    # Arrange
+    base_url = mock_world.server.base_url
+    expected_count = len(mock_world.list_digital_contracts())
+
+    async def listing(transport):
+        sail_portal = AsyncSailPortalApi(
+            base_url, mock_world.data_owner["Email"], mock_world.data_owner["Password"], transport=transport
+        )
+        digitalcontract_management = AsyncDigitalContractManagementApi(base_url, transport=transport)
+        return await digitalcontract_management.list_digital_contracts(sail_portal, stream=True)
+
+    # Act
+    _, (test_response, report, eosb) = run(listing)
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(200)
+    assert_that(report.ok).is_true()
+    assert_that(report.count).is_equal_to(expected_count)
+    assert_that(eosb).is_not_none()
@@ -0,0 +1,60 @@
+# -----------------------------------------------------------
+#
+# Concurrent portal calls unit test file
+#
+# -----------------------------------------------------------
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.sail_portal_api import SailPortalApi
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS
+from mock_portal.portal_server import FaultProfile, MockPortalServer
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def slow_portal():
+    """
+    Fixture for a mock portal taking LATENCY seconds to answer every request
+
+    :return: MockPortalServer
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    with MockPortalServer(faults=FaultProfile(latency=LATENCY)) as server:
+        yield server
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("number_calls", [200])
+def test_concurrent_calls_share_one_session(slow_portal, make_transport, number_calls):
+    """
+    Test hundreds of calls run at once from a thread pool over one SailPortalApi and one pooled transport,
+    logging in once
+
+    :param slow_portal: fixture, MockPortalServer
+    :type slow_portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :param number_calls: parameterized value
+    :type number_calls: int
+    """
+    # Arrange
+    transport = make_transport(pool_maxsize=number_calls)
+    sail_portal = SailPortalApi(slow_portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+    dataset_management = DataSetManagementApi(slow_portal.base_url, transport=transport)
+
+    # Act
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=number_calls) as executor:
+        responses = list(executor.map(lambda _: dataset_management.list_datasets(sail_portal)[0], range(number_calls)))
+    elapsed = time.monotonic() - start
+
+    # Assert
+    assert_that({response.status_code for response in responses}).is_equal_to({200})
+    assert_that(slow_portal.requests["POST /SAIL/AuthenticationManager/User/Login"]).is_equal_to(1)
+    # Run one after the other the calls would take number_calls * LATENCY seconds
+    assert_that(elapsed).is_less_than(number_calls * LATENCY / 10)
@@ -0,0 +1,105 @@
+# -----------------------------------------------------------
+#
+# Fixtures of the unit tests, run offline against in-process mock portals
+#
+# -----------------------------------------------------------
+import pytest
+from api_portal.digital_contract_management_api import DigitalContractManagementApi
+from api_portal.http_transport import HttpTransport
+from api_portal.request_timing import RequestTimingRecorder
+from api_portal.retry_policy import RetryStats
+from api_portal.sail_portal_api import SailPortalApi
+from api_portal.virtual_machine_api import VirtualMachineApi
+from mock_portal.portal_server import MockPortalServer
+from mock_portal.portal_state import PortalState
+from utils.digital_contract_helpers import get_digital_contract_provision_payload
+from utils.world_helpers import World, WorldSpec
+
+
+@pytest.fixture
+def make_transport():
+    """
+    Fixture for a factory of HttpTransports private to the test, closed at teardown
+
+    Their requests and retries are recorded into their own recorder and RetryStats, the
+    timing report and retry counters of the session only hold the traffic of the portal
+    under test.
+
+    :return: factory taking the HttpTransport arguments, its recorder and retry_stats default to private ones
+    :rtype: callable
+    """
+    transports = []
+
+    def make(**kwargs):
+        kwargs.setdefault("recorder", RequestTimingRecorder())
+        kwargs.setdefault("retry_stats", RetryStats())
+        transport = HttpTransport(**kwargs)
+        transports.append(transport)
+        return transport
+
+    yield make
+    for transport in transports:
+        transport.close()
+
+
+class MockWorld:
+    """
+    Mock World Class, a synthetic World served by a mock portal with the api clients of its first data owner
+    """
+
+    def __init__(self, world, server, transport):
+        """
+        :param world: world loaded into the portal state of server
+        :type world: class : utils.world_helpers.World
+        :param server: running mock portal
+        :type server: class : mock_portal.portal_server.MockPortalServer
+        :param transport: HttpTransport of the api clients
+        :type transport: class : api_portal.http_transport.HttpTransport
+        """
+        self.world = world
+        self.server = server
+        self.data_owner = world.users(0)[0]
+        self.sail_portal = SailPortalApi(
+            server.base_url, self.data_owner["Email"], self.data_owner["Password"], transport=transport
+        )
+        self.digitalcontract_management = DigitalContractManagementApi(base_url=server.base_url, transport=transport)
+        self.virtualmachine_management = VirtualMachineApi(base_url=server.base_url, transport=transport)
+
+    def list_digital_contracts(self):
+        """
+        :return: DigitalContractGuid -> digital contract, as listed for the data owner
+        :rtype: dict
+        """
+        return self.digitalcontract_management.list_digital_contracts(self.sail_portal)[1]["DigitalContracts"]
+
+    def provision_contracts(self):
+        """
+        Provision every activated digital contract of the data owner
+
+        :return: guids of the provisioned contracts
+        :rtype: list
+        """
+        contracts = self.list_digital_contracts()
+        provisioned = [guid for guid, contract in contracts.items() if contract["ContractStage"] == 3]
+        for dc_guid in provisioned:
+            self.digitalcontract_management.provision_digital_contract(
+                self.sail_portal, payload=get_digital_contract_provision_payload(dc_guid=dc_guid)
+            )
+        return provisioned
+
+
+@pytest.fixture
+def mock_world(make_transport):
+    """
+    Fixture for a synthetic world of 3 organizations holding contracts in every stage, served by a mock portal
+
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :return: MockWorld
+    :rtype: class : test_api.test_unit.conftest.MockWorld
+    """
+    world = World(WorldSpec(organizations=3, datasets_per_organization=6, contracts_per_dataset=3, seed=19))
+    state = PortalState(vm_state_interval=0.05)
+    state.load_world(world)
+    with MockPortalServer(state=state) as server:
+        yield MockWorld(world, server, make_transport())
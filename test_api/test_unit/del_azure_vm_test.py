@@ -0,0 +1,299 @@
+# -----------------------------------------------------------
+#
+# Azure vm batch deletion unit test file, run against the local azure stand-in
+#
+# -----------------------------------------------------------
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from assertpy.assertpy import assert_that
+from misc import del_azure_vm
+from misc.mock_azure_management import MockAzureServer, MockAzureState
+
+
+@pytest.fixture
+def azure(monkeypatch):
+    """
+    Fixture for a mock azure resource group of three running vms, del_azure_vm pointed at it
+
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    :return: MockAzureServer
+    :rtype: class : misc.mock_azure_management.MockAzureServer
+    """
+    state = MockAzureState(del_azure_vm.subscription_id, del_azure_vm.resource_group, operation_delay=0.05)
+    for number in range(3):
+        state.add_vm(f"scn-vm-{number}")
+    state.add_vm("keep-vm")
+    with MockAzureServer(state) as server:
+        monkeypatch.setattr(del_azure_vm, "management_url", server.base_url)
+        monkeypatch.setattr(del_azure_vm, "login_url", server.base_url)
+        monkeypatch.setattr(del_azure_vm, "operation_poll_interval", 0.01)
+        # No token cache file, every test logs in against its own mock
+        monkeypatch.setattr(del_azure_vm, "token_provider", del_azure_vm.TokenProvider(cache_path=""))
+        yield server
+
+
+def vm_resources(state, vm_name):
+    """
+    :param state: MockAzureState
+    :type state: class : misc.mock_azure_management.MockAzureState
+    :param vm_name: vm name
+    :type vm_name: string
+    :return: names of the vm, disk, nic and ip of vm_name still in state
+    :rtype: list
+    """
+    names = [vm_name, f"{vm_name}-disk", f"{vm_name}-nic", f"{vm_name}-ip"]
+    return [name for resources in state.resources.values() for name in resources if name in names]
+
+
+@pytest.mark.unit
+def test_batch_main_deletes_matching_vms(azure):
+    """
+    Test batch mode deletes every vm matching the pattern with its disk, nic and ip, and no other vm
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    args = argparse.Namespace(vm=None, pattern="scn-*", yes=True, max_workers=8)
+
+    # Act
+    exit_code = del_azure_vm.batch_main(args)
+
+    # Assert
+    assert_that(exit_code).is_equal_to(0)
+    for number in range(3):
+        assert_that(vm_resources(azure.state, f"scn-vm-{number}")).is_empty()
+    assert_that(vm_resources(azure.state, "keep-vm")).is_length(4)
+    assert_that(azure.requests["POST virtualmachines/deallocate"]).is_equal_to(3)
+    assert_that(azure.requests["DELETE publicipaddresses"]).is_equal_to(3)
+
+
+@pytest.mark.unit
+def test_failed_step_skips_dependent_steps(azure):
+    """
+    Test the steps depending on a failed step are skipped, the teardown of the other vms goes on
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    # Gone before its teardown starts, its deallocate step fails on the missing instance view
+    del azure.state.resources["virtualmachines"]["scn-vm-1"]
+
+    # Act
+    outcomes = del_azure_vm.batch_delete_vms(["scn-vm-0", "scn-vm-1"], max_workers=4)
+
+    # Assert
+    assert_that(outcomes[("scn-vm-1", "deallocate")][0]).is_equal_to("failed")
+    assert_that(outcomes[("scn-vm-1", "vm")]).is_equal_to(("skipped", ("scn-vm-1", "deallocate")))
+    assert_that(outcomes[("scn-vm-1", "disk")]).is_equal_to(("skipped", ("scn-vm-1", "vm")))
+    assert_that(outcomes[("scn-vm-1", "nic")]).is_equal_to(("skipped", ("scn-vm-1", "vm")))
+    assert_that(outcomes[("scn-vm-1", "ip")]).is_equal_to(("skipped", ("scn-vm-1", "nic")))
+    assert_that(vm_resources(azure.state, "scn-vm-1")).is_length(3)
+    assert_that([outcomes[("scn-vm-0", step)][0] for step in ("deallocate", "vm", "disk", "nic", "ip")]).is_equal_to(
+        ["done"] * 5
+    )
+    assert_that(vm_resources(azure.state, "scn-vm-0")).is_empty()
+
+
+@pytest.mark.unit
+def test_wait_for_operation_polls_until_done(azure):
+    """
+    Test a long running operation is polled through its Azure-AsyncOperation url until it succeeded
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    azure.state.operation_delay = 0.3
+    response = del_azure_vm.stop_vm(vm_name="scn-vm-0")
+
+    # Act
+    status = del_azure_vm.wait_for_operation(response, timeout=5)
+
+    # Assert
+    assert_that(response.status_code).is_equal_to(202)
+    assert_that(response.headers).contains_key("Azure-AsyncOperation")
+    assert_that(status).is_equal_to("Succeeded")
+    assert_that(azure.state.power_states["scn-vm-0"]).is_equal_to("VM deallocated")
+    assert_that(azure.requests["GET operation"]).is_greater_than_or_equal_to(1)
+
+
+@pytest.mark.unit
+def test_wait_for_operation_times_out(azure):
+    """
+    Test an operation still running after the timeout raises a TimeoutError
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    azure.state.operation_delay = 60
+    response = del_azure_vm.stop_vm(vm_name="scn-vm-0")
+    # Poll every 10ms instead of the Retry-After of the operation
+    del response.headers["Retry-After"]
+
+    # Act / Assert
+    with pytest.raises(TimeoutError):
+        del_azure_vm.wait_for_operation(response, timeout=0.2)
+    assert_that(azure.state.power_states["scn-vm-0"]).is_equal_to("VM deallocating")
+
+
+@pytest.mark.unit
+def test_vm_ips_joined_on_nic(azure):
+    """
+    Test every vm is mapped from the public ip configured on its nic, a vm without public ip from None
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    azure.state.add_vm("private-vm", public_ip=False)
+    ips = {
+        ip["name"][: -len("-ip")]: ip["properties"]["ipAddress"]
+        for ip in azure.state.resources["publicipaddresses"].values()
+    }
+
+    # Act
+    map_vm_ip = del_azure_vm.get_all_vm_ips()
+
+    # Assert
+    assert_that(map_vm_ip).is_equal_to({**{ip: vm_name for vm_name, ip in ips.items()}, None: "private-vm"})
+    assert_that(azure.requests["GET virtualmachines list"]).is_equal_to(1)
+    assert_that(azure.requests["GET publicipaddresses list"]).is_equal_to(1)
+
+
+@pytest.mark.unit
+def test_list_resources_follows_next_link(azure):
+    """
+    Test a listing longer than a page is followed across every nextLink
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    azure.state.page_size = 2
+    for number in range(3, 8):
+        azure.state.add_vm(f"scn-vm-{number}")
+
+    # Act
+    vm_names = del_azure_vm.list_vm_names()
+
+    # Assert
+    assert_that(vm_names).is_equal_to(sorted(azure.state.resources["virtualmachines"]))
+    assert_that(vm_names).is_length(9)
+    assert_that(azure.requests["GET virtualmachines list"]).is_equal_to(5)
+
+
+@pytest.mark.unit
+def test_list_resources_raises_on_refused_page(azure):
+    """
+    Test a refused listing raises instead of reading the error body as an empty listing
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    url = (
+        f"{azure.base_url}/subscriptions/{del_azure_vm.subscription_id}/resourceGroups/{del_azure_vm.resource_group}"
+        "/providers/Microsoft.Compute/virtualMachines?api-version=2021-07-01"
+    )
+
+    # Act / Assert
+    with pytest.raises(RuntimeError, match="401"):
+        del_azure_vm.list_resources(url, access_token="expired-token")
+
+
+def rotate_token(azure):
+    """
+    Expire the token of del_azure_vm.token_provider at the mock and have the provider fetch a new one,
+    as its refresh thread does ahead of expiry
+
+    :param azure: MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    expired_token = del_azure_vm.token_provider.access_token
+    azure.state.tokens[expired_token] = 0
+    del_azure_vm.token_provider.refresh()
+
+
+@pytest.mark.unit
+def test_token_fetched_once_by_concurrent_callers():
+    """
+    Test threads asking for a stale token at once wait for a single fetch
+    """
+    # Arrange
+    fetches = []
+
+    def fetch():
+        fetches.append(threading.current_thread().name)
+        time.sleep(0.1)
+        return {"access_token": f"token-{len(fetches)}", "expires_in": 3600}
+
+    token_provider = del_azure_vm.TokenProvider(cache_path="", fetch=fetch)
+
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tokens = list(executor.map(lambda _: token_provider.get_token(), range(8)))
+
+    # Assert
+    assert_that(fetches).is_length(1)
+    assert_that(set(tokens)).is_equal_to({"token-1"})
+
+
+@pytest.mark.unit
+def test_wait_for_operation_polls_with_refreshed_token(azure):
+    """
+    Test an operation outliving its token is polled with the token refreshed meanwhile
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    """
+    # Arrange
+    azure.state.operation_delay = 0.3
+    response = del_azure_vm.stop_vm(vm_name="scn-vm-0")
+    rotation = threading.Timer(0.1, rotate_token, args=(azure,))
+
+    # Act
+    rotation.start()
+    status = del_azure_vm.wait_for_operation(response, timeout=2)
+    rotation.join()
+
+    # Assert
+    assert_that(status).is_equal_to("Succeeded")
+    assert_that(azure.requests).does_not_contain_key("GET unauthorized")
+
+
+@pytest.mark.unit
+def test_list_resources_pages_with_refreshed_token(azure, monkeypatch):
+    """
+    Test the pages of a listing after a token refresh are requested with the new token
+
+    :param azure: fixture, MockAzureServer
+    :type azure: class : misc.mock_azure_management.MockAzureServer
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    """
+    # Arrange
+    azure.state.page_size = 1
+    list_page = azure.state.list_resources
+
+    def list_page_then_rotate(kind, skip):
+        page = list_page(kind, skip)
+        if skip == 0:
+            rotate_token(azure)
+        return page
+
+    monkeypatch.setattr(azure.state, "list_resources", list_page_then_rotate)
+
+    # Act
+    vm_names = del_azure_vm.list_vm_names()
+
+    # Assert
+    assert_that(vm_names).is_length(4)
+    assert_that(azure.requests["GET token"]).is_equal_to(2)
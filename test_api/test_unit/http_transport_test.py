@@ -0,0 +1,121 @@
+# -----------------------------------------------------------
+#
+# HttpTransport retry and circuit breaker unit test file
+#
+# -----------------------------------------------------------
+import socket
+
+import pytest
+from api_portal.retry_policy import CircuitOpenError, RetryPolicy
+from api_portal.sail_portal_api import SailPortalApi
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS
+from mock_portal.portal_server import FaultProfile, MockPortalServer
+
+USER_INFO_ROUTE = "/SAIL/AuthenticationManager/GetBasicUserInformation"
+
+
+@pytest.fixture
+def flaky_portal():
+    """
+    Fixture for a mock portal answering half the GetBasicUserInformation requests with a 503
+
+    :return: MockPortalServer
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    route_faults = {USER_INFO_ROUTE: FaultProfile(error_rate=0.5)}
+    with MockPortalServer(route_faults=route_faults, seed=17) as server:
+        yield server
+
+
+@pytest.mark.unit
+def test_get_basic_user_information_retried(flaky_portal, make_transport):
+    """
+    Test transient 503 responses of an idempotent request are retried away and counted
+
+    :param flaky_portal: fixture, MockPortalServer
+    :type flaky_portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    transport = make_transport(retry_policy=RetryPolicy(max_retries=8, backoff_factor=0.001))
+    sail_portal = SailPortalApi(flaky_portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+
+    # Act
+    status_codes = [sail_portal.get_basic_user_info()[0].status_code for _ in range(20)]
+
+    # Assert
+    endpoint = transport.retry_stats.snapshot()[f"GET {USER_INFO_ROUTE}"]
+    assert_that(status_codes).is_equal_to([200] * 20)
+    assert_that(endpoint["Retries"]).is_greater_than(0)
+    assert_that(endpoint["GaveUp"]).is_equal_to(0)
+    attempts = [record for record in transport.recorder.records() if record.path == USER_INFO_ROUTE]
+    assert_that(attempts).is_length(20 + endpoint["Retries"])
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_on_failing_endpoint(make_transport):
+    """
+    Test an endpoint failing every request fails fast once its circuit opened, other endpoints still answer
+
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    route_faults = {USER_INFO_ROUTE: FaultProfile(error_rate=1.0)}
+    transport = make_transport(
+        retry_policy=RetryPolicy(max_retries=0), circuit_failure_threshold=3, circuit_reset_timeout=60
+    )
+    with MockPortalServer(route_faults=route_faults) as server:
+        sail_portal = SailPortalApi(server.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+
+        # Act
+        status_codes = [sail_portal.get_basic_user_info()[0].status_code for _ in range(3)]
+        sent = server.requests[f"GET {USER_INFO_ROUTE}"]
+        with pytest.raises(CircuitOpenError):
+            sail_portal.get_basic_user_info()
+        check_response, _, _ = sail_portal.check_eosb(sail_portal.get_eosb())
+
+    # Assert
+    assert_that(status_codes).is_equal_to([503] * 3)
+    assert_that(server.requests[f"GET {USER_INFO_ROUTE}"]).is_equal_to(sent)
+    assert_that(transport.retry_stats.snapshot()[f"GET {USER_INFO_ROUTE}"]).contains_entry(
+        {"CircuitOpened": 1}, {"CircuitRejected": 1}
+    )
+    assert_that(check_response.status_code).is_equal_to(200)
+
+
+@pytest.mark.unit
+def test_host_resolved_once_per_connection(make_transport, monkeypatch):
+    """
+    Test a new connection looks its host name up once, the lookup is timed as dns and not again as connect
+
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    """
+    # Arrange
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(host, *args, **kwargs):
+        lookups.append(host)
+        return getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", counting_getaddrinfo)
+    transport = make_transport()
+    with MockPortalServer() as server:
+        base_url = server.base_url.replace("127.0.0.1", "localhost")
+        sail_portal = SailPortalApi(base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+
+        # Act
+        test_response, _, _ = sail_portal.get_basic_user_info()
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(200)
+    assert_that(lookups.count("localhost")).is_equal_to(1)
+    login = transport.recorder.records()[0]
+    assert_that(login.dns).is_greater_than(0)
+    assert_that(login.connect).is_greater_than(0)
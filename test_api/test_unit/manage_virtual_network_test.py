@@ -0,0 +1,104 @@
+# -----------------------------------------------------------
+#
+# Virtual network provisioning dry run unit test file
+#
+# -----------------------------------------------------------
+import threading
+
+import pytest
+from assertpy.assertpy import assert_that
+from misc import manage_virtual_network
+
+
+class TrackedPoller:
+    """
+    Tracked Poller Class, calls on_end once the operation of the wrapped poller ended
+    """
+
+    def __init__(self, poller, on_end):
+        self._poller = poller
+        self._on_end = on_end
+
+    def result(self):
+        try:
+            return self._poller.result()
+        finally:
+            self._on_end()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_workers", [1, 2, 3])
+def test_dry_run_respects_workers_and_dependencies(max_workers):
+    """
+    Test the dry run provisions every step, never more than max_workers at once, each after its dependencies
+
+    :param max_workers: parameterized value
+    :type max_workers: int
+    """
+    # Arrange
+    resource_client, network_client = manage_virtual_network.get_clients(dry_run=True, time_scale=0.02)
+    steps = manage_virtual_network.get_provisioning_steps(resource_client, network_client)
+    lock = threading.Lock()
+    running = set()
+    ended = set()
+    peak = []
+    started_early = []
+
+    def end(name):
+        with lock:
+            running.discard(name)
+            ended.add(name)
+
+    def tracked(name, start, dependencies):
+        def tracked_start():
+            with lock:
+                running.add(name)
+                peak.append(len(running))
+                started_early.extend((name, dependency) for dependency in dependencies if dependency not in ended)
+            operation = start()
+            if not hasattr(operation, "result"):
+                end(name)
+                return operation
+            return TrackedPoller(operation, lambda: end(name))
+
+        return tracked_start
+
+    tracked_steps = {
+        name: (tracked(name, start, dependencies), dependencies) for name, (start, dependencies) in steps.items()
+    }
+
+    # Act
+    outcomes = manage_virtual_network.run_steps(tracked_steps, max_workers=max_workers)
+
+    # Assert
+    assert_that({name: result for name, (result, _) in outcomes.items()}).is_equal_to(dict.fromkeys(steps, "done"))
+    assert_that(max(peak)).is_less_than_or_equal_to(max_workers)
+    assert_that(started_early).is_empty()
+
+
+@pytest.mark.unit
+def test_dry_run_runs_independent_steps_concurrently():
+    """
+    Test the public ips, firewall policy and vnet all wait on the resource group only and run side by side
+    """
+    # Arrange
+    resource_client, network_client = manage_virtual_network.get_clients(dry_run=True, time_scale=0.05)
+    steps = manage_virtual_network.get_provisioning_steps(resource_client, network_client)
+    fake_azure = resource_client._fake_azure
+
+    # Act
+    outcomes = manage_virtual_network.run_steps(steps)
+
+    # Assert
+    assert_that([result for result, _ in outcomes.values()]).is_equal_to(["done"] * len(steps))
+    begins = {name: at for at, action, _, name in fake_azure.events if action == "begin"}
+    independent = [
+        manage_virtual_network.VPN_PUBLIC_IP_ADDRESS_NAME,
+        manage_virtual_network.FIREWALL_PUBLIC_IP_ADDRESS_NAME,
+        manage_virtual_network.FIREWALL_POLICY_NAME,
+        manage_virtual_network.VIRTUAL_NETWORK_NAME,
+    ]
+    # Each takes at least 25ms in this run, started one after another the last would begin 75ms after the first
+    assert_that(max(begins[name] for name in independent) - min(begins[name] for name in independent)).is_less_than(
+        0.05
+    )
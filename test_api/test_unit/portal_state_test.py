@@ -0,0 +1,67 @@
+# -----------------------------------------------------------
+#
+# Mock portal state unit test file
+#
+# -----------------------------------------------------------
+import pytest
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS
+from mock_portal.portal_state import PortalState
+
+
+@pytest.fixture
+def state():
+    """
+    Fixture for a portal state holding the config.py accounts
+
+    :return: PortalState
+    :rtype: class : mock_portal.portal_state.PortalState
+    """
+    return PortalState.with_default_accounts()
+
+
+def login(state):
+    """
+    :param state: PortalState
+    :type state: class : mock_portal.portal_state.PortalState
+    :return: eosb and session of the data owner
+    :rtype: (string, dict)
+    """
+    _, body = state.login({"Email": DATAOWNER_EMAIL, "Password": SAIL_PASS})
+    return body["Eosb"], state.get_session(body["Eosb"])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "handler, params, expected_status",
+    [
+        ("get_basic_user_information", {}, 401),
+        ("list_data_federations", {}, 401),
+        ("register_dataset_family", {"DatasetFamilyTitle": "title", "DatasetFamilyDescription": "description"}, 401),
+        ("delete_dataset", {"DatasetGuid": "unknown"}, 404),
+        ("pull_digital_contract", {"DigitalContractGuid": "unknown"}, 404),
+    ],
+)
+def test_handlers_of_removed_user(state, handler, params, expected_status):
+    """
+    Test the handlers answer an error instead of raising when the user of a live session was removed
+
+    :param state: fixture, PortalState
+    :type state: class : mock_portal.portal_state.PortalState
+    :param handler: parameterized value
+    :type handler: string
+    :param params: parameterized value
+    :type params: dict
+    :param expected_status: parameterized value
+    :type expected_status: int
+    """
+    # Arrange
+    eosb, session = login(state)
+    del state.users[session["UserGuid"]]
+
+    # Act
+    status, _ = getattr(state, handler)(session, params)
+
+    # Assert
+    assert_that(status).is_equal_to(expected_status)
+    assert_that(state.get_session(eosb)).is_none()
@@ -0,0 +1,52 @@
+# -----------------------------------------------------------
+#
+# Provisioning multiplexer unit test file
+#
+# -----------------------------------------------------------
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from api_portal.provisioning_multiplexer import ProvisioningMultiplexer
+from assertpy.assertpy import assert_that
+from utils.digital_contract_helpers import PROVISIONING_READY
+
+LIST_CONTRACTS = "GET /SAIL/DigitalContractManager/DigitalContracts"
+USER_INFO = "GET /SAIL/AuthenticationManager/GetBasicUserInformation"
+
+
+@pytest.mark.unit
+def test_provisioning_multiplexer(mock_world):
+    """
+    Test many digital contracts are awaited to be provisioned with a single listing per poll
+
+    :param mock_world: fixture, MockWorld
+    :type mock_world: class : test_api.test_unit.conftest.MockWorld
+    """
+    # Arrange
+    provisioned = mock_world.provision_contracts()
+    contracts = mock_world.list_digital_contracts()
+    listings = mock_world.server.requests[LIST_CONTRACTS]
+    user_infos = mock_world.server.requests[USER_INFO]
+
+    # Act
+    with ProvisioningMultiplexer(
+        mock_world.digitalcontract_management, mock_world.sail_portal, initial_interval=0.02, max_interval=0.2
+    ) as multiplexer:
+        with ThreadPoolExecutor(max_workers=len(provisioned)) as executor:
+            statuses = list(
+                executor.map(
+                    lambda dc_guid: multiplexer.wait_for(dc_guid, {PROVISIONING_READY}, timeout=10), provisioned
+                )
+            )
+    polls = mock_world.server.requests[LIST_CONTRACTS] - listings
+    user_infos = mock_world.server.requests[USER_INFO] - user_infos
+
+    # Assert
+    assert_that(len(provisioned)).is_greater_than(1)
+    for dc_guid, status in zip(provisioned, statuses):
+        assert_that(status["DigitalContractGuid"]).is_equal_to(dc_guid)
+        assert_that(status["ProvisioningStatus"]).is_equal_to(PROVISIONING_READY)
+        assert_that(status["NumberOfVirtualMachinesReady"]).is_equal_to(contracts[dc_guid]["NumberOfVirtualMachines"])
+    assert_that(polls).is_equal_to(multiplexer.polls)
+    assert_that(user_infos).is_zero()
+    assert_that(mock_world.server.requests["GET /SAIL/DigitalContractManager/GetProvisioningStatus"]).is_zero()
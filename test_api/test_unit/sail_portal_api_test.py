@@ -0,0 +1,197 @@
+# -----------------------------------------------------------
+#
+# SailPortalApi eosb cache unit test file
+#
+# -----------------------------------------------------------
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from api_portal.dataset_management_api import DataSetManagementApi
+from api_portal.sail_portal_api import SailPortalApi
+from assertpy.assertpy import assert_that
+from config import DATAOWNER_EMAIL, SAIL_PASS
+from mock_portal.portal_server import MockPortalServer
+from utils.dataset_helpers import get_dataset_payload
+
+LOGIN = "POST /SAIL/AuthenticationManager/User/Login"
+
+
+@pytest.fixture
+def portal():
+    """
+    Fixture for a mock portal holding the config.py accounts
+
+    :return: MockPortalServer
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    with MockPortalServer() as server:
+        yield server
+
+
+@pytest.mark.unit
+def test_eosb_cached_until_ttl(portal, make_transport):
+    """
+    Test api calls share one login while the eosb is younger than eosb_ttl, and login again once it is older
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    transport = make_transport()
+    cached = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+    expiring = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, eosb_ttl=0.05, transport=transport)
+
+    # Act
+    status_codes = [cached.get_basic_user_info()[0].status_code for _ in range(3)]
+    cached_logins = portal.requests[LOGIN]
+    first_eosb = expiring.get_eosb()
+    time.sleep(0.1)
+    second_eosb = expiring.get_eosb()
+
+    # Assert
+    assert_that(status_codes).is_equal_to([200] * 3)
+    assert_that(cached_logins).is_equal_to(1)
+    assert_that(portal.requests[LOGIN]).is_equal_to(3)
+    assert_that(second_eosb).is_not_equal_to(first_eosb)
+
+
+@pytest.mark.unit
+def test_invalidate_eosb(portal, make_transport):
+    """
+    Test the call after invalidate_eosb logs in again
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    sail_portal = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=make_transport())
+    first_eosb = sail_portal.get_eosb()
+
+    # Act
+    sail_portal.invalidate_eosb()
+    second_eosb = sail_portal.get_eosb()
+
+    # Assert
+    assert_that(portal.requests[LOGIN]).is_equal_to(2)
+    assert_that(second_eosb).is_not_equal_to(first_eosb)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("number_threads", [20])
+def test_refresh_eosb_logs_in_once(portal, make_transport, number_threads):
+    """
+    Test threads refreshing the same expired eosb at once share a single new login
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :param number_threads: parameterized value
+    :type number_threads: int
+    """
+    # Arrange
+    sail_portal = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=make_transport())
+    expired_eosb = sail_portal.get_eosb()
+    barrier = threading.Barrier(number_threads)
+
+    def refresh(_):
+        barrier.wait()
+        return sail_portal.refresh_eosb(expired_eosb)
+
+    # Act
+    with ThreadPoolExecutor(max_workers=number_threads) as executor:
+        refreshed = set(executor.map(refresh, range(number_threads)))
+
+    # Assert
+    assert_that(portal.requests[LOGIN]).is_equal_to(2)
+    assert_that(refreshed).is_length(1)
+    assert_that(refreshed).does_not_contain(expired_eosb)
+
+
+@pytest.mark.unit
+def test_rejected_eosb_refreshed_and_get_resent(portal, make_transport):
+    """
+    Test a GET rejected with a 401 is resent once with a new eosb
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    transport = make_transport()
+    sail_portal = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+    dataset_management = DataSetManagementApi(portal.base_url, transport=transport)
+    sail_portal.get_eosb()
+    portal.state.sessions.clear()
+
+    # Act
+    test_response, _, _ = dataset_management.list_datasets(sail_portal)
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(200)
+    assert_that(portal.requests[LOGIN]).is_equal_to(2)
+    assert_that(portal.requests["GET /SAIL/DatasetManager/ListDatasets"]).is_equal_to(2)
+
+
+@pytest.mark.unit
+def test_rejected_eosb_refreshed_and_post_resent(portal, make_transport):
+    """
+    Test a POST rejected with a 401 is resent once with a new eosb and applied once
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    transport = make_transport()
+    sail_portal = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=transport)
+    dataset_management = DataSetManagementApi(portal.base_url, transport=transport)
+    sail_portal.get_eosb()
+    portal.state.sessions.clear()
+    payload = get_dataset_payload()[0]
+
+    # Act
+    test_response, _, _ = dataset_management.register_dataset(sail_portal, payload)
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(201)
+    assert_that(portal.requests["POST /SAIL/DatasetManager/RegisterDataset"]).is_equal_to(2)
+    assert_that(portal.requests[LOGIN]).is_equal_to(2)
+    assert_that(portal.state.datasets).is_length(1)
+
+
+@pytest.mark.unit
+def test_client_sends_through_its_transport(portal, make_transport):
+    """
+    Test an api client given its own transport sends its calls through it, the login goes through the session one
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    session_transport = make_transport()
+    client_transport = make_transport()
+    sail_portal = SailPortalApi(portal.base_url, DATAOWNER_EMAIL, SAIL_PASS, transport=session_transport)
+    dataset_management = DataSetManagementApi(portal.base_url, transport=client_transport)
+
+    # Act
+    test_response, _, _ = dataset_management.list_datasets(sail_portal)
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(200)
+    assert_that([record.path for record in client_transport.recorder.records()]).is_equal_to(
+        ["/SAIL/DatasetManager/ListDatasets"]
+    )
+    assert_that([record.path for record in session_transport.recorder.records()]).is_equal_to(
+        ["/SAIL/AuthenticationManager/User/Login"]
+    )
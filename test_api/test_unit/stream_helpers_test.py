@@ -0,0 +1,134 @@
+# -----------------------------------------------------------
+#
+# Streamed listing decoding unit test file
+#
+# -----------------------------------------------------------
+import json
+
+import pytest
+import utils.stream_helpers
+from assertpy.assertpy import assert_that
+from utils.stream_helpers import iter_listing
+
+LISTING = {
+    "Eosb": "ÉOSB-ünïcode",
+    "DigitalContracts": {
+        "guid-1": {
+            "Title": "Ünïcode ✓ 😀 日本",
+            "Size": 1234567890,
+            "Ratio": -1.5e-10,
+            "Tags": ['quote " inside', "backslash \\", "brackets ]}{["],
+            "Nested": {"Values": [1, {"Empty": None}, [], {}]},
+            "Active": True,
+        },
+        "guid-2": {"Title": "", "Size": 0, "Ratio": 42.0, "Tags": [], "Nested": {}, "Active": False},
+    },
+    "Status": 200,
+}
+
+
+def split(document, size):
+    """
+    :param document: encoded document
+    :type document: bytes
+    :param size: bytes per chunk
+    :type size: int
+    :return: chunks of document
+    :rtype: list
+    """
+    return [document[start : start + size] for start in range(0, len(document), size)]
+
+
+def decode(chunks):
+    """
+    :param chunks: chunks of a digital contracts listing
+    :type chunks: iterable
+    :return: the listing as decoded by iter_listing
+    :rtype: dict
+    """
+    listing = {"DigitalContracts": {}}
+    for is_item, key, value in iter_listing(chunks, "DigitalContracts"):
+        if is_item:
+            listing["DigitalContracts"][key] = value
+        else:
+            listing[key] = value
+    return listing
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_chunk_boundaries(size):
+    """
+    Test chunk boundaries anywhere, within multibyte utf-8 characters, numbers, strings and escapes,
+    decode the same listing
+
+    :param size: parameterized value, bytes per chunk
+    :type size: int
+    """
+    # Arrange
+    document = json.dumps(LISTING, ensure_ascii=False).encode()
+
+    # Act
+    listing = decode(split(document, size))
+
+    # Assert
+    assert_that(listing).is_equal_to(LISTING)
+
+
+@pytest.mark.unit
+def test_split_numbers():
+    """
+    Test a number split after every digit is decoded whole
+    """
+    # Arrange
+    document = '{"Size": 1234567890, "Ratio": -1.5e-10, "Status": 200}'
+
+    # Act
+    values = [value for _, _, value in iter_listing(list(document), "DigitalContracts")]
+
+    # Assert
+    assert_that(values).is_equal_to([1234567890, -1.5e-10, 200])
+
+
+@pytest.mark.unit
+def test_truncated_input():
+    """
+    Test every truncation of the listing, also within a multibyte utf-8 character, raises a ValueError
+    """
+    # Arrange
+    document = json.dumps(LISTING, ensure_ascii=False).encode()
+
+    for end in range(len(document)):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            decode(split(document[:end], 4))
+
+
+@pytest.mark.unit
+def test_value_decoded_once(monkeypatch):
+    """
+    Test a large item arriving in many chunks is decoded once, not again on every chunk
+
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    """
+    # Arrange
+    decoder = json.JSONDecoder()
+    calls = []
+
+    class CountingDecoder:
+        def raw_decode(self, document, index):
+            calls.append(index)
+            return decoder.raw_decode(document, index)
+
+    monkeypatch.setattr(utils.stream_helpers, "_decoder", CountingDecoder())
+    item = {"Tables": {f"table-{index}": {"Name": "ü" * 50, "Rows": index} for index in range(2000)}}
+    document = json.dumps({"DigitalContracts": {"guid-1": item}, "Status": 200}).encode()
+
+    # Act
+    listing = decode(split(document, 64))
+
+    # Assert
+    assert_that(listing["DigitalContracts"]["guid-1"]).is_equal_to(item)
+    # Keys DigitalContracts, guid-1 and Status, the item and the Status value
+    assert_that(calls).is_length(5)
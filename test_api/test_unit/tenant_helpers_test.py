@@ -0,0 +1,130 @@
+# -----------------------------------------------------------
+#
+# Tenant provision and teardown unit test file
+#
+# -----------------------------------------------------------
+import pytest
+import requests
+import utils.tenant_helpers
+from api_portal.account_management_api import AccountManagementApi
+from assertpy.assertpy import assert_that
+from mock_portal.portal_server import MockPortalServer
+from mock_portal.portal_state import ACCOUNT_ACTIVE, ACCOUNT_DELETED
+from utils.account_helpers import get_add_user_payload
+from utils.tenant_helpers import Tenant
+
+
+@pytest.fixture
+def portal():
+    """
+    Fixture for a mock portal holding the config.py accounts
+
+    :return: MockPortalServer
+    :rtype: class : mock_portal.portal_server.MockPortalServer
+    """
+    with MockPortalServer() as server:
+        yield server
+
+
+def account_status(portal, email):
+    """
+    :param portal: MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param email: user email
+    :type email: string
+    :return: AccountStatus of the user, None when the portal has no such user
+    :rtype: int
+    """
+    return next((user["AccountStatus"] for user in portal.state.users.values() if user["Email"] == email), None)
+
+
+@pytest.mark.unit
+def test_provision_and_teardown(portal, make_transport):
+    """
+    Test teardown deletes both users added by provision
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    """
+    # Arrange
+    transport = make_transport()
+    account_management = AccountManagementApi(base_url=portal.base_url, transport=transport)
+    tenant = Tenant.for_worker("gw0")
+
+    # Act
+    tenant.provision(portal.base_url, account_management, transport=transport)
+    provisioned = [account_status(portal, email) for email in (tenant.researcher_email, tenant.data_owner_email)]
+    tenant.teardown(portal.base_url, account_management)
+
+    # Assert
+    assert_that(provisioned).is_equal_to([ACCOUNT_ACTIVE] * 2)
+    assert_that(account_status(portal, tenant.researcher_email)).is_equal_to(ACCOUNT_DELETED)
+    assert_that(account_status(portal, tenant.data_owner_email)).is_equal_to(ACCOUNT_DELETED)
+    assert_that(tenant.created_emails).is_empty()
+
+
+@pytest.mark.unit
+def test_failed_provision_deletes_added_user(portal, make_transport, monkeypatch):
+    """
+    Test the researcher user is deleted again when adding the data owner user fails
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    """
+    # Arrange
+    transport = make_transport()
+    account_management = AccountManagementApi(base_url=portal.base_url, transport=transport)
+    tenant = Tenant.for_worker("gw0")
+    # Both users get the same email, the portal rejects the second one with a 409
+    payload, email = get_add_user_payload(prefix=tenant.namespace)
+    monkeypatch.setattr(utils.tenant_helpers, "get_add_user_payload", lambda prefix: (dict(payload), email))
+
+    # Act
+    with pytest.raises(ValueError):
+        tenant.provision(portal.base_url, account_management, transport=transport)
+
+    # Assert
+    assert_that(account_status(portal, email)).is_equal_to(ACCOUNT_DELETED)
+    assert_that(tenant.created_emails).is_empty()
+
+
+@pytest.mark.unit
+def test_teardown_deletes_remaining_users_after_failure(portal, make_transport, monkeypatch):
+    """
+    Test teardown still deletes the data owner user when deleting the researcher user fails, then raises
+
+    :param portal: fixture, MockPortalServer
+    :type portal: class : mock_portal.portal_server.MockPortalServer
+    :param make_transport: fixture, factory of private HttpTransports
+    :type make_transport: callable
+    :param monkeypatch: fixture, pytest monkeypatch
+    :type monkeypatch: class : _pytest.monkeypatch.MonkeyPatch
+    """
+    # Arrange
+    transport = make_transport()
+    account_management = AccountManagementApi(base_url=portal.base_url, transport=transport)
+    tenant = Tenant.for_worker("gw0")
+    tenant.provision(portal.base_url, account_management, transport=transport)
+    delete_user = account_management.delete_user
+
+    def failing_delete_user(sail_portal, get_base_url, Email, Password):
+        if Email == tenant.researcher_email:
+            raise requests.exceptions.ConnectionError("portal unreachable")
+        return delete_user(sail_portal, get_base_url, Email=Email, Password=Password)
+
+    monkeypatch.setattr(account_management, "delete_user", failing_delete_user)
+
+    # Act
+    with pytest.raises(ValueError, match=tenant.researcher_email):
+        tenant.teardown(portal.base_url, account_management)
+
+    # Assert
+    assert_that(account_status(portal, tenant.researcher_email)).is_equal_to(ACCOUNT_ACTIVE)
+    assert_that(account_status(portal, tenant.data_owner_email)).is_equal_to(ACCOUNT_DELETED)
+    assert_that(tenant.created_emails).is_equal_to([tenant.researcher_email])
@@ -0,0 +1,49 @@
+# -----------------------------------------------------------
+#
+# Virtual machine inventory unit test file
+#
+# -----------------------------------------------------------
+import pytest
+from api_portal.vm_inventory import VmInventory
+from api_portal.vm_state_waiter import VM_STATE_NAMES
+from assertpy.assertpy import assert_that
+
+LIST_VMS = "GET /SAIL/VirtualMachineManager/ListVirtualMachines"
+
+
+@pytest.mark.unit
+def test_virtual_machine_inventory(mock_world):
+    """
+    Test the inventory indexes the vms of every provisioned contract from one listing, and lists again only once stale
+
+    :param mock_world: fixture, MockWorld
+    :type mock_world: class : test_api.test_unit.conftest.MockWorld
+    """
+    # Arrange
+    provisioned = mock_world.provision_contracts()
+    contracts = mock_world.list_digital_contracts()
+    now = [0.0]
+    inventory = VmInventory(
+        mock_world.virtualmachine_management, mock_world.sail_portal, max_age=60, clock=lambda: now[0]
+    )
+
+    # Act
+    snapshot = inventory.snapshot()
+    listings = [mock_world.server.requests[LIST_VMS]]
+    cached = inventory.snapshot()
+    listings.append(mock_world.server.requests[LIST_VMS])
+    now[0] = 60.0
+    refreshed = inventory.snapshot()
+    listings.append(mock_world.server.requests[LIST_VMS])
+
+    # Assert
+    assert_that(listings).is_equal_to([1, 1, 2])
+    assert_that(cached).is_same_as(snapshot)
+    assert_that(refreshed).is_not_same_as(snapshot)
+    assert_that(snapshot.contracts()).contains_only(*provisioned)
+    for dc_guid in provisioned:
+        vm_guids = snapshot.vms(dc_guid)
+        assert_that(vm_guids).is_length(contracts[dc_guid]["NumberOfVirtualMachines"])
+        for vm_guid in vm_guids:
+            assert_that(snapshot.contract(vm_guid)).is_equal_to(dc_guid)
+            assert_that(VM_STATE_NAMES).contains_key(snapshot.state(vm_guid))
@@ -0,0 +1,40 @@
+# -----------------------------------------------------------
+#
+# Synthetic world unit test file
+#
+# -----------------------------------------------------------
+import pytest
+from assertpy.assertpy import assert_that
+from utils.digital_contract_helpers import CONTRACT_STAGES
+from utils.schema_helpers import get_validator
+
+
+@pytest.mark.unit
+def test_list_digital_contracts_synthetic_world(mock_world):
+    """
+    Test the data owner lists the contracts on its datasets and its own as researcher, in every stage
+
+    :param mock_world: fixture, MockWorld
+    :type mock_world: class : test_api.test_unit.conftest.MockWorld
+    """
+    # Arrange
+    validator = get_validator("DigitalContracts")
+    world = mock_world.world
+    expected = len(list(world.digital_contracts(0))) + sum(
+        1
+        for organization in (1, 2)
+        for contract in world.digital_contracts(organization)
+        if contract["Researcher"] == 0
+    )
+
+    # Act
+    test_response, test_response_json, _ = mock_world.digitalcontract_management.list_digital_contracts(
+        mock_world.sail_portal
+    )
+
+    # Assert
+    assert_that(test_response.status_code).is_equal_to(200)
+    assert_that(validator.validate(test_response_json), description=validator.errors).is_true()
+    contracts = test_response_json["DigitalContracts"]
+    assert_that(contracts).is_length(expected)
+    assert_that({contract["ContractStage"] for contract in contracts.values()}).is_equal_to(set(CONTRACT_STAGES))
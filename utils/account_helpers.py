@@ -8,16 +8,18 @@ from config import SAIL_PASS
 from utils.helpers import random_name
 
 
-def get_add_user_payload():
+def get_add_user_payload(prefix=""):
     """
     Helper function to return a add user template payload
 
+    :param prefix: prefix of the user email, e.g. the namespace of a test tenant
+    :type prefix: string, optional
     :return: add_user_payload, user_email
     :rtype: (dict, str)
     """
     name = random_name(5)
     add_user_payload = {
-        "Email": f"{name}@test.com",
+        "Email": f"{prefix}{name}@test.com",
         "Password": SAIL_PASS,
         "Name": f"{name}",
         "PhoneNumber": 1231231234,
@@ -5,16 +5,18 @@
 # -----------------------------------------------------------
 
 
-def get_az_template_payload():
+def get_az_template_payload(name="Test_template"):
     """
     Helper to return template of azure template payload
 
+    :param name: template name
+    :type name: string, optional
     :return: az_template_payload
     :rtype: dict
     """
     az_template_payload = {
         "TemplateData": {
-            "Name": "Test_template",
+            "Name": name,
             "Description": "Test_template_spices",
             "SubscriptionID": "3d2b9951-a0c8-4dc3-8114-2776b047b15c",
             "Secret": "1YEn1Y.bVTVk-dzm9voTWyf7DrgQF29xL2",
@@ -62,3 +62,85 @@ def get_dataset_payload():
         },
     }
     return dataset_payload, rand_uuid, dataset_name
+
+
+def _draw(rng, size):
+    """
+    :param size: fixed size, or (low, high) range drawn from inclusively
+    :type size: int or tuple
+    :rtype: int
+    """
+    if isinstance(size, int):
+        return size
+    low, high = size
+    return rng.randint(low, high)
+
+
+def get_table_metadata(rng, index, number_rows, number_columns):
+    """
+    Helper to return the metadata of a generated dataset table
+
+    :param rng: random generator the sizes, names and table guid are drawn from
+    :type rng: random.Random
+    :param index: position of the table in its dataset
+    :type index: int
+    :param number_rows: rows, or (low, high) range of rows
+    :type number_rows: int or tuple
+    :param number_columns: columns, or (low, high) range of columns
+    :type number_columns: int or tuple
+    :return: table_guid, table
+    :rtype: (string, dict)
+    """
+    table_guid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    columns = [f"column_{column}" for column in range(_draw(rng, number_columns))]
+    table = {
+        "ColumnName": f",{','.join(columns)},",
+        "Description": f"generated table {index}",
+        "Hashtags": f"t{index}",
+        "Name": f"table_{index}.csv",
+        "NumberColumns": len(columns),
+        "NumberRows": _draw(rng, number_rows),
+    }
+    return table_guid, table
+
+
+def get_generated_dataset_payload(
+    rng, index, number_tables, number_rows, number_columns, name_prefix="seed-", publish_date=None
+):
+    """
+    Helper to return a dataset payload with generated tables, the same rng state gives the same payload
+
+    :param rng: random generator the guids and table sizes are drawn from
+    :type rng: random.Random
+    :param index: position of the dataset in its batch, part of its name
+    :type index: int
+    :param number_tables: tables of the dataset
+    :type number_tables: int
+    :param number_rows: rows per table, or (low, high) range of rows
+    :type number_rows: int or tuple
+    :param number_columns: columns per table, or (low, high) range of columns
+    :type number_columns: int or tuple
+    :param name_prefix: start of the dataset name
+    :type name_prefix: string
+    :param publish_date: utc timestamp, defaults to now
+    :type publish_date: float, optional
+    :return: dataset_payload, dataset_guid, dataset_name
+    :rtype: (dict, str, str)
+    """
+    dataset_guid = f"{{{uuid.UUID(int=rng.getrandbits(128), version=4)}}}"
+    dataset_name = f"{name_prefix}{index:06d}"
+    tables = dict(get_table_metadata(rng, table, number_rows, number_columns) for table in range(number_tables))
+    dataset_payload = {
+        "DatasetGuid": dataset_guid,
+        "DatasetData": {
+            "VersionNumber": "0x00000001",
+            "DatasetName": dataset_name,
+            "Description": f"Generated dataset {index} with {number_tables} tables",
+            "Keywords": "generated, seed",
+            "PublishDate": publish_date or datetime.datetime.now(timezone.utc).timestamp(),
+            "PrivacyLevel": 1,
+            "JurisdictionalLimitations": "N/A",
+            "Tables": tables,
+        },
+    }
+    return dataset_payload, dataset_guid, dataset_name
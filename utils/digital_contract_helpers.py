@@ -4,8 +4,53 @@
 #
 # -----------------------------------------------------------
 
+# enum class DigitalContractStage of the portal
+CONTRACT_APPLICATION = 1
+CONTRACT_APPROVAL = 2
+CONTRACT_ACTIVE = 3
+CONTRACT_SUSPENDED = 4
+CONTRACT_EXPIRED = 5
+CONTRACT_TERMINATED = 6
 
-def get_digital_contract_payload(data_owner_guid, dataset_guid):
+# Stage -> name
+CONTRACT_STAGES = {
+    CONTRACT_APPLICATION: "Application",
+    CONTRACT_APPROVAL: "Approval",
+    CONTRACT_ACTIVE: "Active",
+    CONTRACT_SUSPENDED: "Suspended",
+    CONTRACT_EXPIRED: "Expired",
+    CONTRACT_TERMINATED: "Terminated",
+}
+
+# enum class DigitalContractProvisiongStatus of the portal
+PROVISIONING = 1
+PROVISIONING_READY = 2
+UNPROVISIONED = 3
+PROVISIONING_FAILED = 4
+
+# enum class VirtualMachineState of the portal, State of PullVirtualMachine
+VM_STARTING = 1
+VM_CONFIGURING = 2
+VM_INITIALIZING = 3
+VM_WAITING_FOR_DATA = 4
+VM_READY_FOR_COMPUTATION = 5
+VM_IN_USE = 6
+VM_DELETING = 7
+VM_DELETED = 8
+VM_DELETE_FAILED = 9
+VM_PROVISIONING_FAILED = 10
+
+PROVISIONING_STATUSES = {
+    PROVISIONING: "Provisioning",
+    PROVISIONING_READY: "Ready",
+    UNPROVISIONED: "Unprovisioned",
+    PROVISIONING_FAILED: "ProvisioningFailed",
+}
+
+DIGITAL_CONTRACT_TITLE = "miaw Miow phase 1"
+
+
+def get_digital_contract_payload(data_owner_guid, dataset_guid, title=DIGITAL_CONTRACT_TITLE):
     """
     Helper to return template for digital contract payload
 
@@ -13,12 +58,14 @@ def get_digital_contract_payload(data_owner_guid, dataset_guid):
     :type data_owner_guid: str
     :param dataset_guid:
     :type dataset_guid: str
+    :param title: title of the digital contract, defaults to DIGITAL_CONTRACT_TITLE
+    :type title: str, optional
     :return: digital_contract_payload
     :rtype: dict
     """
     digital_contract_payload = {
         "DataOwnerOrganization": f"{data_owner_guid}",
-        "Title": "miaw Miow phase 1",
+        "Title": title,
         "Description": "The dataset will be used to train models for academic research purposes.",
         "VersionNumber": "0x0000000100000001",
         "SubscriptionDays": 28,
@@ -101,3 +148,18 @@ def get_digital_contract_provision_payload(dc_guid):
         "VirtualMachineType": "Standard_D4s_v4",
     }
     return digital_contract_provision_payload
+
+
+def get_digital_contract_deprovision_payload(dc_guid):
+    """
+    Helper to return template for digital_contract_deprovision_payload
+
+    :param dc_guid: digital contract guid
+    :type dc_guid: str
+    :return: digital_contract_deprovision_payload
+    :rtype: dict
+    """
+    digital_contract_deprovision_payload = {
+        "DigitalContractGuid": f"{dc_guid}",
+    }
+    return digital_contract_deprovision_payload
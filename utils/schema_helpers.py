@@ -0,0 +1,381 @@
+# -----------------------------------------------------------
+#
+# Schema Helpers, registry of the response schemas
+#
+# -----------------------------------------------------------
+import functools
+import re
+import threading
+
+from cerberus import Validator, errors
+from cerberus.schema import DefinitionSchema
+
+# Portal GUIDs carry their object type in the leading bits, e.g. "{4[89AB]" for a job
+_GUID_TAIL = r"-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}}"
+ORGANIZATION_GUID_PATTERN = r"{0[4567][A-Z0-9]{6}" + _GUID_TAIL
+DIGITAL_CONTRACT_GUID_PATTERN = r"{1[4567][A-Z0-9]{6}" + _GUID_TAIL
+DATA_FEDERATION_GUID_PATTERN = r"{1[89AB][A-Z0-9]{6}" + _GUID_TAIL
+DATASET_FAMILY_GUID_PATTERN = r"{1[CDEF][A-Z0-9]{6}" + _GUID_TAIL
+# Milestone 3 dataset families only have the leading 5 bits set to "01100"
+DATASET_FAMILY_M3_GUID_PATTERN = r"{C[A-Z0-9]{7}" + _GUID_TAIL
+SECURE_NODE_GUID_PATTERN = r"{4[0123][A-Z0-9]{6}" + _GUID_TAIL
+JOB_GUID_PATTERN = r"{4[89AB][A-Z0-9]{6}" + _GUID_TAIL
+JOB_PARAMETER_GUID_PATTERN = r"{4[CDEF][A-Z0-9]{6}" + _GUID_TAIL
+USER_DATA_GUID_PATTERN = r"{5[4567][A-Z0-9]{6}" + _GUID_TAIL
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_regex(pattern):
+    """
+    Helper to compile a regex rule once per process, anchored at the end like cerberus does
+
+    :param pattern: regex of a schema rule
+    :type pattern: string
+    :return: compiled pattern
+    :rtype: re.Pattern
+    """
+    return re.compile(pattern if pattern.endswith("$") else pattern + "$")
+
+
+class PortalValidator(Validator):
+    """
+    Portal Validator Class, cerberus Validator matching regex rules with precompiled patterns
+
+    The registry schemas have no normalization rules, so validate skips the normalization
+    pass, which copies and rechecks the schema on every call.
+    """
+
+    def validate(self, document, schema=None, update=False, normalize=False):
+        return super().validate(document, schema=schema, update=update, normalize=normalize)
+
+    def _validate_regex(self, pattern, field, value):
+        """{'type': 'string'}"""
+        if not isinstance(value, str):
+            return
+        if not compiled_regex(pattern).match(value):
+            self._error(field, errors.REGEX_MISMATCH)
+
+
+def envelope(**fields):
+    """
+    Helper to return the schema of a portal response, fields next to Eosb and Status
+    """
+    return {**fields, "Eosb": {"type": "string"}, "Status": {"type": "number"}}
+
+
+def guid_map(value_schema, key_pattern=None):
+    """
+    Helper to return the schema of a guid -> item map
+    """
+    schema = {"type": "dict", "valueschema": value_schema}
+    if key_pattern is not None:
+        schema["keysrules"] = {"type": "string", "regex": key_pattern}
+    return schema
+
+
+DIGITAL_CONTRACT_SCHEMA = {
+    "ActivationTime": {"type": "number"},
+    "AzureTemplateGuid": {"required": False, "type": "string"},
+    "ContractStage": {"type": "number"},
+    "DatasetDRMMetadata": {"type": "dict"},
+    "DatasetDRMMetadataSize": {"type": "number"},
+    "DatasetGuid": {"type": "string"},
+    "DatasetName": {"type": "string"},
+    "Description": {"type": "string"},
+    "DigitalContractGuid": {"type": "string"},
+    "Eula": {"type": "string"},
+    "EulaAcceptedByDOOAuthorizedUser": {"type": "string"},
+    "EulaAcceptedByROAuthorizedUser": {"type": "string"},
+    "ExpirationTime": {"type": "number"},
+    "HostForVirtualMachines": {"type": "string"},
+    "HostRegion": {"type": "string"},
+    "LastActivity": {"type": "number"},
+    "LegalAgreement": {"type": "string"},
+    "Note": {"type": "string"},
+    "NumberOfVirtualMachines": {"type": "number"},
+    "NumberOfVirtualMachinesReady": {"required": False, "type": "number"},
+    "ProvisioningStatus": {"type": "number"},
+    "RetentionTime": {"type": "number"},
+    "SubscriptionDays": {"type": "number"},
+    "Title": {"type": "string"},
+    "VersionNumber": {"type": "string"},
+}
+# Listed digital contracts also carry the names of both parties
+DIGITAL_CONTRACT_PARTIES_SCHEMA = {
+    "DOOName": {"type": "string"},
+    "DataOwnerOrganization": {"type": "string"},
+    "ROName": {"type": "string"},
+    "ResearcherOrganization": {"type": "string"},
+}
+DIGITAL_CONTRACT_LIST_ITEM_SCHEMA = {**DIGITAL_CONTRACT_SCHEMA, **DIGITAL_CONTRACT_PARTIES_SCHEMA}
+
+DATASET_SCHEMA = {
+    "DataOwnerGuid": {"type": "string"},
+    "DatasetGuid": {"type": "string"},
+    "DatasetName": {"type": "string"},
+    "Description": {"type": "string"},
+    "JurisdictionalLimitations": {"type": "string"},
+    "Keywords": {"type": "string"},
+    "OrganizationName": {"type": "string"},
+    "PrivacyLevel": {"type": "number"},
+    "PublishDate": {"type": "number"},
+    "Tables": guid_map(
+        {
+            "type": "dict",
+            "schema": {
+                "TableIdentifier": {"type": "string"},
+                "ColumnName": {"type": "string"},
+                "Description": {"type": "string"},
+                "Tags": {"type": "string"},
+                "Hashtags": {"type": "string", "required": False},
+                "Name": {"type": "string", "required": False},
+                "NumberColumns": {"type": "number", "required": False},
+                "NumberRows": {"type": "number", "required": False},
+                "Title": {"type": "string"},
+                "NumberOfColumns": {"type": "number"},
+                "NumberOfRows": {"type": "number"},
+                "CompressedDataSizeInBytes": {"type": "number"},
+                "DataSizeInBytes": {"type": "number"},
+                "AllColumnProperties": guid_map(
+                    {
+                        "type": "dict",
+                        "schema": {
+                            "ColumnIdentifier": {"type": "string"},
+                            "Description": {"type": "string"},
+                            "Tags": {"type": "string"},
+                            "Title": {"type": "string"},
+                            "Type": {"type": "string"},
+                            "Units": {"type": "string"},
+                        },
+                    }
+                ),
+            },
+        }
+    ),
+    "VersionNumber": {"type": "string"},
+}
+
+DATASET_FAMILY_LIST_ITEM_SCHEMA = {
+    "DatasetFamilyActive": {"type": "boolean"},
+    "DatasetFamilyOwnerGuid": {"type": "string"},
+    "DatasetFamilyTags": {"type": "string"},
+    "DatasetFamilyTitle": {"type": "string"},
+    "OrganizationName": {"type": "string"},
+}
+DATASET_FAMILY_SCHEMA = {
+    **DATASET_FAMILY_LIST_ITEM_SCHEMA,
+    "DatasetFamilyDescription": {"type": "string"},
+    "DatasetFamilyGuid": {"type": "string"},
+    "VersionNumber": {"type": "string"},
+}
+
+# Templates and virtual machines carry more fields depending on the portal version
+AZURE_TEMPLATE_LIST_ITEM_SCHEMA = {
+    "Name": {"type": "string"},
+    "Description": {"type": "string"},
+    "State": {"type": "number"},
+}
+AZURE_TEMPLATE_SCHEMA = {
+    **AZURE_TEMPLATE_LIST_ITEM_SCHEMA,
+    "SubscriptionID": {"type": "string"},
+    "TenantID": {"type": "string"},
+    "ApplicationID": {"type": "string"},
+    "ResourceGroup": {"type": "string"},
+    "VirtualNetwork": {"type": "string"},
+    "HostRegion": {"type": "string"},
+    "NetworkSecurityGroup": {"type": "string"},
+    "VirtualMachineImage": {"type": "string"},
+}
+
+VIRTUAL_MACHINE_SCHEMA = {
+    "VirtualMachineGuid": {"type": "string", "required": True},
+    "DigitalContractGuid": {"type": "string"},
+    "DigitalContractTitle": {"type": "string"},
+    "IPAddress": {"type": "string"},
+    "HostRegion": {"type": "string"},
+    "VirtualMachineType": {"type": "string"},
+    "StartTime": {"type": "number"},
+    "State": {"type": "number", "required": True},
+}
+
+# Virtual machines are listed per digital contract
+VIRTUAL_MACHINE_CONTRACT_SCHEMA = {
+    "VirtualMachinesAssociatedWithDc": guid_map(
+        {"type": "dict", "schema": VIRTUAL_MACHINE_SCHEMA, "allow_unknown": True}
+    )
+}
+
+DATA_FEDERATION_SCHEMA = {
+    "Description": {"type": "string"},
+    "Name": {"type": "string"},
+    "DataSubmitterOrganizations": {
+        "type": "dict",
+        "keysrules": {"type": "string", "regex": ORGANIZATION_GUID_PATTERN},
+    },
+    "DatasetFamilies": {"type": "dict"},
+    "ResearcherOrganizations": {
+        "type": "dict",
+        "keysrules": {"type": "string", "regex": ORGANIZATION_GUID_PATTERN},
+    },
+    "Identifier": {"type": "string", "regex": DATA_FEDERATION_GUID_PATTERN},
+    "OrganizationName": {"type": "string"},
+    "OrganizationIdentifier": {"type": "string", "regex": ORGANIZATION_GUID_PATTERN},
+}
+
+# Response type -> schema of the whole response
+SCHEMAS = {
+    "Status": {"Status": {"type": "number"}},
+    "EosbStatus": envelope(),
+    "BasicUserInformation": envelope(
+        AccessRights={"type": "number"},
+        Email={"type": "string"},
+        OrganizationGuid={"type": "string"},
+        OrganizationName={"type": "string"},
+        PhoneNumber={"type": "string"},
+        Title={"type": "string"},
+        UserGuid={"type": "string"},
+        Username={"type": "string"},
+    ),
+    "OrganizationInformation": envelope(
+        OrganizationInformation={
+            "type": "dict",
+            "schema": {
+                "OrganizationAddress": {"type": "string"},
+                "OrganizationName": {"type": "string"},
+                "PrimaryContactEmail": {"type": "string"},
+                "PrimaryContactName": {"type": "string"},
+                "PrimaryContactPhoneNumber": {"type": "string"},
+                "PrimaryContactTitle": {"type": "string"},
+                "SecondaryContactEmail": {"type": "string"},
+                "SecondaryContactName": {"type": "string"},
+                "SecondaryContactPhoneNumber": {"type": "string"},
+                "SecondaryContactTitle": {"type": "string"},
+            },
+        }
+    ),
+    "OrganizationUsers": envelope(
+        OrganizationUsers=guid_map(
+            {
+                "type": "dict",
+                "schema": {
+                    "AccessRights": {"type": "number"},
+                    "AccountStatus": {"type": "number"},
+                    "Email": {"type": "string"},
+                    "PhoneNumber": {"type": "string"},
+                    "TimeOfAccountCreation": {"type": "number"},
+                    "Title": {"type": "string"},
+                    "UserGuid": {"type": "string"},
+                    "Username": {"type": "string"},
+                },
+            }
+        )
+    ),
+    "AzureTemplate": envelope(Template={"type": "dict", "schema": AZURE_TEMPLATE_SCHEMA, "allow_unknown": True}),
+    "AzureTemplates": envelope(
+        Templates=guid_map({"type": "dict", "schema": AZURE_TEMPLATE_LIST_ITEM_SCHEMA, "allow_unknown": True})
+    ),
+    "DataFederations": envelope(
+        DataFederations=guid_map({"type": "dict", "schema": DATA_FEDERATION_SCHEMA}, DATA_FEDERATION_GUID_PATTERN)
+    ),
+    "Dataset": envelope(Dataset={"type": "dict", "schema": DATASET_SCHEMA}),
+    "Datasets": envelope(Datasets=guid_map({"type": "dict", "schema": DATASET_SCHEMA})),
+    "DatasetFamily": envelope(DatasetFamily={"type": "dict", "schema": DATASET_FAMILY_SCHEMA}),
+    "DatasetFamilies": envelope(
+        DatasetFamilies=guid_map(
+            {"type": "dict", "schema": DATASET_FAMILY_LIST_ITEM_SCHEMA}, DATASET_FAMILY_GUID_PATTERN
+        )
+    ),
+    "DatasetFamilyRegistration": envelope(DatasetFamilyIdentifier={"type": "string"}),
+    "DatasetFamiliesM3": envelope(DatasetFamilies=guid_map({"type": "string"}, DATASET_FAMILY_M3_GUID_PATTERN)),
+    "DigitalContract": envelope(
+        DigitalContract={"type": "dict", "schema": DIGITAL_CONTRACT_SCHEMA}, **DIGITAL_CONTRACT_PARTIES_SCHEMA
+    ),
+    "DigitalContracts": envelope(
+        DigitalContracts=guid_map({"type": "dict", "schema": DIGITAL_CONTRACT_LIST_ITEM_SCHEMA})
+    ),
+    "DigitalContractRegistration": envelope(DigitalContractIdentifier={"type": "string"}),
+    "DigitalContractEvent": envelope(Instructions={"type": "string"}, RootEventStatus={"type": "number"}),
+    "DigitalContractAssociation": envelope(ErrorMessage={"type": "string"}),
+    "DigitalContractProvision": envelope(
+        Message={"required": False, "type": "string"}, SecureNodeGuid={"type": "string"}
+    ),
+    "DigitalContractProvisioningStatus": {
+        "ProvisioningStatus": {"type": "number"},
+        "Status": {"type": "number"},
+        "VirtualMachines": {"required": False, "type": "dict"},
+    },
+    "VirtualMachine": envelope(
+        VirtualMachine={"type": "dict", "schema": VIRTUAL_MACHINE_SCHEMA, "allow_unknown": True}
+    ),
+    "VirtualMachines": envelope(VirtualMachines=guid_map({"type": "dict", "schema": VIRTUAL_MACHINE_CONTRACT_SCHEMA})),
+    # Orchestrator results are wrapped as {"return_value": result}
+    "OrchestratorDigitalContracts": {
+        "return_value": guid_map(
+            {"type": "dict", "schema": DIGITAL_CONTRACT_LIST_ITEM_SCHEMA}, DIGITAL_CONTRACT_GUID_PATTERN
+        )
+    },
+    "OrchestratorDatasets": {"return_value": guid_map({"type": "dict", "schema": DATASET_SCHEMA})},
+    "JobGuid": {"return_value": {"type": "string", "regex": JOB_GUID_PATTERN}},
+    "JobParameter": {"return_value": {"type": "string", "regex": JOB_GUID_PATTERN + "." + JOB_PARAMETER_GUID_PATTERN}},
+    "UserDataGuid": {"return_value": {"type": "string", "regex": USER_DATA_GUID_PATTERN}},
+    "SecureNodeProvision": {
+        "SCNGuid": {"type": "string", "regex": SECURE_NODE_GUID_PATTERN},
+        "Message": {"type": "string", "required": False},
+        "Status": {"type": "boolean"},
+    },
+}
+
+# One entry of a listing, e.g. SCHEMAS["DigitalContractsItem"], for streaming validation of large listings
+LISTINGS = {
+    "DigitalContracts": (DIGITAL_CONTRACT_LIST_ITEM_SCHEMA, None),
+    "Datasets": (DATASET_SCHEMA, None),
+    "DatasetFamilies": (DATASET_FAMILY_LIST_ITEM_SCHEMA, DATASET_FAMILY_GUID_PATTERN),
+    "VirtualMachines": (VIRTUAL_MACHINE_CONTRACT_SCHEMA, None),
+}
+SCHEMAS.update({f"{list_key}Item": item_schema for list_key, (item_schema, _) in LISTINGS.items()})
+
+_compile_lock = threading.Lock()
+_definitions = {}
+_validators = threading.local()
+
+
+def get_schema_definition(response_type):
+    """
+    Helper to return the schema of a response type, checked and expanded by cerberus once per process
+
+    :param response_type: key of SCHEMAS, e.g. "DigitalContracts"
+    :type response_type: string
+    :raises KeyError: unknown response type
+    :return: compiled schema
+    :rtype: cerberus.schema.DefinitionSchema
+    """
+    definition = _definitions.get(response_type)
+    if definition is None:
+        with _compile_lock:
+            definition = _definitions.get(response_type)
+            if definition is None:
+                definition = DefinitionSchema(PortalValidator(), SCHEMAS[response_type])
+                _definitions[response_type] = definition
+    return definition
+
+
+def get_validator(response_type):
+    """
+    Helper to return the validator of a response type
+
+    Schemas are compiled once per process, validators are cached per thread as
+    cerberus validators keep the state of the last validation.
+
+    :param response_type: key of SCHEMAS, e.g. "DigitalContracts"
+    :type response_type: string
+    :raises KeyError: unknown response type
+    :return: validator
+    :rtype: class : utils.schema_helpers.PortalValidator
+    """
+    validators = getattr(_validators, "by_type", None)
+    if validators is None:
+        validators = _validators.by_type = {}
+    validator = validators.get(response_type)
+    if validator is None:
+        validator = validators[response_type] = PortalValidator(get_schema_definition(response_type))
+    return validator
@@ -0,0 +1,302 @@
+# -----------------------------------------------------------
+#
+# Stream Helpers, validation of large listings while they download
+#
+# -----------------------------------------------------------
+import codecs
+import json
+import re
+
+from config import STREAM_CHUNK_SIZE, STREAM_MAX_FAILURES
+
+from utils.schema_helpers import LISTINGS, compiled_regex, get_validator
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_STRING_SPECIAL = re.compile(r'["\\]')
+_CONTAINER_SPECIAL = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r"[ \t\n\r,:\]}]")
+
+
+class _ValueScanner:
+    """
+    Value Scanner Class, find the end of a json value fed in parts
+
+    Strings and brackets are tracked across parts so every character is looked at
+    once, the value is only decoded once its end is known.
+    """
+
+    def __init__(self, first):
+        """
+        :param first: first character of the value
+        :type first: string
+        """
+        self.scalar = first not in '{["'
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text, pos=0):
+        """
+        :param text: next part of the document
+        :type text: string
+        :param pos: index in text to scan from
+        :type pos: int
+        :return: index in text just past the value, None when the value goes on in the next part
+        :rtype: int
+        """
+        if self.scalar:
+            # A number is only complete once followed by a delimiter, it may go on in the next part
+            match = _SCALAR_END.search(text, pos)
+            return None if match is None else match.start()
+        while True:
+            if self.escaped:
+                if pos == len(text):
+                    return None
+                self.escaped = False
+                pos += 1
+            match = (_STRING_SPECIAL if self.in_string else _CONTAINER_SPECIAL).search(text, pos)
+            if match is None:
+                return None
+            pos = match.end()
+            character = match.group()
+            if character == "\\":
+                self.escaped = True
+            elif character == '"':
+                self.in_string = not self.in_string
+                if not self.in_string and self.depth == 0:
+                    return pos
+            elif character in "{[":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth <= 0:
+                    return pos
+
+
+class JsonStream:
+    """
+    Json Stream Class, decode json values one at a time from chunks of a document
+
+    Only the undecoded tail of the document is buffered, a value is decoded once all
+    of it has arrived. The parts of a value spread over many chunks are scanned once
+    and joined once, so decoding stays linear in the size of the value.
+    """
+
+    def __init__(self, chunks):
+        """
+        :param chunks: parts of the document, bytes in utf-8 or strings
+        :type chunks: iterable
+        """
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read(self):
+        """
+        :raises ValueError: the document ends within a utf-8 character
+        :return: next decoded part of the document, None at the end of the document
+        :rtype: string
+        """
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                chunk = self._utf8.decode(b"", final=True)
+            elif isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                return chunk
+        return None
+
+    def _fill(self):
+        """
+        :return: False at the end of the document
+        :rtype: bool
+        """
+        chunk = self._read()
+        if chunk is None:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        :return: next non whitespace character, "" at the end of the document
+        :rtype: string
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, character):
+        """
+        :raises ValueError: the next character is not character
+        """
+        found = self.peek()
+        if found != character:
+            raise ValueError(f"Expecting {character!r}, found {found or 'end of document'!r}")
+        self.pos += 1
+
+    def value(self):
+        """
+        :raises ValueError: the document is not valid json
+        :return: next json value
+        """
+        scanner = _ValueScanner(self.peek())
+        if scanner.feed(self.buffer, self.pos) is None:
+            parts = [self.buffer[self.pos :]]
+            while True:
+                chunk = self._read()
+                if chunk is None:
+                    break
+                parts.append(chunk)
+                if scanner.feed(chunk) is not None:
+                    break
+            self.buffer = "".join(parts)
+            self.pos = 0
+        # A truncated or malformed value raises here, json.JSONDecodeError is a ValueError
+        value, self.pos = _decoder.raw_decode(self.buffer, self.pos)
+        return value
+
+
+def iter_listing(chunks, list_key):
+    """
+    Helper to decode a listing response one entry at a time
+
+    :param chunks: parts of a response like {"Eosb": ..., list_key: {guid: item, ...}, "Status": ...}
+    :type chunks: iterable
+    :param list_key: key of the guid -> item map, e.g. "DigitalContracts"
+    :type list_key: string
+    :raises ValueError: the document is not valid json
+    :return: (True, guid, item) for the entries of the map, (False, key, value) for the other fields
+    :rtype: generator
+    """
+    stream = JsonStream(chunks)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == list_key and stream.peek() == "{":
+            stream.expect("{")
+            while stream.peek() != "}":
+                guid = stream.value()
+                stream.expect(":")
+                yield True, guid, stream.value()
+                if stream.peek() != ",":
+                    break
+                stream.pos += 1
+            stream.expect("}")
+        else:
+            yield False, key, stream.value()
+        if stream.peek() != ",":
+            break
+        stream.pos += 1
+    stream.expect("}")
+
+
+class StreamValidationReport:
+    """
+    Stream Validation Report Class, outcome of validating a listing entry by entry
+
+    fields holds the response fields next to the listing, e.g. Eosb and Status, failures
+    the errors of the first max_failures invalid entries. The entries are not kept.
+    """
+
+    def __init__(self, list_key, max_failures=STREAM_MAX_FAILURES):
+        self.list_key = list_key
+        self.max_failures = max_failures
+        self.fields = {}
+        self.count = 0
+        self.failure_count = 0
+        self.failures = []
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.failure_count == 0
+
+    @property
+    def errors(self):
+        """
+        :return: guid -> cerberus errors of the reported failures, None for the response fields
+        :rtype: dict
+        """
+        return dict(self.failures)
+
+    def add_failure(self, guid, errors):
+        self.failure_count += 1
+        if len(self.failures) < self.max_failures:
+            self.failures.append((guid, errors))
+
+    def get(self, key, default=None):
+        return self.fields.get(key, default)
+
+    def __repr__(self):
+        return (
+            f"StreamValidationReport({self.list_key}: {self.count} entries, {self.failure_count} invalid, "
+            f"error={self.error!r}, first failures={self.failures})"
+        )
+
+
+def validate_listing_stream(chunks, list_key, max_failures=STREAM_MAX_FAILURES):
+    """
+    Helper to validate a listing against SCHEMAS[f"{list_key}Item"] as it is decoded
+
+    :param chunks: parts of the listing response
+    :type chunks: iterable
+    :param list_key: key of LISTINGS, e.g. "DigitalContracts"
+    :type list_key: string
+    :param max_failures: number of invalid entries reported in full
+    :type max_failures: int
+    :return: report
+    :rtype: class : utils.stream_helpers.StreamValidationReport
+    """
+    report = StreamValidationReport(list_key, max_failures)
+    item_validator = get_validator(f"{list_key}Item")
+    key_pattern = LISTINGS[list_key][1]
+    try:
+        for is_item, key, value in iter_listing(chunks, list_key):
+            if not is_item:
+                report.fields[key] = value
+                continue
+            report.count += 1
+            if key_pattern is not None and not compiled_regex(key_pattern).match(key):
+                report.add_failure(key, {"guid": [f"value does not match regex '{key_pattern}'"]})
+            elif not item_validator.validate(value):
+                report.add_failure(key, item_validator.errors)
+    except ValueError as error:
+        report.error = f"{type(error).__name__}: {error}"
+        return report
+    # Response fields are checked with the schema of the whole response, the listing left out
+    response_validator = get_validator(list_key)
+    if not response_validator.validate(report.fields):
+        report.add_failure(None, response_validator.errors)
+    return report
+
+
+def get_streamed_response_values(response, list_key, max_failures=STREAM_MAX_FAILURES):
+    """
+    Helper function, get_response_values of a listing sent with stream=True, validated entry by entry
+
+    :param response: response whose body has not been read
+    :type response: requests.Response
+    :param list_key: key of LISTINGS, e.g. "DigitalContracts"
+    :type list_key: string
+    :param max_failures: number of invalid entries reported in full
+    :type max_failures: int
+    :return: response, report, user_eosb
+    :rtype: (requests.Response, utils.stream_helpers.StreamValidationReport, string)
+    """
+    try:
+        report = validate_listing_stream(response.iter_content(STREAM_CHUNK_SIZE), list_key, max_failures)
+    finally:
+        response.close()
+    return response, report, report.get("Eosb")
@@ -0,0 +1,140 @@
+# -----------------------------------------------------------
+#
+# Tenant Helpers, isolation of parallel test workers
+#
+# -----------------------------------------------------------
+import os
+
+from api_portal.sail_portal_api import SailPortalApi
+from config import DATAOWNER_EMAIL, RESEARCHER_EMAIL, SAIL_PASS
+
+from utils.account_helpers import get_add_user_payload
+from utils.helpers import random_name
+
+
+def get_worker_id():
+    """
+    Helper to return the id of the pytest-xdist worker running this process
+
+    :return: worker id, e.g. "gw0", "master" when not running under xdist
+    :rtype: string
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+class Tenant:
+    """
+    Tenant Class, the researcher and data owner users a test worker logs in with
+
+    Every title a worker registers is prefixed with its namespace so cleanups only
+    touch the resources of that worker. The shared tenant uses the config.py
+    accounts and an empty namespace, which matches every resource.
+    """
+
+    def __init__(self, namespace="", researcher_email=RESEARCHER_EMAIL, data_owner_email=DATAOWNER_EMAIL):
+        """
+        :param namespace: prefix of the resource titles of this tenant
+        :type namespace: string
+        :param researcher_email: researcher user
+        :type researcher_email: string
+        :param data_owner_email: data owner user
+        :type data_owner_email: string
+        """
+        self.namespace = namespace
+        self.researcher_email = researcher_email
+        self.data_owner_email = data_owner_email
+        self.password = SAIL_PASS
+        # users added by provision so far, deleted by teardown
+        self.created_emails = []
+
+    @classmethod
+    def for_worker(cls, worker_id=None):
+        """
+        Create an isolated tenant, its users are created by provision
+
+        :param worker_id: worker id, defaults to the current xdist worker
+        :type worker_id: string, optional
+        :return: tenant
+        :rtype: class : utils.tenant_helpers.Tenant
+        """
+        return cls(namespace=f"{worker_id or get_worker_id()}-{random_name(5)}-")
+
+    @property
+    def isolated(self):
+        """
+        :return: True when the tenant has a namespace, so owns matches only the resources it registered
+        :rtype: bool
+        """
+        return bool(self.namespace)
+
+    def namespaced(self, name):
+        """
+        :param name: resource title
+        :type name: string
+        :return: title prefixed with the tenant namespace
+        :rtype: string
+        """
+        return f"{self.namespace}{name}"
+
+    def owns(self, name):
+        """
+        :param name: resource title
+        :type name: string
+        :return: True when the resource belongs to this tenant
+        :rtype: bool
+        """
+        return (name or "").startswith(self.namespace)
+
+    def provision(self, base_url, account_management, transport=None):
+        """
+        Add the tenant users to the researcher and data owner organizations, each
+        added by the config.py account of that organization, the users already added are
+        deleted again when a later one fails
+
+        :param base_url: portal base url
+        :type base_url: string
+        :param account_management: AccountManagementApi
+        :type account_management: class : api_portal.account_management_api.AccountManagementApi
+        :param transport: HttpTransport, defaults to the process wide one
+        :type transport: class : api_portal.http_transport.HttpTransport, optional
+        :raises ValueError: a tenant user could not be added
+        """
+        for role, admin_email in (("researcher", RESEARCHER_EMAIL), ("data_owner", DATAOWNER_EMAIL)):
+            admin_portal = SailPortalApi(base_url=base_url, email=admin_email, password=SAIL_PASS, transport=transport)
+            payload, user_email = get_add_user_payload(prefix=self.namespace)
+            response, _, _ = account_management.add_user(admin_portal, payload=payload)
+            if response is None or response.status_code != 201:
+                message = f"Could not add {role} user of tenant {self.namespace}: {response}"
+                try:
+                    self.teardown(base_url, account_management)
+                except ValueError as teardown_error:
+                    message = f"{message}. {teardown_error}"
+                raise ValueError(message)
+            self.created_emails.append(user_email)
+            setattr(self, f"{role}_email", user_email)
+
+    def teardown(self, base_url, account_management):
+        """
+        Delete the users added by provision, also those of a provision that failed part way.
+        Every user is tried, the ones that could not be deleted stay in created_emails
+
+        :param base_url: portal base url
+        :type base_url: string
+        :param account_management: AccountManagementApi
+        :type account_management: class : api_portal.account_management_api.AccountManagementApi
+        :raises ValueError: some users could not be deleted
+        """
+        failures = {}
+        while self.created_emails:
+            email = self.created_emails.pop()
+            # delete_user logs in as the deleted user itself, its sail_portal argument is unused
+            try:
+                response, _, _, _ = account_management.delete_user(None, base_url, Email=email, Password=self.password)
+            except Exception as error:
+                failures[email] = repr(error)
+                continue
+            if response is None or response.status_code != 200:
+                failures[email] = getattr(response, "status_code", None)
+        self.created_emails = list(failures)
+        if failures:
+            raise ValueError(f"Could not delete {len(failures)} users of tenant {self.namespace}: {failures}")
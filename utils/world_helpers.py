@@ -0,0 +1,276 @@
+# -----------------------------------------------------------
+#
+# Synthetic World Helpers, a multi-tenant portal population of any size
+#
+# -----------------------------------------------------------
+import random
+
+from config import SAIL_PASS
+
+from utils.az_template_helpers import get_az_template_payload
+from utils.dataset_helpers import get_generated_dataset_payload
+from utils.digital_contract_helpers import (
+    CONTRACT_STAGES,
+    get_digital_contract_acceptance_payload,
+    get_digital_contract_activate_payload,
+    get_digital_contract_payload,
+)
+
+# Datasets of a world are published over the three years before WORLD_EPOCH, 2022-01-01 utc
+WORLD_EPOCH = 1640995200
+WORLD_PUBLISH_SPAN = 3 * 365 * 86400
+
+
+class WorldSpec:
+    """
+    World Spec Class, cardinalities of a synthetic world
+
+    Counts are per organization, digital contracts per dataset, so 100 organizations x
+    1000 datasets x 10 contracts describe 100000 datasets and 1000000 contracts.
+    """
+
+    def __init__(
+        self,
+        organizations=10,
+        users_per_organization=2,
+        dataset_families_per_organization=2,
+        datasets_per_organization=10,
+        contracts_per_dataset=1,
+        azure_templates_per_organization=1,
+        data_federations_per_organization=0,
+        tables_per_dataset=3,
+        number_rows=(10, 1000),
+        number_columns=(2, 20),
+        seed=0,
+    ):
+        """
+        :param organizations: organizations of the world
+        :type organizations: int
+        :param users_per_organization: users of each organization, the first one registers its resources
+        :type users_per_organization: int
+        :param dataset_families_per_organization: dataset families owned by each organization
+        :type dataset_families_per_organization: int
+        :param datasets_per_organization: datasets owned by each organization
+        :type datasets_per_organization: int
+        :param contracts_per_dataset: digital contracts researchers of other organizations hold on each dataset
+        :type contracts_per_dataset: int
+        :param azure_templates_per_organization: azure templates of each organization
+        :type azure_templates_per_organization: int
+        :param data_federations_per_organization: data federations of each organization
+        :type data_federations_per_organization: int
+        :param tables_per_dataset: tables of each dataset
+        :type tables_per_dataset: int
+        :param number_rows: rows per table, or (low, high) range of rows
+        :type number_rows: int or tuple
+        :param number_columns: columns per table, or (low, high) range of columns
+        :type number_columns: int or tuple
+        :param seed: the same seed and cardinalities describe the same world
+        :type seed: int
+        """
+        if organizations < 1 or users_per_organization < 1:
+            raise ValueError("A world needs at least one organization with one user")
+        self.organizations = organizations
+        self.users_per_organization = users_per_organization
+        self.dataset_families_per_organization = dataset_families_per_organization
+        self.datasets_per_organization = datasets_per_organization
+        self.contracts_per_dataset = contracts_per_dataset
+        self.azure_templates_per_organization = azure_templates_per_organization
+        self.data_federations_per_organization = data_federations_per_organization
+        self.tables_per_dataset = tables_per_dataset
+        self.number_rows = number_rows
+        self.number_columns = number_columns
+        self.seed = seed
+
+    def counts(self):
+        """
+        :return: number of each resource in the world
+        :rtype: dict
+        """
+        datasets = self.organizations * self.datasets_per_organization
+        return {
+            "Organizations": self.organizations,
+            "Users": self.organizations * self.users_per_organization,
+            "DatasetFamilies": self.organizations * self.dataset_families_per_organization,
+            "Datasets": datasets,
+            "DigitalContracts": datasets * self.contracts_per_dataset,
+            "AzureTemplates": self.organizations * self.azure_templates_per_organization,
+            "DataFederations": self.organizations * self.data_federations_per_organization,
+        }
+
+    def __repr__(self):
+        return f"WorldSpec(seed={self.seed}, {self.counts()})"
+
+
+class World:
+    """
+    World Class, the organizations, users and resources described by a WorldSpec
+
+    Every resource is generated on demand from its own random generator, seeded from
+    the world seed and the resource position, so a world of millions of resources is
+    walked without holding it and any resource is regenerated alone. The payloads are
+    the ones the api_portal register calls take.
+
+    Digital contracts cycle through every stage of CONTRACT_STAGES, the researcher of
+    a contract belongs to another organization than the data owner whenever the world
+    has more than one.
+    """
+
+    def __init__(self, spec):
+        """
+        :param spec: cardinalities and seed
+        :type spec: class : utils.world_helpers.WorldSpec
+        """
+        self.spec = spec
+
+    def _rng(self, kind, *position):
+        return random.Random(f"{self.spec.seed}-{kind}-{'-'.join(str(index) for index in position)}")
+
+    def organization_name(self, organization):
+        return f"World Organization {organization:05d}"
+
+    def users(self, organization):
+        """
+        :param organization: organization position
+        :type organization: int
+        :return: register user payloads of the organization, first is the one registering its resources
+        :rtype: list
+        """
+        return [
+            {
+                "Email": f"user{user:03d}.org{organization:05d}@world.test",
+                "Password": SAIL_PASS,
+                "Name": f"World User {organization:05d}-{user:03d}",
+                "PhoneNumber": 1231231234,
+                "Title": "Data Owner" if user == 0 else "Researcher",
+                "AccessRights": 1,
+            }
+            for user in range(self.spec.users_per_organization)
+        ]
+
+    def dataset_family(self, organization, family):
+        """
+        :return: register dataset family payload
+        :rtype: dict
+        """
+        rng = self._rng("family", organization, family)
+        return {
+            "DatasetFamilyTitle": f"World Family {organization:05d}-{family:03d}",
+            "DatasetFamilyDescription": f"Dataset family {family} of organization {organization}",
+            "DatasetFamilyTags": ", ".join(rng.sample(["SAIL", "genomics", "imaging", "trial", "ehr"], 2)),
+        }
+
+    def dataset_families(self, organization):
+        """
+        :return: register dataset family payloads of the organization
+        :rtype: list
+        """
+        return [
+            self.dataset_family(organization, family) for family in range(self.spec.dataset_families_per_organization)
+        ]
+
+    def dataset(self, organization, dataset):
+        """
+        :return: dataset_payload, dataset_guid, dataset_name
+        :rtype: (dict, str, str)
+        """
+        rng = self._rng("dataset", organization, dataset)
+        return get_generated_dataset_payload(
+            rng,
+            dataset,
+            self.spec.tables_per_dataset,
+            self.spec.number_rows,
+            self.spec.number_columns,
+            name_prefix=f"world-{organization:05d}-",
+            publish_date=WORLD_EPOCH - rng.randrange(WORLD_PUBLISH_SPAN),
+        )
+
+    def datasets(self, organization):
+        """
+        :return: dataset_payload, dataset_guid, dataset_name of each dataset of the organization
+        :rtype: generator
+        """
+        for dataset in range(self.spec.datasets_per_organization):
+            yield self.dataset(organization, dataset)
+
+    def azure_template(self, organization, template):
+        """
+        :return: register azure template payload
+        :rtype: dict
+        """
+        return get_az_template_payload(f"World Template {organization:05d}-{template:03d}")
+
+    def azure_templates(self, organization):
+        """
+        :return: register azure template payloads of the organization
+        :rtype: list
+        """
+        return [
+            self.azure_template(organization, template)
+            for template in range(self.spec.azure_templates_per_organization)
+        ]
+
+    def data_federation(self, organization, federation):
+        """
+        :return: register data federation payload
+        :rtype: dict
+        """
+        return {
+            "DataFederationName": f"World Federation {organization:05d}-{federation:03d}",
+            "DataFederationDescription": f"Data federation {federation} of organization {organization}",
+        }
+
+    def data_federations(self, organization):
+        """
+        :return: register data federation payloads of the organization
+        :rtype: list
+        """
+        return [
+            self.data_federation(organization, federation)
+            for federation in range(self.spec.data_federations_per_organization)
+        ]
+
+    def digital_contracts(self, organization):
+        """
+        Digital contracts on the datasets of a data owner organization
+
+        :return: dicts of the researcher organization position, dataset guid, target stage and
+            payload builders, the organization guids being known only once the world is loaded
+        :rtype: generator
+        """
+        organizations = self.spec.organizations
+        for dataset in range(self.spec.datasets_per_organization):
+            _, dataset_guid, _ = self.dataset(organization, dataset)
+            for contract in range(self.spec.contracts_per_dataset):
+                rng = self._rng("contract", organization, dataset, contract)
+                researcher = organization
+                if organizations > 1:
+                    researcher = (organization + 1 + rng.randrange(organizations - 1)) % organizations
+                position = (
+                    organization * self.spec.datasets_per_organization + dataset
+                ) * self.spec.contracts_per_dataset
+                yield {
+                    "Researcher": researcher,
+                    "DatasetGuid": dataset_guid,
+                    "Stage": list(CONTRACT_STAGES)[(position + contract) % len(CONTRACT_STAGES)],
+                    "Title": f"World Contract {organization:05d}-{dataset:06d}-{contract:03d}",
+                    "SubscriptionDays": rng.choice((7, 28, 90, 365)),
+                    "NumberOfVirtualMachines": rng.randint(1, 4),
+                }
+
+    def digital_contract_payloads(self, contract, data_owner_guid, digital_contract_guid=None):
+        """
+        :param contract: digital contract from digital_contracts
+        :type contract: dict
+        :param data_owner_guid: guid of the data owner organization
+        :type data_owner_guid: string
+        :param digital_contract_guid: guid of the registered contract, needed for the accept and activate payloads
+        :type digital_contract_guid: string, optional
+        :return: register, accept and activate payloads of the contract
+        :rtype: (dict, dict, dict)
+        """
+        register = get_digital_contract_payload(data_owner_guid, contract["DatasetGuid"].strip("{}"))
+        register.update(Title=contract["Title"], SubscriptionDays=contract["SubscriptionDays"])
+        accept = get_digital_contract_acceptance_payload(digital_contract_guid)
+        accept["NumberOfVirtualMachines"] = contract["NumberOfVirtualMachines"]
+        activate = get_digital_contract_activate_payload(digital_contract_guid)
+        return register, accept, activate